@@ -0,0 +1,52 @@
+"""
+测量保存 JSON 媒体库时 GUI 线程被阻塞的时间。
+
+用法（在项目根目录下）：
+    python -m benchmarks.bench_background_save [行数]
+
+sync 为改动前 MainWindow.on_save 的做法：在 GUI 线程中调用 save_library；
+background 为 LibrarySaver.save 在 GUI 线程中的耗时（只创建快照）以及后台写入的总耗时。
+"""
+import os
+import sys
+import tempfile
+import time
+
+from PySide6.QtCore import QCoreApplication
+
+from controllers.library_controller import LibraryController
+from models.media_model import MediaItem
+from models.media_table_model import MediaTableModel
+from repository.json_repository import JSONRepository
+from services.library_saver import LibrarySaver
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    app = QCoreApplication.instance() or QCoreApplication([])
+    controller = LibraryController(MediaTableModel(), JSONRepository())
+    controller._set_items([MediaItem(f'标题{i}', f'导演{i % 997}', 1950 + i % 75, (i % 100) / 10,
+                                     f'http://example.com/{i}.jpg', '简介' * 40)
+                           for i in range(n)])
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'library.json')
+        start = time.perf_counter()
+        controller.save_library(path)
+        sync = (time.perf_counter() - start) * 1000
+
+        saver = LibrarySaver(controller)
+        done = []
+        saver.saved.connect(done.append)
+        start = time.perf_counter()
+        saver.save(path)
+        blocked = (time.perf_counter() - start) * 1000
+        while not done:
+            app.processEvents()
+            time.sleep(0.001)
+        total = (time.perf_counter() - start) * 1000
+    print(f'{n} 行  sync {sync:8.1f} ms   background: GUI 线程 {blocked:6.1f} ms，'
+          f'写入完成 {total:8.1f} ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,39 @@
+"""
+测量 LibraryColumns 在大型媒体库上的建列、排序和统计耗时。
+
+用法（在项目根目录下）：
+    python -m benchmarks.bench_columns [行数]
+"""
+import sys
+import time
+
+from models.library_columns import LibraryColumns
+from models.media_model import MediaItem
+
+
+def _timed(label: str, fn):
+    start = time.perf_counter()
+    result = fn()
+    print(f'{label:32} {(time.perf_counter() - start) * 1000:9.1f}ms')
+    return result
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    items = [MediaItem(f'标题{i * 7919 % n}', f'导演{i % 9973}', 1950 + i % 75, (i % 100) / 10)
+             for i in range(n)]
+    columns = LibraryColumns()
+    columns.reset(items)
+    _timed('build columns', columns.ensure_built)
+    _timed('sort by rating desc', lambda: columns.sort_order([('rating', False)]))
+    _timed('sort by year, rating desc',
+           lambda: columns.sort_order([('year', True), ('rating', False)]))
+    _timed('sort by creator, year', lambda: columns.sort_order([('creator', True), ('year', True)]))
+    _timed('sort by title (first)', lambda: columns.sort_order([('title', True)]))
+    _timed('sort by title (cached ranks)', lambda: columns.sort_order([('title', True)]))
+    _timed('stats', columns.stats)
+    _timed('stats over 10% rows', lambda: columns.stats(rows=range(0, n, 10)))
+
+
+if __name__ == '__main__':
+    main()
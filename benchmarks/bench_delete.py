@@ -0,0 +1,68 @@
+"""
+测量从 10 万行的媒体库中删除 1 万个选中行及撤销的耗时。
+
+用法（在项目根目录下）：
+    python -m benchmarks.bench_delete [总行数] [删除行数]
+
+两种选择方式：连续的一块，以及均匀分散的行（每 n/k 行一个）。
+per-row 为改动前 MainWindow.on_delete 的做法：按行号倒序逐行调用 delete_item，
+每行都移动列表后部并发出一次 rowsRemoved；这里直接调用模型和仓库以模拟旧的实现。
+"""
+import sys
+import time
+
+from PySide6.QtCore import QCoreApplication
+
+from controllers.library_controller import LibraryController
+from models.media_model import MediaItem
+from models.media_table_model import MediaTableModel
+from models.search_proxy_model import SearchProxyModel
+from repository.json_repository import JSONRepository
+
+
+def _controller(n: int):
+    model = MediaTableModel()
+    controller = LibraryController(model, JSONRepository())
+    controller._set_items([MediaItem(f'标题{i}', f'导演{i % 997}', 1950 + i % 75, (i % 100) / 10)
+                           for i in range(n)])
+    # 与主窗口相同，代理模型在控制层之后连接；先建好搜索索引，与实际使用时一致
+    proxy = SearchProxyModel(controller.search, controller.sort_order)
+    proxy.setSourceModel(model)
+    controller._index.ensure_built()
+    return controller, model, proxy
+
+
+def _timed(fn) -> float:
+    start = time.perf_counter()
+    fn()
+    return (time.perf_counter() - start) * 1000
+
+
+def _per_row(controller, model, rows):
+    for row in sorted(rows, reverse=True):
+        model.remove_items(row)
+        controller.repository.delete(row)
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    k = int(sys.argv[2]) if len(sys.argv) > 2 else 10_000
+    app = QCoreApplication.instance() or QCoreApplication([])
+    selections = {
+        '连续': list(range(n // 3, n // 3 + k)),
+        '分散': list(range(0, n, n // k))[:k],
+    }
+    print(f'{n} 行中删除 {k} 行')
+    for name, rows in selections.items():
+        controller, model, proxy = _controller(n)
+        per_row = _timed(lambda: _per_row(controller, model, rows))
+        controller, model, proxy = _controller(n)
+        delete = _timed(lambda: controller.delete_rows(rows))
+        undo = _timed(controller.undo_stack.undo)
+        redo = _timed(controller.undo_stack.redo)
+        print(f'{name}: per-row {per_row:9.1f} ms   delete_rows {delete:8.1f} ms   '
+              f'undo {undo:8.1f} ms   redo {redo:8.1f} ms')
+
+
+if __name__ == '__main__':
+    main()
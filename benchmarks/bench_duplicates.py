@@ -0,0 +1,45 @@
+"""
+测量 find_duplicates 在合成媒体库上的耗时。
+
+用法（在项目根目录下）：
+    python -m benchmarks.bench_duplicates [条目数] [进程数]
+
+每 100 个条目追加一个多了一个字符的副本（模糊重复）和一个大写副本（精确重复），
+因此预期约有 n/100 组重复项。
+"""
+import random
+import sys
+import time
+
+from models.media_model import MediaItem
+from services.duplicates import find_duplicates
+
+WORDS = ['star', 'night', 'love', 'war', 'city', 'dark', 'river', 'moon',
+         'king', 'ghost', 'blue', 'last', 'road', 'house', 'dream']
+
+
+def synthetic_library(n: int, seed: int = 1) -> list[MediaItem]:
+    rng = random.Random(seed)
+    items = [MediaItem(' '.join(rng.choice(WORDS) for _ in range(rng.randint(1, 4))) + f' {i}',
+                       f'Director {i % 5000}', 1950 + i % 75, 5.0) for i in range(n)]
+    for i in range(0, n, 100):
+        item = items[i]
+        items.append(MediaItem(item.title[0] + 'x' + item.title[1:], item.creator, item.year,
+                               item.rating))
+        items.append(MediaItem(item.title.upper(), item.creator, item.year, item.rating))
+    return items
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else None
+    items = synthetic_library(n)
+    start = time.perf_counter()
+    groups = find_duplicates(items, workers=workers)
+    elapsed = time.perf_counter() - start
+    exact = sum(group.exact for group in groups)
+    print(f'{len(items)} 项：{len(groups)} 组重复项（完全相同 {exact} 组），{elapsed:.2f} s')
+
+
+if __name__ == '__main__':
+    main()
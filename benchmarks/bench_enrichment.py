@@ -0,0 +1,67 @@
+"""
+在本地替身 OMDb 服务器上测量元数据补全的吞吐量。
+
+用法（在项目根目录下）：
+    python -m benchmarks.bench_enrichment [条目数] [--latency 秒]
+
+对比逐个同步请求（相当于每个标题一个 OMDbWorker 顺序执行）与
+EnrichmentEngine 的 aiohttp 路径和线程池退路。
+"""
+import argparse
+import asyncio
+import time
+
+from benchmarks.mock_omdb import MockOMDbServer
+from models.media_model import MediaItem
+from services import enrichment
+from services.enrichment import EnrichmentEngine
+from services.omdb_worker import fetch_omdb
+
+
+def _items(n: int):
+    return [MediaItem(f'Title {i}', 'C', 2000, 5.0) for i in range(n)]
+
+
+def _sequential(url: str, items) -> float:
+    start = time.perf_counter()
+    for item in items:
+        fetch_omdb(item.title, 'k', url=url)
+    return time.perf_counter() - start
+
+
+def _engine(url: str, items, concurrency: int) -> float:
+    engine = EnrichmentEngine(api_key='k', concurrency=concurrency, url=url)
+    stats = asyncio.run(engine.run(items, lambda batch: None))
+    assert stats['enriched'] == len(items), stats
+    return stats['elapsed']
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument('count', type=int, nargs='?', default=5000)
+    parser.add_argument('--latency', type=float, default=0.05)
+    parser.add_argument('--concurrency', type=int, default=64)
+    args = parser.parse_args(argv)
+
+    items = _items(args.count)
+    # 顺序请求太慢，只取一小部分后按比例换算
+    sample = items[:max(1, args.count // 20)]
+    print(f'{"method":<22}{"items":>8}{"time (s)":>10}{"items/s":>10}')
+    with MockOMDbServer(latency=args.latency) as server:
+        elapsed = _sequential(server.url, sample)
+        print(f'{"sequential":<22}{len(sample):>8}{elapsed:>10.2f}{len(sample) / elapsed:>10.1f}')
+
+        if enrichment.aiohttp is not None:
+            elapsed = _engine(server.url, items, args.concurrency)
+            print(f'{"engine (aiohttp)":<22}{len(items):>8}{elapsed:>10.2f}{len(items) / elapsed:>10.1f}')
+
+        aiohttp_module, enrichment.aiohttp = enrichment.aiohttp, None
+        try:
+            elapsed = _engine(server.url, items, args.concurrency)
+        finally:
+            enrichment.aiohttp = aiohttp_module
+        print(f'{"engine (threads)":<22}{len(items):>8}{elapsed:>10.2f}{len(items) / elapsed:>10.1f}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+"""
+对比 json.load 整体解析与 JSONRepository.iter_load 流式解析的内存峰值。
+
+用法（在项目根目录下）：
+    python -m benchmarks.bench_json_load [条目数 ...]
+
+默认生成约 300MB 的媒体库文件；tracemalloc 只统计 Python 分配的内存。
+"""
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from models.media_model import MediaItem
+from repository.json_repository import JSONRepository
+
+DEFAULT_SIZES = [500_000]
+
+
+def _write_library(path: str, n: int):
+    items = [MediaItem(f'标题{i}', f'导演{i % 997}', 1950 + i % 75, (i % 100) / 10,
+                       plot='一段剧情简介。' * 20)
+             for i in range(n)]
+    JSONRepository().save(items, path)
+
+
+def _eager_load(path: str) -> int:
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    return len([MediaItem.from_dict(d) for d in data])
+
+
+def _streaming_count(path: str) -> int:
+    # 只计数不保留，体现流式解析本身的常数内存开销
+    return sum(1 for _ in JSONRepository().iter_load(path))
+
+
+def _streaming_load(path: str) -> int:
+    return len(JSONRepository().load(path))
+
+
+def _measure(func, path: str):
+    tracemalloc.start()
+    start = time.perf_counter()
+    count = func(path)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return count, elapsed, peak / (1024 * 1024)
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    sizes = [int(a) for a in argv] or DEFAULT_SIZES
+    print(f'{"method":<16}{"items":>10}{"file (MB)":>12}{"time (s)":>10}{"peak (MB)":>12}')
+    for n in sizes:
+        fd, path = tempfile.mkstemp(suffix='.json')
+        os.close(fd)
+        try:
+            _write_library(path, n)
+            size_mb = os.path.getsize(path) / (1024 * 1024)
+            for name, func in (('json.load', _eager_load),
+                               ('iter_load', _streaming_count),
+                               ('iter_load+list', _streaming_load)):
+                count, elapsed, peak = _measure(func, path)
+                assert count == n
+                print(f'{name:<16}{n:>10}{size_mb:>12.1f}{elapsed:>10.2f}{peak:>12.1f}')
+        finally:
+            os.remove(path)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+"""
+对比原先的 @dataclass MediaItem（带 __dict__、asdict 序列化）、加了 __slots__ 的 MediaItem
+和列式 MediaStore 的每项内存占用与序列化/反序列化吞吐。
+
+用法（在项目根目录下）：
+    python -m benchmarks.bench_media_store [行数]
+
+内存用 tracemalloc 统计从 JSON 文本构建集合并丢弃中间字典后仍占用的字节数，
+其中包含条目引用的字符串；吞吐单位为每秒处理的条目数。
+"""
+import gc
+import json
+import sys
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass
+
+from models.media_model import MediaItem
+from models.media_store import MediaStore
+
+
+@dataclass
+class LegacyMediaItem:
+    """改动前的 MediaItem"""
+    title: str
+    creator: str
+    year: int
+    rating: float
+    poster_url: str = ''
+    plot: str = ''
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'LegacyMediaItem':
+        return cls(
+            title=data.get('title', ''),
+            creator=data.get('creator', ''),
+            year=int(data.get('year', 0)),
+            rating=float(data.get('rating', 0.0)),
+            poster_url=data.get('poster_url', ''),
+            plot=data.get('plot', '')
+        )
+
+
+def _make_records(n: int) -> list[dict]:
+    return [{'title': f'标题{i}', 'creator': f'导演{i % 997}', 'year': 1950 + i % 75,
+             'rating': (i % 100) / 10, 'poster_url': f'https://img.example/{i}.jpg',
+             'plot': f'第{i}部作品的简介'}
+            for i in range(n)]
+
+
+def _measure(text: str, build) -> tuple[object, int]:
+    tracemalloc.start()
+    records = json.loads(text)
+    result = build(records)
+    del records
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, size
+
+
+def _rate(n: int, fn) -> float:
+    start = time.perf_counter()
+    fn()
+    return n / (time.perf_counter() - start)
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+    records = _make_records(n)
+    text = json.dumps(records, ensure_ascii=False)
+    cases = {
+        'dataclass': lambda rs: [LegacyMediaItem.from_dict(r) for r in rs],
+        'slots': lambda rs: [MediaItem.from_dict(r) for r in rs],
+        'store': MediaStore.from_dicts,
+    }
+    print(f'{"kind":10} {"bytes/item":>10} {"from_dict/s":>12} {"to_dict/s":>12}')
+    for kind, build in cases.items():
+        collection, size = _measure(text, build)
+        from_rate = _rate(n, lambda: build(records))
+        if kind == 'store':
+            to_rate = _rate(n, collection.to_dicts)
+        else:
+            to_rate = _rate(n, lambda: [item.to_dict() for item in collection])
+        print(f'{kind:10} {size / n:10.1f} {from_rate:12,.0f} {to_rate:12,.0f}')
+        del collection
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+"""
+对比 JSONRepository、JournaledJSONRepository 与 SQLiteRepository 的
+打开耗时、单次编辑后保存的延迟以及内存峰值。
+
+用法（在项目根目录下）：
+    python -m benchmarks.bench_repositories [条目数 ...]
+"""
+import os
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from models.media_model import MediaItem
+from repository.json_repository import JSONRepository
+from repository.journaled_repository import JournaledJSONRepository
+from repository.sqlite_repository import SQLiteRepository, convert_json_to_sqlite
+
+DEFAULT_SIZES = [100_000, 1_000_000]
+EDITS = 20
+
+
+def _write_library(path: str, n: int):
+    items = [MediaItem(f'标题{i}', f'导演{i % 997}', 1950 + i % 75, (i % 100) / 10,
+                       plot='一段剧情简介。' * 5)
+             for i in range(n)]
+    JSONRepository().save(items, path)
+
+
+def _bench(repo, path: str):
+    tracemalloc.start()
+    start = time.perf_counter()
+    items = repo.load(path)
+    open_time = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    start = time.perf_counter()
+    for i in range(EDITS):
+        row = (i * 7919) % len(items)
+        items[row].rating = 9.9
+        repo.update(row, items[row])
+        repo.save(items, path)
+    edit_latency = (time.perf_counter() - start) / EDITS
+    return open_time, edit_latency * 1000, peak / (1024 * 1024)
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    sizes = [int(a) for a in argv] or DEFAULT_SIZES
+    print(f'{"repository":<12}{"items":>10}{"open (s)":>10}{"edit+save (ms)":>16}{"peak (MB)":>12}')
+    for n in sizes:
+        workdir = tempfile.mkdtemp()
+        try:
+            json_path = os.path.join(workdir, 'library.json')
+            db_path = os.path.join(workdir, 'library.db')
+            _write_library(json_path, n)
+            convert_json_to_sqlite(json_path, db_path)
+            for name, repo, path in (('json', JSONRepository(), json_path),
+                                     ('journaled', JournaledJSONRepository(), json_path),
+                                     ('sqlite', SQLiteRepository(), db_path)):
+                open_time, edit_ms, peak = _bench(repo, path)
+                print(f'{name:<12}{n:>10}{open_time:>10.2f}{edit_ms:>16.2f}{peak:>12.1f}')
+        finally:
+            shutil.rmtree(workdir)
+
+
+if __name__ == '__main__':
+    main()
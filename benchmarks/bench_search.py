@@ -0,0 +1,54 @@
+"""
+测量搜索索引的建立耗时，以及模拟逐字输入时每次按键的查询延迟。
+
+用法（在项目根目录下）：
+    python -m benchmarks.bench_search [行数]
+"""
+import random
+import sys
+import time
+
+from models.media_model import MediaItem
+from models.search_index import SearchIndex
+
+WORDS = ['matrix', 'spirited', 'away', 'ghost', 'shell', 'akira', 'blade', 'runner',
+         'star', 'wars', 'godfather', 'casablanca', 'vertigo', 'alien', 'heat']
+CJK = '千与寻龙猫天空之城风起了红猪魔女宅急便幽灵公主悬崖上的金鱼姬'
+QUERIES = ['blade run', 'godfa', '千与千寻', '龙猫', 'star year:1990-1999', 'rating:9-']
+
+
+def _make_items(n: int) -> list[MediaItem]:
+    rng = random.Random(0)
+    items = []
+    for i in range(n):
+        if i % 2:
+            title = ' '.join(rng.choice(WORDS) for _ in range(rng.randint(1, 3)))
+        else:
+            title = ''.join(rng.choice(CJK) for _ in range(rng.randint(2, 6)))
+        items.append(MediaItem(title, f'导演{i % 997}', 1950 + i % 75, (i % 100) / 10))
+    return items
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    items = _make_items(n)
+    index = SearchIndex()
+    index.reset(items)
+    start = time.perf_counter()
+    index.ensure_built()
+    print(f'build {n} rows: {time.perf_counter() - start:.2f}s')
+
+    for query in QUERIES:
+        # 逐字输入：每个前缀各查询一次，记录最慢的一次
+        worst, hits = 0.0, 0
+        for end in range(1, len(query) + 1):
+            criteria = SearchIndex.parse_query(query[:end])
+            start = time.perf_counter()
+            rows = index.search(**criteria)
+            worst = max(worst, time.perf_counter() - start)
+            hits = 0 if rows is None else len(rows)
+        print(f'{query!r:28} hits={hits:<8} worst keystroke={worst * 1000:.1f}ms')
+
+
+if __name__ == '__main__':
+    main()
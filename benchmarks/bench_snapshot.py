@@ -0,0 +1,51 @@
+"""
+对比 JSON 与二进制快照（.mlib）的文件大小、打开耗时和首屏访问耗时。
+
+用法（在项目根目录下）：
+    python -m benchmarks.bench_snapshot [条目数]
+
+“打开”指得到可以交给模型的条目序列：JSON 需要解析全部条目，
+快照只做 mmap；“首屏”为随后读取前 50 行的耗时。
+"""
+import os
+import sys
+import tempfile
+import time
+
+from models.media_model import MediaItem
+from repository.binary_repository import BinaryRepository
+from repository.json_repository import JSONRepository
+
+FIRST_SCREEN = 50
+
+
+def _make_items(n: int) -> list[MediaItem]:
+    return [MediaItem(f'标题{i}', f'导演{i % 997}', 1950 + i % 75, (i % 100) / 10,
+                      f'https://img.example/{i}.jpg', f'第{i}部作品的剧情简介。' * 3)
+            for i in range(n)]
+
+
+def _timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    items = _make_items(n)
+    with tempfile.TemporaryDirectory() as directory:
+        for name, repo in (('json', JSONRepository()), ('mlib', BinaryRepository())):
+            path = os.path.join(directory, f'library.{name}')
+            _, save = _timed(lambda: repo.save(items, path))
+            loaded, opened = _timed(lambda: repo.load(path))
+            _, first = _timed(lambda: [loaded[row].title for row in range(FIRST_SCREEN)])
+            _, full = _timed(lambda: sum(1 for _ in loaded))
+            print(f'{name}: size={os.path.getsize(path) / 2**20:.1f}MB save={save:.2f}s '
+                  f'open={opened * 1000:.1f}ms first screen={first * 1000:.2f}ms '
+                  f'read all={full:.2f}s')
+            del loaded
+
+
+if __name__ == '__main__':
+    main()
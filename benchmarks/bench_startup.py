@@ -0,0 +1,77 @@
+"""
+测量图形界面的冷启动耗时，分别给出导入耗时和程序内各阶段耗时。
+
+用法（在项目根目录下）：
+    python -m benchmarks.bench_startup [运行次数]
+
+每次运行都启动一个新的 `python -X importtime main.py` 进程（QT_QPA_PLATFORM=offscreen），
+MEDIA_LIBRARY_STARTUP_TIMING=exit 使程序在完成启动后输出各阶段耗时并退出。
+导入耗时按 main 直接导入的顶层包汇总（累计微秒，含子模块）；
+第一次运行时样式表缓存可能尚未生成，因此同时给出第一次与其余各次的中位数。
+"""
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# import time:      self [us] |  cumulative | imported package
+_IMPORT_LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$')
+_PHASE_LINE = re.compile(r'^startup: (.+?)\s+([\d.]+)ms$')
+
+
+def run_once() -> tuple[float, dict[str, float], dict[str, float]]:
+    """返回 (进程墙钟秒数, {顶层包: 导入毫秒}, {阶段: 毫秒})"""
+    env = dict(os.environ, QT_QPA_PLATFORM='offscreen', MEDIA_LIBRARY_STARTUP_TIMING='exit')
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, '-X', 'importtime', 'main.py'], cwd=ROOT, env=env,
+                            capture_output=True, text=True, timeout=120)
+    wall = time.perf_counter() - start
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr[-2000:])
+
+    imports: dict[str, float] = defaultdict(float)
+    phases: dict[str, float] = {}
+    for line in result.stderr.splitlines():
+        match = _IMPORT_LINE.match(line)
+        if match:
+            _, cumulative, indent, name = match.groups()
+            # main.py 作为脚本运行，缩进为一个空格的是它（或解释器启动时）直接导入的模块
+            if len(indent) == 1:
+                imports[name.split('.')[0]] += int(cumulative) / 1000
+            continue
+        match = _PHASE_LINE.match(line)
+        if match:
+            phases[match.group(1)] = float(match.group(2))
+    return wall, dict(imports), phases
+
+
+def _median(runs: list[dict[str, float]]) -> dict[str, float]:
+    keys = {key for run in runs for key in run}
+    return {key: statistics.median(run.get(key, 0.0) for run in runs) for key in keys}
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    runs = [run_once() for _ in range(count)]
+    walls = [wall for wall, _, _ in runs]
+    print(f'进程墙钟：第一次 {walls[0] * 1000:.0f} ms，'
+          f'中位数 {statistics.median(walls) * 1000:.0f} ms（{count} 次）')
+
+    print('\n导入耗时（中位数，按顶层包汇总，前 15 项）：')
+    imports = _median([run[1] for run in runs])
+    for name, ms in sorted(imports.items(), key=lambda pair: -pair[1])[:15]:
+        print(f'  {name:32} {ms:8.1f} ms')
+
+    print('\n程序内阶段耗时：')
+    first, rest = runs[0][2], _median([run[2] for run in runs[1:]] or [runs[0][2]])
+    print(f"  {'':24} {'第一次':>10} {'其余中位数':>10}")
+    for phase in first:
+        print(f'  {phase:24} {first[phase]:8.1f}ms {rest.get(phase, 0.0):8.1f}ms')
+
+
+if __name__ == '__main__':
+    main()
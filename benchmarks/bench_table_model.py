@@ -0,0 +1,79 @@
+"""
+对比 QStandardItemModel 与 MediaTableModel 的加载耗时和内存占用。
+
+用法（在项目根目录下）：
+    python -m benchmarks.bench_table_model [行数 ...]
+
+每个 (模型, 行数) 组合在独立子进程中运行，保证 RSS 互不干扰。
+"""
+import os
+import resource
+import subprocess
+import sys
+import time
+
+DEFAULT_SIZES = [10_000, 100_000, 1_000_000]
+
+
+def _make_items(n: int):
+    from models.media_model import MediaItem
+    return [MediaItem(f'标题{i}', f'导演{i % 997}', 1950 + i % 75, (i % 100) / 10)
+            for i in range(n)]
+
+
+def _load_standard(items):
+    from PySide6.QtGui import QStandardItem, QStandardItemModel
+    model = QStandardItemModel(0, 4)
+    for item in items:
+        model.appendRow([
+            QStandardItem(item.title),
+            QStandardItem(item.creator),
+            QStandardItem(str(item.year)),
+            QStandardItem(str(item.rating)),
+        ])
+    return model
+
+
+def _load_table(items):
+    from models.media_table_model import MediaTableModel
+    model = MediaTableModel()
+    model.set_items(items)
+    return model
+
+
+def _max_rss_mb() -> float:
+    # Linux 下 ru_maxrss 单位为 KB，macOS 下为字节
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == 'darwin' else rss / 1024
+
+
+def _run_case(kind: str, n: int):
+    from PySide6.QtGui import QGuiApplication
+    app = QGuiApplication.instance() or QGuiApplication([])
+    items = _make_items(n)
+    base_rss = _max_rss_mb()
+    loader = _load_standard if kind == 'standard' else _load_table
+    start = time.perf_counter()
+    model = loader(items)
+    elapsed = time.perf_counter() - start
+    assert model.rowCount() == n
+    print(f'{kind:<9}{n:>10}{elapsed:>12.3f}{_max_rss_mb() - base_rss:>14.1f}')
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if argv and argv[0] == '--case':
+        _run_case(argv[1], int(argv[2]))
+        return
+    sizes = [int(a) for a in argv] or DEFAULT_SIZES
+    env = dict(os.environ, QT_QPA_PLATFORM='offscreen')
+    print(f'{"model":<9}{"rows":>10}{"load (s)":>12}{"+RSS (MB)":>14}')
+    for n in sizes:
+        for kind in ('standard', 'table'):
+            subprocess.run(
+                [sys.executable, '-m', 'benchmarks.bench_table_model', '--case', kind, str(n)],
+                env=env, check=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+"""
+测量在打开 10 万行媒体库时切换主题的耗时。
+
+用法（在项目根目录下）：
+    QT_QPA_PLATFORM=offscreen python -m benchmarks.bench_theme_switch [行数]
+
+对比两种方式，每次切换后都处理完事件队列（包括重新抛光和重绘）：
+    qt_material   每次调用 qt_material.apply_stylesheet 重新生成并应用样式表
+    cached        MainWindow.apply_theme：样式表取自缓存，图标取自已着色的缓存
+第一轮会生成尚未缓存的主题，单独列出；切换的主题不写入设置。
+"""
+import statistics
+import sys
+import time
+
+from PySide6.QtWidgets import QApplication
+
+from models.media_model import MediaItem
+
+THEMES_TO_CYCLE = ['dark_teal.xml', 'light_blue.xml', 'dark_amber.xml', 'light_pink.xml']
+ROUNDS = 3
+
+
+def _make_items(n: int) -> list[MediaItem]:
+    return [MediaItem(f'标题{i}', f'导演{i % 997}', 1950 + i % 75, (i % 100) / 10)
+            for i in range(n)]
+
+
+def _switch_times(app, switch, rounds: int) -> list[list[float]]:
+    """返回每一轮中各次切换的毫秒数"""
+    result = []
+    for _ in range(rounds):
+        times = []
+        for theme in THEMES_TO_CYCLE:
+            start = time.perf_counter()
+            switch(theme)
+            app.processEvents()
+            times.append((time.perf_counter() - start) * 1000)
+        result.append(times)
+    return result
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    app = QApplication(sys.argv[:1])
+    import main as main_module
+    window = main_module.MainWindow()
+    # 不把基准中切换的主题写入 config.ini
+    window.settings.set_theme = lambda theme: None
+    window.controller._set_items(_make_items(n))
+    window.finish_startup()
+    window.show()
+    app.processEvents()
+    print(f'{n} 行，主题循环 {len(THEMES_TO_CYCLE)} 个，{ROUNDS} 轮')
+
+    from qt_material import apply_stylesheet
+    baseline = _switch_times(app, lambda theme: apply_stylesheet(
+        app, theme=theme, invert_secondary='light' in theme), ROUNDS)
+    window.theme = None  # 基准修改了全局样式表，强制 apply_theme 重新应用
+    cached = _switch_times(app, window.apply_theme, ROUNDS)
+
+    for name, runs in (('qt_material', baseline), ('cached', cached)):
+        first, rest = runs[0], [ms for run in runs[1:] for ms in run]
+        print(f'{name:12} 第一轮 {statistics.mean(first):7.1f} ms/次  '
+              f'之后中位数 {statistics.median(rest):7.1f} ms/次  最大 {max(rest):7.1f} ms')
+
+
+if __name__ == '__main__':
+    main()
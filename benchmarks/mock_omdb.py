@@ -0,0 +1,94 @@
+"""
+本地替身 OMDb 服务器，供测试和基准测试使用。
+标题为 'Missing' 时返回查无此片，其余标题返回固定的海报和简介；
+海报地址指向本服务器的 /poster/<标题>.png，返回一张纯色 PNG。
+"""
+import json
+import struct
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+def make_png(width: int = 300, height: int = 450, rgb=(200, 60, 60)) -> bytes:
+    """生成一张纯色 PNG，不依赖 Qt"""
+    def chunk(kind: bytes, data: bytes) -> bytes:
+        return (struct.pack('>I', len(data)) + kind + data
+                + struct.pack('>I', zlib.crc32(kind + data) & 0xffffffff))
+    row = b'\x00' + bytes(rgb) * width
+    return (b'\x89PNG\r\n\x1a\n'
+            + chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0))
+            + chunk(b'IDAT', zlib.compress(row * height))
+            + chunk(b'IEND', b''))
+
+
+class MockOMDbServer:
+    def __init__(self, latency: float = 0.0):
+        """
+        :param latency: 每个请求的人为延迟（秒），模拟真实网络往返。
+        """
+        self.latency = latency
+        self.requests: list[str] = []
+        self.poster_requests: list[str] = []
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), self._make_handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        return f'http://127.0.0.1:{self._server.server_port}/'
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                parsed = urlparse(self.path)
+                if parsed.path.startswith('/poster/'):
+                    with server._lock:
+                        server.poster_requests.append(parsed.path)
+                    self._reply(make_png(), 'image/png')
+                    return
+                title = parse_qs(parsed.query).get('t', [''])[0]
+                with server._lock:
+                    server.requests.append(title)
+                if server.latency:
+                    time.sleep(server.latency)
+                if title == 'Missing':
+                    body = {'Response': 'False', 'Error': 'Movie not found!'}
+                else:
+                    body = {'Response': 'True', 'Poster': f'{server.url}poster/{title}.png',
+                            'Plot': f'{title} plot'}
+                self._reply(json.dumps(body).encode(), 'application/json')
+
+            def _reply(self, payload: bytes, content_type: str):
+                self.send_response(200)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def start(self) -> 'MockOMDbServer':
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
@@ -0,0 +1,409 @@
+"""
+可重复的基准测试套件：以 benchmarks.synthetic 生成的确定性媒体库为输入，
+结果写成 JSON，可与保存的基线比较并标出变慢的项目。
+
+用法（在项目根目录下）：
+    python -m benchmarks.suite run [--sizes 1k,100k,1m] [--cases json.save,model.populate]
+                                   [--repeat 3] [-o results.json]
+                                   [--compare benchmarks/baselines/reference.json] [--threshold 0.2]
+    python -m benchmarks.suite compare 基线.json 结果.json [--threshold 0.2]
+    python -m benchmarks.suite list
+
+每个 (项目, 行数) 在独立子进程中运行（QT_QPA_PLATFORM=offscreen），RSS 互不干扰。
+生成条目和写入输入文件不计时，加载类项目的输入文件由另一个子进程生成；耗时取多次重复中的最小值（1M 行只运行一次），
+峰值内存为计时部分使 ru_maxrss 增加的量。
+结果格式：
+    {"meta": {...}, "results": {"项目@行数": {"seconds", "ops", "ops_per_s", "peak_rss_mib"}}}
+不带行数的项目（icons.render）键中没有 @。
+比较时耗时或峰值内存超过基线 (1 + threshold) 倍、且绝对差值超过 --min-ms / --min-mib 的项目
+视为退化，命令以状态 1 退出，可以直接用于 CI。
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_SIZES = [1_000, 100_000, 1_000_000]
+DEFAULT_REPEAT = 3
+# 达到此行数时只运行一次
+SINGLE_RUN_SIZE = 1_000_000
+# 添加、编辑和删除的操作次数上限
+MUTATIONS = 1_000
+DEFAULT_THRESHOLD = 0.2
+DEFAULT_MIN_MS = 5.0
+DEFAULT_MIN_MIB = 8.0
+SVG = ('<svg xmlns="http://www.w3.org/2000/svg" width="24" height="24" viewBox="0 0 24 24">'
+       '<path d="M19 13h-6v6h-2v-6H5v-2h6V5h2v6h6v2z"/>'
+       '<circle cx="12" cy="12" r="{radius}" fill="none" stroke="black"/></svg>')
+
+
+def _max_rss_mib() -> float:
+    # Linux 下 ru_maxrss 单位为 KB，macOS 下为字节
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == 'darwin' else rss / 1024
+
+
+def parse_size(text: str) -> int:
+    """'1k' -> 1000，'1m' -> 1000000，也接受普通整数"""
+    text = text.strip().lower().replace('_', '')
+    for suffix, factor in (('k', 1_000), ('m', 1_000_000)):
+        if text.endswith(suffix):
+            return int(float(text[:-1]) * factor)
+    return int(text)
+
+
+def format_size(n: int) -> str:
+    if n >= 1_000_000 and n % 1_000_000 == 0:
+        return f'{n // 1_000_000}m'
+    if n >= 1_000 and n % 1_000 == 0:
+        return f'{n // 1_000}k'
+    return str(n)
+
+
+def result_key(case: str, n: int | None) -> str:
+    return case if n is None else f'{case}@{format_size(n)}'
+
+
+# --- 各个项目 ---
+# 每个项目是 (n, 工作目录) -> prepare 的函数；prepare() 做不计时的准备，返回 (计时的函数, 操作次数)。
+# 修改数据的项目每次重复都重新准备。
+
+def _items(n, seed=0):
+    from benchmarks.synthetic import synthetic_items
+    return synthetic_items(n, seed)
+
+
+def _library_file(n, directory, name='library.json'):
+    """在另一个进程中生成输入文件，生成时的内存峰值不计入加载的峰值"""
+    path = os.path.join(directory, name)
+    subprocess.run([sys.executable, '-m', 'benchmarks.synthetic', str(n), path],
+                   cwd=ROOT, check=True)
+    return path
+
+
+def _controller(items=()):
+    from controllers.library_controller import LibraryController
+    from models.media_table_model import MediaTableModel
+    from repository.json_repository import JSONRepository
+    controller = LibraryController(MediaTableModel(), JSONRepository())
+    if items:
+        controller._set_items(list(items))
+    return controller
+
+
+def case_json_save(n, directory):
+    from repository.json_repository import JSONRepository
+    items = _items(n)
+    path = os.path.join(directory, 'saved.json')
+    return lambda: (lambda: JSONRepository().save(items, path), n)
+
+
+def case_json_load(n, directory):
+    from repository.json_repository import JSONRepository
+    path = _library_file(n, directory)
+    return lambda: (lambda: JSONRepository().load(path), n)
+
+
+def case_binary_save(n, directory):
+    from repository.binary_repository import BinaryRepository
+    items = _items(n)
+    path = os.path.join(directory, 'saved.mlib')
+    return lambda: (lambda: BinaryRepository().save(items, path), n)
+
+
+def case_binary_load(n, directory):
+    from repository.binary_repository import BinaryRepository
+    path = _library_file(n, directory, 'library.mlib')
+
+    def run():
+        # 按需解码的快照：访问全部条目才算加载完成
+        loaded = BinaryRepository().load(path)
+        for _ in loaded:
+            pass
+    return lambda: (run, n)
+
+
+def case_controller_load(n, directory):
+    path = _library_file(n, directory)
+
+    def prepare():
+        controller = _controller()
+        return (lambda: controller.load_library(path)), n
+    return prepare
+
+
+def case_controller_add(n, directory):
+    items = _items(n)
+    records = [item.to_dict() for item in _items(min(MUTATIONS, n), seed=1)]
+
+    def prepare():
+        controller = _controller(items)
+
+        def run():
+            for record in records:
+                controller.add_item(record)
+        return run, len(records)
+    return prepare
+
+
+def case_controller_edit(n, directory):
+    items = _items(n)
+    count = min(MUTATIONS, n)
+    step = max(1, n // count)
+
+    def prepare():
+        # 编辑原地修改条目，每次重复使用新的副本
+        controller = _controller([item.copy() for item in items])
+        rows = [(i * step) % n for i in range(count)]
+        originals = [items[row].title for row in rows]
+
+        def run():
+            for row, title in zip(rows, originals):
+                controller.edit_item(row, {'title': title + ' 修订版'})
+        return run, count
+    return prepare
+
+
+def case_controller_delete(n, directory):
+    items = _items(n)
+    count = min(MUTATIONS, n)
+
+    def prepare():
+        controller = _controller(items)
+
+        def run():
+            # 从中间逐行删除：每次都要移动后半部分的行
+            for i in range(count):
+                controller.delete_item((n - i) // 2)
+        return run, count
+    return prepare
+
+
+def case_model_populate(n, directory):
+    from PySide6.QtWidgets import QApplication, QTableView
+    from models.search_proxy_model import SearchProxyModel
+    items = _items(n)
+
+    def prepare():
+        controller = _controller()
+        proxy = SearchProxyModel(controller.search, controller.sort_order)
+        proxy.setSourceModel(controller._model)
+        view = QTableView()
+        view.setModel(proxy)
+        view.resize(1000, 700)
+        view.show()
+        QApplication.processEvents()
+
+        def run():
+            controller._set_items(list(items))
+            QApplication.processEvents()
+            view.scrollToBottom()
+            QApplication.processEvents()
+            assert proxy.rowCount() == n
+        # 保持视图存活到计时结束
+        run.view = view
+        return run, n
+    return prepare
+
+
+def case_icons_render(n, directory):
+    from iconmanager.icon_atlas import ICON_NAMES
+    from iconmanager.icon_manager import IconManager
+    from iconmanager.theme import THEMES
+    for index, name in enumerate(ICON_NAMES):
+        with open(os.path.join(directory, name), 'w', encoding='utf-8') as f:
+            f.write(SVG.format(radius=4 + index))
+    themes = sorted(THEMES)
+
+    def prepare():
+        def run():
+            # 不使用图集，每个 (图标, 颜色) 都从 SVG 渲染一次
+            manager = IconManager(themes[0], base_path=directory)
+            for theme in themes:
+                manager.set_theme(theme)
+                for name in ICON_NAMES:
+                    manager._create_colored_icon(name)
+        return run, len(themes) * len(ICON_NAMES)
+    return prepare
+
+
+# 名称 -> (函数, 是否按行数运行)
+CASES = {
+    'json.save': (case_json_save, True),
+    'json.load': (case_json_load, True),
+    'binary.save': (case_binary_save, True),
+    'binary.load': (case_binary_load, True),
+    'controller.load': (case_controller_load, True),
+    'controller.add': (case_controller_add, True),
+    'controller.edit': (case_controller_edit, True),
+    'controller.delete': (case_controller_delete, True),
+    'model.populate': (case_model_populate, True),
+    'icons.render': (case_icons_render, False),
+}
+
+
+def run_case(name: str, n: int, repeat: int) -> dict:
+    """在当前进程中运行一个项目，返回结果字典"""
+    from PySide6.QtWidgets import QApplication
+    app = QApplication.instance() or QApplication([])
+    factory, _ = CASES[name]
+    with tempfile.TemporaryDirectory() as directory:
+        prepare = factory(n, directory)
+        best = None
+        peak = 0.0
+        for _ in range(repeat):
+            run, ops = prepare()
+            base = _max_rss_mib()
+            start = time.perf_counter()
+            run()
+            elapsed = time.perf_counter() - start
+            peak = max(peak, _max_rss_mib() - base)
+            best = elapsed if best is None else min(best, elapsed)
+            del run
+    app.processEvents()
+    return {'seconds': round(best, 6), 'ops': ops,
+            'ops_per_s': round(ops / best, 1) if best else None,
+            'peak_rss_mib': round(peak, 1)}
+
+
+def _run_subprocess(name: str, n: int | None, repeat: int) -> dict:
+    env = dict(os.environ, QT_QPA_PLATFORM='offscreen')
+    result = subprocess.run(
+        [sys.executable, '-m', 'benchmarks.suite', '_case', name, str(n or 0), str(repeat)],
+        cwd=ROOT, env=env, capture_output=True, text=True, encoding='utf-8')
+    if result.returncode != 0:
+        return {'error': (result.stderr.strip().splitlines() or ['失败'])[-1]}
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def _meta() -> dict:
+    from PySide6 import __version__ as pyside_version
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                                capture_output=True, text=True).stdout.strip()
+    except OSError:
+        commit = ''
+    return {'created': datetime.datetime.now().isoformat(timespec='seconds'),
+            'commit': commit, 'python': platform.python_version(),
+            'pyside': pyside_version, 'platform': platform.platform(),
+            'machine': platform.machine(), 'cpus': os.cpu_count()}
+
+
+def run_suite(sizes, cases=None, repeat: int = DEFAULT_REPEAT, log=print) -> dict:
+    results = {}
+    for name in cases or CASES:
+        sized = CASES[name][1]
+        for n in (sizes if sized else [None]):
+            times = 1 if n and n >= SINGLE_RUN_SIZE else repeat
+            key = result_key(name, n)
+            result = _run_subprocess(name, n, times)
+            results[key] = result
+            if log is not None:
+                if 'error' in result:
+                    log(f'{key:<26}失败：{result["error"]}')
+                else:
+                    log(f'{key:<26}{result["seconds"] * 1000:>11.1f} ms{result["ops_per_s"]:>14,.0f} 次/秒'
+                        f'{result["peak_rss_mib"]:>9.1f} MiB')
+    return {'meta': _meta(), 'results': results}
+
+
+def compare(baseline: dict, current: dict, threshold: float = DEFAULT_THRESHOLD,
+            min_ms: float = DEFAULT_MIN_MS, min_mib: float = DEFAULT_MIN_MIB) -> list[dict]:
+    """
+    返回两份结果中共有项目的比较 [{'key', 'metric', 'baseline', 'current', 'ratio', 'regressed'}, ...]，
+    metric 为 'seconds' 或 'peak_rss_mib'。
+    """
+    rows = []
+    base_results, current_results = baseline['results'], current['results']
+    for key in base_results:
+        old, new = base_results[key], current_results.get(key)
+        if new is None or 'error' in old or 'error' in new:
+            continue
+        for metric, scale, minimum in (('seconds', 1000, min_ms), ('peak_rss_mib', 1, min_mib)):
+            before, after = old[metric], new[metric]
+            ratio = after / before if before else None
+            regressed = (after - before) * scale > minimum and (
+                ratio is None or ratio > 1 + threshold)
+            rows.append({'key': key, 'metric': metric, 'baseline': before, 'current': after,
+                         'ratio': ratio, 'regressed': regressed})
+    return rows
+
+
+def print_comparison(rows: list[dict]) -> int:
+    """输出比较表，返回退化的项目数"""
+    regressions = 0
+    for row in rows:
+        unit, scale = ('ms', 1000) if row['metric'] == 'seconds' else ('MiB', 1)
+        ratio = f'{row["ratio"]:.2f}x' if row['ratio'] is not None else '-'
+        mark = '  变慢' if row['regressed'] and unit == 'ms' else \
+            '  内存增加' if row['regressed'] else ''
+        regressions += row['regressed']
+        print(f'{row["key"]:<26}{row["baseline"] * scale:>11.1f}{row["current"] * scale:>11.1f} '
+              f'{unit:<4}{ratio:>8}{mark}')
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='媒体库基准测试套件')
+    commands = parser.add_subparsers(dest='command', required=True)
+    run = commands.add_parser('run', help='运行基准测试')
+    run.add_argument('--sizes', default=','.join(format_size(n) for n in DEFAULT_SIZES))
+    run.add_argument('--cases', default='', help='逗号分隔的项目名，默认全部')
+    run.add_argument('--repeat', type=int, default=DEFAULT_REPEAT)
+    run.add_argument('-o', '--output')
+    run.add_argument('--compare', metavar='BASELINE')
+    comparison = commands.add_parser('compare', help='比较两份结果')
+    comparison.add_argument('baseline')
+    comparison.add_argument('current')
+    for command in (run, comparison):
+        command.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD)
+        command.add_argument('--min-ms', type=float, default=DEFAULT_MIN_MS)
+        command.add_argument('--min-mib', type=float, default=DEFAULT_MIN_MIB)
+    commands.add_parser('list', help='列出项目')
+    case = commands.add_parser('_case')
+    case.add_argument('name')
+    case.add_argument('n', type=int)
+    case.add_argument('repeat', type=int)
+    args = parser.parse_args(argv)
+
+    if args.command == '_case':
+        print(json.dumps(run_case(args.name, args.n, args.repeat)))
+        return 0
+    if args.command == 'list':
+        for name, (_, sized) in CASES.items():
+            print(name if sized else f'{name}（不按行数）')
+        return 0
+    if args.command == 'run':
+        cases = [name.strip() for name in args.cases.split(',') if name.strip()]
+        unknown = [name for name in cases if name not in CASES]
+        if unknown:
+            parser.error(f'未知的项目：{", ".join(unknown)}')
+        sizes = [parse_size(size) for size in args.sizes.split(',') if size.strip()]
+        current = run_suite(sizes, cases, args.repeat)
+        if args.output:
+            with open(args.output, 'w', encoding='utf-8') as f:
+                json.dump(current, f, ensure_ascii=False, indent=2)
+        if not args.compare:
+            return 0
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)
+    else:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        with open(args.current, encoding='utf-8') as f:
+            current = json.load(f)
+    rows = compare(baseline, current, args.threshold, args.min_ms, args.min_mib)
+    regressions = print_comparison(rows)
+    print(f'{regressions} 项超过基线 {args.threshold:.0%}' if regressions else '没有退化')
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
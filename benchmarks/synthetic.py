@@ -0,0 +1,130 @@
+"""
+确定性的合成媒体库，供基准测试使用。
+
+同一 (n, seed) 总是生成相同的条目。标题约 45% 为中文、15% 为日文、40% 为英文，
+部分带续集编号；导演/作者取自固定的人名池；简介长度近似对数正态分布
+（约 20% 为空，中位数约 120 个字符，最长 1000 个字符），约 70% 的条目有海报地址。
+
+生成媒体库文件（在项目根目录下；.mlib 为二进制快照，其他为 JSON）：
+    python -m benchmarks.synthetic 100000 library.json [--seed 0]
+"""
+import argparse
+import math
+import random
+
+from models.media_model import MediaItem
+
+ZH_WORDS = ['霸王', '别姬', '无间', '花样', '年华', '卧虎', '藏龙', '春光', '乍泄', '重庆', '森林',
+            '活着', '大话', '西游', '阳光', '灿烂', '日子', '一代', '宗师', '让子弹飞', '功夫', '少林',
+            '英雄', '流浪', '地球', '长安', '十二时辰', '山河', '故人', '饮食', '男女', '海上', '钢琴师',
+            '秋天', '童话', '城南', '旧事', '天堂', '电影院', '风声', '鹤唳', '夜宴', '满城', '黄金甲']
+JA_WORDS = ['千と千尋の', '神隠し', 'もののけ姫', '東京', '物語', '七人の', '侍', '羅生門', '万引き家族',
+            '君の名は', '天気の子', '秒速', '5センチメートル', 'となりの', 'トトロ', '風立ちぬ', '海街',
+            'ダイアリー', '百円の', '恋', 'おくりびと', '告白', '悪人', '誰も知らない']
+EN_WORDS = ['The', 'Last', 'Night', 'City', 'Dark', 'River', 'Moon', 'King', 'Ghost', 'Blue', 'Road',
+            'House', 'Dream', 'Star', 'War', 'Love', 'Silent', 'Iron', 'Golden', 'Lost', 'Empire',
+            'Shadow', 'Winter', 'Summer', 'Machine', 'Garden', 'Storm', 'Hunter', 'Paper', 'Glass']
+ZH_SURNAMES = '王李张刘陈杨黄赵吴周徐孙马朱胡郭何高林罗郑梁谢宋唐许韩冯邓曹彭'
+ZH_GIVEN = '伟芳娜敏静丽强磊军洋勇艳杰娟涛明超秀霞平刚桂英华玉兰萍红'
+JA_NAMES = ['黒澤 明', '小津 安二郎', '宮崎 駿', '是枝 裕和', '新海 誠', '北野 武', '溝口 健二',
+            '今村 昌平', '岩井 俊二', '細田 守']
+EN_FIRST = ['James', 'Mary', 'John', 'Patricia', 'Robert', 'Jennifer', 'Michael', 'Linda', 'David',
+            'Sofia', 'Christopher', 'Greta', 'Denis', 'Kathryn', 'Ridley', 'Jane']
+EN_LAST = ['Smith', 'Nolan', 'Scott', 'Villeneuve', 'Bigelow', 'Campion', 'Coppola', 'Gerwig',
+           'Anderson', 'Fincher', 'Kubrick', 'Lynch', 'Mann', 'Reichardt', 'Wright', 'Zhao']
+ZH_PLOT = ('在动荡的年代里，一对师兄弟从戏班学艺开始，经历了半个世纪的悲欢离合。'
+           '故事围绕一座城市的变迁展开，几代人的命运在时代洪流中交织。'
+           '他在追寻真相的过程中逐渐发现，所有人都在隐藏自己的秘密。')
+JA_PLOT = ('少女は不思議な町に迷い込み、両親を救うために働き始める。'
+           '小さな港町で暮らす家族の日常と、季節の移ろいを静かに描く。')
+EN_PLOT = ('A retired detective is drawn back into a case that haunted his career. '
+           'Two strangers meet on a night train and discover their lives are connected. '
+           'In a near future city, a machine begins to question its purpose. ')
+CREATOR_POOL_SIZE = 5_000
+
+
+def _corpus(text: str, size: int = 4096) -> str:
+    return (text * (size // len(text) + 2))[:size]
+
+
+def _creators(rng: random.Random) -> list[str]:
+    creators = []
+    for _ in range(CREATOR_POOL_SIZE):
+        kind = rng.random()
+        if kind < 0.45:
+            creators.append(rng.choice(ZH_SURNAMES) + ''.join(rng.choices(ZH_GIVEN, k=rng.randint(1, 2))))
+        elif kind < 0.55:
+            creators.append(rng.choice(JA_NAMES))
+        else:
+            creators.append(f'{rng.choice(EN_FIRST)} {rng.choice(EN_LAST)}')
+    return creators
+
+
+# 基础标题池的大小；条目从池中抽取标题后再加上编号，避免逐条组合词语
+TITLE_POOL_SIZE = 20_000
+
+
+def _titles(rng: random.Random) -> list[tuple[str, str]]:
+    """[(语言, 标题), ...]"""
+    titles = []
+    for _ in range(TITLE_POOL_SIZE):
+        kind = rng.random()
+        if kind < 0.45:
+            titles.append(('zh', ''.join(rng.sample(ZH_WORDS, rng.randint(1, 3)))))
+        elif kind < 0.60:
+            titles.append(('ja', ''.join(rng.sample(JA_WORDS, rng.randint(1, 2)))))
+        else:
+            titles.append(('en', ' '.join(rng.sample(EN_WORDS, rng.randint(1, 4)))))
+    return titles
+
+
+def synthetic_items(n: int, seed: int = 0) -> list[MediaItem]:
+    rng = random.Random(seed)
+    creators = _creators(rng)
+    titles = _titles(rng)
+    plots = {language: _corpus(text) for language, text in
+             (('zh', ZH_PLOT), ('ja', JA_PLOT), ('en', EN_PLOT))}
+    corpus_size = len(plots['zh'])
+    # 按列批量抽取随机数，比逐条调用快得多
+    picked = rng.choices(titles, k=n)
+    picked_creators = rng.choices(creators, k=n)
+    numbers = [rng.random() for _ in range(n)]
+    years = [min(2025, int(1920 + 105 * math.sqrt(rng.random()))) for _ in range(n)]
+    ratings = [round(min(10.0, max(0.0, rng.gauss(6.8, 1.3))), 1) for _ in range(n)]
+    lengths = [min(1000, int(rng.lognormvariate(math.log(150), 0.8))) for _ in range(n)]
+    starts = [rng.randrange(corpus_size - 1000) for _ in range(n)]
+    posters = [rng.getrandbits(64) for _ in range(n)]
+    items = []
+    for index in range(n):
+        language, title = picked[index]
+        number = numbers[index]
+        if number < 0.1:
+            title += f' {2 + int(number * 40)}'
+        # 一半的条目带编号，同名条目仍可区分，与真实媒体库中的重名比例相近
+        if number >= 0.5:
+            title += f' {index % 997}'
+        poster = posters[index]
+        poster_url = f'https://m.media-amazon.com/images/M/{poster:016x}.jpg' if poster % 10 < 7 else ''
+        plot = ''
+        if (poster >> 8) % 5:
+            start = starts[index]
+            plot = plots[language][start:start + lengths[index]]
+        items.append(MediaItem(title, picked_creators[index], years[index], ratings[index],
+                               poster_url, plot))
+    return items
+
+
+def main(argv=None):
+    from repository.binary_repository import BinaryRepository
+    from repository.json_repository import JSONRepository
+    parser = argparse.ArgumentParser(description='生成确定性的合成媒体库文件')
+    parser.add_argument('count', type=int)
+    parser.add_argument('output')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+    repository = BinaryRepository() if args.output.lower().endswith('.mlib') else JSONRepository()
+    repository.save(synthetic_items(args.count, args.seed), args.output)
+
+
+if __name__ == '__main__':
+    main()
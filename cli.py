@@ -0,0 +1,312 @@
+"""
+不启动图形界面的媒体库命令行工具。
+
+用法（在项目根目录下）：
+    python cli.py import movies.csv more.json -o library.json
+    python cli.py export library.json -o library.csv
+    python cli.py merge a.json b.mlib -o merged.json [--key title]
+    python cli.py validate library.json movies.csv
+
+文件格式由扩展名决定：.json、.csv、.mlib（二进制快照）、.db/.sqlite。
+JSON 与 CSV 的读写都是流式的，内存占用与文件大小无关；
+写出 .mlib 需要先在内存中汇总各列。本模块不导入 Qt，启动只需几十毫秒。
+"""
+import argparse
+import csv
+import datetime
+import hashlib
+import os
+import sys
+import tempfile
+from typing import Iterable, Iterator
+
+from models.media_model import MediaItem, normalize_title
+from repository.json_repository import JSONRepository
+
+FIELDS = ['title', 'creator', 'year', 'rating', 'poster_url', 'plot']
+SQLITE_SUFFIXES = ('.db', '.sqlite')
+# 年份超出该范围时给出警告
+MIN_YEAR = 1800
+MAX_YEAR_AHEAD = 10
+
+
+class InputError(Exception):
+    """输入文件中无法转换的记录"""
+
+
+def _suffix(path: str) -> str:
+    return os.path.splitext(path)[1].lower()
+
+
+# --- 读取 ---
+
+def _csv_records(path: str) -> Iterator[dict]:
+    # utf-8-sig 兼容 Excel 导出的带 BOM 文件
+    with open(path, newline='', encoding='utf-8-sig') as f:
+        for record in csv.DictReader(f):
+            # 空白的数值单元格按缺省值处理
+            yield {key: value for key, value in record.items()
+                   if key is not None and not (key in ('year', 'rating') and value == '')}
+
+
+def iter_records(path: str) -> Iterator:
+    """逐条生成输入文件中的原始记录（JSON 值或 CSV 行字典）"""
+    suffix = _suffix(path)
+    if suffix == '.csv':
+        return _csv_records(path)
+    if suffix == '.json':
+        return JSONRepository().iter_records(path)
+    return (item.to_dict() for item in _repository_for(path).iter_load(path))
+
+
+def iter_items(path: str, errors: list = None) -> Iterator[MediaItem]:
+    """
+    按 MediaItem.from_dict 的规则（与控制层添加条目时相同）转换每条记录。
+    :param errors: 给出时跳过无法转换的记录并把 (序号, 原因) 追加到其中，否则抛出 InputError。
+    """
+    for index, record in enumerate(iter_records(path), 1):
+        try:
+            if not isinstance(record, dict):
+                raise ValueError('record is not an object')
+            yield MediaItem.from_dict(record)
+        except (TypeError, ValueError) as e:
+            if errors is None:
+                raise InputError(f'{path}: record {index}: {e}') from e
+            errors.append((index, str(e)))
+
+
+def _repository_for(path: str):
+    suffix = _suffix(path)
+    if suffix in SQLITE_SUFFIXES:
+        from repository.sqlite_repository import SQLiteRepository
+        return SQLiteRepository(path)
+    if suffix == '.mlib':
+        from repository.binary_repository import BinaryRepository
+        return BinaryRepository(path)
+    if suffix == '.json':
+        return JSONRepository(path)
+    raise InputError(f'unsupported file type: {path}')
+
+
+# --- 写出 ---
+
+def _write_csv(items: Iterable[MediaItem], path: str):
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix='.library-', suffix='.tmp', dir=directory)
+    try:
+        with os.fdopen(fd, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(FIELDS)
+            for item in items:
+                writer.writerow([item.title, item.creator, item.year, item.rating,
+                                 item.poster_url, item.plot])
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def write_items(items: Iterable[MediaItem], path: str) -> int:
+    """写出到 path，返回写出的条目数"""
+    counter = _Counter(items)
+    if _suffix(path) == '.csv':
+        _write_csv(counter, path)
+    elif _suffix(path) in SQLITE_SUFFIXES:
+        # 直接写入新数据库，不经过行号映射
+        _repository_for(path).write_new(counter, path)
+    else:
+        _repository_for(path).save(counter, path)
+    return counter.count
+
+
+class _Counter:
+    def __init__(self, items: Iterable[MediaItem]):
+        self._items = items
+        self.count = 0
+
+    def __iter__(self):
+        for item in self._items:
+            self.count += 1
+            yield item
+
+
+# --- 合并与校验 ---
+
+def merge_key(item: MediaItem, by_year: bool = True) -> bytes:
+    """规范化标题（和年份）的 16 字节摘要，内存中只保留摘要"""
+    key = normalize_title(item.title)
+    if by_year:
+        key += f'\0{item.year}'
+    return hashlib.blake2b(key.encode('utf-8'), digest_size=16).digest()
+
+
+def dedupe(items: Iterable[MediaItem], by_year: bool = True, stats: dict = None):
+    """保留每个键第一次出现的条目；stats 给出时记录 'duplicates'"""
+    seen = set()
+    for item in items:
+        key = merge_key(item, by_year)
+        if key in seen:
+            if stats is not None:
+                stats['duplicates'] = stats.get('duplicates', 0) + 1
+            continue
+        seen.add(key)
+        yield item
+
+
+def check_record(record) -> tuple[list[str], list[str]]:
+    """检查一条原始记录，返回 (错误, 警告)"""
+    if not isinstance(record, dict):
+        return ['record is not an object'], []
+    errors, warnings = [], []
+    unknown = sorted(set(record) - set(FIELDS))
+    if unknown:
+        warnings.append(f"unknown fields: {', '.join(map(str, unknown))}")
+    title = record.get('title')
+    if not isinstance(title, str) or not title.strip():
+        errors.append('missing title')
+    for field in ('creator', 'poster_url', 'plot'):
+        if field in record and not isinstance(record[field], str):
+            errors.append(f'{field} is not a string')
+    try:
+        year = int(record.get('year', 0))
+    except (TypeError, ValueError):
+        errors.append(f"invalid year {record.get('year')!r}")
+    else:
+        max_year = datetime.date.today().year + MAX_YEAR_AHEAD
+        if not MIN_YEAR <= year <= max_year:
+            warnings.append(f'year {year} outside {MIN_YEAR}..{max_year}')
+    try:
+        rating = float(record.get('rating', 0.0))
+    except (TypeError, ValueError):
+        errors.append(f"invalid rating {record.get('rating')!r}")
+    else:
+        if not 0 <= rating <= 10:
+            warnings.append(f'rating {rating} outside 0..10')
+    return errors, warnings
+
+
+def validate(path: str, out=None) -> tuple[int, int, int]:
+    """逐条检查并输出问题（默认输出到标准输出），返回 (记录数, 错误数, 警告数)"""
+    out = out or sys.stdout
+    counts = [0, 0, 0]
+    first_seen: dict[bytes, int] = {}
+
+    def report(index, level, message):
+        counts[1 if level == 'error' else 2] += 1
+        print(f'{path}: record {index}: {level}: {message}', file=out)
+
+    try:
+        for index, record in enumerate(iter_records(path), 1):
+            counts[0] = index
+            errors, warnings = check_record(record)
+            for message in errors:
+                report(index, 'error', message)
+            for message in warnings:
+                report(index, 'warning', message)
+            if not errors:
+                key = merge_key(MediaItem.from_dict(record))
+                if key in first_seen:
+                    report(index, 'warning', f'duplicate of record {first_seen[key]}')
+                else:
+                    first_seen[key] = index
+    except (ValueError, OSError, InputError) as e:
+        # JSONDecodeError 是 ValueError 的子类；文件结构损坏时无法继续
+        counts[1] += 1
+        print(f'{path}: error: {e}', file=out)
+    return tuple(counts)
+
+
+# --- 命令 ---
+
+def _chain(paths: list[str], errors: dict) -> Iterator[MediaItem]:
+    for path in paths:
+        skipped = errors.setdefault(path, [])
+        yield from iter_items(path, skipped)
+
+
+def _report_skipped(errors: dict) -> int:
+    total = 0
+    for path, skipped in errors.items():
+        for index, message in skipped:
+            print(f'{path}: record {index}: skipped: {message}', file=sys.stderr)
+        total += len(skipped)
+    return total
+
+
+def cmd_import(args) -> int:
+    errors: dict = {}
+    count = write_items(_chain(args.inputs, errors), args.output)
+    skipped = _report_skipped(errors)
+    print(f'imported {count} items into {args.output}'
+          + (f', skipped {skipped} invalid records' if skipped else ''), file=sys.stderr)
+    return 0
+
+
+def cmd_export(args) -> int:
+    count = write_items(iter_items(args.input), args.output)
+    print(f'exported {count} items to {args.output}', file=sys.stderr)
+    return 0
+
+
+def cmd_merge(args) -> int:
+    errors: dict = {}
+    stats = {'duplicates': 0}
+    items = dedupe(_chain(args.inputs, errors), by_year=args.key == 'title-year', stats=stats)
+    count = write_items(items, args.output)
+    skipped = _report_skipped(errors)
+    print(f"merged {len(args.inputs)} files into {args.output}: {count} items, "
+          f"{stats['duplicates']} duplicates dropped"
+          + (f', {skipped} invalid records skipped' if skipped else ''), file=sys.stderr)
+    return 0
+
+
+def cmd_validate(args) -> int:
+    failed = False
+    for path in args.inputs:
+        records, errors, warnings = validate(path)
+        print(f'{path}: {records} records, {errors} errors, {warnings} warnings',
+              file=sys.stderr)
+        failed = failed or errors > 0
+    return 1 if failed else 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog='cli.py', description='媒体库命令行工具（不启动图形界面）')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    p = commands.add_parser('import', help='把 CSV/JSON 等文件导入为媒体库')
+    p.add_argument('inputs', nargs='+')
+    p.add_argument('-o', '--output', required=True)
+    p.set_defaults(func=cmd_import)
+
+    p = commands.add_parser('export', help='把媒体库导出为 CSV/JSON 等格式')
+    p.add_argument('input')
+    p.add_argument('-o', '--output', required=True)
+    p.set_defaults(func=cmd_export)
+
+    p = commands.add_parser('merge', help='合并多个媒体库并去除重复条目')
+    p.add_argument('inputs', nargs='+')
+    p.add_argument('-o', '--output', required=True)
+    p.add_argument('--key', choices=['title-year', 'title'], default='title-year',
+                   help='判断重复的依据：规范化标题加年份（默认）或只看标题')
+    p.set_defaults(func=cmd_merge)
+
+    p = commands.add_parser('validate', help='检查媒体库文件，发现错误时退出码为 1')
+    p.add_argument('inputs', nargs='+')
+    p.set_defaults(func=cmd_validate)
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    try:
+        return args.func(args)
+    except (InputError, OSError, ValueError) as e:
+        print(f'error: {e}', file=sys.stderr)
+        return 2
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,99 @@
+"""
+LibraryController 的可撤销命令，配合 QUndoStack 使用。
+
+命令只记录撤销所需的最少信息：插入记录插入的条目，删除记录被删除的条目，
+编辑只记录发生变化的字段的旧值和新值。
+实际的修改通过控制层的 _insert_rows / _remove_ranges 等方法完成，
+它们同时维护模型、仓库、搜索索引和排序列。
+"""
+from PySide6.QtGui import QUndoCommand
+from models.media_model import MediaItem
+
+
+def merge_rows(rows) -> list[tuple[int, int]]:
+    """把行号合并为升序的连续区间 [(起始行, 行数), ...]"""
+    ranges: list[tuple[int, int]] = []
+    for row in sorted(set(rows)):
+        if ranges and ranges[-1][0] + ranges[-1][1] == row:
+            start, count = ranges[-1]
+            ranges[-1] = (start, count + 1)
+        else:
+            ranges.append((row, 1))
+    return ranges
+
+
+class BatchBoundaryCommand(QUndoCommand):
+    """
+    放在宏命令的首尾，使执行、撤销和重做整个宏时其中的行变化都位于
+    模型的一次 begin_batch / end_batch 之内。撤销时子命令倒序执行，首尾的角色互换。
+    """
+    def __init__(self, model, opening: bool):
+        super().__init__()
+        self._model = model
+        self._opening = opening
+
+    def redo(self):
+        self._model.begin_batch() if self._opening else self._model.end_batch()
+
+    def undo(self):
+        self._model.end_batch() if self._opening else self._model.begin_batch()
+
+
+class InsertItemsCommand(QUndoCommand):
+    def __init__(self, controller, row: int, items: list[MediaItem], text: str = '添加'):
+        super().__init__(text)
+        self._controller = controller
+        self._row = row
+        self._items = items
+
+    def redo(self):
+        self._controller._insert_rows(self._row, self._items)
+
+    def undo(self):
+        self._controller._remove_rows(self._row, len(self._items))
+
+
+class RemoveRowsCommand(QUndoCommand):
+    """
+    删除任意一组行。相邻的行合并成一个区间，每个区间只调用一次 remove_items；
+    区间很多时控制层改为一次重建列表（见 LibraryController._remove_ranges）。
+    """
+    def __init__(self, controller, rows, text: str = '删除'):
+        super().__init__(text)
+        self._controller = controller
+        self._ranges = merge_rows(rows)
+        # 与 _ranges 对应的被删除条目，redo 时填入
+        self._removed: list[list[MediaItem]] = []
+
+    @property
+    def row_count(self) -> int:
+        return sum(count for _, count in self._ranges)
+
+    def redo(self):
+        self._removed = self._controller._remove_ranges(self._ranges)
+
+    def undo(self):
+        self._controller._insert_ranges(self._ranges, self._removed)
+        self._removed = []
+
+
+class EditItemCommand(QUndoCommand):
+    """只保存变化字段的 {字段: (旧值, 新值)}"""
+    def __init__(self, controller, row: int, changes: dict, text: str = '编辑'):
+        super().__init__(text)
+        self._controller = controller
+        self._row = row
+        self._changes = changes
+
+    @classmethod
+    def diff(cls, item: MediaItem, values: dict) -> dict:
+        return {field: (getattr(item, field), value) for field, value in values.items()
+                if getattr(item, field) != value}
+
+    def redo(self):
+        self._controller._set_fields(
+            self._row, {field: new for field, (_, new) in self._changes.items()})
+
+    def undo(self):
+        self._controller._set_fields(
+            self._row, {field: old for field, (old, _) in self._changes.items()})
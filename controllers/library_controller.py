@@ -1,51 +1,422 @@
-from PySide6.QtGui import QStandardItem
+import weakref
+from contextlib import contextmanager
+from itertools import islice
+from PySide6.QtCore import QTimer, Qt
+from PySide6.QtGui import QUndoStack
+from controllers.commands import (BatchBoundaryCommand, EditItemCommand, InsertItemsCommand,
+                                  RemoveRowsCommand)
+from controllers.library_snapshot import LibrarySnapshot
 from models.media_model import MediaItem
+from models.search_index import SearchIndex
+from services.instrumentation import timed
 
 class LibraryController:
+    # 分块加载时每次事件循环迭代插入的行数
+    LOAD_CHUNK_SIZE = 50_000
+    # 加载后在空闲时预建搜索索引，每次事件循环迭代处理的行数
+    INDEX_WARMUP_ROWS = 2_000
+    # 一次删除或恢复的区间多于此数时重建列表并重置模型，而不是逐个区间移动后面的行
+    RESET_RANGES = 64
+
     def __init__(self, model, repository):
         self._model = model
         self._repo = repository
         self._items: list[MediaItem] = []
+        self._load_generation = 0
+        # 分块加载还有未追加的块
+        self._loading = False
+        self._index = SearchIndex()
+        # 条目直接来自仓库的数据库时，由仓库的 search_rows 代替内存索引查询
+        self._repo_search = None
+        # NumPy 列只在第一次排序或统计时创建，启动时不导入 numpy
+        self._columns = None
+        # 添加、删除和编辑都通过命令完成，可以撤销和重做；加载新的媒体库时清空
+        self.undo_stack = QUndoStack()
+        # 后台保存中的快照；原地修改条目前通知它们保留修改前的副本
+        self._snapshots = weakref.WeakSet()
+        # 先于视图和代理模型连接，保证它们收到行变化时索引和列已经更新
+        self._model.rowsInserted.connect(self._on_rows_inserted)
+        self._model.rowsRemoved.connect(self._on_rows_removed)
+        # 模型直接引用 _items，不再为每个单元格创建 QStandardItem
+        self._set_items(self._items)
+
+    def _on_rows_inserted(self, parent, first, last):
+        self._index.insert_rows(first, last - first + 1)
+        if self._columns is not None:
+            self._columns.insert_rows(first, last - first + 1)
+
+    def _on_rows_removed(self, parent, first, last):
+        self._index.remove_rows(first, last - first + 1)
+        if self._columns is not None:
+            self._columns.remove_rows(first, last - first + 1)
 
     def add_item(self, data: dict) -> MediaItem:
-        item = MediaItem.from_dict(data)
-        self._items.append(item)
-        self._add_to_model(item)
-        return item
-
-    def _add_to_model(self, item: MediaItem):
-        row = [
-            QStandardItem(item.title),
-            QStandardItem(item.creator),
-            QStandardItem(str(item.year)),
-            QStandardItem(str(item.rating))
-        ]
-        self._model.appendRow(row)
+        return self.add_items([data])[0]
+
+    def add_items(self, records: list[dict]) -> list[MediaItem]:
+        """在末尾追加多项，作为一个可撤销的操作"""
+        items = [MediaItem.from_dict(data) for data in records]
+        if items:
+            self.undo_stack.push(InsertItemsCommand(self, len(self._items), items))
+        return items
 
     def delete_item(self, row: int):
-        if 0 <= row < len(self._items):
-            del self._items[row]
-            self._model.removeRow(row)
+        self.delete_rows([row])
+
+    def delete_rows(self, rows):
+        """删除任意一组行（不要求有序），作为一个可撤销的操作"""
+        rows = [row for row in rows if 0 <= row < len(self._items)]
+        if rows:
+            command = RemoveRowsCommand(self, rows)
+            command.setText(f'删除 {command.row_count} 项')
+            self.undo_stack.push(command)
 
     def edit_item(self, row: int, data: dict):
         if 0 <= row < len(self._items):
             item = self._items[row]
-            item.title = data.get('title', item.title)
-            item.creator = data.get('creator', item.creator)
-            item.year = int(data.get('year', item.year))
-            item.rating = float(data.get('rating', item.rating))
-            self._update_model_row(row, item)
-
-    def _update_model_row(self, row: int, item: MediaItem):
-        self._model.setItem(row, 0, QStandardItem(item.title))
-        self._model.setItem(row, 1, QStandardItem(item.creator))
-        self._model.setItem(row, 2, QStandardItem(str(item.year)))
-        self._model.setItem(row, 3, QStandardItem(str(item.rating)))
+            values = {
+                'title': data.get('title', item.title),
+                'creator': data.get('creator', item.creator),
+                'year': int(data.get('year', item.year)),
+                'rating': float(data.get('rating', item.rating)),
+            }
+            changes = EditItemCommand.diff(item, values)
+            if changes:
+                self.undo_stack.push(EditItemCommand(self, row, changes))
+
+    def merge_duplicates(self, merges: list[tuple[MediaItem, list[MediaItem]]]):
+        """
+        合并重复项：[(保留的条目, [被合并的条目, ...]), ...]。
+        保留条目缺少的海报和简介从被合并的条目中补齐，然后删除被合并的条目；
+        整体作为一次撤销。条目按身份查找，已不在媒体库中的条目被忽略。
+        """
+        rows = {id(item): row for row, item in enumerate(self._items)}
+        merges = [(keeper, [other for other in others
+                            if other is not keeper and id(other) in rows])
+                  for keeper, others in merges if id(keeper) in rows]
+        merges = [(keeper, others) for keeper, others in merges if others]
+        if not merges:
+            return
+        with self.batch(f'合并 {len(merges)} 组重复项'):
+            removed = []
+            for keeper, others in merges:
+                values = {}
+                for field in ('poster_url', 'plot'):
+                    if not getattr(keeper, field):
+                        value = next((getattr(o, field) for o in others if getattr(o, field)), '')
+                        if value:
+                            values[field] = value
+                changes = EditItemCommand.diff(keeper, values)
+                if changes:
+                    self.undo_stack.push(EditItemCommand(self, rows[id(keeper)], changes))
+                removed.extend(rows[id(other)] for other in others)
+            # 编辑不改变行号，删除可以使用合并前的行号
+            self.delete_rows(removed)
+
+    def apply_diff(self, opcodes, items: list[MediaItem], text: str = '外部修改') -> dict:
+        """
+        按 library_diff.diff_items 的结果把当前条目改成 items，作为一次撤销。
+        只对变化的行发出插入、删除和 dataChanged，视图的滚动位置和选择得以保留。
+        返回 {'inserted', 'removed', 'changed'} 行数。
+        """
+        summary = {'inserted': 0, 'removed': 0, 'changed': 0}
+        if not opcodes:
+            return summary
+        with self.batch(text):
+            # 从后往前应用，前面的操作使用的旧行号不受影响
+            for tag, i1, i2, j1, j2 in reversed(opcodes):
+                paired = min(i2 - i1, j2 - j1)
+                for offset in range(paired):
+                    changes = EditItemCommand.diff(self._items[i1 + offset],
+                                                   items[j1 + offset].to_dict())
+                    if changes:
+                        self.undo_stack.push(EditItemCommand(self, i1 + offset, changes))
+                        summary['changed'] += 1
+                if i2 - i1 > paired:
+                    self.undo_stack.push(RemoveRowsCommand(self, range(i1 + paired, i2)))
+                    summary['removed'] += i2 - i1 - paired
+                if j2 - j1 > paired:
+                    self.undo_stack.push(
+                        InsertItemsCommand(self, i1 + paired, items[j1 + paired:j2]))
+                    summary['inserted'] += j2 - j1 - paired
+        return summary
+
+    @contextmanager
+    def batch(self, text: str):
+        """
+        with controller.batch('...'): 其中的多个操作合并为一次撤销。
+        执行、撤销和重做时模型的行变化都包在一次 begin_batch / end_batch 中，
+        排序或过滤中的代理模型只在最后更新一次。
+        """
+        self.undo_stack.beginMacro(text)
+        self.undo_stack.push(BatchBoundaryCommand(self._model, opening=True))
+        try:
+            yield
+        finally:
+            self.undo_stack.push(BatchBoundaryCommand(self._model, opening=False))
+            self.undo_stack.endMacro()
+
+    # --- 由命令调用的修改操作 ---
+
+    @timed('controller.insert_rows')
+    def _insert_rows(self, row: int, items: list[MediaItem]):
+        self._model.insert_items(row, items)
+        for offset, item in enumerate(items):
+            self._repo.insert(row + offset, item)
+
+    @timed('controller.remove_rows')
+    def _remove_rows(self, row: int, count: int) -> list[MediaItem]:
+        removed = self._items[row:row + count]
+        self._model.remove_items(row, count)
+        self._repo.delete(row, count)
+        return removed
+
+    @timed('controller.remove_ranges')
+    def _remove_ranges(self, ranges: list[tuple[int, int]]) -> list[list[MediaItem]]:
+        """删除升序的多个区间，返回各区间被删除的条目"""
+        if len(ranges) <= self.RESET_RANGES:
+            # 从后往前删除，前面区间的行号不受影响；
+            # 各区间在一次 batch 中删除，排序或过滤中的代理模型只更新一次
+            self._model.begin_batch()
+            try:
+                removed = [self._remove_rows(start, count) for start, count in reversed(ranges)]
+            finally:
+                self._model.end_batch()
+            return removed[::-1]
+        kept, removed, position = [], [], 0
+        for start, count in ranges:
+            kept.extend(self._items[position:start])
+            removed.append(self._items[start:start + count])
+            position = start + count
+        kept.extend(self._items[position:])
+        for start, count in reversed(ranges):
+            self._repo.delete(start, count)
+        self._replace_items(kept)
+        return removed
+
+    @timed('controller.insert_ranges')
+    def _insert_ranges(self, ranges: list[tuple[int, int]], items: list[list[MediaItem]]):
+        """_remove_ranges 的逆操作：把各区间的条目插回原来的行号"""
+        if len(ranges) <= self.RESET_RANGES:
+            # 从前往后插回，每个区间插入时它之前的行都已复原
+            self._model.begin_batch()
+            try:
+                for (start, _), chunk in zip(ranges, items):
+                    self._insert_rows(start, chunk)
+            finally:
+                self._model.end_batch()
+            return
+        merged, position = [], 0
+        for (start, _), chunk in zip(ranges, items):
+            take = start - len(merged)
+            merged.extend(self._items[position:position + take])
+            position += take
+            merged.extend(chunk)
+        merged.extend(self._items[position:])
+        for (start, _), chunk in zip(ranges, items):
+            for offset, item in enumerate(chunk):
+                self._repo.insert(start + offset, item)
+        self._replace_items(merged)
+
+    @timed('controller.replace_items')
+    def _replace_items(self, items: list[MediaItem]):
+        # 与 _set_items 相同，但保留撤销历史
+        self._items = items
+        self._index.reset(self._items)
+        if self._columns is not None:
+            self._columns.reset(self._items)
+        self._model.set_items(self._items)
+        self._schedule_index_warmup(self._load_generation)
+
+    @timed('controller.set_fields')
+    def _set_fields(self, row: int, values: dict):
+        item = self._items[row]
+        self._preserve(item)
+        for field, value in values.items():
+            setattr(item, field, value)
+        self._index.update_row(row)
+        if self._columns is not None:
+            self._columns.update_row(row)
+        self._model.refresh_rows(row)
+        self._repo.update(row, item)
+
+    def set_repository(self, repository):
+        self._repo = repository
+        self._repo_search = None
+
+    @property
+    def repository(self):
+        return self._repo
+
+    @timed('controller.save_library')
+    def save_library(self, path: str = None):
+        self._repo.save(self._items, path)
+
+    def snapshot(self) -> LibrarySnapshot:
+        """当前条目的写时复制快照，可以交给其他线程保存，用完后调用 close()"""
+        materialize = getattr(self._items, 'materialize', None)
+        if materialize is not None:
+            # 按需解码的 SnapshotItems 不是线程安全的，先在当前线程中全部解码
+            materialize()
+        snapshot = LibrarySnapshot(self._items)
+        self._snapshots.add(snapshot)
+        return snapshot
+
+    def _preserve(self, item: MediaItem):
+        for snapshot in self._snapshots:
+            snapshot.preserve(item)
+
+    @timed('controller.load_library')
+    def load_library(self, path: str = None, chunk_size: int = 0, progress=None):
+        """
+        批量加载媒体库：一次性替换 _items 并只重置一次模型。
+        chunk_size > 0 时边解析边显示：首块解析完即重置模型，其余各块
+        通过事件循环分批解析并追加，使界面在大文件加载期间仍能重绘。
+        :param progress: 转交给 JSONRepository.iter_load 的字节进度回调。
+        """
+        self._load_generation += 1
+        self._loading = False
+        if self._repo.LAZY_LOAD:
+            # 快照按需解码条目，直接绑定即可，不需要分块
+            self._set_items(self._repo.load(path, progress))
+            # 预建内存索引会把整张表读进来，能在数据库中查询时就不建
+            self._repo_search = getattr(self._repo, 'search_rows', None)
+            self._schedule_index_warmup(self._load_generation)
+            return
+        if chunk_size <= 0:
+            self._set_items(list(self._repo.iter_load(path, progress)))
+            return
+        source = self._repo.iter_load(path, progress)
+        first = list(islice(source, chunk_size))
+        self._set_items(first)
+        if len(first) == chunk_size:
+            self._loading = True
+            self._schedule_chunk(source, chunk_size, self._load_generation)
+        self._schedule_index_warmup(self._load_generation)
+
+    def restore(self, items):
+        """直接显示已经读出的条目（例如会话缓存中的快照），不经过仓库；清空撤销历史"""
+        self._load_generation += 1
+        self._loading = False
+        self._set_items(items)
+        self._schedule_index_warmup(self._load_generation)
+
+    def _set_items(self, items: list[MediaItem]):
+        self.undo_stack.clear()
+        self._repo_search = None
+        self._items = items
+        self._index.reset(self._items)
+        if self._columns is not None:
+            self._columns.reset(self._items)
+        self._model.set_items(self._items)
+
+    def _schedule_index_warmup(self, generation):
+        if self._repo_search is not None:
+            return
+
+        def step():
+            if generation != self._load_generation:
+                return
+            if not self._index.build_step(self.INDEX_WARMUP_ROWS):
+                QTimer.singleShot(0, step)
+        QTimer.singleShot(0, step)
+
+    def _schedule_chunk(self, source, chunk_size, generation):
+        QTimer.singleShot(
+            0, lambda: self._append_chunk(source, chunk_size, generation))
+
+    def _append_chunk(self, source, chunk_size, generation):
+        # 加载过程中又开始了新的加载，丢弃旧的剩余块
+        if generation != self._load_generation:
+            source.close()
+            return
+        chunk = list(islice(source, chunk_size))
+        self._model.insert_items(len(self._items), chunk)
+        if len(chunk) == chunk_size:
+            self._schedule_chunk(source, chunk_size, generation)
+        else:
+            self._loading = False
+
+    @property
+    def loading(self) -> bool:
+        """分块加载尚未完成，此时保存只会写入已加载的部分"""
+        return self._loading
+
+    @property
+    def load_generation(self) -> int:
+        """每次加载或恢复新的媒体库时递增"""
+        return self._load_generation
 
     def get_item(self, row: int) -> MediaItem:
         return self._items[row]
 
     def update_item(self, item: MediaItem, info: dict):
-        item.poster_url = info.get('poster_url', item.poster_url)
-        item.plot = info.get('plot', item.plot)
-        # 这里可以根据需要更新 UI
\ No newline at end of file
+        self._preserve(item)
+        item.apply_metadata(info)
+        row = self._row_of(item)
+        if row is not None:
+            self._repo.update(row, item)
+            # 元数据只影响海报和简介，显示的文字和排序不变
+            self._model.refresh_rows(row, roles=[Qt.DecorationRole])
+
+    @timed('controller.update_items')
+    def update_items(self, updates: list[tuple[MediaItem, dict]]):
+        """
+        批量写入元数据：行号查找只建一次索引，模型只发出一次 dataChanged。
+        """
+        if not updates:
+            return
+        rows = {id(item): row for row, item in enumerate(self._items)}
+        changed = []
+        for item, info in updates:
+            self._preserve(item)
+            item.apply_metadata(info)
+            row = rows.get(id(item))
+            if row is not None:
+                self._repo.update(row, item)
+                changed.append(row)
+        if changed:
+            self._model.refresh_rows(min(changed), max(changed), roles=[Qt.DecorationRole])
+
+    @timed('controller.search')
+    def search(self, text: str = '', min_year: int = None, max_year: int = None,
+               min_rating: float = None, max_rating: float = None) -> list[int] | None:
+        """通过搜索索引查询，返回升序的匹配行号；没有条件时返回 None"""
+        if self._repo_search is not None:
+            return self._repo_search(text, min_year, max_year, min_rating, max_rating)
+        return self._index.search(text, min_year, max_year, min_rating, max_rating)
+
+    @timed('controller.sort_order')
+    def sort_order(self, keys: list[tuple[str, bool]], rows: list[int] = None):
+        """
+        按 NumPy 列计算排序后的行号排列（numpy.ndarray）。
+        :param keys: [(字段名, 是否升序), ...]，第一个为主键。
+        :param rows: 只对这些行排序，例如 search() 的结果。
+        """
+        return self._library_columns().sort_order(keys, rows)
+
+    def stats(self, rows: list[int] = None) -> dict:
+        """评分直方图、每年数量和每位导演/作者的平均评分，见 LibraryColumns.stats"""
+        return self._library_columns().stats(rows)
+
+    def _library_columns(self):
+        if self._columns is None:
+            from models.library_columns import LibraryColumns
+            self._columns = LibraryColumns()
+            self._columns.reset(self._items)
+        return self._columns
+
+    def row_count(self) -> int:
+        """条目数；不像 items() 那样复制列表或解码按需读取的条目"""
+        return len(self._items)
+
+    def items(self) -> list[MediaItem]:
+        """当前条目列表的浅拷贝"""
+        return list(self._items)
+
+    def _row_of(self, item: MediaItem):
+        # 按身份查找，值相同的两个条目不能互相替代
+        for row, candidate in enumerate(self._items):
+            if candidate is item:
+                return row
+        return None
@@ -0,0 +1,104 @@
+"""
+比较两份条目列表，得到把旧列表变成新列表所需的行操作，供外部修改的增量应用使用。
+
+条目没有稳定的主键，以全部字段作为比较键，使用 patience diff：
+先去掉相同的开头和结尾，再以两边都只出现一次的键为锚点，
+取锚点在两边顺序一致的最长子序列（O(n log n)），锚点之间的区间递归处理；
+没有锚点的小区间（重复的条目）交给 difflib.SequenceMatcher。
+变化的行数超过 MAX_CHANGES（例如文件被重新排序）时返回 None，由调用方重新加载，
+逐行发出的信号此时比一次模型重置更慢。
+"""
+from bisect import bisect_left
+from collections import Counter
+from difflib import SequenceMatcher
+from typing import Sequence
+from models.media_model import MediaItem
+
+MAX_CHANGES = 10_000
+# 没有锚点时用 SequenceMatcher 比较的最大区间长度，更长的区间整体替换
+MAX_UNANCHORED = 2_000
+
+
+def _key(item: MediaItem) -> tuple:
+    return (item.title, item.creator, item.year, item.rating, item.poster_url, item.plot)
+
+
+def _anchors(a, b, alo, ahi, blo, bhi) -> list[tuple[int, int]]:
+    """两边各只出现一次的键中，顺序一致的最长匹配 [(i, j), ...]"""
+    count_a = Counter(a[alo:ahi])
+    count_b = Counter(b[blo:bhi])
+    position_b = {b[j]: j for j in range(blo, bhi) if count_b[b[j]] == 1}
+    pairs = [(i, position_b[a[i]]) for i in range(alo, ahi)
+             if count_a[a[i]] == 1 and a[i] in position_b]
+    # 按 i 排好的 pairs 中 j 的最长递增子序列
+    tails: list[int] = []
+    tail_index: list[int] = []
+    previous = [-1] * len(pairs)
+    for index, (_, j) in enumerate(pairs):
+        k = bisect_left(tails, j)
+        if k == len(tails):
+            tails.append(j)
+            tail_index.append(index)
+        else:
+            tails[k] = j
+            tail_index[k] = index
+        previous[index] = tail_index[k - 1] if k else -1
+    result = []
+    index = tail_index[-1] if tail_index else -1
+    while index >= 0:
+        result.append(pairs[index])
+        index = previous[index]
+    result.reverse()
+    return result
+
+
+def _matches(a, b, alo, ahi, blo, bhi, out: list[tuple[int, int]]):
+    """把 a[alo:ahi] 与 b[blo:bhi] 中相等的行对按顺序追加到 out"""
+    while alo < ahi and blo < bhi and a[alo] == b[blo]:
+        out.append((alo, blo))
+        alo += 1
+        blo += 1
+    suffix = []
+    while alo < ahi and blo < bhi and a[ahi - 1] == b[bhi - 1]:
+        ahi -= 1
+        bhi -= 1
+        suffix.append((ahi, bhi))
+    if alo < ahi and blo < bhi:
+        anchors = _anchors(a, b, alo, ahi, blo, bhi)
+        if anchors:
+            for i, j in anchors:
+                if i > alo and j > blo:
+                    _matches(a, b, alo, i, blo, j, out)
+                out.append((i, j))
+                alo, blo = i + 1, j + 1
+            _matches(a, b, alo, ahi, blo, bhi, out)
+        elif max(ahi - alo, bhi - blo) <= MAX_UNANCHORED:
+            matcher = SequenceMatcher(None, a[alo:ahi], b[blo:bhi], autojunk=False)
+            for i, j, size in matcher.get_matching_blocks():
+                out.extend((alo + i + k, blo + j + k) for k in range(size))
+    out.extend(reversed(suffix))
+
+
+def diff_items(old: Sequence[MediaItem], new: Sequence[MediaItem],
+               max_changes: int = MAX_CHANGES) -> list[tuple[str, int, int, int, int]] | None:
+    """
+    返回 difflib 风格的操作 [(tag, i1, i2, j1, j2), ...]，不含 'equal'：
+    'replace' 把 old[i1:i2] 换成 new[j1:j2]，'delete' 删除 old[i1:i2]，'insert' 在 i1 处插入 new[j1:j2]。
+    """
+    a = [_key(item) for item in old]
+    b = [_key(item) for item in new]
+    matches: list[tuple[int, int]] = []
+    _matches(a, b, 0, len(a), 0, len(b), matches)
+    matches.append((len(a), len(b)))
+    opcodes = []
+    changes = 0
+    i = j = 0
+    for next_i, next_j in matches:
+        if next_i > i or next_j > j:
+            tag = 'replace' if next_i > i and next_j > j else 'delete' if next_i > i else 'insert'
+            opcodes.append((tag, i, next_i, j, next_j))
+            changes += max(next_i - i, next_j - j)
+            if changes > max_changes:
+                return None
+        i, j = next_i + 1, next_j + 1
+    return opcodes
@@ -0,0 +1,48 @@
+"""
+媒体库条目的写时复制快照，供后台线程保存。
+
+创建快照只复制条目列表（不复制条目）。之后 GUI 线程在原地修改某个条目之前，
+控制层调用 preserve(item)：写入线程尚未读到该条目时，把修改前的副本放入快照。
+写入线程通过迭代快照读取条目，每个条目在锁内复制一份再交出，
+因此不会读到修改到一半的条目。插入和删除只改变控制层的列表，不影响快照。
+"""
+import threading
+from models.media_model import MediaItem
+
+
+class LibrarySnapshot:
+    def __init__(self, items):
+        self._items: list[MediaItem] = list(items)
+        self._lock = threading.Lock()
+        # 写入线程下一个要读取的位置，之前的条目已经读完
+        self._position = 0
+        # {id(条目): 位置}，第一次 preserve 时才建立
+        self._positions: dict[int, int] | None = None
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __iter__(self):
+        items, lock = self._items, self._lock
+        for index in range(len(items)):
+            with lock:
+                self._position = index + 1
+                item = items[index].copy()
+            yield item
+
+    def preserve(self, item: MediaItem):
+        """item 即将被原地修改：如果快照中的这个条目还没有被读取，先换成修改前的副本"""
+        with self._lock:
+            if self._position >= len(self._items):
+                return
+            if self._positions is None:
+                self._positions = {id(entry): index for index, entry in enumerate(self._items)}
+            index = self._positions.get(id(item))
+            if index is not None and index >= self._position and self._items[index] is item:
+                self._items[index] = item.copy()
+
+    def close(self):
+        """写入完成后调用，之后 preserve 不再复制"""
+        with self._lock:
+            self._position = len(self._items)
+            self._positions = None
@@ -0,0 +1,191 @@
+"""
+预先着色的图标图集。
+
+把每个 SVG 图标按 THEMES 中出现的每种图标颜色、在常见的设备像素比下渲染好，
+全部像素保存在一个文件里；启动时一次读入，取图标时不再解析或渲染 SVG。
+
+条目以 (SVG 内容摘要, 颜色, 设备像素比) 为键，颜色相同的主题共用同一组图像。
+文件中还记录了各 SVG 文件的修改时间和大小，文件未变化时无需读取 SVG 即可得到摘要。
+像素按本机字节序保存，图集只作为本机缓存使用。
+
+预先生成（在项目根目录下）：
+    python -m iconmanager.icon_atlas icons settings/icon_atlas.bin
+"""
+import hashlib
+import os
+import struct
+import sys
+import tempfile
+from PySide6.QtCore import QByteArray, Qt
+from PySide6.QtGui import QColor, QImage, QPainter
+from iconmanager.theme import THEMES
+
+MAGIC = b'MLIC'
+VERSION = 1
+ICON_NAMES = ('add.svg', 'delete.svg', 'edit.svg', 'save.svg', 'file_open.svg', 'warning.svg')
+DEVICE_PIXEL_RATIOS = (1.0, 1.25, 1.5, 2.0, 3.0)
+# 图标使用主题中的这种颜色着色
+ICON_COLOR_KEY = 'secondaryTextColor'
+# magic, 版本, 保留, SVG 文件数, 图像数
+_HEADER = struct.Struct('<4sHHII')
+# 修改时间(ns), 文件大小, 内容摘要, 文件名字节数
+_FILE = struct.Struct('<QQ8sH')
+# 内容摘要, 颜色 (ARGB), 设备像素比, 宽, 高, 像素数据偏移
+_IMAGE = struct.Struct('<8sIfHHQ')
+_FORMAT = QImage.Format.Format_ARGB32_Premultiplied
+
+
+def icon_colors(themes: dict = THEMES) -> list[str]:
+    """各主题使用的图标颜色，去重后保持首次出现的顺序"""
+    return list(dict.fromkeys(theme['colors'][ICON_COLOR_KEY] for theme in themes.values()))
+
+
+def svg_digest(data: bytes) -> bytes:
+    return hashlib.blake2b(data, digest_size=8).digest()
+
+
+def render_icon(svg_data: bytes, color: QColor, ratio: float) -> QImage | None:
+    """按 SVG 的默认尺寸乘以设备像素比渲染并着色；SVG 无效时返回 None"""
+    from PySide6.QtSvg import QSvgRenderer
+    renderer = QSvgRenderer(QByteArray(svg_data))
+    size = renderer.defaultSize()
+    if not renderer.isValid() or size.isEmpty():
+        return None
+    image = QImage(round(size.width() * ratio), round(size.height() * ratio), _FORMAT)
+    image.fill(Qt.transparent)
+    painter = QPainter(image)
+    renderer.render(painter)
+    painter.setCompositionMode(QPainter.CompositionMode_SourceIn)
+    painter.fillRect(image.rect(), color)
+    painter.end()
+    return image
+
+
+def _key(digest: bytes, color: QColor, ratio: float) -> tuple[bytes, int, float]:
+    # 以 float32 保存的设备像素比读回后与原值不一定相等，统一舍入
+    return digest, color.rgba(), round(ratio, 3)
+
+
+class IconAtlas:
+    """图集文件的读写；load() 之后按 (摘要, 颜色, 设备像素比) 取出 QImage"""
+    def __init__(self, path: str):
+        self.path = path
+        self._data = b''
+        self._data_start = 0
+        # 文件名 -> (修改时间, 大小, 摘要)
+        self._files: dict[str, tuple[int, int, bytes]] = {}
+        self._images: dict[tuple[bytes, int, float], tuple[int, int, int]] = {}
+
+    def load(self) -> bool:
+        """一次读入整个图集；文件不存在或格式不符时返回 False"""
+        try:
+            with open(self.path, 'rb') as f:
+                data = f.read()
+            self._parse(data)
+        except (OSError, ValueError, struct.error):
+            self._data, self._files, self._images = b'', {}, {}
+            return False
+        return True
+
+    def _parse(self, data: bytes):
+        magic, version, _, file_count, image_count = _HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f'{self.path} is not an icon atlas')
+        position = _HEADER.size
+        files = {}
+        for _ in range(file_count):
+            mtime, size, digest, length = _FILE.unpack_from(data, position)
+            position += _FILE.size
+            files[data[position:position + length].decode('utf-8')] = (mtime, size, digest)
+            position += length
+        images = {}
+        for _ in range(image_count):
+            digest, rgba, ratio, width, height, offset = _IMAGE.unpack_from(data, position)
+            position += _IMAGE.size
+            images[digest, rgba, round(ratio, 3)] = (width, height, offset)
+        if any(position + offset + width * height * 4 > len(data)
+               for width, height, offset in images.values()):
+            raise ValueError(f'{self.path} is truncated')
+        self._data, self._data_start, self._files, self._images = data, position, files, images
+
+    def digest_of(self, svg_path: str) -> bytes | None:
+        """文件的修改时间和大小与图集中记录的一致时返回记录的摘要，否则返回 None"""
+        record = self._files.get(os.path.basename(svg_path))
+        if record is None:
+            return None
+        try:
+            stat = os.stat(svg_path)
+        except OSError:
+            return None
+        return record[2] if (stat.st_mtime_ns, stat.st_size) == record[:2] else None
+
+    def image(self, digest: bytes, color: QColor, ratio: float) -> QImage | None:
+        entry = self._images.get(_key(digest, color, ratio))
+        if entry is None:
+            return None
+        width, height, offset = entry
+        start = self._data_start + offset
+        # copy() 使图像拥有自己的像素，不再引用图集的数据
+        return QImage(self._data[start:start + width * height * 4],
+                      width, height, width * 4, _FORMAT).copy()
+
+    def build(self, base_path: str, names=ICON_NAMES, colors=None, ratios=DEVICE_PIXEL_RATIOS):
+        """渲染 base_path 下的图标并写出图集；不存在或无效的 SVG 被跳过"""
+        colors = [QColor(color) for color in (colors or icon_colors())]
+        files, images, pixels = {}, {}, bytearray()
+        for name in names:
+            svg_path = os.path.join(base_path, name)
+            try:
+                stat = os.stat(svg_path)
+                with open(svg_path, 'rb') as f:
+                    svg_data = f.read()
+            except OSError:
+                continue
+            digest = svg_digest(svg_data)
+            files[name] = (stat.st_mtime_ns, stat.st_size, digest)
+            for color in colors:
+                for ratio in ratios:
+                    key = _key(digest, color, ratio)
+                    if key in images:
+                        continue
+                    image = render_icon(svg_data, color, ratio)
+                    if image is None:
+                        break
+                    images[key] = (image.width(), image.height(), len(pixels))
+                    pixels += image.constBits()[:image.width() * image.height() * 4]
+        data = self._serialize(files, images, pixels)
+        self._write(data)
+        self._parse(data)
+
+    @staticmethod
+    def _serialize(files: dict, images: dict, pixels: bytearray) -> bytes:
+        parts = [_HEADER.pack(MAGIC, VERSION, 0, len(files), len(images))]
+        for name, (mtime, size, digest) in files.items():
+            encoded = name.encode('utf-8')
+            parts.append(_FILE.pack(mtime, size, digest, len(encoded)) + encoded)
+        for (digest, rgba, ratio), (width, height, offset) in images.items():
+            parts.append(_IMAGE.pack(digest, rgba, ratio, width, height, offset))
+        parts.append(pixels)
+        return b''.join(parts)
+
+    def _write(self, data: bytes):
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(prefix='.icons-', suffix='.tmp', dir=directory)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.chmod(tmp_path, 0o644)
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+
+if __name__ == '__main__':
+    if len(sys.argv) != 3:
+        sys.exit('usage: python -m iconmanager.icon_atlas <icon directory> <atlas file>')
+    from PySide6.QtGui import QGuiApplication
+    app = QGuiApplication(sys.argv[:1])
+    IconAtlas(sys.argv[2]).build(sys.argv[1])
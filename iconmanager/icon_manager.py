@@ -1,55 +1,88 @@
-from PySide6.QtSvg import QSvgRenderer
-from PySide6.QtGui import (QColor, QIcon, QPainter, QPixmap)
+from PySide6.QtGui import (QColor, QIcon, QPixmap)
 import os
-from PySide6.QtCore import Qt, QSize
+from iconmanager.icon_atlas import DEVICE_PIXEL_RATIOS, ICON_COLOR_KEY, IconAtlas, render_icon
 from iconmanager.theme import THEMES
+from services.instrumentation import metrics
 
 class IconManager:
     """
     一个集中管理和着色应用程序图标的类。
+    给出 atlas_path 时图标取自预先渲染的图集（见 iconmanager.icon_atlas），
+    图集缺少当前 SVG 的图像时为所有主题重新生成一次。
     """
-    def __init__(self, theme_name: str, base_path: str = 'icons'):
+    def __init__(self, theme_name: str, base_path: str = 'icons', atlas_path: str = None):
         """
         初始化图标管理器。
         :param theme: 主题名称。
         :param base_path: 存放SVG文件的基础路径。
+        :param atlas_path: 图集文件路径；为 None 时每个图标在第一次使用时渲染。
         """
+        self.base_path = base_path
+        self._atlas = None
+        self._rebuilt = False
+        if atlas_path is not None:
+            self._atlas = IconAtlas(atlas_path)
+            self._atlas.load()
+        # 键为 (文件名, 颜色)，切换主题后再切回来时直接复用
+        self._icon_cache = {}  # 用于缓存已创建的图标
+        self.set_theme(theme_name)
+
+    def set_theme(self, theme_name: str):
+        """切换图标颜色；图集中已有各主题的图像，切换时不重新着色"""
         # 如果传入的是带.xml后缀的文件名，先清理一下
         if theme_name.endswith('.xml'):
             theme_name = theme_name[:-4]
 
-        color_key = 'secondaryTextColor'
-            
-        icon_color = THEMES[theme_name]['colors'][color_key]
+        icon_color = THEMES[theme_name]['colors'][ICON_COLOR_KEY]
 
         self.icon_color = QColor(icon_color)
-        self.base_path = base_path
-        self._icon_cache = {}  # 用于缓存已创建的图标
+
+    def _digest(self, svg_path: str) -> bytes | None:
+        digest = self._atlas.digest_of(svg_path)
+        if digest is None and not self._rebuilt and os.path.exists(svg_path):
+            # SVG 是新的或被修改过：重新生成整个图集，每个实例最多一次
+            self._rebuilt = True
+            self._atlas.build(self.base_path)
+            digest = self._atlas.digest_of(svg_path)
+        return digest
 
     def _create_colored_icon(self, svg_name: str) -> QIcon:
         """
-        内部辅助函数，加载一个SVG文件并将其渲染为指定颜色的QIcon。
-        （这就是我们之前写的那个函数，现在封装为类的一个私有方法）
+        内部辅助函数，返回指定颜色的图标。
+        图标包含各个设备像素比下的位图，高分屏上不再放大默认尺寸的位图。
         """
+        key = (svg_name, self.icon_color.rgba())
         # 如果图标已在缓存中，直接返回，无需重复创建
-        if svg_name in self._icon_cache:
-            return self._icon_cache[svg_name]
+        if key in self._icon_cache:
+            metrics.count('icon.cache', result='hit')
+            return self._icon_cache[key]
+        metrics.count('icon.cache', result='miss')
+        with metrics.timer('icon.create'):
+            icon = self._render_icon(svg_name)
+        self._icon_cache[key] = icon  # 将新创建的图标存入缓存
+        return icon
 
+    def _render_icon(self, svg_name: str) -> QIcon:
         svg_path = os.path.join(self.base_path, svg_name)
-        
-        renderer = QSvgRenderer(svg_path)
-        pixmap = QPixmap(renderer.defaultSize())
-        pixmap.fill(Qt.transparent)
-        
-        painter = QPainter(pixmap)
-        renderer.render(painter)
-        
-        painter.setCompositionMode(QPainter.CompositionMode_SourceIn)
-        painter.fillRect(pixmap.rect(), self.icon_color)
-        painter.end()
-        
-        icon = QIcon(pixmap)
-        self._icon_cache[svg_name] = icon  # 将新创建的图标存入缓存
+        if self._atlas is not None:
+            digest = self._digest(svg_path)
+            images = [] if digest is None else [
+                self._atlas.image(digest, self.icon_color, ratio) for ratio in DEVICE_PIXEL_RATIOS]
+        else:
+            try:
+                with open(svg_path, 'rb') as f:
+                    svg_data = f.read()
+            except OSError:
+                svg_data = b''
+            images = [render_icon(svg_data, self.icon_color, ratio)
+                      for ratio in DEVICE_PIXEL_RATIOS]
+
+        icon = QIcon()
+        for ratio, image in zip(DEVICE_PIXEL_RATIOS, images):
+            if image is not None:
+                pixmap = QPixmap.fromImage(image)
+                pixmap.setDevicePixelRatio(ratio)
+                icon.addPixmap(pixmap)
         return icon
 
     # --- 公共API方法 ---
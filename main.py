@@ -1,56 +1,111 @@
+from services.startup_timer import StartupTimer
+
+# 尽早开始计时，导入本身也计入启动耗时
+startup_timer = StartupTimer()
+
 import sys
 import os
-import json
+import time
 from PySide6.QtWidgets import (
-    QApplication, QMainWindow, QTableView, QDialog, QMessageBox, QFileDialog
-)
-from PySide6.QtGui import (
-    QAction, QIcon, QStandardItemModel, QStandardItem, QPalette, QPainter, QColor, QPixmap
-)
-from PySide6.QtCore import (
-    Qt, QThread, Signal, QSettings, Slot, QTimer
+    QApplication, QMainWindow, QTableView, QDialog, QMessageBox, QFileDialog, QLineEdit
 )
+from PySide6.QtGui import QAction, QActionGroup, QKeySequence
+from PySide6.QtCore import Qt, Slot, QTimer
 
-from PySide6.QtSvg import QSvgRenderer
-
-from qt_material import apply_stylesheet
-
-from models.media_model import MediaItem
+# 网络、SVG 渲染和 qt_material 相关的模块都在窗口显示之后按需导入
+from models.media_table_model import MediaTableModel
+from models.search_index import SearchIndex
+from models.search_proxy_model import SearchProxyModel
 from controllers.library_controller import LibraryController
-from services.omdb_worker import OMDbWorker
 from repository.json_repository import JSONRepository
+from repository.journaled_repository import JournaledJSONRepository
 from settings.settings_manager import SettingsManager
-from ui.dialogs import AddEditDialog
+from ui.dialogs import AddEditDialog, DuplicatesDialog
+from ui.stylesheet_cache import apply_cached_stylesheet, theme_name
 from iconmanager.icon_manager import IconManager
+from iconmanager.theme import THEMES
 from ui.dialogs import AddWarningDialog
 from services.application_manager import ApplicationManager
+from services.instrumentation import Profiler, metrics
+from services.library_saver import LibrarySaver
+from services.library_watcher import LibraryWatcher
+from services.session_cache import SessionCache
 
+LIBRARY_FILE_FILTER = 'JSON Files (*.json);;SQLite Files (*.db *.sqlite);;Snapshot Files (*.mlib)'
+SQLITE_SUFFIXES = ('.db', '.sqlite')
+SNAPSHOT_SUFFIX = '.mlib'
+OMDB_CACHE_FILE = 'omdb_cache.sqlite3'
+POSTER_CACHE_DIR = 'posters'
+STYLESHEET_CACHE_DIR = 'stylesheets'
+ICON_ATLAS_FILE = 'icon_atlas.bin'
+PROFILES_DIR = 'profiles'
+SCAN_INDEX_FILE = 'scan_index.sqlite3'
+SESSION_CACHE_FILE = 'session_cache.mlib'
+DEFAULT_THEME = 'dark_teal.xml'
 
 
 
 
-class MainWindow(QMainWindow):
-    worker_created = Signal(QThread)
 
+class MainWindow(QMainWindow):
     """主窗口: UI层"""
-    def __init__(self):
+    def __init__(self, app_manager: ApplicationManager = None, timer: StartupTimer = None):
         super().__init__()
         self.base_dir = os.path.dirname(os.path.abspath(__file__))
         self.setWindowTitle("Media Library Manager")
-        self.theme = 'dark_teal.xml'
+        self.app_manager = app_manager
+        self.timer = timer or StartupTimer()
+        # 后台服务在窗口显示后由 finish_startup 创建
+        self.poster_cache = None
+        self.metadata_scheduler = None
+        self.enrichment_runner = None
+        self.duplicate_runner = None
+        self.scan_runner = None
+        self.profiler = Profiler()
 
-        apply_stylesheet(
-            QApplication.instance(), theme=self.theme, 
+        self._init_settings()
+        if self.settings.get_metrics_enabled():
+            metrics.enabled = True
+        self.theme = self.settings.get_theme()
+        if theme_name(self.theme) not in THEMES:
+            self.theme = DEFAULT_THEME
+        apply_cached_stylesheet(
+            QApplication.instance(), self.theme,
+            self.settings.data_path(STYLESHEET_CACHE_DIR),
             invert_secondary=('light' in self.theme))
+        self.timer.mark('stylesheet')
 
         icon_path_root = os.path.join(self.base_dir, 'icons')
-        self.icon_manager = IconManager(self.theme, base_path=icon_path_root)
-
-        self.setWindowIcon(self.icon_manager.get_app_icon())
+        self.icon_manager = IconManager(
+            self.theme, base_path=icon_path_root,
+            atlas_path=self.settings.data_path(ICON_ATLAS_FILE))
 
-        self._init_settings()
         self._init_ui()
         self._init_controller()
+        self.timer.mark('window')
+
+    def finish_startup(self):
+        """窗口显示后执行的初始化：渲染图标、创建后台服务、加载上次的媒体库"""
+        self._load_icons()
+        self.timer.mark('icons')
+        self._init_services()
+        self.timer.mark('services')
+        port = self.settings.get_metrics_port()
+        if port:
+            try:
+                metrics.serve(port)
+            except OSError as e:
+                self.statusBar().showMessage(f'无法在端口 {port} 提供性能数据：{e}')
+        if self.settings.get_load_last_library() and self.last_path \
+                and os.path.exists(self.last_path):
+            if not self._warm_start(self.last_path):
+                self._load(self.last_path)
+            self.timer.mark('last library')
+        mode = StartupTimer.mode()
+        if mode:
+            self.timer.report()
+            if mode == 'exit':
+                QApplication.instance().quit()
 
 
     def _init_settings(self):
@@ -77,41 +132,98 @@ class MainWindow(QMainWindow):
 
     def _create_actions(self):
         """创建并配置动作"""
-        icon_path = lambda name: os.path.join(self.base_dir, 'icons', name)
-        icon = self.icon_manager.get_add_icon()
-        self.add_action = QAction(icon, '添加', self)
+        # 图标在窗口显示后由 _load_icons 设置
+        self.add_action = QAction('添加', self)
         self.add_action.setStatusTip('添加新媒体项')
         self.add_action.triggered.connect(self.on_add)
 
-        icon = self.icon_manager.get_delete_icon()
-        self.delete_action = QAction(icon, '删除', self)
+        self.delete_action = QAction('删除', self)
         self.delete_action.setStatusTip('删除选中的媒体项')
         self.delete_action.triggered.connect(self.on_delete)
 
-        icon = self.icon_manager.get_edit_icon()
-        self.edit_action = QAction(icon, '编辑', self)
+        self.edit_action = QAction('编辑', self)
         self.edit_action.setStatusTip('编辑选中的媒体项')
         self.edit_action.triggered.connect(self.on_edit)
 
-        icon = self.icon_manager.get_save_icon()
-        self.save_action = QAction(icon, '保存', self)
+        self.enrich_action = QAction('补全元数据', self)
+        self.enrich_action.setStatusTip('为整个媒体库批量获取海报和简介')
+        self.enrich_action.triggered.connect(self.on_enrich)
+
+        self.duplicates_action = QAction('查找重复项', self)
+        self.duplicates_action.setStatusTip('查找标题、导演/作者和年份相同或相似的媒体项')
+        self.duplicates_action.triggered.connect(self.on_find_duplicates)
+
+        self.stats_action = QAction('统计', self)
+        self.stats_action.setStatusTip('统计当前显示的媒体项')
+        self.stats_action.triggered.connect(self.on_stats)
+
+        self.save_action = QAction('保存', self)
         self.save_action.setStatusTip('保存媒体库到文件')
         self.save_action.triggered.connect(self.on_save)
 
-        icon = self.icon_manager.get_file_open_icon()
-        self.load_action = QAction(icon, '加载', self)
+        self.load_action = QAction('加载', self)
         self.load_action.setStatusTip('从文件加载媒体库')
         self.load_action.triggered.connect(self.on_load)
 
+        self.scan_action = QAction('扫描文件夹...', self)
+        self.scan_action.setStatusTip('扫描文件夹中的视频文件，把新文件添加到媒体库')
+        self.scan_action.triggered.connect(self.on_scan)
+
+        self.metrics_action = QAction('记录性能数据', self, checkable=True)
+        self.metrics_action.setStatusTip('记录仓库、控制层、图标和 OMDb 请求的耗时和次数')
+        self.metrics_action.setChecked(metrics.enabled)
+        self.metrics_action.toggled.connect(self.on_toggle_metrics)
+
+        self.export_metrics_action = QAction('导出性能数据...', self)
+        self.export_metrics_action.triggered.connect(self.on_export_metrics)
+
+        self.profile_action = QAction('性能分析 (cProfile/tracemalloc)', self, checkable=True)
+        self.profile_action.setStatusTip('再次点击时停止分析，并把结果写入设置目录下的 profiles')
+        self.profile_action.toggled.connect(self.on_toggle_profiling)
+
+        self.theme_group = QActionGroup(self)
+        self.theme_group.triggered.connect(self.on_theme)
+        self.theme_actions = {}
+        for name in sorted(THEMES):
+            action = QAction(name, self, checkable=True)
+            action.setData(THEMES[name]['qt_material_theme'])
+            action.setChecked(action.data() == self.theme)
+            self.theme_group.addAction(action)
+            self.theme_actions[name] = action
+
+    def _load_icons(self):
+        """渲染 SVG 图标并设置到窗口和各动作上"""
+        self.setWindowIcon(self.icon_manager.get_app_icon())
+        self._set_action_icons()
+
+    def _set_action_icons(self):
+        self.add_action.setIcon(self.icon_manager.get_add_icon())
+        self.delete_action.setIcon(self.icon_manager.get_delete_icon())
+        self.edit_action.setIcon(self.icon_manager.get_edit_icon())
+        self.save_action.setIcon(self.icon_manager.get_save_icon())
+        self.load_action.setIcon(self.icon_manager.get_file_open_icon())
+
     def _create_menus(self):
         """设置菜单栏"""
         file_menu = self.menuBar().addMenu('文件')
         file_menu.addAction(self.save_action)
         file_menu.addAction(self.load_action)
+        file_menu.addSeparator()
+        file_menu.addAction(self.scan_action)
         edit_menu = self.menuBar().addMenu('编辑')
+        self.edit_menu = edit_menu
         edit_menu.addAction(self.add_action)
         edit_menu.addAction(self.delete_action)
         edit_menu.addAction(self.edit_action)
+        edit_menu.addAction(self.enrich_action)
+        edit_menu.addAction(self.duplicates_action)
+        edit_menu.addAction(self.stats_action)
+        theme_menu = self.menuBar().addMenu('主题')
+        theme_menu.addActions(self.theme_group.actions())
+        tools_menu = self.menuBar().addMenu('工具')
+        tools_menu.addAction(self.metrics_action)
+        tools_menu.addAction(self.export_metrics_action)
+        tools_menu.addAction(self.profile_action)
 
     def _create_toolbar(self):
         """设置工具栏"""
@@ -120,6 +232,11 @@ class MainWindow(QMainWindow):
         toolbar.addAction(self.delete_action)
         toolbar.addAction(self.edit_action)
         toolbar.setToolButtonStyle(Qt.ToolButtonStyle.ToolButtonTextBesideIcon)
+        self.search_edit = QLineEdit(self)
+        self.search_edit.setPlaceholderText('搜索标题/导演，year:1990-1999 rating:8-')
+        self.search_edit.setClearButtonEnabled(True)
+        self.search_edit.textChanged.connect(self.on_search)
+        toolbar.addWidget(self.search_edit)
 
     def _create_status_bar(self):
         """初始化状态栏"""
@@ -127,17 +244,123 @@ class MainWindow(QMainWindow):
 
     def _create_table_view(self):
         """初始化QTableView和模型"""
-        self.model = QStandardItemModel(0, 4, self)
-        headers = ['标题', '导演/作者', '年份', '评分']
-        self.model.setHorizontalHeaderLabels(headers)
+        self.model = MediaTableModel(self)
         self.table_view = QTableView(self)
-        self.table_view.setModel(self.model)
         self.setCentralWidget(self.table_view)
 
     def _init_controller(self):
         """初始化控制层: 管理数据操作"""
-        repo = JSONRepository(self.last_path)
+        repo = self._repository_for(self.last_path)
         self.controller = LibraryController(self.model, repo)
+        self._create_undo_actions()
+        self.saver = LibrarySaver(self.controller, self.settings.get_autosave_delay(), self)
+        self.saver.saved.connect(lambda path: self.statusBar().showMessage(f'已保存到 {path}', 5000))
+        self.saver.failed.connect(
+            lambda path, error: self.statusBar().showMessage(f'保存 {path} 失败：{error}'))
+        if self.app_manager is not None:
+            self.app_manager.track(self.saver)
+        # 撤销栈的每次变化（添加、删除、编辑、撤销、重做）都推迟自动保存
+        self.controller.undo_stack.indexChanged.connect(self._on_library_modified)
+        self.watcher = LibraryWatcher(self.controller, busy=self.saver.is_saving, parent=self)
+        self.saver.saved.connect(self.watcher.mark_synced)
+        self.watcher.applied.connect(self._on_external_change)
+        self.watcher.reload_needed.connect(self._on_external_reload)
+        self.watcher.failed.connect(
+            lambda path, error: self.statusBar().showMessage(f'无法读取被修改的 {path}：{error}'))
+        if self.app_manager is not None:
+            self.app_manager.track(self.watcher)
+        self.session_cache = SessionCache(self.settings.data_path(SESSION_CACHE_FILE), self)
+        self.session_cache.verified.connect(
+            lambda path: self.statusBar().showMessage(f'{os.path.basename(path)} 与会话缓存一致', 5000))
+        self.session_cache.stale.connect(self._on_session_stale)
+        if self.app_manager is not None:
+            self.app_manager.track(self.session_cache)
+        # 内存中的数据是否与 last_path 一致，决定关闭时能否写入会话缓存；
+        # _revision 随每次修改递增，后台保存期间又有修改时保存完成后仍不一致
+        self._unsaved = False
+        self._revision = 0
+        self._save_revision = None
+        self._closing_view = None
+        self._closing_order = None
+        # 扫描添加的 (条目, 文件指纹)；保存时仍在媒体库中的记为已导入，换媒体库时清空
+        self._scan_imports = []
+        self._saving_imports = []
+        self.saver.task_started.connect(self._on_save_started)
+        self.saver.saved.connect(self._on_saved)
+        # 代理模型在控制层之后连接源模型的信号，重新查询时搜索索引已经更新
+        self.proxy_model = SearchProxyModel(
+            self.controller.search, self.controller.sort_order, self)
+        self.proxy_model.setSourceModel(self.model)
+        self.table_view.setModel(self.proxy_model)
+        # 初始按文件中的顺序显示，点击表头后才排序
+        self.table_view.horizontalHeader().setSortIndicator(-1, Qt.AscendingOrder)
+        self.table_view.setSortingEnabled(True)
+
+    def _create_undo_actions(self):
+        """撤销/重做动作，文字随命令栈顶部的命令变化"""
+        stack = self.controller.undo_stack
+        self.undo_action = stack.createUndoAction(self, '撤销')
+        self.undo_action.setShortcut(QKeySequence.StandardKey.Undo)
+        self.redo_action = stack.createRedoAction(self, '重做')
+        self.redo_action.setShortcut(QKeySequence.StandardKey.Redo)
+        first = self.edit_menu.actions()[0]
+        self.edit_menu.insertActions(first, [self.undo_action, self.redo_action])
+        self.edit_menu.insertSeparator(first)
+
+    def _init_services(self):
+        """创建海报缓存和元数据调度器（会导入 requests），重复调用时不做任何事"""
+        if self.metadata_scheduler is not None:
+            return
+        from services.metadata_scheduler import MetadataScheduler
+        from services.omdb_cache import OMDbCache
+        from services.poster_cache import PosterCache
+        self.poster_cache = PosterCache(
+            self.settings.data_path(POSTER_CACHE_DIR), parent=self)
+        self.model.set_poster_cache(self.poster_cache)
+        if self.model.rowCount():
+            self.model.refresh_rows(0, self.model.rowCount() - 1, roles=[Qt.DecorationRole])
+        self.metadata_scheduler = MetadataScheduler(
+            max_workers=self.settings.get_omdb_max_workers(),
+            rate_limit=self.settings.get_omdb_rate_limit(),
+            cache=OMDbCache(self.settings.data_path(OMDB_CACHE_FILE)),
+            parent=self)
+        if self.app_manager is not None:
+            self.app_manager.track(self.metadata_scheduler)
+
+    def _init_enrichment(self):
+        """第一次批量补全时才创建 EnrichmentRunner（会导入 aiohttp）"""
+        if self.enrichment_runner is not None:
+            return
+        from services.enrichment import EnrichmentEngine
+        from services.enrichment_runner import EnrichmentRunner
+        engine = EnrichmentEngine(
+            concurrency=self.settings.get_omdb_concurrency(),
+            rate_limit=self.settings.get_omdb_batch_rate_limit(),
+            cache_path=self.settings.data_path(OMDB_CACHE_FILE))
+        self.enrichment_runner = EnrichmentRunner(engine, self)
+        self.enrichment_runner.batch_ready.connect(self.controller.update_items)
+        self.enrichment_runner.batch_ready.connect(self._on_library_modified)
+        self.enrichment_runner.progress.connect(self._on_enrich_progress)
+        self.enrichment_runner.finished.connect(self._on_enrich_finished)
+        if self.app_manager is not None:
+            self.app_manager.track(self.enrichment_runner)
+
+    def _repository_for(self, path: str):
+        """根据文件扩展名选择仓库类型；类型不变时沿用当前仓库以保留其增量状态"""
+        if path and path.lower().endswith(SQLITE_SUFFIXES):
+            from repository.sqlite_repository import SQLiteRepository
+            repo_class = SQLiteRepository
+        elif path and path.lower().endswith(SNAPSHOT_SUFFIX):
+            from repository.binary_repository import BinaryRepository
+            repo_class = BinaryRepository
+        elif self.settings.is_journal_enabled():
+            repo_class = JournaledJSONRepository
+        else:
+            repo_class = JSONRepository
+        current = getattr(self, 'controller', None)
+        if current is not None and type(current.repository) is repo_class:
+            return current.repository
+        return repo_class(path)
 
 
 
@@ -148,16 +371,41 @@ class MainWindow(QMainWindow):
         if dialog.exec() == QDialog.Accepted:
             data = dialog.get_data()
             item = self.controller.add_item(data)
-            worker = OMDbWorker(item.title, self)
-            worker.fetched.connect(lambda info: self.controller.update_item(item, info))
-            self.worker_created.emit(worker)
-            worker.start()
+            self._init_services()
+            self.metadata_scheduler.submit(item.title, lambda info: self._apply_metadata(item, info))
+
+    def _apply_metadata(self, item, info: dict):
+        self.controller.update_item(item, info)
+        self._on_library_modified()
+
+    def _on_library_modified(self, *args):
+        self._revision += 1
+        self._unsaved = True
+        self.saver.schedule_autosave(self.last_path)
+
+    def _on_save_started(self):
+        self._save_revision = self._revision
+        self._saving_imports = self._present_scan_imports()
+
+    def _on_saved(self, path: str):
+        if self._save_revision in (None, self._revision):
+            self._unsaved = False
+        self._save_revision = None
+        if self._saving_imports and self.scan_runner is not None:
+            recorded = {id(item) for item, _ in self._saving_imports}
+            self.scan_runner.record_imports(path, [fp for _, fp in self._saving_imports])
+            self._scan_imports = [entry for entry in self._scan_imports
+                                  if id(entry[0]) not in recorded]
+        self._saving_imports = []
+        # 关闭窗口时等待中的保存写完了
+        self._store_session()
 
     @Slot()
     def on_delete(self):
         indexes = self.table_view.selectionModel().selectedRows()
-        for index in sorted(indexes, reverse=True):
-            self.controller.delete_item(index.row())
+        rows = [self.proxy_model.mapToSource(index).row() for index in indexes]
+        # 相邻的行合并为一次删除，整个选择作为一次撤销
+        self.controller.delete_rows(rows)
 
     @Slot()
     def on_edit(self):
@@ -169,43 +417,345 @@ class MainWindow(QMainWindow):
             message_box.show()
             QTimer.singleShot(3000, message_box.accept)
             return
-        row = selected.row()
+        row = self.proxy_model.mapToSource(selected).row()
         item = self.controller.get_item(row)
         dialog = AddEditDialog(self, item)
         if dialog.exec() == QDialog.Accepted:
             data = dialog.get_data()
             self.controller.edit_item(row, data)
 
+    @Slot(str)
+    def on_search(self, text: str):
+        self.proxy_model.set_criteria(**SearchIndex.parse_query(text))
+
+    @Slot()
+    def on_stats(self):
+        rows = self.proxy_model.source_rows() if self.proxy_model.is_filtering else None
+        stats = self.controller.stats(rows)
+        if not stats['count']:
+            self.statusBar().showMessage('没有可统计的媒体项')
+            return
+        years = sorted(stats['year_counts'].items(), key=lambda pair: -pair[1])[:5]
+        creators = sorted(((count, name, mean) for name, (count, mean)
+                           in stats['creators'].items()), reverse=True)[:5]
+        histogram = '  '.join(f'{low}-{low + 1}: {count}'
+                              for low, count in stats['rating_histogram'].items())
+        lines = [
+            f"数量：{stats['count']}，平均评分：{stats['rating_mean']:.2f}",
+            f'评分分布：{histogram}',
+            '年份最多：' + '，'.join(f'{year}（{count}）' for year, count in years),
+            '导演/作者最多：' + '，'.join(
+                f'{name}（{count} 部，平均 {mean:.1f}）' for count, name, mean in creators),
+        ]
+        QMessageBox.information(self, '统计', '\n'.join(lines))
+
+    @Slot()
+    def on_scan(self):
+        if self.scan_runner is not None and self.scan_runner.is_running():
+            return
+        directory = QFileDialog.getExistingDirectory(
+            self, '扫描文件夹', self.settings.get_scan_dir())
+        if not directory:
+            return
+        self.settings.set_scan_dir(directory)
+        if self.scan_runner is None:
+            from services.media_scanner import MediaScanner
+            from services.scan_runner import ScanRunner
+            scanner = MediaScanner(self.settings.data_path(SCAN_INDEX_FILE),
+                                   threads=self.settings.get_scan_threads(),
+                                   workers=self.settings.get_scan_workers() or None)
+            self.scan_runner = ScanRunner(scanner, self)
+            self.scan_runner.progress.connect(self._on_scan_progress)
+            self.scan_runner.finished.connect(self._on_scan_finished)
+            self.scan_runner.failed.connect(
+                lambda error: self.statusBar().showMessage(f'扫描失败：{error}'))
+            if self.app_manager is not None:
+                self.app_manager.track(self.scan_runner)
+        self.statusBar().showMessage(f'正在扫描 {directory}…')
+        self.scan_runner.start([directory], self.last_path or '',
+                               [fp for _, fp in self._present_scan_imports()])
+
+    def _present_scan_imports(self) -> list:
+        """扫描添加、尚未记为已导入且仍在媒体库中（没有被撤销）的 (条目, 指纹)"""
+        if not self._scan_imports:
+            return []
+        present = {id(item) for item in self.controller.items()}
+        return [entry for entry in self._scan_imports if id(entry[0]) in present]
+
+    def _on_scan_progress(self, phase: str, done: int, total: int):
+        if phase == 'dirs':
+            self.statusBar().showMessage(f'正在扫描… 已检查 {done} 个目录')
+        else:
+            self.statusBar().showMessage(f'正在计算文件指纹… {done}/{total}')
+
+    def _on_scan_finished(self, result):
+        if result.records:
+            with self.controller.batch(f'扫描添加 {len(result.records)} 项'):
+                items = self.controller.add_items(result.records)
+            self._scan_imports += zip(items, result.fingerprints)
+        self.statusBar().showMessage(
+            f'扫描完成：新增 {len(result.records)} 项，找到 {result.files_found} 个视频文件，'
+            f'跳过未变化的目录 {result.dirs_skipped} 个')
+
+    @Slot()
+    def on_find_duplicates(self):
+        if self.duplicate_runner is None:
+            from services.duplicate_runner import DuplicateRunner
+            self.duplicate_runner = DuplicateRunner(
+                self.settings.get_duplicate_workers() or None, self)
+            self.duplicate_runner.finished.connect(self._on_duplicates_found)
+            self.duplicate_runner.failed.connect(
+                lambda error: self.statusBar().showMessage(f'查找重复项失败：{error}'))
+            if self.app_manager is not None:
+                self.app_manager.track(self.duplicate_runner)
+        if self.duplicate_runner.is_running():
+            return
+        self.statusBar().showMessage('正在查找重复项…')
+        self.duplicate_runner.start(self.controller.items())
+
+    def _on_duplicates_found(self, groups: list):
+        if not groups:
+            self.statusBar().showMessage('没有找到重复项')
+            return
+        self.statusBar().showMessage(f'找到 {len(groups)} 组重复项')
+        dialog = DuplicatesDialog(groups, self)
+        if dialog.exec() == QDialog.Accepted:
+            self.controller.merge_duplicates(dialog.merges())
+
+    @Slot(bool)
+    def on_toggle_metrics(self, enabled: bool):
+        metrics.enabled = enabled
+        self.settings.set_metrics_enabled(enabled)
+
+    @Slot()
+    def on_export_metrics(self):
+        path, _ = QFileDialog.getSaveFileName(self, '导出性能数据', 'metrics.json', 'JSON Files (*.json)')
+        if not path:
+            return
+        try:
+            metrics.dump_json(path)
+        except OSError as e:
+            QMessageBox.critical(self, '错误', f'导出失败：{e}')
+
+    @Slot(bool)
+    def on_toggle_profiling(self, enabled: bool):
+        if enabled:
+            self.profiler.start()
+            self.statusBar().showMessage('正在进行性能分析，再次点击以停止')
+            return
+        directory = self.settings.data_path(PROFILES_DIR)
+        os.makedirs(directory, exist_ok=True)
+        prefix = os.path.join(directory, time.strftime('profile-%Y%m%d-%H%M%S'))
+        written = self.profiler.stop(prefix)
+        self.statusBar().showMessage('性能分析结果已写入 ' + '、'.join(written))
+
+    @Slot(QAction)
+    def on_theme(self, action: QAction):
+        self.apply_theme(action.data())
+
+    def apply_theme(self, theme: str):
+        """
+        在运行时切换主题。样式表取自缓存；图标取自 IconManager 中已着色的图标，
+        图标颜色不变时不更新动作；切换期间暂停窗口重绘，结束后只重绘一次。
+        """
+        if theme == self.theme:
+            return
+        self.setUpdatesEnabled(False)
+        try:
+            apply_cached_stylesheet(
+                QApplication.instance(), theme,
+                self.settings.data_path(STYLESHEET_CACHE_DIR),
+                invert_secondary=('light' in theme))
+            old_color = self.icon_manager.icon_color
+            self.icon_manager.set_theme(theme)
+            if self.icon_manager.icon_color != old_color:
+                self._set_action_icons()
+        finally:
+            self.setUpdatesEnabled(True)
+        self.theme = theme
+        self.theme_actions[theme_name(theme)].setChecked(True)
+        self.settings.set_theme(theme)
+
+    @Slot()
+    def on_enrich(self):
+        self._init_enrichment()
+        if self.enrichment_runner.is_running():
+            return
+        self.statusBar().showMessage('正在补全元数据…')
+        self.enrichment_runner.start(self.controller.items())
+
+    def _on_enrich_progress(self, done: int, total: int):
+        self.statusBar().showMessage(f'正在补全元数据… {done}/{total}')
+
+    def _on_enrich_finished(self, stats: dict):
+        if 'error' in stats:
+            self.statusBar().showMessage(f"补全元数据失败：{stats['error']}")
+        else:
+            self.statusBar().showMessage(
+                f"补全完成：{stats['enriched']}/{stats['items']} 项，"
+                f"请求 {stats['requests']} 次，缓存命中 {stats['cache_hits']} 次")
+
     @Slot()
     def on_save(self):
         path, _ = QFileDialog.getSaveFileName(
             self, '保存媒体库', (self.last_path if self.last_path else ''), 
-            'JSON Files (*.json)'
+            LIBRARY_FILE_FILTER
             )
         if path:
-            self.controller.save_library(path)
+            self.controller.set_repository(self._repository_for(path))
+            # 在后台线程中写入，完成或失败时在状态栏显示
+            self.saver.save(path)
+            self._watch(path)
+            self.last_path = path
             self.settings.set_last_path(path)
 
     @Slot()
     def on_load(self):
         path, _ = QFileDialog.getOpenFileName(
-            self, '加载媒体库', '', 'JSON Files (*.json)'
+            self, '加载媒体库', '', LIBRARY_FILE_FILTER
         )
         if path:
-            self.controller.load_library(path)
+            self._load(path)
+            self.last_path = path
             self.settings.set_last_path(path)
 
+    def _load(self, path: str):
+        self.controller.set_repository(self._repository_for(path))
+        self.controller.load_library(
+            path, chunk_size=LibraryController.LOAD_CHUNK_SIZE,
+            progress=self._on_load_progress)
+        # 加载前的修改属于上一个媒体库，不再自动保存到新的路径
+        self.saver.cancel_autosave()
+        self._unsaved = False
+        self._scan_imports = []
+        self._watch(path)
+
+    def _session_cacheable(self, path: str) -> bool:
+        """SQLite 和 .mlib 本身就能很快打开，不需要会话缓存"""
+        return self.settings.get_session_cache_enabled() and bool(path) \
+            and not path.lower().endswith(SQLITE_SUFFIXES + (SNAPSHOT_SUFFIX,))
+
+    def _warm_start(self, path: str) -> bool:
+        """从会话缓存立即显示上次的媒体库，源文件在后台核对；没有可用的缓存时返回 False"""
+        if not self._session_cacheable(path):
+            return False
+        entry = self.session_cache.restore(path)
+        if entry is None:
+            return False
+        self.controller.set_repository(self._repository_for(path))
+        self.controller.restore(entry.items)
+        self.saver.cancel_autosave()
+        self._unsaved = False
+        self._scan_imports = []
+        self._restore_view(entry.view, entry.order)
+        self._watch(path)
+        self.session_cache.verify(entry)
+        self.statusBar().showMessage(
+            f'已从会话缓存恢复 {len(entry.items)} 项，正在核对 {os.path.basename(path)}…')
+        return True
+
+    def _on_session_stale(self, path: str):
+        """
+        缓存之后源文件被修改过：只应用变化的行（一次撤销，代理模型一次布局变化），
+        期间的修改、选择和滚动位置得以保留，恢复的排序也不会被重置
+        """
+        if not self.last_path or os.path.abspath(self.last_path) != path:
+            return
+        if self.watcher.path == path:
+            self.watcher.recheck()
+        else:
+            self._load(self.last_path)
+
+    def _view_state(self) -> dict:
+        header = self.table_view.horizontalHeader()
+        return {'sort': [[field, ascending] for field, ascending in self.proxy_model.sort_keys],
+                'widths': [header.sectionSize(column) for column in range(header.count())],
+                'row': max(self.table_view.rowAt(0), 0)}
+
+    def _restore_view(self, view: dict, order=None):
+        header = self.table_view.horizontalHeader()
+        for column, width in enumerate(view.get('widths', [])[:header.count()]):
+            header.resizeSection(column, int(width))
+        keys = [(field, bool(ascending)) for field, ascending in view.get('sort', [])
+                if field in self.model.FIELDS]
+        if keys:
+            # 只更新表头的箭头，排序键整体设置，避免表头信号按单列重新排序
+            header.blockSignals(True)
+            header.setSortIndicator(self.model.FIELDS.index(keys[0][0]),
+                                    Qt.AscendingOrder if keys[0][1] else Qt.DescendingOrder)
+            header.blockSignals(False)
+            self.proxy_model.restore_sort(keys, order)
+        row = int(view.get('row', 0))
+        if 0 < row < self.proxy_model.rowCount():
+            # 模型重置后视图推迟更新滚动范围，先立即布局，否则滚动会被限制在 0
+            self.table_view.doItemsLayout()
+            self.table_view.scrollTo(self.proxy_model.index(row, 0), QTableView.ScrollHint.PositionAtTop)
+
+    def _store_session(self):
+        """关闭窗口后，媒体库与文件一致时更新会话缓存，否则删除它；保存还在进行时写完再调用"""
+        if self._closing_view is None or self.saver.is_saving():
+            return
+        view, self._closing_view = self._closing_view, None
+        order, self._closing_order = self._closing_order, None
+        path = self.last_path
+        if not self._session_cacheable(path):
+            return
+        if self._unsaved or self.controller.loading or not os.path.exists(path):
+            self.session_cache.clear()
+            return
+        self.session_cache.store(self.controller.snapshot(), path, view, order)
+
+    def _watch(self, path: str):
+        """监视媒体库文件的外部修改；SQLite 数据库由打开的连接独占，不监视"""
+        if not self.settings.get_watch_library() or path.lower().endswith(SQLITE_SUFFIXES):
+            self.watcher.unwatch()
+            return
+        repo_class = type(self.controller.repository)
+        self.watcher.watch(path, lambda p: list(repo_class(p).load(p)))
+
+    def _on_external_change(self, path: str, summary: dict):
+        # 内存中的数据已经与文件一致：丢弃仓库的增量状态，也不需要自动保存
+        self.controller.set_repository(type(self.controller.repository)(path))
+        self.saver.cancel_autosave()
+        self._unsaved = False
+        self.statusBar().showMessage(
+            f'{os.path.basename(path)} 已被其他程序修改：新增 {summary["inserted"]} 项，'
+            f'删除 {summary["removed"]} 项，修改 {summary["changed"]} 项（可撤销）')
+
+    def _on_external_reload(self, path: str):
+        self.controller.set_repository(type(self.controller.repository)(path))
+        self._load(path)
+        self.statusBar().showMessage(f'{os.path.basename(path)} 已被其他程序修改，已重新加载')
+
+    def _on_load_progress(self, bytes_read: int, total: int):
+        percent = bytes_read * 100 // total if total else 100
+        self.statusBar().showMessage(f'正在加载媒体库… {percent}%')
+        if bytes_read >= total:
+            self.statusBar().showMessage('就绪')
+
     def closeEvent(self, event):
+        # 等待中的自动保存立即开始；ApplicationManager 等写入完成后才退出
+        self.saver.flush()
+        # 会话缓存在保存写完之后更新，视图状态现在记下
+        self._closing_view = self._view_state()
+        proxy = self.proxy_model
+        self._closing_order = proxy.source_rows() if proxy.is_sorted and not proxy.is_filtering \
+            else None
+        self._store_session()
         event.accept()
 
 
 def main():
+    startup_timer.mark('imports')
     app = QApplication(sys.argv)
     app.setQuitOnLastWindowClosed(False)
     app_manager = ApplicationManager(app)
-    window = MainWindow()
-    window.worker_created.connect(app_manager.add_worker)
+    startup_timer.mark('qapplication')
+    window = MainWindow(app_manager, startup_timer)
     window.show()
+    startup_timer.mark('show')
+    # 事件循环开始后（窗口已经绘制）再完成其余的初始化
+    QTimer.singleShot(0, window.finish_startup)
     app.lastWindowClosed.connect(app_manager.check_quit)
     sys.exit(app.exec())
 
@@ -0,0 +1,195 @@
+import numpy as np
+from models.media_model import MediaItem
+
+# 评分直方图的分桶：[0, 1), [1, 2), ..., [9, 10]
+RATING_BINS = np.arange(0, 11)
+
+
+class LibraryColumns:
+    """
+    与条目列表按行对齐的 NumPy 列：年份、评分、导演/作者编号和 casefold 后的标题。
+    用于整体排序和统计，避免逐行比较显示字符串。
+
+    列在第一次排序或统计时才建立，之后随增删改增量维护；
+    末尾追加按容量倍增，不会每次复制整列。
+    """
+    def __init__(self):
+        self.reset([])
+
+    def reset(self, items: list[MediaItem]):
+        """绑定新的条目列表（不复制），列延迟到使用时建立"""
+        self._items = items
+        self._size = 0
+        self._built = False
+        self._year = np.empty(0, np.int32)
+        self._rating = np.empty(0, np.float64)
+        self._creator = np.empty(0, np.int32)
+        self._title = np.empty(0, object)
+        self._creator_names: list[str] = []
+        self._creator_codes: dict[str, int] = {}
+        self._title_rank = None
+
+    def ensure_built(self):
+        if self._built:
+            return
+        items, n = self._items, len(self._items)
+        self._year = np.fromiter((item.year for item in items), np.int32, n)
+        self._rating = np.fromiter((item.rating for item in items), np.float64, n)
+        code = self._code
+        self._creator = np.fromiter((code(item.creator) for item in items), np.int32, n)
+        self._title = np.fromiter((item.title.casefold() for item in items), object, n)
+        self._size = n
+        self._built = True
+
+    def _code(self, creator: str) -> int:
+        code = self._creator_codes.get(creator)
+        if code is None:
+            code = self._creator_codes[creator] = len(self._creator_names)
+            self._creator_names.append(creator)
+        return code
+
+    # --- 增量维护 ---
+
+    def insert_rows(self, row: int, count: int = 1):
+        """条目已插入到 items[row:row + count] 后调用"""
+        self._title_rank = None
+        if not self._built:
+            return
+        new = self._items[row:row + count]
+        year = np.fromiter((item.year for item in new), np.int32, count)
+        rating = np.fromiter((item.rating for item in new), np.float64, count)
+        creator = np.fromiter((self._code(item.creator) for item in new), np.int32, count)
+        title = np.fromiter((item.title.casefold() for item in new), object, count)
+        size = self._size + count
+        if size > len(self._year):
+            capacity = max(size, 2 * len(self._year), 1024)
+            for name in ('_year', '_rating', '_creator', '_title'):
+                old = getattr(self, name)
+                grown = np.empty(capacity, old.dtype)
+                grown[:self._size] = old[:self._size]
+                setattr(self, name, grown)
+        for column, values in ((self._year, year), (self._rating, rating),
+                               (self._creator, creator), (self._title, title)):
+            column[row + count:size] = column[row:self._size].copy()
+            column[row:row + count] = values
+        self._size = size
+
+    def remove_rows(self, row: int, count: int = 1):
+        """条目已从 items[row:row + count] 删除后调用"""
+        self._title_rank = None
+        if not self._built:
+            return
+        for column in (self._year, self._rating, self._creator, self._title):
+            column[row:self._size - count] = column[row + count:self._size].copy()
+        self._size -= count
+        self._title[self._size:self._size + count] = None
+
+    def update_row(self, row: int):
+        """items[row] 的标题、导演、年份或评分被修改后调用"""
+        if not self._built:
+            return
+        item = self._items[row]
+        self._year[row] = item.year
+        self._rating[row] = item.rating
+        self._creator[row] = self._code(item.creator)
+        title = item.title.casefold()
+        if title != self._title[row]:
+            # 只有标题变化才需要重新计算标题名次
+            self._title[row] = title
+            self._title_rank = None
+
+    @property
+    def year(self) -> np.ndarray:
+        self.ensure_built()
+        return self._year[:self._size]
+
+    @property
+    def rating(self) -> np.ndarray:
+        self.ensure_built()
+        return self._rating[:self._size]
+
+    @property
+    def creator(self) -> np.ndarray:
+        self.ensure_built()
+        return self._creator[:self._size]
+
+    @property
+    def title(self) -> np.ndarray:
+        """casefold 后的标题（object 数组）"""
+        self.ensure_built()
+        return self._title[:self._size]
+
+    # --- 排序 ---
+
+    def _creator_rank(self) -> np.ndarray:
+        names = self._creator_names
+        order = sorted(range(len(names)), key=lambda code: names[code].casefold())
+        rank_of_code = np.empty(len(names), np.int64)
+        rank_of_code[order] = np.arange(len(names))
+        return rank_of_code[self.creator]
+
+    def _title_ranks(self) -> np.ndarray:
+        # 排序时按需计算名次并缓存到下一次插入、删除或标题修改
+        if self._title_rank is None:
+            # 相同的标题取相同的名次，次要排序键才能起作用；
+            # 转成定长 Unicode 数组后由 NumPy 在 C 中排序，逐字符比较与 str 相同
+            self._title_rank = np.unique(self.title.astype(str), return_inverse=True)[1]
+        return self._title_rank
+
+    def sort_key(self, field: str) -> np.ndarray:
+        if field == 'year':
+            return self.year
+        if field == 'rating':
+            return self.rating
+        if field == 'creator':
+            return self._creator_rank()
+        if field == 'title':
+            return self._title_ranks()
+        raise ValueError(f'cannot sort by {field!r}')
+
+    def sort_order(self, keys: list[tuple[str, bool]], rows=None) -> np.ndarray:
+        """
+        返回按 keys 排序后的行号排列。
+        :param keys: [(字段名, 是否升序), ...]，第一个为主键；相等的行保持原有顺序。
+        :param rows: 只对这些行排序（例如搜索结果），默认为全部行。
+        """
+        self.ensure_built()
+        subset = np.arange(self._size) if rows is None else np.asarray(rows, np.int64)
+        if not keys or not len(subset):
+            return subset
+        # np.lexsort 以最后一个键为主键，且是稳定排序
+        columns = []
+        for field, ascending in reversed(keys):
+            column = self.sort_key(field)[subset]
+            columns.append(column if ascending else -column)
+        return subset[np.lexsort(columns)]
+
+    # --- 统计 ---
+
+    def stats(self, rows=None) -> dict:
+        """
+        汇总统计：数量、平均评分、评分直方图、每年数量和每位导演/作者的数量与平均评分。
+        :param rows: 只统计这些行，默认为全部行。
+        """
+        year, rating, creator = self.year, self.rating, self.creator
+        if rows is not None:
+            rows = np.asarray(rows, np.int64)
+            year, rating, creator = year[rows], rating[rows], creator[rows]
+        counts, _ = np.histogram(rating, bins=RATING_BINS)
+        years, year_counts = np.unique(year, return_counts=True)
+        creator_counts = np.bincount(creator, minlength=len(self._creator_names))
+        creator_sums = np.bincount(creator, weights=rating, minlength=len(self._creator_names))
+        present = np.flatnonzero(creator_counts)
+        names = self._creator_names
+        return {
+            'count': int(len(rating)),
+            'rating_mean': float(rating.mean()) if len(rating) else None,
+            'rating_histogram': dict(zip(RATING_BINS[:-1].tolist(), counts.tolist())),
+            'year_counts': dict(zip(years.tolist(), year_counts.tolist())),
+            'creators': {
+                names[code]: (count, total / count)
+                for code, count, total in zip(present.tolist(),
+                                              creator_counts[present].tolist(),
+                                              creator_sums[present].tolist())
+            },
+        }
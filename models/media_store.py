@@ -0,0 +1,347 @@
+import sys
+from array import array
+from typing import Iterable
+from models.media_model import MediaItem
+
+FIELDS = ('title', 'creator', 'year', 'rating', 'poster_url', 'plot')
+
+
+class _ArenaColumn:
+    """
+    变长字符串列：UTF-8 字节依次追加到同一块缓冲区，每行只记录起点和长度。
+    修改和删除留下的旧字节计入 _garbage，超过缓冲区一半时整体压缩。
+    """
+    def __init__(self):
+        self._buffer = bytearray()
+        self._starts = array('Q')
+        self._lengths = array('I')
+        self._garbage = 0
+
+    def __len__(self):
+        return len(self._starts)
+
+    def get(self, row: int) -> str:
+        length = self._lengths[row]
+        if not length:
+            return ''
+        start = self._starts[row]
+        return self._buffer[start:start + length].decode('utf-8')
+
+    def values(self) -> list[str]:
+        buffer = self._buffer
+        return [buffer[start:start + length].decode('utf-8') if length else ''
+                for start, length in zip(self._starts, self._lengths)]
+
+    def _store(self, value: str) -> tuple[int, int]:
+        data = value.encode('utf-8')
+        start = len(self._buffer)
+        self._buffer += data
+        return start, len(data)
+
+    def extend(self, values: Iterable[str]):
+        starts, lengths, store = self._starts, self._lengths, self._store
+        for value in values:
+            start, length = store(value)
+            starts.append(start)
+            lengths.append(length)
+
+    def insert(self, row: int, values: list[str]):
+        pairs = [self._store(value) for value in values]
+        self._starts[row:row] = array('Q', (start for start, _ in pairs))
+        self._lengths[row:row] = array('I', (length for _, length in pairs))
+
+    def set(self, row: int, value: str):
+        self._garbage += self._lengths[row]
+        self._starts[row], self._lengths[row] = self._store(value)
+        self._maybe_compact()
+
+    def delete(self, row: int, count: int):
+        self._garbage += sum(self._lengths[row:row + count])
+        del self._starts[row:row + count]
+        del self._lengths[row:row + count]
+        self._maybe_compact()
+
+    def _maybe_compact(self):
+        if self._garbage > len(self._buffer) // 2:
+            self.compact()
+
+    def compact(self):
+        buffer, new = self._buffer, bytearray()
+        starts = array('Q')
+        for start, length in zip(self._starts, self._lengths):
+            starts.append(len(new))
+            new += buffer[start:start + length]
+        self._buffer, self._starts, self._garbage = new, starts, 0
+
+    def nbytes(self) -> int:
+        return (len(self._buffer) + self._starts.itemsize * len(self._starts)
+                + self._lengths.itemsize * len(self._lengths))
+
+
+class _InternedColumn:
+    """重复率高的字符串列：每个不同的值只保存一次，每行记录一个 4 字节编号"""
+    def __init__(self):
+        self._codes = array('I')
+        self._values: list[str] = []
+        self._lookup: dict[str, int] = {}
+
+    def __len__(self):
+        return len(self._codes)
+
+    def _code(self, value: str) -> int:
+        code = self._lookup.get(value)
+        if code is None:
+            code = self._lookup[value] = len(self._values)
+            self._values.append(sys.intern(value))
+        return code
+
+    def get(self, row: int) -> str:
+        return self._values[self._codes[row]]
+
+    def values(self) -> list[str]:
+        values = self._values
+        return [values[code] for code in self._codes]
+
+    def extend(self, values: Iterable[str]):
+        self._codes.extend(map(self._code, values))
+
+    def insert(self, row: int, values: list[str]):
+        self._codes[row:row] = array('I', map(self._code, values))
+
+    def set(self, row: int, value: str):
+        self._codes[row] = self._code(value)
+
+    def delete(self, row: int, count: int):
+        del self._codes[row:row + count]
+
+    def compact(self):
+        pass
+
+    def nbytes(self) -> int:
+        return (self._codes.itemsize * len(self._codes)
+                + sum(sys.getsizeof(value) for value in self._values))
+
+
+def _values(item) -> tuple:
+    """MediaItem 或 MediaItemView 按 FIELDS 顺序的字段值"""
+    return tuple(getattr(item, field) for field in FIELDS)
+
+
+def _rating(value: float) -> float:
+    # 评分以 float32 保存，读出时舍去单精度误差（8.7 而不是 8.699999809265137）
+    return round(value, 6)
+
+
+class MediaStore:
+    """
+    列式保存的媒体条目集合，内存占用远小于 list[MediaItem]。
+    标题、简介和海报地址放在 UTF-8 字节区中，导演/作者按值去重，
+    年份和评分分别保存为 array('H') 和 array('f')，因此年份必须在 0..65535 之间。
+
+    按下标访问得到 MediaItemView，它与 MediaItem 有相同的属性。
+    支持连续切片的赋值和删除，可以直接交给 MediaTableModel.set_items，
+    之后的 insert_items / remove_items 也作用于列数据。
+    视图只记录行号，插入或删除行之后应重新获取。
+    """
+    def __init__(self, items: Iterable[MediaItem] = ()):
+        self._title = _ArenaColumn()
+        self._creator = _InternedColumn()
+        self._years = array('H')
+        self._ratings = array('f')
+        self._poster_url = _ArenaColumn()
+        self._plot = _ArenaColumn()
+        self._strings = {'title': self._title, 'creator': self._creator,
+                         'poster_url': self._poster_url, 'plot': self._plot}
+        self.extend(items)
+
+    @classmethod
+    def from_dicts(cls, records: Iterable[dict]) -> 'MediaStore':
+        """按 MediaItem.from_dict 的规则逐列写入，不创建中间的 MediaItem"""
+        store = cls()
+        title, creator, poster_url, plot = [], [], [], []
+        years, ratings = store._years, store._ratings
+        for record in records:
+            get = record.get
+            title.append(get('title', ''))
+            creator.append(get('creator', ''))
+            years.append(int(get('year', 0)))
+            ratings.append(float(get('rating', 0.0)))
+            poster_url.append(get('poster_url', ''))
+            plot.append(get('plot', ''))
+        store._title.extend(title)
+        store._creator.extend(creator)
+        store._poster_url.extend(poster_url)
+        store._plot.extend(plot)
+        return store
+
+    # --- 序列接口 ---
+
+    def __len__(self) -> int:
+        return len(self._years)
+
+    def __getitem__(self, row):
+        if isinstance(row, slice):
+            return [MediaItemView(self, r) for r in range(*row.indices(len(self)))]
+        return MediaItemView(self, self._check_row(row))
+
+    def __iter__(self):
+        return (MediaItemView(self, row) for row in range(len(self)))
+
+    def __setitem__(self, row, value):
+        if isinstance(row, slice):
+            start, stop = self._contiguous(row)
+            # 先读出新值：它们可能是本集合的视图，删除后行号会变化
+            self._insert_values(start, [_values(item) for item in value], replace=stop - start)
+        else:
+            row = self._check_row(row)
+            values = dict(zip(FIELDS, _values(value)))
+            # 先写年份：越界时其他列保持不变
+            for field in ('year', 'rating', 'title', 'creator', 'poster_url', 'plot'):
+                self.set(row, field, values[field])
+
+    def __delitem__(self, row):
+        if isinstance(row, slice):
+            start, stop = self._contiguous(row)
+            self.delete(start, stop - start)
+        else:
+            self.delete(self._check_row(row), 1)
+
+    def _contiguous(self, row: slice) -> tuple[int, int]:
+        start, stop, step = row.indices(len(self))
+        if step != 1:
+            raise ValueError('MediaStore only supports contiguous slices')
+        return start, max(start, stop)
+
+    def _check_row(self, row: int) -> int:
+        if row < 0:
+            row += len(self)
+        if not 0 <= row < len(self):
+            raise IndexError('MediaStore index out of range')
+        return row
+
+    def append(self, item: MediaItem):
+        self.extend((item,))
+
+    def extend(self, items: Iterable[MediaItem]):
+        items = list(items)
+        # 先转换数值列，年份越界时在修改任何列之前抛出 OverflowError
+        years = array('H', (item.year for item in items))
+        ratings = array('f', (item.rating for item in items))
+        self._years.extend(years)
+        self._ratings.extend(ratings)
+        self._title.extend(item.title for item in items)
+        self._creator.extend(item.creator for item in items)
+        self._poster_url.extend(item.poster_url for item in items)
+        self._plot.extend(item.plot for item in items)
+
+    def insert(self, row: int, items: list[MediaItem]):
+        """在 row 处插入若干项"""
+        self._insert_values(row, [_values(item) for item in items])
+
+    def _insert_values(self, row: int, values: list[tuple], replace: int = 0):
+        """插入按 FIELDS 顺序的字段值；replace > 0 时先删除 row 开始的这么多行"""
+        title, creator, years, ratings, poster_url, plot = zip(*values) if values else ((),) * 6
+        # 年份越界时在修改任何列之前抛出 OverflowError
+        years = array('H', years)
+        ratings = array('f', ratings)
+        if replace:
+            self.delete(row, replace)
+        self._years[row:row] = years
+        self._ratings[row:row] = ratings
+        self._title.insert(row, list(title))
+        self._creator.insert(row, list(creator))
+        self._poster_url.insert(row, list(poster_url))
+        self._plot.insert(row, list(plot))
+
+    def delete(self, row: int, count: int = 1):
+        """删除从 row 开始的 count 项"""
+        for column in self._strings.values():
+            column.delete(row, count)
+        del self._years[row:row + count]
+        del self._ratings[row:row + count]
+
+    # --- 单元格读写 ---
+
+    def get(self, row: int, field: str):
+        if field == 'year':
+            return self._years[row]
+        if field == 'rating':
+            return _rating(self._ratings[row])
+        return self._strings[field].get(row)
+
+    def set(self, row: int, field: str, value):
+        if field == 'year':
+            self._years[row] = int(value)
+        elif field == 'rating':
+            self._ratings[row] = float(value)
+        else:
+            self._strings[field].set(row, value)
+
+    # --- 转换 ---
+
+    def row_dict(self, row: int) -> dict:
+        return {field: self.get(row, field) for field in FIELDS}
+
+    def to_item(self, row: int) -> MediaItem:
+        return MediaItem(*(self.get(row, field) for field in FIELDS))
+
+    def _columns(self):
+        return (self._title.values(), self._creator.values(), self._years,
+                map(_rating, self._ratings), self._poster_url.values(), self._plot.values())
+
+    def to_items(self) -> list[MediaItem]:
+        return [MediaItem(*values) for values in zip(*self._columns())]
+
+    def to_dicts(self) -> list[dict]:
+        """逐列解码后一次性组装，适合整体保存为 JSON"""
+        return [{'title': title, 'creator': creator, 'year': year, 'rating': rating,
+                 'poster_url': poster_url, 'plot': plot}
+                for title, creator, year, rating, poster_url, plot in zip(*self._columns())]
+
+    def compact(self):
+        """回收修改和删除在字节区中留下的空间"""
+        for column in self._strings.values():
+            column.compact()
+
+    def nbytes(self) -> int:
+        """各列实际占用的字节数（不含 Python 对象本身的固定开销）"""
+        return (sum(column.nbytes() for column in self._strings.values())
+                + self._years.itemsize * len(self._years)
+                + self._ratings.itemsize * len(self._ratings))
+
+
+def _field(name: str) -> property:
+    return property(lambda self: self._store.get(self._row, name),
+                    lambda self, value: self._store.set(self._row, name, value))
+
+
+class MediaItemView:
+    """MediaStore 中某一行的轻量视图，属性读写直接作用于列数据"""
+    __slots__ = ('_store', '_row')
+
+    title = _field('title')
+    creator = _field('creator')
+    year = _field('year')
+    rating = _field('rating')
+    poster_url = _field('poster_url')
+    plot = _field('plot')
+
+    def __init__(self, store: MediaStore, row: int):
+        self._store = store
+        self._row = row
+
+    def to_dict(self) -> dict:
+        return self._store.row_dict(self._row)
+
+    def to_item(self) -> MediaItem:
+        return self._store.to_item(self._row)
+
+    def apply_metadata(self, info: dict):
+        """与 MediaItem.apply_metadata 相同"""
+        if 'poster_url' in info:
+            self.poster_url = info['poster_url']
+        if 'plot' in info:
+            self.plot = info['plot']
+
+    def __repr__(self):
+        return f'MediaItemView({self._row}, {self.to_item()!r})'
@@ -0,0 +1,138 @@
+from PySide6.QtCore import QAbstractTableModel, QModelIndex, QPersistentModelIndex, Qt, Signal
+from PySide6.QtGui import QColor, QPixmap
+from models.media_model import MediaItem
+
+
+class MediaTableModel(QAbstractTableModel):
+    """
+    直接读取 MediaItem 列表的表格模型。
+    不为每个单元格创建 QStandardItem，显示字符串在 data() 中按需生成。
+    """
+    HEADERS = ['标题', '导演/作者', '年份', '评分']
+    # 各列对应的 MediaItem 字段，排序时据此选择列
+    FIELDS = ['title', 'creator', 'year', 'rating']
+
+    # 一组相关的行变化开始和结束（见 begin_batch），代理模型据此只更新一次
+    batch_started = Signal()
+    batch_finished = Signal()
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._items: list[MediaItem] = []
+        self._batch_depth = 0
+        self._poster_cache = None
+        self._placeholder = None
+        # 海报 URL -> 正在等待该缩略图的单元格
+        self._waiting: dict[str, list[QPersistentModelIndex]] = {}
+
+    def set_poster_cache(self, cache):
+        """启用标题列的海报缩略图，cache 为 services.poster_cache.PosterCache"""
+        self._poster_cache = cache
+        cache.thumbnail_ready.connect(self._on_thumbnail_ready)
+
+    # --- Qt 模型接口 ---
+
+    def rowCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self._items)
+
+    def columnCount(self, parent=QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        if role == Qt.DecorationRole:
+            return self._poster(index) if index.column() == 0 else None
+        if role not in (Qt.DisplayRole, Qt.EditRole):
+            return None
+        item = self._items[index.row()]
+        column = index.column()
+        if column == 0:
+            return item.title
+        if column == 1:
+            return item.creator
+        if column == 2:
+            return str(item.year)
+        if column == 3:
+            return str(item.rating)
+        return None
+
+    def _poster(self, index):
+        if self._poster_cache is None:
+            return None
+        url = self._items[index.row()].poster_url
+        if not url or url == 'N/A':
+            return None
+        pixmap = self._poster_cache.get(url)
+        if pixmap is not None:
+            return pixmap
+        if self._poster_cache.has_failed(url):
+            return None
+        # 只有视图实际请求过的单元格才会登记，缩略图就绪后只刷新这些单元格
+        waiting = self._waiting.setdefault(url, [])
+        if not any(persistent == index for persistent in waiting):
+            waiting.append(QPersistentModelIndex(index))
+        return self._placeholder_pixmap()
+
+    def _placeholder_pixmap(self) -> QPixmap:
+        if self._placeholder is None:
+            self._placeholder = QPixmap(self._poster_cache.thumb_size)
+            self._placeholder.fill(QColor(128, 128, 128, 64))
+        return self._placeholder
+
+    def _on_thumbnail_ready(self, url: str):
+        for persistent in self._waiting.pop(url, []):
+            if persistent.isValid():
+                index = self.index(persistent.row(), persistent.column())
+                self.dataChanged.emit(index, index, [Qt.DecorationRole])
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return None
+        if orientation == Qt.Horizontal and 0 <= section < len(self.HEADERS):
+            return self.HEADERS[section]
+        if orientation == Qt.Vertical:
+            return str(section + 1)
+        return None
+
+    # --- 供控制层调用的修改接口 ---
+
+    def set_items(self, items: list[MediaItem]):
+        """绑定新的数据列表（不复制），只触发一次模型重置"""
+        self.beginResetModel()
+        self._items = items
+        self._waiting.clear()
+        self.endResetModel()
+
+    def insert_items(self, row: int, items: list[MediaItem]):
+        """在 row 处插入若干项，并发出一次 rowsInserted"""
+        if not items:
+            return
+        self.beginInsertRows(QModelIndex(), row, row + len(items) - 1)
+        self._items[row:row] = items
+        self.endInsertRows()
+
+    def remove_items(self, row: int, count: int = 1):
+        """删除从 row 开始的 count 项，并发出一次 rowsRemoved"""
+        if count <= 0:
+            return
+        self.beginRemoveRows(QModelIndex(), row, row + count - 1)
+        del self._items[row:row + count]
+        self.endRemoveRows()
+
+    def begin_batch(self):
+        """之后直到对应的 end_batch 的行变化属于同一次操作；可以嵌套，只在最外层发出信号"""
+        self._batch_depth += 1
+        if self._batch_depth == 1:
+            self.batch_started.emit()
+
+    def end_batch(self):
+        self._batch_depth -= 1
+        if self._batch_depth == 0:
+            self.batch_finished.emit()
+
+    def refresh_rows(self, first: int, last: int = None, roles: list = ()):
+        """通知视图 first..last 行的内容已变化；roles 为空表示所有角色"""
+        last = first if last is None else last
+        self.dataChanged.emit(
+            self.index(first, 0), self.index(last, self.columnCount() - 1), list(roles))
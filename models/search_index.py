@@ -0,0 +1,281 @@
+import re
+from array import array
+from models.media_model import MediaItem
+
+# 中日韩文字按单字和相邻二字切分，其余文字按单词切分
+_CJK = '぀-ヿ㐀-䶿一-鿿豈-﫿가-힯'
+_RUNS = re.compile(rf'[{_CJK}]+|[^\W{_CJK}]+')
+_CJK_RUN = re.compile(rf'[{_CJK}]')
+_RANGE = re.compile(r'^(year|rating):([\d.]*)(-?)([\d.]*)$')
+
+
+def _runs(text: str) -> list[str]:
+    return _RUNS.findall(text.casefold())
+
+
+def _is_cjk(run: str) -> bool:
+    return _CJK_RUN.match(run) is not None
+
+
+class SearchIndex:
+    """
+    标题和导演/作者的倒排索引，以及年份、评分的分桶索引。
+
+    每一行分配一个稳定的文档号，倒排表为 array('l')。
+    编辑和删除不会从倒排表中移除旧记录，查询时对候选逐个回查条目本身，
+    因此过期记录只影响性能而不影响结果；过期记录过多时整体重建。
+
+    索引从第 0 行开始逐步建立（build_step），已建立的部分随增删改增量维护，
+    尚未建立的部分在轮到它时再索引；查询前会先补齐剩余部分。
+    条目序列提供 search_fields(行号) 时（例如 .mlib 的 SnapshotItems），
+    建立索引和查询时都通过它读取字段，不会为每一行解码出 MediaItem。
+    """
+    # 西文单词额外索引的前缀长度上限，用于输入过程中的前缀匹配
+    PREFIX_LEN = 4
+    # 过期记录超过有效记录的倍数时重建索引
+    GARBAGE_RATIO = 1.0
+
+    def __init__(self):
+        self.reset([])
+
+    def reset(self, items: list[MediaItem]):
+        """绑定新的条目列表（不复制），并清空索引"""
+        self._items = items
+        self._fields = getattr(items, 'search_fields', None) or self._item_fields
+        self._postings: dict[str, array] = {}
+        self._years: dict[int, array] = {}
+        self._ratings: dict[int, array] = {}
+        self._row_docids = array('l')
+        self._doc_rows = array('l')
+        # 每个文档号当前有效的倒排记录数（含年份、评分分桶）
+        self._doc_entries = array('l')
+        self._rows_dirty = False
+        self._next_doc = 0
+        self._live_entries = 0
+        self._garbage = 0
+
+    @property
+    def built(self) -> bool:
+        return len(self._row_docids) == len(self._items)
+
+    # --- 建立与增量维护 ---
+
+    def build_step(self, max_rows: int) -> bool:
+        """继续为尚未索引的行建立索引，最多处理 max_rows 行；全部完成时返回 True"""
+        fields, row_docids = self._fields, self._row_docids
+        start = len(row_docids)
+        end = min(len(self._items), start + max_rows)
+        for row in range(start, end):
+            row_docids.append(self._index_item(fields(row)))
+        if end > start:
+            self._rows_dirty = True
+        return end == len(self._items)
+
+    def ensure_built(self):
+        self.build_step(len(self._items))
+
+    def insert_rows(self, row: int, count: int = 1):
+        """条目已插入到 items[row:row + count] 后调用"""
+        if row > len(self._row_docids):
+            # 插入位置还没有建立索引，轮到时再处理
+            return
+        docids = array('l', (self._index_item(self._fields(r)) for r in range(row, row + count)))
+        at_end = row == len(self._row_docids)
+        self._row_docids[row:row] = docids
+        if at_end and not self._rows_dirty:
+            self._doc_rows.extend(range(row, row + count))
+        else:
+            self._rows_dirty = True
+
+    def remove_rows(self, row: int, count: int = 1):
+        """条目已从 items[row:row + count] 删除后调用"""
+        docids = self._row_docids[row:row + count]
+        if not docids:
+            return
+        del self._row_docids[row:row + count]
+        for docid in docids:
+            self._retire(docid)
+        self._rows_dirty = True
+
+    def update_row(self, row: int):
+        """items[row] 的标题、导演、年份或评分被修改后调用"""
+        if row >= len(self._row_docids):
+            return
+        docid = self._row_docids[row]
+        self._retire(docid)
+        self._doc_entries[docid] = self._add_postings(docid, self._fields(row))
+
+    def _retire(self, docid: int):
+        # 文档号的现有记录不再有效，从有效计数移到过期计数
+        stale = self._doc_entries[docid]
+        self._doc_entries[docid] = 0
+        self._live_entries -= stale
+        self._garbage += stale
+
+    def _item_fields(self, row: int) -> tuple[str, str, int, float]:
+        item = self._items[row]
+        return item.title, item.creator, item.year, item.rating
+
+    def _index_item(self, fields: tuple[str, str, int, float]) -> int:
+        docid = self._next_doc
+        self._next_doc += 1
+        self._doc_entries.append(self._add_postings(docid, fields))
+        return docid
+
+    def _add_postings(self, docid: int, fields: tuple[str, str, int, float]) -> int:
+        title, creator, year, rating = fields
+        tokens = set()
+        for run in _runs(title) + _runs(creator):
+            if _is_cjk(run):
+                tokens.update(run)
+                tokens.update(run[i:i + 2] for i in range(len(run) - 1))
+            else:
+                tokens.add(run)
+                tokens.update(run[:k] for k in range(1, min(len(run), self.PREFIX_LEN) + 1))
+        postings = self._postings
+        for token in tokens:
+            posting = postings.get(token)
+            if posting is None:
+                postings[token] = array('l', (docid,))
+            else:
+                posting.append(docid)
+        self._bucket(self._years, year).append(docid)
+        self._bucket(self._ratings, self._rating_key(rating)).append(docid)
+        added = len(tokens) + 2
+        self._live_entries += added
+        return added
+
+    @staticmethod
+    def _bucket(buckets: dict[int, array], key: int) -> array:
+        bucket = buckets.get(key)
+        if bucket is None:
+            bucket = buckets[key] = array('l')
+        return bucket
+
+    @staticmethod
+    def _rating_key(rating: float) -> int:
+        return int(round(rating * 10))
+
+    def _refresh_rows(self):
+        if not self._rows_dirty:
+            return
+        doc_rows = array('l', (-1,)) * self._next_doc
+        for row, docid in enumerate(self._row_docids):
+            doc_rows[docid] = row
+        self._doc_rows = doc_rows
+        self._rows_dirty = False
+
+    # --- 查询 ---
+
+    @staticmethod
+    def parse_query(text: str) -> dict:
+        """
+        解析搜索框文本：普通词语匹配标题和导演/作者，
+        year:1990-1999、rating:8-、rating:-5 之类的词语表示闭区间过滤。
+        """
+        criteria = {'text': []}
+        for word in text.split():
+            match = _RANGE.match(word.casefold())
+            if match is None:
+                criteria['text'].append(word)
+                continue
+            field, low, dash, high = match.groups()
+            convert = int if field == 'year' else float
+            try:
+                low = convert(low) if low else None
+                high = convert(high) if high else None
+            except ValueError:
+                criteria['text'].append(word)
+                continue
+            if not dash:
+                high = low
+            criteria[f'min_{field}'] = low
+            criteria[f'max_{field}'] = high
+        criteria['text'] = ' '.join(criteria['text'])
+        return criteria
+
+    def search(self, text: str = '', min_year: int = None, max_year: int = None,
+               min_rating: float = None, max_rating: float = None) -> list[int] | None:
+        """
+        返回按行号升序排列的匹配行；没有任何条件时返回 None，表示不过滤。
+        """
+        terms = _runs(text)
+        has_range = any(v is not None for v in (min_year, max_year, min_rating, max_rating))
+        if not terms and not has_range:
+            return None
+        if self._garbage > self._live_entries * self.GARBAGE_RATIO:
+            self.reset(self._items)
+        self.ensure_built()
+        self._refresh_rows()
+
+        candidates = self._candidates(terms, min_year, max_year, min_rating, max_rating)
+        if candidates is None:
+            return []
+        doc_rows, fields = self._doc_rows, self._fields
+        rows = set()
+        for docid in candidates:
+            row = doc_rows[docid]
+            if row < 0 or row in rows:
+                continue
+            title, creator, year, rating = fields(row)
+            if ((min_year is not None and year < min_year)
+                    or (max_year is not None and year > max_year)
+                    or (min_rating is not None and rating < min_rating)
+                    or (max_rating is not None and rating > max_rating)):
+                continue
+            if terms and not self.match_text(title, creator, terms):
+                continue
+            rows.add(row)
+        return sorted(rows)
+
+    def _candidates(self, terms, min_year, max_year, min_rating, max_rating):
+        """选出最短的倒排表作为候选；某个词语完全不在索引中时返回 None"""
+        best = None
+        for term in terms:
+            if _is_cjk(term):
+                keys = [term] if len(term) == 1 else [term[i:i + 2] for i in range(len(term) - 1)]
+            else:
+                keys = [term if len(term) <= self.PREFIX_LEN else term[:self.PREFIX_LEN]]
+            for key in keys:
+                posting = self._postings.get(key)
+                if posting is None:
+                    return None
+                if best is None or len(posting) < len(best):
+                    best = posting
+        if best is not None:
+            return best
+        # 只有区间条件：合并区间内的各个分桶
+        if min_year is not None or max_year is not None:
+            return self._range_union(self._years, min_year, max_year)
+        low = None if min_rating is None else self._rating_key(min_rating)
+        high = None if max_rating is None else self._rating_key(max_rating)
+        return self._range_union(self._ratings, low, high)
+
+    @staticmethod
+    def _range_union(buckets: dict[int, array], low, high) -> array:
+        result = array('l')
+        for key, bucket in buckets.items():
+            if (low is None or key >= low) and (high is None or key <= high):
+                result.extend(bucket)
+        return result
+
+    @staticmethod
+    def terms(text: str) -> list[str]:
+        """把搜索文本切分成 search() 匹配时使用的词语"""
+        return _runs(text)
+
+    @staticmethod
+    def match_text(title: str, creator: str, terms: list[str]) -> bool:
+        """标题或导演/作者是否包含全部词语：中日韩文字按子串，其余按单词前缀"""
+        words = None
+        folded_title, folded_creator = title.casefold(), creator.casefold()
+        for term in terms:
+            if _is_cjk(term):
+                if term not in folded_title and term not in folded_creator:
+                    return False
+                continue
+            if words is None:
+                words = [run for run in _runs(title) + _runs(creator) if not _is_cjk(run)]
+            if not any(word.startswith(term) for word in words):
+                return False
+        return True
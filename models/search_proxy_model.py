@@ -0,0 +1,305 @@
+from bisect import bisect_left, bisect_right
+from typing import TYPE_CHECKING, Callable
+from PySide6.QtCore import QAbstractProxyModel, QModelIndex, Qt
+
+if TYPE_CHECKING:
+    import numpy as np
+
+
+class SearchProxyModel(QAbstractProxyModel):
+    """
+    按搜索条件过滤并排序的代理模型。
+    匹配的行由 search 回调（通常是 LibraryController.search）通过索引给出，
+    排列顺序由 sort 回调（通常是 LibraryController.sort_order）整体计算，
+    代理本身不逐行比较，因此每次按键或点击表头的开销与逐行过滤无关。
+
+    点击表头时被点击的列成为主键，之前的排序列依次作为次要键。
+    """
+    # 最多保留的排序键数
+    MAX_SORT_KEYS = 3
+
+    def __init__(self, search: Callable[..., list[int] | None],
+                 sort: Callable[[list[tuple[str, bool]], list[int] | None], 'np.ndarray'] = None,
+                 parent=None):
+        super().__init__(parent)
+        self._search = search
+        self._sort = sort
+        self._criteria: dict = {}
+        self._sort_keys: list[tuple[str, bool]] = []
+        # 显示顺序下的源模型行号；None 表示既不过滤也不排序
+        self._rows: 'list[int] | np.ndarray | None' = None
+        # 排序时源模型行号 -> 代理行号，按需建立
+        self._positions: 'np.ndarray | None' = None
+        self._filtered = False
+        # 源模型的行变化期间（layoutAboutToBeChanged 之后）保存的持久索引和它们的源模型行号
+        self._layout_indexes = None
+        self._layout_sources: list[int] | None = None
+        # 布局变化结束时需要重新查询
+        self._stale = False
+        # 源模型的 batch 期间布局变化推迟到 batch 结束
+        self._batching = False
+
+    def setSourceModel(self, source):
+        old = self.sourceModel()
+        if old is not None:
+            for signal, slot in self._source_connections(old):
+                signal.disconnect(slot)
+        self.beginResetModel()
+        super().setSourceModel(source)
+        for signal, slot in self._source_connections(source):
+            signal.connect(slot)
+        self.endResetModel()
+
+    def _source_connections(self, source):
+        connections = [
+            (source.modelAboutToBeReset, self._on_source_about_to_be_reset),
+            (source.modelReset, self._on_source_reset),
+            (source.rowsAboutToBeInserted, self._on_rows_about_to_be_inserted),
+            (source.rowsInserted, self._on_rows_inserted),
+            (source.rowsAboutToBeRemoved, self._on_rows_about_to_be_removed),
+            (source.rowsRemoved, self._on_rows_removed),
+            (source.dataChanged, self._on_source_data_changed),
+        ]
+        if hasattr(source, 'batch_started'):
+            connections += [(source.batch_started, self._on_batch_started),
+                            (source.batch_finished, self._on_batch_finished)]
+        return connections
+
+    def set_criteria(self, **criteria):
+        """criteria 原样传给 search 回调"""
+        self._criteria = criteria
+        self.refresh()
+
+    def set_sort_keys(self, keys: list[tuple[str, bool]]):
+        """keys 为 [(字段名, 是否升序), ...]，空列表表示按源模型顺序显示"""
+        self._sort_keys = list(keys)[:self.MAX_SORT_KEYS]
+        self.refresh()
+
+    @property
+    def sort_keys(self) -> list[tuple[str, bool]]:
+        return list(self._sort_keys)
+
+    def restore_sort(self, keys: list[tuple[str, bool]], rows):
+        """
+        设置排序键并直接使用已知的显示顺序（例如会话缓存中保存的），不调用 sort 回调；
+        rows 为 None、长度与源模型不符或正在过滤时按普通方式排序。
+        """
+        if rows is None or self._criteria or self.sourceModel() is None \
+                or len(rows) != self.sourceModel().rowCount():
+            self.set_sort_keys(keys)
+            return
+        self._end_layout()
+        self.beginResetModel()
+        self._sort_keys = list(keys)[:self.MAX_SORT_KEYS]
+        self._filtered = False
+        self._rows = rows
+        self._positions = None
+        self.endResetModel()
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        if column < 0:
+            self.set_sort_keys([])
+            return
+        field = self.sourceModel().FIELDS[column]
+        keys = [(field, order == Qt.AscendingOrder)]
+        keys += [key for key in self._sort_keys if key[0] != field]
+        self.set_sort_keys(keys)
+
+    def refresh(self, *args):
+        """重新查询并重置代理"""
+        self._end_layout()
+        self.beginResetModel()
+        self._query()
+        self.endResetModel()
+
+    def _query(self):
+        rows = self._search(**self._criteria) if self._criteria else None
+        self._filtered = rows is not None
+        if self._sort_keys and self._sort is not None:
+            rows = self._sort(self._sort_keys, rows)
+        self._rows = rows
+        self._positions = None
+        self._stale = False
+
+    @property
+    def is_filtering(self) -> bool:
+        return self._filtered
+
+    def source_rows(self):
+        """显示顺序下的源模型行号；既不过滤也不排序时返回 None"""
+        return self._rows
+
+    @property
+    def is_sorted(self) -> bool:
+        return bool(self._sort_keys) and self._sort is not None
+
+    # 未过滤也未排序时逐一转发源模型的行变化。
+    # 否则把它们合并成一次布局变化（源模型的 batch 期间的全部变化也只算一次）：
+    # 删除的行直接从显示顺序中去掉，其余行号随之平移；
+    # 插入和编辑可能影响匹配结果或顺序，布局变化结束时重新查询。
+    # 持久索引（视图的选择和当前行）按源模型行号重新定位，滚动位置不变。
+
+    def _on_source_about_to_be_reset(self):
+        self._end_layout()
+        self.beginResetModel()
+
+    def _on_source_reset(self):
+        self._query()
+        self.endResetModel()
+
+    def _on_rows_about_to_be_inserted(self, parent, first, last):
+        if self._rows is None:
+            self.beginInsertRows(QModelIndex(), first, last)
+
+    def _on_rows_inserted(self, parent, first, last):
+        if self._rows is None:
+            self.endInsertRows()
+            return
+        self._begin_layout()
+        count = last - first + 1
+        if self.is_sorted:
+            import numpy as np
+            rows = np.array(self._rows, np.int64)
+            rows[rows >= first] += count
+        else:
+            # 只过滤时 _rows 是升序的列表
+            pos = bisect_left(self._rows, first)
+            rows = self._rows[:pos] + [row + count for row in self._rows[pos:]]
+        self._rows, self._positions = rows, None
+        self._layout_sources = [row + count if row >= first else row
+                                for row in self._layout_sources]
+        self._stale = True
+        self._maybe_end_layout()
+
+    def _on_rows_about_to_be_removed(self, parent, first, last):
+        if self._rows is None:
+            self.beginRemoveRows(QModelIndex(), first, last)
+
+    def _on_rows_removed(self, parent, first, last):
+        if self._rows is None:
+            self.endRemoveRows()
+            return
+        self._begin_layout()
+        count = last - first + 1
+        if self.is_sorted:
+            import numpy as np
+            rows = np.array(self._rows, np.int64)
+            rows = rows[(rows < first) | (rows > last)]
+            rows[rows > last] -= count
+        else:
+            lo, hi = bisect_left(self._rows, first), bisect_right(self._rows, last)
+            rows = self._rows[:lo] + [row - count for row in self._rows[hi:]]
+        self._rows, self._positions = rows, None
+        # 被删除的行记为 -1，布局变化结束时对应的持久索引失效
+        self._layout_sources = [-1 if first <= row <= last else row - count if row > last else row
+                                for row in self._layout_sources]
+        self._maybe_end_layout()
+
+    def _on_source_data_changed(self, top_left, bottom_right, roles=()):
+        if self._rows is None:
+            self.dataChanged.emit(self.mapFromSource(top_left),
+                                  self.mapFromSource(bottom_right), roles)
+            return
+        # 编辑可能改变匹配结果或顺序，布局变化结束时重新查询
+        if not roles or Qt.DisplayRole in roles:
+            self._begin_layout()
+            self._stale = True
+            self._maybe_end_layout()
+            return
+        if self._layout_sources is not None:
+            # 布局变化结束时视图会整体重绘
+            return
+        if top_left.row() == bottom_right.row():
+            index = self.mapFromSource(top_left)
+            if index.isValid():
+                self.dataChanged.emit(
+                    index, self.index(index.row(), bottom_right.column()), roles)
+        elif self.rowCount():
+            # 源模型中连续的一段行在代理中是分散的，让视图重绘可见部分即可
+            self.dataChanged.emit(
+                self.index(0, top_left.column()),
+                self.index(self.rowCount() - 1, bottom_right.column()), roles)
+
+    def _begin_layout(self):
+        if self._layout_sources is not None:
+            return
+        self.layoutAboutToBeChanged.emit()
+        # 先发出信号：选择模型在收到它时才把选择区域展开为持久索引
+        self._layout_indexes = self.persistentIndexList()
+        self._layout_sources = [int(self._rows[index.row()]) for index in self._layout_indexes]
+
+    def _maybe_end_layout(self):
+        if not self._batching:
+            self._end_layout()
+
+    def _on_batch_started(self):
+        self._batching = True
+
+    def _on_batch_finished(self):
+        self._batching = False
+        self._end_layout()
+
+    def _end_layout(self):
+        if self._layout_sources is None:
+            return
+        if self._stale:
+            self._query()
+        source = self.sourceModel()
+        indexes, sources = self._layout_indexes, self._layout_sources
+        self._layout_indexes = self._layout_sources = None
+        self.changePersistentIndexList(indexes, [
+            self.mapFromSource(source.index(row, index.column())) if row >= 0 else QModelIndex()
+            for index, row in zip(indexes, sources)])
+        self.layoutChanged.emit()
+
+    # --- Qt 代理模型接口 ---
+
+    def rowCount(self, parent=QModelIndex()) -> int:
+        if parent.isValid() or self.sourceModel() is None:
+            return 0
+        return self.sourceModel().rowCount() if self._rows is None else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()) -> int:
+        if parent.isValid() or self.sourceModel() is None:
+            return 0
+        return self.sourceModel().columnCount()
+
+    def index(self, row, column, parent=QModelIndex()):
+        if parent.isValid() or not (0 <= row < self.rowCount() and 0 <= column < self.columnCount()):
+            return QModelIndex()
+        return self.createIndex(row, column)
+
+    def parent(self, index=QModelIndex()):
+        return QModelIndex()
+
+    def mapToSource(self, proxy_index):
+        if not proxy_index.isValid() or self.sourceModel() is None:
+            return QModelIndex()
+        row = proxy_index.row() if self._rows is None else int(self._rows[proxy_index.row()])
+        return self.sourceModel().index(row, proxy_index.column())
+
+    def mapFromSource(self, source_index):
+        if not source_index.isValid():
+            return QModelIndex()
+        row = source_index.row()
+        if self.is_sorted:
+            if self._positions is None:
+                # 只有排序后才会走到这里，此时 sort 回调已经导入了 numpy
+                import numpy as np
+                self._positions = np.full(self.sourceModel().rowCount(), -1, np.int64)
+                self._positions[self._rows] = np.arange(len(self._rows))
+            row = int(self._positions[row]) if row < len(self._positions) else -1
+            if row < 0:
+                return QModelIndex()
+        elif self._rows is not None:
+            pos = bisect_left(self._rows, row)
+            if pos == len(self._rows) or self._rows[pos] != row:
+                return QModelIndex()
+            row = pos
+        return self.index(row, source_index.column())
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation == Qt.Vertical and role == Qt.DisplayRole and self._rows is not None:
+            # 行号显示源模型中的行号
+            return str(int(self._rows[section]) + 1) if 0 <= section < len(self._rows) else None
+        return self.sourceModel().headerData(section, orientation, role)
@@ -0,0 +1,319 @@
+"""
+二进制快照格式（.mlib），用于快速打开非常大的媒体库。
+
+文件布局（小端序）：
+    头部        magic 'MLIB'、版本、条目数，以及各段的起始偏移
+    rating      float64 × n
+    title 等    每个字符串字段一列 uint64 × n，指向字符串表中的条目
+    year        int32 × n
+    字符串表    每个条目为 uint32 字节长度 + UTF-8 字节；相同的字符串只保存一次
+
+打开时只做 mmap 并读取头部，条目在第一次访问时才从映射中解码。
+与 JSON 格式可以无损互相转换：
+    python -m repository.binary_repository library.json library.mlib
+    python -m repository.binary_repository library.mlib library.json
+"""
+import mmap
+import os
+import struct
+import sys
+import tempfile
+from array import array
+from collections.abc import MutableSequence
+from typing import Callable, Iterator
+from models.media_model import MediaItem
+from repository.json_repository import JSONRepository
+from services.instrumentation import timed
+
+MAGIC = b'MLIB'
+VERSION = 1
+STRING_FIELDS = ('title', 'creator', 'poster_url', 'plot')
+# magic, 版本, 保留, 条目数, rating/title/creator/poster_url/plot/year/字符串表偏移, 字符串表长度
+_HEADER = struct.Struct('<4sHHQ8Q')
+_LENGTH = struct.Struct('<I')
+
+
+def _little_endian(column: array) -> array:
+    if sys.byteorder != 'little':
+        column = array(column.typecode, column)
+        column.byteswap()
+    return column
+
+
+def write_snapshot(items, file_path: str):
+    """写入同目录下的临时文件并落盘后原子替换目标文件"""
+    ratings, years = array('d'), array('i')
+    offsets = {field: array('Q') for field in STRING_FIELDS}
+    strings = bytearray()
+    seen: dict[str, int] = {}
+    for item in items:
+        ratings.append(item.rating)
+        years.append(item.year)
+        for field in STRING_FIELDS:
+            value = getattr(item, field)
+            offset = seen.get(value)
+            if offset is None:
+                offset = seen[value] = len(strings)
+                data = value.encode('utf-8')
+                strings += _LENGTH.pack(len(data))
+                strings += data
+            offsets[field].append(offset)
+    count = len(ratings)
+
+    # 各段按 8 字节对齐排列，year 放在最后一个定长段，之后的字符串表不需要对齐
+    position = _HEADER.size
+    starts = []
+    for size in [8 * count] * (1 + len(STRING_FIELDS)) + [4 * count]:
+        starts.append(position)
+        position += size
+    header = _HEADER.pack(MAGIC, VERSION, 0, count, *starts, position, len(strings))
+
+    directory = os.path.dirname(os.path.abspath(file_path))
+    fd, tmp_path = tempfile.mkstemp(prefix='.library-', suffix='.tmp', dir=directory)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(header)
+            f.write(_little_endian(ratings))
+            for field in STRING_FIELDS:
+                f.write(_little_endian(offsets[field]))
+            f.write(_little_endian(years))
+            f.write(strings)
+            f.flush()
+            os.fsync(f.fileno())
+        mode = os.stat(file_path).st_mode if os.path.exists(file_path) else 0o644
+        os.chmod(tmp_path, mode & 0o777)
+        os.replace(tmp_path, file_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+class _Snapshot:
+    """只读映射的快照文件，按行号解码条目"""
+    def __init__(self, file_path: str):
+        self.path = file_path
+        with open(file_path, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            if size < _HEADER.size:
+                raise ValueError(f'{file_path} is not a media library snapshot')
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            magic, version, _, count, *starts, strings_size = _HEADER.unpack_from(self._map)
+            if magic != MAGIC:
+                raise ValueError(f'{file_path} is not a media library snapshot')
+            if version != VERSION:
+                raise ValueError(f'unsupported snapshot version {version}')
+            if starts[-1] + strings_size > size:
+                raise ValueError(f'{file_path} is truncated')
+            self.count = count
+            view = memoryview(self._map)
+            self._strings_start = starts[-1]
+            self._ratings = self._column(view, starts[0], 'd', count)
+            self._offsets = [self._column(view, start, 'Q', count)
+                             for start in starts[1:1 + len(STRING_FIELDS)]]
+            self._years = self._column(view, starts[1 + len(STRING_FIELDS)], 'i', count)
+        except BaseException:
+            self.close()
+            raise
+
+    @staticmethod
+    def _column(view: memoryview, start: int, typecode: str, count: int):
+        column = view[start:start + count * struct.calcsize(typecode)].cast(typecode)
+        if sys.byteorder == 'little':
+            return column
+        # 大端机器上无法直接引用映射，复制一份再交换字节序
+        copy = array(typecode, column)
+        copy.byteswap()
+        column.release()
+        return copy
+
+    def item(self, row: int) -> MediaItem:
+        data, base, unpack = self._map, self._strings_start, _LENGTH.unpack_from
+        title, creator, poster_url, plot = [
+            str(data[start + 4:start + 4 + unpack(data, start)[0]], 'utf-8')
+            for start in [base + offsets[row] for offsets in self._offsets]]
+        return MediaItem(title, creator, self._years[row], self._ratings[row], poster_url, plot)
+
+    def search_fields(self, row: int) -> tuple[str, str, int, float]:
+        """只解码搜索索引用到的标题、导演/作者、年份和评分"""
+        data, base, unpack = self._map, self._strings_start, _LENGTH.unpack_from
+        title, creator = [
+            str(data[start + 4:start + 4 + unpack(data, start)[0]], 'utf-8')
+            for start in (base + self._offsets[0][row], base + self._offsets[1][row])]
+        return title, creator, self._years[row], self._ratings[row]
+
+    def close(self):
+        for name in ('_ratings', '_years'):
+            column = getattr(self, name, None)
+            if isinstance(column, memoryview):
+                column.release()
+        for column in getattr(self, '_offsets', []):
+            if isinstance(column, memoryview):
+                column.release()
+        self._offsets = []
+        if not self._map.closed:
+            self._map.close()
+
+
+class SnapshotItems(MutableSequence):
+    """
+    以快照为后备的条目序列，可以代替 list[MediaItem] 交给控制层和模型。
+    后备对象提供 count、path、item(行号) 和 close()，SQLiteRepository 用它按页读取数据库。
+    未访问过的位置在第一次访问时才解码成 MediaItem，之后同一位置总是返回同一个对象；
+    插入、删除和赋值与 list 的语义相同。所有条目都解码后释放映射。
+    """
+    def __init__(self, snapshot: _Snapshot):
+        self._snapshot = snapshot
+        # 已解码的条目，None 表示尚未访问
+        self._items: list[MediaItem | None] = [None] * snapshot.count
+        # 各位置对应的快照行号；快照范围内发生插入或删除之前与位置相同，不单独保存
+        self._rows: array | None = None
+        self._pending = snapshot.count
+
+    @property
+    def path(self) -> str:
+        return self._snapshot.path
+
+    @property
+    def pending(self) -> int:
+        """尚未解码的条目数"""
+        return self._pending
+
+    def _resolve(self, index: int) -> MediaItem:
+        item = self._items[index]
+        if item is None:
+            row = index if self._rows is None else self._rows[index]
+            item = self._items[index] = self._snapshot.item(row)
+            self._pending -= 1
+            self._detach()
+        return item
+
+    def search_fields(self, index: int) -> tuple[str, str, int, float]:
+        """
+        (标题, 导演/作者, 年份, 评分)，供 SearchIndex 使用；
+        后备对象也提供 search_fields 时，尚未解码的位置直接从快照读取而不解码整个条目。
+        """
+        item = self._items[index]
+        if item is None:
+            read = getattr(self._snapshot, 'search_fields', None)
+            if read is not None:
+                return read(index if self._rows is None else self._rows[index])
+            item = self._resolve(index)
+        return item.title, item.creator, item.year, item.rating
+
+    def _before_shift(self, start: int):
+        # start 之后的位置将要移动，先记下它们对应的快照行号
+        if self._rows is None and self._pending and start < len(self._items):
+            self._rows = array('q', range(len(self._items)))
+
+    def _detach(self):
+        if not self._pending:
+            self._snapshot.close()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self._resolve(i) for i in range(*index.indices(len(self._items)))]
+        item = self._items[index]
+        if item is None:
+            item = self._resolve(index % len(self._items))
+        return item
+
+    def __iter__(self):
+        items = self._items
+        for index in range(len(items)):
+            item = items[index]
+            yield item if item is not None else self._resolve(index)
+
+    def __setitem__(self, index, value):
+        if not isinstance(index, slice):
+            if self._items[index] is None:
+                self._pending -= 1
+            self._items[index] = value
+            self._detach()
+            return
+        values = list(value)
+        self._before_shift(index.indices(len(self._items))[0])
+        self._pending -= self._items[index].count(None)
+        self._items[index] = values
+        if self._rows is not None:
+            self._rows[index] = array('q', [-1]) * len(values)
+        self._detach()
+
+    def __delitem__(self, index):
+        if isinstance(index, slice):
+            start = index.indices(len(self._items))[0]
+            removed = self._items[index].count(None)
+        else:
+            removed = self._items[index] is None
+            start = index % len(self._items)
+        self._before_shift(start)
+        del self._items[index]
+        if self._rows is not None:
+            del self._rows[index]
+        self._pending -= removed
+        self._detach()
+
+    def insert(self, index: int, value: MediaItem):
+        index = min(max(index + len(self._items) if index < 0 else index, 0), len(self._items))
+        self._before_shift(index)
+        self._items.insert(index, value)
+        if self._rows is not None:
+            self._rows.insert(index, -1)
+
+    def materialize(self):
+        """解码所有尚未访问的条目并释放映射"""
+        for index, item in enumerate(self._items):
+            if item is None:
+                self._resolve(index)
+
+    def __eq__(self, other):
+        return list(self) == list(other)
+
+
+class BinaryRepository(JSONRepository):
+    """
+    以二进制快照保存的媒体库仓库，接口与 JSONRepository 相同。
+    load() 返回按需解码的 SnapshotItems，控制层可以直接绑定而无需分块加载。
+    """
+    # 控制层据此直接绑定 load() 的结果，而不是通过 iter_load 分块读取
+    LAZY_LOAD = True
+
+    def _write_snapshot(self, items, file_path: str):
+        if isinstance(items, SnapshotItems) and os.path.exists(file_path) \
+                and os.path.samefile(items.path, file_path):
+            # 覆盖正在映射的文件前先把条目全部读出
+            items.materialize()
+        write_snapshot(items, file_path)
+
+    @timed('repository.load')
+    def load(self, path: str = None,
+             progress: Callable[[int, int], None] = None) -> SnapshotItems:
+        file_path = path or self._path
+        if not file_path:
+            raise ValueError("No path specified for loading library.")
+        items = SnapshotItems(_Snapshot(file_path))
+        if progress is not None:
+            total = os.path.getsize(file_path)
+            progress(total, total)
+        return items
+
+    def iter_load(self, path: str = None,
+                  progress: Callable[[int, int], None] = None) -> Iterator[MediaItem]:
+        yield from self.load(path, progress)
+
+
+def convert(src: str, dst: str):
+    """在 JSON 与 .mlib 之间转换，格式由扩展名决定"""
+    def repository(path):
+        return BinaryRepository(path) if path.lower().endswith('.mlib') else JSONRepository(path)
+    repository(dst).save(list(repository(src).iter_load()), dst)
+
+
+if __name__ == '__main__':
+    if len(sys.argv) != 3:
+        sys.exit('usage: python -m repository.binary_repository <source> <destination>')
+    convert(sys.argv[1], sys.argv[2])
@@ -0,0 +1,145 @@
+import json
+import os
+from typing import Callable, Iterator
+from models.media_model import MediaItem
+from repository.json_repository import JSONRepository
+from services.instrumentation import timed
+
+class JournaledJSONRepository(JSONRepository):
+    """
+    带追加日志的 JSON 仓库。
+    快照文件格式与 JSONRepository 完全相同；两次保存之间的增删改记录在
+    旁路日志 <path>.journal 中，保存时只追加这些小记录，日志过长时再压缩回快照。
+    日志首行记录其所依附快照的大小和修改时间，快照被替换后旧日志自动失效。
+    """
+    JOURNAL_SUFFIX = '.journal'
+    # 日志记录数达到该值时，下一次保存改为重写快照
+    COMPACT_RECORDS = 10_000
+    # 待追加的日志记录由 GUI 线程中的单条修改接口写入，保存必须在同一线程
+    BACKGROUND_SAVE = False
+
+    def __init__(self, path: str = ''):
+        super().__init__(path)
+        # 日志与快照组合后与内存中数据一致的文件路径
+        self._synced_path = None
+        self._journal_records = 0
+        self._pending: list[dict] = []
+
+    @classmethod
+    def journal_path(cls, path: str) -> str:
+        return path + cls.JOURNAL_SUFFIX
+
+    # --- 单条修改接口 ---
+
+    def insert(self, row: int, item: MediaItem):
+        self._pending.append({'op': 'insert', 'row': row, 'item': item.to_dict()})
+
+    def update(self, row: int, item: MediaItem):
+        self._pending.append({'op': 'update', 'row': row, 'item': item.to_dict()})
+
+    def delete(self, row: int, count: int = 1):
+        self._pending.append({'op': 'delete', 'row': row, 'count': count})
+
+    # --- 保存与加载 ---
+
+    @timed('repository.save')
+    def save(self, items: list[MediaItem], path: str = None):
+        file_path = path or self._path
+        if not file_path:
+            raise ValueError("No path specified for saving library.")
+        if (file_path == self._synced_path and os.path.exists(file_path)
+                and self._journal_records + len(self._pending) < self.COMPACT_RECORDS):
+            try:
+                self._append_journal(file_path, self._pending)
+            except BaseException:
+                # 日志中可能已经有一部分记录，再次追加会重复；下一次保存改为重写快照
+                self._synced_path = None
+                raise
+        else:
+            self.compact(items, file_path)
+        self._pending = []
+
+    def compact(self, items: list[MediaItem], path: str = None):
+        """把当前数据完整写入快照并删除日志"""
+        file_path = path or self._path
+        self._write_snapshot(items, file_path)
+        journal = self.journal_path(file_path)
+        if os.path.exists(journal):
+            os.remove(journal)
+        self._path = self._synced_path = file_path
+        self._journal_records = 0
+        self._pending = []
+
+    def iter_load(self, path: str = None,
+                  progress: Callable[[int, int], None] = None) -> Iterator[MediaItem]:
+        file_path = path or self._path
+        if not file_path:
+            raise ValueError("No path specified for loading library.")
+        records, clean = self._read_journal(file_path)
+        self._path = file_path
+        # 日志过期或损坏时不能继续向其追加，下一次保存改为重写快照
+        self._synced_path = file_path if clean else None
+        self._journal_records = len(records)
+        self._pending = []
+        if not records:
+            yield from super().iter_load(file_path, progress)
+            return
+        items = list(super().iter_load(file_path, progress))
+        _replay(items, records)
+        yield from items
+
+    # --- 日志读写 ---
+
+    @staticmethod
+    def _snapshot_stamp(file_path: str) -> list[int]:
+        st = os.stat(file_path)
+        return [st.st_size, st.st_mtime_ns]
+
+    def _append_journal(self, file_path: str, records: list[dict]):
+        if not records:
+            return
+        journal = self.journal_path(file_path)
+        lines = []
+        if not os.path.exists(journal):
+            lines.append(json.dumps({'snapshot': self._snapshot_stamp(file_path)}))
+        lines.extend(json.dumps(r, ensure_ascii=False) for r in records)
+        with open(journal, 'a', encoding='utf-8') as f:
+            f.write('\n'.join(lines) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+        self._journal_records += len(records)
+
+    def _read_journal(self, file_path: str) -> tuple[list[dict], bool]:
+        """返回 (可重放的记录, 日志是否完好)"""
+        journal = self.journal_path(file_path)
+        if not os.path.exists(journal):
+            return [], True
+        with open(journal, 'r', encoding='utf-8') as f:
+            lines = f.read().split('\n')
+        try:
+            header = json.loads(lines[0])
+        except ValueError:
+            return [], False
+        if header.get('snapshot') != self._snapshot_stamp(file_path):
+            return [], False
+        records = []
+        for line in lines[1:]:
+            if not line:
+                continue
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                # 写到一半时崩溃留下的残缺记录，之后的内容都不可信
+                return records, False
+        return records, True
+
+
+def _replay(items: list[MediaItem], records: list[dict]):
+    for record in records:
+        op, row = record['op'], record['row']
+        if op == 'insert':
+            items.insert(row, MediaItem.from_dict(record['item']))
+        elif op == 'update':
+            items[row] = MediaItem.from_dict(record['item'])
+        elif op == 'delete':
+            del items[row:row + record.get('count', 1)]
@@ -1,22 +1,132 @@
+import codecs
 import json
+import os
+import tempfile
+from typing import Callable, Iterable, Iterator, TextIO
 from models.media_model import MediaItem
+from services.instrumentation import timed
+
+
+def write_json_items(items: Iterable[MediaItem], f: TextIO):
+    """
+    逐项写出 JSON 数组，输出与 json.dump(data, f, ensure_ascii=False, indent=2) 相同，
+    但不需要先把全部条目转换成字典列表。
+    """
+    first = True
+    for item in items:
+        f.write('[\n  ' if first else ',\n  ')
+        # 字符串中的换行会被转义，因此文本中的换行都来自缩进
+        f.write(json.dumps(item.to_dict(), ensure_ascii=False, indent=2).replace('\n', '\n  '))
+        first = False
+    f.write('[]' if first else '\n]')
+
 
 class JSONRepository:
+    # 流式读取时每次从文件读取的字节数
+    READ_CHUNK_SIZE = 1 << 20
+    # 为 True 时 load() 返回按需解码的序列，控制层直接绑定而不分块读取
+    LAZY_LOAD = False
+    # save() 只依赖传入的条目和路径，可以在后台线程中调用（见 services.library_saver）
+    BACKGROUND_SAVE = True
+
     def __init__(self, path: str = ''):
         self._path = path
 
+    @timed('repository.save')
     def save(self, items: list[MediaItem], path: str = None):
         file_path = path or self._path
         if not file_path:
             raise ValueError("No path specified for saving library.")
-        data = [item.to_dict() for item in items]
-        with open(file_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+        self._write_snapshot(items, file_path)
+
+    def _write_snapshot(self, items: list[MediaItem], file_path: str):
+        """先写入同目录下的临时文件并落盘，再原子替换目标文件，中途崩溃不会损坏原文件"""
+        directory = os.path.dirname(os.path.abspath(file_path))
+        fd, tmp_path = tempfile.mkstemp(prefix='.library-', suffix='.tmp', dir=directory)
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                write_json_items(items, f)
+                f.flush()
+                os.fsync(f.fileno())
+            # mkstemp 创建的文件权限为 0600，沿用原文件的权限
+            mode = os.stat(file_path).st_mode if os.path.exists(file_path) else 0o644
+            os.chmod(tmp_path, mode & 0o777)
+            os.replace(tmp_path, file_path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    # --- 单条修改接口 ---
+    # JSONRepository 每次保存都完整重写文件，因此无需记录单条修改；
+    # 支持增量保存的仓库（如 JournaledJSONRepository）会重写这些方法。
+
+    def insert(self, row: int, item: MediaItem):
+        pass
 
+    def update(self, row: int, item: MediaItem):
+        pass
+
+    def delete(self, row: int, count: int = 1):
+        pass
+
+    @timed('repository.load')
     def load(self, path: str = None) -> list[MediaItem]:
+        return list(self.iter_load(path))
+
+    def iter_load(self, path: str = None,
+                  progress: Callable[[int, int], None] = None) -> Iterator[MediaItem]:
+        """
+        逐个解析顶层数组中的元素并生成 MediaItem，内存中只保留当前读取块。
+        :param progress: 可选回调 progress(已读字节数, 文件总字节数)，每读一块调用一次。
+        """
+        # 生成器而不是 map：分块加载被新的加载取代时调用方会 close() 它，连带关闭文件
+        for record in self.iter_records(path, progress):
+            yield MediaItem.from_dict(record)
+
+    def iter_records(self, path: str = None,
+                     progress: Callable[[int, int], None] = None) -> Iterator:
+        """与 iter_load 相同，但生成未经转换的 JSON 值，供校验等需要原始数据的场合使用"""
         file_path = path or self._path
         if not file_path:
             raise ValueError("No path specified for loading library.")
-        with open(file_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        return [MediaItem.from_dict(d) for d in data]
\ No newline at end of file
+        total = os.path.getsize(file_path)
+        decoder = json.JSONDecoder()
+        text_decoder = codecs.getincrementaldecoder('utf-8')()
+        buf, pos, bytes_read = '', 0, 0
+        started = eof = False
+
+        with open(file_path, 'rb') as f:
+            while True:
+                # 跳过空白和元素间的逗号
+                while pos < len(buf) and (buf[pos].isspace() or (started and buf[pos] == ',')):
+                    pos += 1
+                if pos < len(buf):
+                    if not started:
+                        if buf[pos] != '[':
+                            raise json.JSONDecodeError("Expecting '['", buf, pos)
+                        started = True
+                        pos += 1
+                        continue
+                    if buf[pos] == ']':
+                        return
+                    try:
+                        data, end = decoder.raw_decode(buf, pos)
+                    except json.JSONDecodeError:
+                        # 元素跨越了读取块的边界，继续读取后重试
+                        if eof:
+                            raise
+                    else:
+                        pos = end
+                        yield data
+                        continue
+                elif eof:
+                    raise json.JSONDecodeError("Unexpected end of file", buf, pos)
+
+                chunk = f.read(self.READ_CHUNK_SIZE)
+                bytes_read += len(chunk)
+                eof = not chunk
+                buf = buf[pos:] + text_decoder.decode(chunk, final=eof)
+                pos = 0
+                if progress is not None and chunk:
+                    progress(bytes_read, total)
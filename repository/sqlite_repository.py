@@ -0,0 +1,364 @@
+import os
+import sqlite3
+import sys
+from array import array
+from typing import Callable, Iterator
+from urllib.request import pathname2url
+from models.media_model import MediaItem
+from models.search_index import SearchIndex
+from repository.binary_repository import SnapshotItems
+from repository.json_repository import JSONRepository
+from services.instrumentation import timed
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS media (
+    id INTEGER PRIMARY KEY,
+    pos REAL NOT NULL,
+    title TEXT NOT NULL DEFAULT '',
+    creator TEXT NOT NULL DEFAULT '',
+    year INTEGER NOT NULL DEFAULT 0,
+    rating REAL NOT NULL DEFAULT 0,
+    poster_url TEXT NOT NULL DEFAULT '',
+    plot TEXT NOT NULL DEFAULT ''
+);
+CREATE INDEX IF NOT EXISTS media_pos ON media(pos);
+CREATE INDEX IF NOT EXISTS media_title ON media(title);
+CREATE INDEX IF NOT EXISTS media_creator ON media(creator);
+CREATE INDEX IF NOT EXISTS media_year ON media(year);
+CREATE INDEX IF NOT EXISTS media_rating ON media(rating);
+"""
+
+_COLUMNS = 'title, creator, year, rating, poster_url, plot'
+
+
+def _row_values(item: MediaItem) -> tuple:
+    return (item.title, item.creator, item.year, item.rating, item.poster_url, item.plot)
+
+
+def _to_item(row) -> MediaItem:
+    return MediaItem(*row)
+
+
+def _select_ids(conn: sqlite3.Connection, ids) -> dict[int, MediaItem]:
+    """{主键: MediaItem}，不存在的主键不出现在结果中"""
+    placeholders = ','.join('?' * len(ids))
+    rows = conn.execute(
+        f'SELECT id, {_COLUMNS} FROM media WHERE id IN ({placeholders})', tuple(ids))
+    return {r[0]: _to_item(r[1:]) for r in rows}
+
+
+class _PagedRows:
+    """
+    SnapshotItems 的后备对象：按加载时的行顺序分页读取数据库，每页 PAGE_SIZE 行。
+    使用自己的只读连接，仓库重新打开或关闭连接后仍然可用；
+    还没有被读取的行不会被修改（修改前控制层总会先读取条目），读到的总是加载时的内容。
+    """
+    PAGE_SIZE = 500
+
+    def __init__(self, path: str, ids: array):
+        self.path = path
+        self.count = len(ids)
+        self._ids = ids
+        self._conn = sqlite3.connect(
+            f'file:{pathname2url(os.path.abspath(path))}?mode=ro', uri=True)
+        # 最近读取的一页中尚未取走的条目：行号 -> MediaItem
+        self._page: dict[int, MediaItem] = {}
+        # 已经查询过的页数
+        self.pages_read = 0
+
+    def item(self, row: int) -> MediaItem:
+        item = self._page.pop(row, None)
+        if item is None:
+            start = row - row % self.PAGE_SIZE
+            ids = self._ids[start:start + self.PAGE_SIZE]
+            by_id = _select_ids(self._conn, ids)
+            self.pages_read += 1
+            self._page = {start + offset: by_id[i] for offset, i in enumerate(ids) if i in by_id}
+            item = self._page.pop(row)
+        return item
+
+    def close(self):
+        """所有行都已读取时由 SnapshotItems 调用"""
+        self._page = {}
+        self._conn.close()
+
+
+class SQLiteRepository:
+    """
+    基于 SQLite 的媒体库仓库，save/load 接口与 JSONRepository 相同。
+    load() 返回按需分页读取的 SnapshotItems，控制层直接绑定，打开时不读取任何条目；
+    加载后连接保持打开，控制层的单条增删改直接写入数据库，
+    保存到同一文件时只需提交事务；title、creator、year、rating 均建有索引。
+    行号到主键的映射保存在一个 array('q') 中，行顺序由 pos 列决定。
+    """
+    # 流式读取时每批取出的行数
+    FETCH_SIZE = 10_000
+    # 控制层据此直接绑定 load() 的结果，而不是通过 iter_load 分块读取
+    LAZY_LOAD = True
+    # 连接属于 GUI 线程，保存到同一文件时也只是提交事务，不需要后台保存
+    BACKGROUND_SAVE = False
+
+    def __init__(self, path: str = ''):
+        self._path = path
+        self._conn: sqlite3.Connection | None = None
+        self._ids = array('q')
+        # 主键 -> 行号，search_rows 第一次用到时建立，增删行后失效
+        self._id_rows: dict[int, int] | None = None
+        # 最近一次 load() 返回的序列的后备对象
+        self._rows: _PagedRows | None = None
+
+    # --- 连接管理 ---
+
+    @staticmethod
+    def _connect(path: str) -> sqlite3.Connection:
+        conn = sqlite3.connect(path)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.executescript(_SCHEMA)
+        conn.create_function('casefold', 1, str.casefold, deterministic=True)
+        return conn
+
+    def _open(self, path: str):
+        if self._conn is not None and path == self._path:
+            return
+        self.close()
+        self._conn = self._connect(path)
+        self._path = path
+        self._ids = array('q', (r[0] for r in self._conn.execute(
+            'SELECT id FROM media ORDER BY pos')))
+        self._id_rows = None
+
+    def close(self):
+        """关闭连接，未保存的修改随之回滚"""
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+        self._ids = array('q')
+        self._id_rows = None
+
+    # --- 保存与加载 ---
+
+    @timed('repository.save')
+    def save(self, items: list[MediaItem], path: str = None):
+        file_path = path or self._path
+        if not file_path:
+            raise ValueError("No path specified for saving library.")
+        if self._conn is not None and file_path == self._path:
+            # 单条修改已经写入当前连接，提交即可
+            self._conn.commit()
+            return
+        self.write_new(items, file_path)
+        self.close()
+        self._open(file_path)
+
+    def write_new(self, items, file_path: str):
+        """
+        把 items（可以是任意可迭代对象，逐条流式写入）写成一个新的数据库文件，
+        写入同目录下的临时数据库后原子替换目标文件；不打开也不改变仓库的当前连接。
+        """
+        tmp_path = file_path + '.tmp'
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        conn = sqlite3.connect(tmp_path)
+        try:
+            conn.execute('PRAGMA journal_mode=OFF')
+            conn.executescript(_SCHEMA)
+            conn.executemany(
+                f'INSERT INTO media (pos, {_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?)',
+                ((float(pos),) + _row_values(item) for pos, item in enumerate(items)))
+            conn.commit()
+        except BaseException:
+            conn.close()
+            os.remove(tmp_path)
+            raise
+        conn.close()
+        for suffix in ('-wal', '-shm'):
+            if os.path.exists(file_path + suffix):
+                os.remove(file_path + suffix)
+        os.replace(tmp_path, file_path)
+
+    @property
+    def pages_read(self) -> int:
+        """最近一次 load() 返回的序列已经从数据库读取的页数"""
+        return 0 if self._rows is None else self._rows.pages_read
+
+    @timed('repository.load')
+    def load(self, path: str = None,
+             progress: Callable[[int, int], None] = None) -> SnapshotItems:
+        """返回按需分页读取的条目序列；只读取行顺序，progress 在返回前调用一次"""
+        file_path = path or self._path
+        if not file_path:
+            raise ValueError("No path specified for loading library.")
+        if not os.path.exists(file_path):
+            raise FileNotFoundError(file_path)
+        # 重新打开连接，丢弃未保存的修改
+        self.close()
+        self._open(file_path)
+        self._rows = _PagedRows(file_path, array('q', self._ids))
+        items = SnapshotItems(self._rows)
+        if progress is not None:
+            progress(len(items), len(items))
+        return items
+
+    def iter_load(self, path: str = None,
+                  progress: Callable[[int, int], None] = None) -> Iterator[MediaItem]:
+        """按行顺序分批读取，progress(已读行数, 总行数)"""
+        file_path = path or self._path
+        if not file_path:
+            raise ValueError("No path specified for loading library.")
+        if not os.path.exists(file_path):
+            raise FileNotFoundError(file_path)
+        # 重新打开连接，丢弃未保存的修改
+        self.close()
+        self._open(file_path)
+        total = len(self._ids)
+        done = 0
+        cursor = self._conn.execute(f'SELECT {_COLUMNS} FROM media ORDER BY pos')
+        while True:
+            rows = cursor.fetchmany(self.FETCH_SIZE)
+            if not rows:
+                break
+            done += len(rows)
+            if progress is not None:
+                progress(done, total)
+            yield from map(_to_item, rows)
+
+    # --- 单条修改接口 ---
+
+    def insert(self, row: int, item: MediaItem):
+        if self._conn is None:
+            return
+        pos = self._position_for(row)
+        cursor = self._conn.execute(
+            f'INSERT INTO media (pos, {_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?)',
+            (pos,) + _row_values(item))
+        self._ids.insert(row, cursor.lastrowid)
+        self._id_rows = None
+
+    def update(self, row: int, item: MediaItem):
+        if self._conn is None:
+            return
+        self._conn.execute(
+            'UPDATE media SET title=?, creator=?, year=?, rating=?, poster_url=?, plot=? '
+            'WHERE id=?', _row_values(item) + (self._ids[row],))
+
+    def delete(self, row: int, count: int = 1):
+        if self._conn is None:
+            return
+        self._conn.executemany(
+            'DELETE FROM media WHERE id=?', ((i,) for i in self._ids[row:row + count]))
+        del self._ids[row:row + count]
+        self._id_rows = None
+
+    def _pos_of(self, row: int) -> float:
+        return self._conn.execute(
+            'SELECT pos FROM media WHERE id=?', (self._ids[row],)).fetchone()[0]
+
+    def _position_for(self, row: int) -> float:
+        """为插入到 row 处的新行计算 pos，相邻 pos 之间没有空隙时重新编号"""
+        if not self._ids:
+            return 0.0
+        if row >= len(self._ids):
+            return self._pos_of(len(self._ids) - 1) + 1.0
+        hi = self._pos_of(row)
+        lo = self._pos_of(row - 1) if row > 0 else hi - 1.0
+        mid = (lo + hi) / 2
+        if lo < mid < hi:
+            return mid
+        self._renumber()
+        return row - 0.5
+
+    def _renumber(self):
+        self._conn.executemany(
+            'UPDATE media SET pos=? WHERE id=?',
+            ((float(pos), id_) for pos, id_ in enumerate(self._ids)))
+
+    # --- 查询接口 ---
+
+    def count(self) -> int:
+        return len(self._ids)
+
+    def fetch_rows(self, offset: int, limit: int) -> list[MediaItem]:
+        """读取当前行顺序中的一页数据（包括未提交的修改）"""
+        ids = self._ids[offset:offset + limit]
+        if not ids:
+            return []
+        by_id = _select_ids(self._conn, ids)
+        return [by_id[i] for i in ids]
+
+    def search(self, title: str = None, creator: str = None,
+               min_year: int = None, max_year: int = None,
+               min_rating: float = None, max_rating: float = None,
+               limit: int = None) -> list[MediaItem]:
+        """
+        利用索引查询：title 按前缀匹配，creator 精确匹配，年份与评分按闭区间过滤。
+        """
+        clauses, params = [], []
+        if title:
+            # 前缀区间查询可以走 title 索引，LIKE 则不行
+            clauses.append('title >= ? AND title < ?')
+            params += [title, title + '\U0010ffff']
+        if creator:
+            clauses.append('creator = ?')
+            params.append(creator)
+        for column, op, value in (('year', '>=', min_year), ('year', '<=', max_year),
+                                  ('rating', '>=', min_rating), ('rating', '<=', max_rating)):
+            if value is not None:
+                clauses.append(f'{column} {op} ?')
+                params.append(value)
+        sql = f'SELECT {_COLUMNS} FROM media'
+        if clauses:
+            sql += ' WHERE ' + ' AND '.join(clauses)
+        sql += ' ORDER BY pos'
+        if limit is not None:
+            sql += ' LIMIT ?'
+            params.append(limit)
+        return [_to_item(r) for r in self._conn.execute(sql, params)]
+
+    def search_rows(self, text: str = '', min_year: int = None, max_year: int = None,
+                    min_rating: float = None, max_rating: float = None) -> list[int] | None:
+        """
+        与 SearchIndex.search 的匹配规则和返回值相同，但直接查询数据库（包括未提交的修改），
+        不读取整行也不建立内存索引。年份和评分走索引，词语先在数据库中按子串粗筛，
+        再逐行核对标题和导演/作者；没有任何条件时返回 None。
+        """
+        terms = SearchIndex.terms(text)
+        ranges = (('year', '>=', min_year), ('year', '<=', max_year),
+                  ('rating', '>=', min_rating), ('rating', '<=', max_rating))
+        if not terms and all(value is None for _, _, value in ranges):
+            return None
+        if self._conn is None:
+            return []
+        clauses, params = [], []
+        for column, op, value in ranges:
+            if value is not None:
+                clauses.append(f'{column} {op} ?')
+                params.append(value)
+        for term in terms:
+            if term.isascii():
+                # LIKE 对 ASCII 字母不区分大小写，且不经过 Python 回调
+                pattern = '%' + term.replace('_', '\\_') + '%'
+                clauses.append("(title LIKE ? ESCAPE '\\' OR creator LIKE ? ESCAPE '\\')")
+            else:
+                pattern = term
+                clauses.append('(instr(casefold(title), ?) OR instr(casefold(creator), ?))')
+            params += [pattern, pattern]
+        sql = 'SELECT id, title, creator FROM media'
+        if clauses:
+            sql += ' WHERE ' + ' AND '.join(clauses)
+        if self._id_rows is None:
+            self._id_rows = {id_: row for row, id_ in enumerate(self._ids)}
+        id_rows = self._id_rows
+        return sorted(id_rows[id_] for id_, title, creator in self._conn.execute(sql, params)
+                      if not terms or SearchIndex.match_text(title, creator, terms))
+
+
+def convert_json_to_sqlite(json_path: str, db_path: str):
+    """把现有 JSON 媒体库流式转换为 SQLite 数据库"""
+    SQLiteRepository().write_new(JSONRepository().iter_load(json_path), db_path)
+
+
+if __name__ == '__main__':
+    if len(sys.argv) != 3:
+        sys.exit('usage: python -m repository.sqlite_repository <library.json> <library.db>')
+    convert_json_to_sqlite(sys.argv[1], sys.argv[2])
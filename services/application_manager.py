@@ -1,27 +1,37 @@
-from PySide6.QtCore import QObject
+from PySide6.QtCore import QObject, Slot
 
 class ApplicationManager(QObject):
     """一个简单的管理器，用于追踪后台任务并在完成后退出应用"""
     def __init__(self, app):
         super().__init__()
         self.app = app
-        self.running_workers = []
+        # 只记录未完成任务的数量，不再逐个保存线程对象
+        self.pending = 0
+
+    @Slot()
+    def task_started(self):
+        self.pending += 1
+
+    @Slot()
+    def task_finished(self):
+        self.pending = max(0, self.pending - 1)
+        self.check_quit()
 
     def add_worker(self, worker):
-        self.running_workers.append(worker)
+        self.task_started()
         # 关键：当任何一个线程结束后，都调用check_quit方法
-        worker.finished.connect(lambda: self.on_worker_finished(worker))
+        worker.finished.connect(self.task_finished)
 
-    def on_worker_finished(self, worker):
-        if worker in self.running_workers:
-            self.running_workers.remove(worker)
-        self.check_quit()
+    def track(self, scheduler):
+        """追踪调度器中的任务"""
+        scheduler.task_started.connect(self.task_started)
+        scheduler.task_finished.connect(self.task_finished)
 
     def check_quit(self):
-        # 检查所有窗口是否都已关闭，并且没有正在运行的线程
+        # 检查所有窗口是否都已关闭，并且没有未完成的任务
         # a.topLevelWidgets() 会返回所有顶级窗口
         all_windows_closed = not any(w.isVisible() for w in self.app.topLevelWidgets())
         
-        if all_windows_closed and not self.running_workers:
+        if all_windows_closed and not self.pending:
             print("All windows closed and all workers finished. Quitting.")
-            self.app.quit()
\ No newline at end of file
+            self.app.quit()
@@ -0,0 +1,37 @@
+import threading
+from PySide6.QtCore import QObject, Signal
+from services.duplicates import find_duplicates
+
+
+class DuplicateRunner(QObject):
+    """
+    在后台线程中运行 find_duplicates（条目很多时它再使用进程池），
+    通过排队的 Qt 信号把结果交回 GUI 线程。
+    """
+    finished = Signal(list)
+    failed = Signal(str)
+    task_started = Signal()
+    task_finished = Signal()
+
+    def __init__(self, workers: int = None, parent=None):
+        super().__init__(parent)
+        self.workers = workers
+        self._thread = None
+
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, items):
+        """items 应为快照列表；结果中的 DuplicateGroup.items 引用其中的条目对象"""
+        if self.is_running():
+            return
+        self.task_started.emit()
+        self._thread = threading.Thread(target=self._run, args=(list(items),), daemon=True)
+        self._thread.start()
+
+    def _run(self, items):
+        try:
+            self.finished.emit(find_duplicates(items, workers=self.workers))
+        except Exception as e:
+            self.failed.emit(str(e))
+        self.task_finished.emit()
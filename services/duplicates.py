@@ -0,0 +1,227 @@
+"""
+媒体库的重复项检测，不依赖 Qt，可以在后台线程或子进程中运行。
+
+两个阶段：
+    精确  规范化后的标题、导演/作者和年份完全相同：按 8 字节摘要分组，O(n)。
+    模糊  只在同一年份内比较：按标题排序、再按反转的标题排序，
+          每个条目只与排序后相邻的 WINDOW 个条目比较（排序邻域分块），
+          先用长度和二元组过滤，再用带上限的编辑距离确认。
+比较次数约为 2·WINDOW·n，而不是 n²/2；各年份相互独立，条目很多时分给进程池。
+"""
+import hashlib
+import os
+import re
+import unicodedata
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from multiprocessing import get_context
+from typing import Sequence
+from models.media_model import MediaItem
+
+# 排序后与之后的几个条目比较
+WINDOW = 4
+# 标题允许的编辑次数：较长标题长度的比例，至少 1 次，最多 MAX_TITLE_EDITS 次
+TITLE_EDIT_RATIO = 0.15
+MAX_TITLE_EDITS = 3
+CREATOR_EDIT_RATIO = 0.25
+# 少于此数的条目在当前进程内比较，避免启动进程池的开销
+PARALLEL_MIN_ITEMS = 50_000
+_LEADING_ARTICLES = {'the', 'a', 'an'}
+# 标点、符号和下划线视为空白
+_SEPARATORS = re.compile(r'[\W_]+')
+_NUMBERS = re.compile(r'\d+')
+
+
+def match_text(text: str, drop_article: bool = False) -> str:
+    """
+    用于比较的规范形式：NFKC（全角转半角）、忽略大小写，标点视为空白并合并空白。
+    drop_article 时去掉开头或逗号后结尾的英文冠词（"The Matrix"、"Matrix, The" 与 "Matrix"）。
+    """
+    text = unicodedata.normalize('NFKC', text).casefold()
+    if drop_article:
+        # "Matrix, The" 与 "The Matrix"
+        head, comma, tail = text.rpartition(',')
+        if comma and tail.strip() in _LEADING_ARTICLES:
+            text = head
+    words = _SEPARATORS.sub(' ', text).split()
+    if drop_article and len(words) > 1 and words[0] in _LEADING_ARTICLES:
+        words = words[1:]
+    return ' '.join(words)
+
+
+def exact_key(title: str, creator: str, year: int) -> bytes:
+    """已规范化的标题和导演/作者加年份的摘要"""
+    data = f'{title}\0{creator}\0{year}'.encode('utf-8')
+    return hashlib.blake2b(data, digest_size=8).digest()
+
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """Levenshtein 距离；超过 limit 时提前返回 limit + 1"""
+    if len(a) > len(b):
+        a, b = b, a
+    if len(b) - len(a) > limit:
+        return limit + 1
+    previous = list(range(len(a) + 1))
+    for j, cb in enumerate(b, 1):
+        current = [j]
+        for i, ca in enumerate(a, 1):
+            current.append(min(previous[i] + 1, current[i - 1] + 1,
+                               previous[i - 1] + (ca != cb)))
+        if min(current) > limit:
+            return limit + 1
+        previous = current
+    return previous[-1]
+
+
+def _bigrams(text: str) -> frozenset:
+    return frozenset(text[i:i + 2] for i in range(len(text) - 1))
+
+
+def _edits_allowed(a: str, b: str, ratio: float, cap: int) -> int:
+    return min(cap, max(1, int(max(len(a), len(b)) * ratio)))
+
+
+def _creators_match(a: str, b: str) -> bool:
+    # 任一方缺失时只看标题；名字写法不同（“Nolan” 与 “Christopher Nolan”）时允许包含
+    if not a or not b or a == b or a in b or b in a:
+        return True
+    limit = _edits_allowed(a, b, CREATOR_EDIT_RATIO, len(max(a, b, key=len)))
+    return edit_distance(a, b, limit) <= limit
+
+
+def fuzzy_pairs(entries: Sequence[tuple[int, str, str]]) -> list[tuple[int, int]]:
+    """
+    在一个年份的条目 [(行号, 标题, 导演/作者), ...] 中找出相似的行号对。
+    标题中的数字必须相同（“Rocky 2” 与 “Rocky 3” 不是重复项）。
+    模块级函数，供进程池调用。
+    """
+    # (行号, 标题, 导演/作者, 标题中的数字, 标题长度)
+    entries = [(row, title, creator, _NUMBERS.findall(title), len(title))
+               for row, title, creator in entries]
+    longest = max((entry[4] for entry in entries), default=0)
+    # 按较长标题的长度查表得到允许的编辑次数
+    limits = [min(MAX_TITLE_EDITS, max(1, int(size * TITLE_EDIT_RATIO)))
+              for size in range(longest + 1)]
+    grams: dict[int, frozenset] = {}
+    pairs = []
+    seen = set()
+    for order in (sorted(entries, key=lambda e: e[1]),
+                  sorted(entries, key=lambda e: e[1][::-1])):
+        for index, (row, title, creator, numbers, size) in enumerate(order):
+            for other_row, other_title, other_creator, other_numbers, other_size \
+                    in order[index + 1:index + 1 + WINDOW]:
+                if size > other_size:
+                    limit, difference = limits[size], size - other_size
+                else:
+                    limit, difference = limits[other_size], other_size - size
+                if difference > limit or numbers != other_numbers:
+                    continue
+                pair = (row, other_row) if row < other_row else (other_row, row)
+                if pair in seen:
+                    continue
+                seen.add(pair)
+                # 每次编辑最多破坏两个二元组
+                a = grams.get(row) or grams.setdefault(row, _bigrams(title))
+                b = grams.get(other_row) or grams.setdefault(other_row, _bigrams(other_title))
+                if max(len(a), len(b)) - len(a & b) > 2 * limit:
+                    continue
+                if edit_distance(title, other_title, limit) > limit:
+                    continue
+                if _creators_match(creator, other_creator):
+                    pairs.append(pair)
+    return pairs
+
+
+@dataclass
+class DuplicateGroup:
+    """一组重复的行号（升序）；exact 表示组内所有条目都完全相同"""
+    rows: list[int]
+    exact: bool = True
+    items: list[MediaItem] = field(default_factory=list, repr=False)
+
+
+class _DisjointSet:
+    def __init__(self):
+        self.parent: dict[int, int] = {}
+
+    def find(self, x: int) -> int:
+        parent = self.parent
+        root = x
+        while parent.get(root, root) != root:
+            root = parent[root]
+        while x != root:
+            parent[x], x = root, parent[x]
+        return root
+
+    def union(self, a: int, b: int):
+        a, b = self.find(a), self.find(b)
+        if a != b:
+            self.parent[max(a, b)] = min(a, b)
+
+
+def normalize_records(records: Sequence[tuple[str, str, int]]) -> list[tuple[str, str, bytes]]:
+    """[(标题, 导演/作者, 年份), ...] -> [(规范标题, 规范导演/作者, 精确键), ...]，供进程池调用"""
+    result = []
+    for title, creator, year in records:
+        title = match_text(title, drop_article=True)
+        creator = match_text(creator)
+        result.append((title, creator, exact_key(title, creator, year)))
+    return result
+
+
+def find_duplicates(items: Sequence[MediaItem], fuzzy: bool = True,
+                    workers: int = None) -> list[DuplicateGroup]:
+    """
+    返回按首行排序的重复组。
+    :param workers: 进程数；默认为 CPU 数，条目少于 PARALLEL_MIN_ITEMS 时不使用进程池。
+    """
+    records = [(item.title, item.creator, item.year) for item in items]
+    workers = workers or os.cpu_count() or 1
+    if workers > 1 and len(records) >= PARALLEL_MIN_ITEMS:
+        # spawn：调用方通常在有其他线程的 GUI 进程中，fork 可能死锁
+        with ProcessPoolExecutor(max_workers=workers, mp_context=get_context('spawn')) as pool:
+            return _find(records, items, fuzzy, pool.map)
+    return _find(records, items, fuzzy, map)
+
+
+def _find(records, items, fuzzy, map_) -> list[DuplicateGroup]:
+    # 规范化：分块交给进程池
+    size = max(1, -(-len(records) // 64))
+    normalized = [entry for chunk in map_(normalize_records, [
+        records[start:start + size] for start in range(0, len(records), size)])
+        for entry in chunk]
+
+    groups = _DisjointSet()
+    # 精确阶段：每个摘要的第一行作为代表，只有代表参与模糊比较
+    first_row: dict[bytes, int] = {}
+    by_year: dict[int, list[tuple[int, str, str]]] = {}
+    for row, (title, creator, key) in enumerate(normalized):
+        representative = first_row.setdefault(key, row)
+        if representative != row:
+            groups.union(representative, row)
+        elif fuzzy and title:
+            by_year.setdefault(records[row][2], []).append((row, title, creator))
+
+    if fuzzy:
+        # 大的年份先提交，减少最后只剩一个进程在忙的时间
+        blocks = sorted((block for block in by_year.values() if len(block) > 1),
+                        key=len, reverse=True)
+        for pairs in map_(fuzzy_pairs, blocks):
+            for a, b in pairs:
+                groups.union(a, b)
+
+    members: dict[int, list[int]] = {}
+    for row in list(groups.parent):
+        members.setdefault(groups.find(row), []).append(row)
+    result = []
+    for root, rows in sorted(members.items()):
+        rows = sorted(set(rows) | {root})
+        exact = len({normalized[row][2] for row in rows}) == 1
+        result.append(DuplicateGroup(rows, exact, [items[row] for row in rows]))
+    return result
+
+
+def preferred_index(items: Sequence[MediaItem]) -> int:
+    """组内默认保留的条目：元数据（海报、简介）最完整的，其次是评分最高的，再其次是最靠前的"""
+    return max(range(len(items)), key=lambda i: (
+        bool(items[i].poster_url) + bool(items[i].plot), items[i].rating, -i))
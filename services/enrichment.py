@@ -0,0 +1,238 @@
+"""
+基于 asyncio 的批量元数据补全引擎。
+
+既可以通过 services.enrichment_runner.EnrichmentRunner 在 Qt 程序中运行，
+也可以在命令行中独立运行：
+    python -m services.enrichment library.json [-o enriched.json] [--concurrency 16]
+
+安装了 aiohttp 时使用异步 HTTP；否则退回到专用线程池中的共享 requests.Session。
+"""
+import argparse
+import asyncio
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterable
+
+import requests
+
+from models.media_model import MediaItem
+from services.instrumentation import metrics
+from services.omdb_worker import OMDB_URL, fetch_omdb, get_api_key, parse_omdb, request_key
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+Batch = list[tuple[MediaItem, dict]]
+
+
+class AsyncRateLimiter:
+    """协程版的最小间隔限速器，rate <= 0 表示不限速"""
+    def __init__(self, rate: float):
+        self._interval = 1.0 / rate if rate > 0 else 0.0
+        self._next = 0.0
+
+    async def acquire(self):
+        if not self._interval:
+            return
+        now = time.monotonic()
+        slot = max(now, self._next)
+        self._next = slot + self._interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+
+class EnrichmentEngine:
+    """
+    并发获取一组 MediaItem 的元数据，并按批回调 on_batch(list[(item, info)])。
+    标题相同的条目只请求一次；并发度由 concurrency 个工作协程限定。
+    """
+    def __init__(self, api_key: str = None, concurrency: int = 16, batch_size: int = 500,
+                 rate_limit: float = 0, plot: str = 'short', url: str = OMDB_URL,
+                 cache_path: str = None, timeout: float = 10):
+        """
+        :param cache_path: 可选的 OMDbCache 文件路径，在引擎所在线程中打开。
+        """
+        self.api_key = get_api_key() if api_key is None else api_key
+        self.concurrency = concurrency
+        self.batch_size = batch_size
+        self.rate_limit = rate_limit
+        self.plot = plot
+        self.url = url
+        self.cache_path = cache_path
+        self.timeout = timeout
+
+    async def run(self, items: Iterable[MediaItem],
+                  on_batch: Callable[[Batch], None],
+                  progress: Callable[[int, int], None] = None) -> dict:
+        """
+        :param progress: 可选回调 progress(已完成请求数, 请求总数)。
+        :return: 统计信息 {'items', 'requests', 'cache_hits', 'enriched', 'failed', 'elapsed'}。
+        """
+        start = time.perf_counter()
+        groups: dict[str, list[MediaItem]] = {}
+        titles: dict[str, str] = {}
+        for item in items:
+            key = request_key(item.title, self.plot)
+            groups.setdefault(key, []).append(item)
+            titles.setdefault(key, item.title)
+        stats = {'items': sum(map(len, groups.values())), 'requests': 0,
+                 'cache_hits': 0, 'enriched': 0, 'failed': 0}
+        if not self.api_key:
+            stats['elapsed'] = time.perf_counter() - start
+            return stats
+
+        batch: Batch = []
+
+        def deliver(key: str, info: dict):
+            nonlocal batch
+            for item in groups[key]:
+                batch.append((item, info))
+            stats['enriched'] += len(groups[key])
+            if len(batch) >= self.batch_size:
+                on_batch(batch)
+                batch = []
+
+        cache = None
+        if self.cache_path:
+            from services.omdb_cache import OMDbCache
+            cache = OMDbCache(self.cache_path)
+        todo = []
+        for key in groups:
+            hit, info = cache.get(key) if cache is not None else (False, None)
+            if hit:
+                stats['cache_hits'] += 1
+                if info is not None:
+                    deliver(key, info)
+            else:
+                todo.append(key)
+
+        limiter = AsyncRateLimiter(self.rate_limit)
+        pending = iter(todo)
+        done = 0
+
+        async with self._client() as fetch:
+            async def worker():
+                nonlocal done
+                # 单线程事件循环中多个协程共享同一个迭代器是安全的
+                for key in pending:
+                    await limiter.acquire()
+                    stats['requests'] += 1
+                    try:
+                        info = await fetch(titles[key])
+                    except Exception:
+                        stats['failed'] += 1
+                    else:
+                        if cache is not None:
+                            cache.put(key, info)
+                        if info is not None:
+                            deliver(key, info)
+                    done += 1
+                    if progress is not None:
+                        progress(done, len(todo))
+
+            await asyncio.gather(*(worker() for _ in range(max(1, self.concurrency))))
+
+        if batch:
+            on_batch(batch)
+        if cache is not None:
+            cache.close()
+        stats['elapsed'] = time.perf_counter() - start
+        return stats
+
+    def _client(self):
+        if aiohttp is not None:
+            return _AiohttpClient(self)
+        return _ThreadedClient(self)
+
+
+class _AiohttpClient:
+    def __init__(self, engine: EnrichmentEngine):
+        self._engine = engine
+
+    async def __aenter__(self):
+        engine = self._engine
+        self._session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=engine.concurrency),
+            timeout=aiohttp.ClientTimeout(total=engine.timeout))
+        return self.fetch
+
+    async def __aexit__(self, *exc):
+        await self._session.close()
+
+    async def fetch(self, title: str) -> dict | None:
+        engine = self._engine
+        params = {'t': title, 'apikey': engine.api_key, 'plot': engine.plot}
+        start = time.perf_counter()
+        try:
+            async with self._session.get(engine.url, params=params) as response:
+                metrics.observe('omdb.fetch', time.perf_counter() - start)
+                metrics.count('omdb.responses', status=response.status)
+                response.raise_for_status()
+                return parse_omdb(await response.json(content_type=None))
+        except aiohttp.ClientResponseError:
+            raise
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            metrics.count('omdb.errors', error=type(e).__name__)
+            raise
+
+
+class _ThreadedClient:
+    """没有 aiohttp 时的退路：在专用线程池中用共享 Session 发起阻塞请求"""
+    def __init__(self, engine: EnrichmentEngine):
+        self._engine = engine
+
+    async def __aenter__(self):
+        engine = self._engine
+        self._executor = ThreadPoolExecutor(max_workers=engine.concurrency)
+        self._session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_maxsize=engine.concurrency)
+        self._session.mount('http://', adapter)
+        self._session.mount('https://', adapter)
+        return self.fetch
+
+    async def __aexit__(self, *exc):
+        self._executor.shutdown(wait=False)
+        self._session.close()
+
+    async def fetch(self, title: str) -> dict | None:
+        engine = self._engine
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor,
+            lambda: fetch_omdb(title, engine.api_key, session=self._session,
+                               plot=engine.plot, timeout=engine.timeout, url=engine.url))
+
+
+def main(argv=None):
+    from repository.json_repository import JSONRepository
+
+    parser = argparse.ArgumentParser(description='批量补全媒体库的在线元数据')
+    parser.add_argument('library', help='JSON 媒体库文件')
+    parser.add_argument('-o', '--output', help='输出文件，默认覆盖输入文件')
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--rate-limit', type=float, default=0, help='每秒最多请求数')
+    parser.add_argument('--cache', help='OMDb 缓存文件路径')
+    args = parser.parse_args(argv)
+
+    repo = JSONRepository(args.library)
+    items = repo.load()
+
+    def apply(batch: Batch):
+        for item, info in batch:
+            item.apply_metadata(info)
+
+    engine = EnrichmentEngine(concurrency=args.concurrency, rate_limit=args.rate_limit,
+                              cache_path=args.cache)
+    if not engine.api_key:
+        sys.exit('OMDB_API_KEY is not set')
+    stats = asyncio.run(engine.run(items, apply))
+    repo.save(items, args.output or args.library)
+    print(', '.join(f'{k}={v:.2f}' if isinstance(v, float) else f'{k}={v}'
+                    for k, v in stats.items()))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,41 @@
+import asyncio
+import threading
+from PySide6.QtCore import QObject, Signal
+from services.enrichment import EnrichmentEngine
+
+
+class EnrichmentRunner(QObject):
+    """
+    在后台线程的 asyncio 事件循环中运行 EnrichmentEngine，
+    通过排队的 Qt 信号把每一批结果交回 GUI 线程。
+    """
+    batch_ready = Signal(list)
+    progress = Signal(int, int)
+    finished = Signal(dict)
+    task_started = Signal()
+    task_finished = Signal()
+
+    def __init__(self, engine: EnrichmentEngine, parent=None):
+        super().__init__(parent)
+        self.engine = engine
+        self._thread = None
+
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, items):
+        """items 应为快照列表，引擎线程只读取其中的标题"""
+        if self.is_running():
+            return
+        self.task_started.emit()
+        self._thread = threading.Thread(target=self._run, args=(list(items),), daemon=True)
+        self._thread.start()
+
+    def _run(self, items):
+        try:
+            stats = asyncio.run(self.engine.run(
+                items, self.batch_ready.emit, progress=self.progress.emit))
+        except Exception as e:
+            stats = {'error': str(e)}
+        self.finished.emit(stats)
+        self.task_finished.emit()
@@ -0,0 +1,241 @@
+"""
+热点路径的计时器和计数器，以及按需开启的 cProfile / tracemalloc 采集。
+
+默认关闭：关闭时 timed 包装的方法只多一次属性检查，timer() 返回共享的空上下文，
+count() 直接返回，不读时钟也不加锁。
+开启后可以导出为 JSON（snapshot / dump_json），或者在本机端口上提供
+Prometheus 文本格式（serve），供抓取。
+
+    from services.instrumentation import metrics, timed
+
+    @timed('repository.save')
+    def save(self, ...): ...
+
+    with metrics.timer('omdb.fetch'):
+        ...
+    metrics.count('omdb.responses', status=200)
+"""
+import functools
+import json
+import os
+import threading
+import time
+from contextlib import nullcontext
+
+# 设置为 1 时启动即开启记录（与设置中的 metrics/enabled 相同）
+METRICS_ENV = 'MEDIA_LIBRARY_METRICS'
+PROMETHEUS_PREFIX = 'media_library'
+
+_NULL_TIMER = nullcontext()
+
+
+def _metric_name(name: str) -> str:
+    return f'{PROMETHEUS_PREFIX}_' + ''.join(c if c.isalnum() else '_' for c in name)
+
+
+def _labels(labels: tuple) -> str:
+    if not labels:
+        return ''
+    escaped = (str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+               for _, value in labels)
+    return '{' + ','.join(f'{key}="{value}"' for (key, _), value in zip(labels, escaped)) + '}'
+
+
+class _Timer:
+    __slots__ = ('_metrics', '_name', '_start')
+
+    def __init__(self, metrics, name: str):
+        self._metrics = metrics
+        self._name = name
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self._metrics.observe(self._name, time.perf_counter() - self._start)
+        return False
+
+
+class Metrics:
+    """线程安全的计数器和耗时统计（次数、总和、最大值）"""
+    def __init__(self):
+        self.enabled = False
+        self._lock = threading.Lock()
+        # {(名称, ((标签, 值), ...)): 次数}
+        self._counters: dict[tuple[str, tuple], int] = {}
+        # {名称: [次数, 总秒数, 最大秒数]}
+        self._timings: dict[str, list] = {}
+        self._server = None
+
+    def count(self, name: str, amount: int = 1, **labels):
+        if not self.enabled:
+            return
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def observe(self, name: str, seconds: float):
+        if not self.enabled:
+            return
+        with self._lock:
+            timing = self._timings.get(name)
+            if timing is None:
+                self._timings[name] = [1, seconds, seconds]
+            else:
+                timing[0] += 1
+                timing[1] += seconds
+                if seconds > timing[2]:
+                    timing[2] = seconds
+
+    def timer(self, name: str):
+        """with metrics.timer('name'): ...；关闭时不计时"""
+        return _Timer(self, name) if self.enabled else _NULL_TIMER
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._timings.clear()
+
+    def snapshot(self) -> dict:
+        """{'counters': [{'name', 'labels', 'value'}], 'timings': {名称: {'count', 'total_ms', 'mean_ms', 'max_ms'}}}"""
+        with self._lock:
+            counters = [{'name': name, 'labels': dict(labels), 'value': value}
+                        for (name, labels), value in sorted(self._counters.items())]
+            timings = {name: {'count': count, 'total_ms': total * 1000,
+                              'mean_ms': total * 1000 / count, 'max_ms': peak * 1000}
+                       for name, (count, total, peak) in sorted(self._timings.items())}
+        return {'counters': counters, 'timings': timings}
+
+    def dump_json(self, path: str):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.snapshot(), f, ensure_ascii=False, indent=2)
+
+    def prometheus_text(self) -> str:
+        """Prometheus 文本格式：计数器为 <名称>_total，耗时为 summary 的 _count、_sum 和 _max"""
+        lines = []
+        with self._lock:
+            counters = sorted(self._counters.items())
+            timings = sorted(self._timings.items())
+        declared = set()
+        for (name, labels), value in counters:
+            metric = _metric_name(name) + '_total'
+            if metric not in declared:
+                declared.add(metric)
+                lines.append(f'# TYPE {metric} counter')
+            lines.append(f'{metric}{_labels(labels)} {value}')
+        if timings:
+            metric = f'{PROMETHEUS_PREFIX}_duration_seconds'
+            lines.append(f'# TYPE {metric} summary')
+            for name, (count, total, _) in timings:
+                label = _labels((('op', name),))
+                lines.append(f'{metric}_count{label} {count}')
+                lines.append(f'{metric}_sum{label} {total:.6f}')
+            lines.append(f'# TYPE {metric}_max gauge')
+            for name, (_, _, peak) in timings:
+                lines.append(f'{metric}_max{_labels((("op", name),))} {peak:.6f}')
+        return '\n'.join(lines) + '\n'
+
+    def serve(self, port: int = 0, host: str = '127.0.0.1') -> int:
+        """在后台线程中提供 http://host:port/metrics，返回实际端口；只监听本机"""
+        if self._server is not None:
+            return self._server.server_address[1]
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?')[0] == '/metrics':
+                    body, content_type = metrics.prometheus_text(), 'text/plain; version=0.0.4'
+                elif self.path.split('?')[0] == '/metrics.json':
+                    body, content_type = json.dumps(metrics.snapshot()), 'application/json'
+                else:
+                    self.send_error(404)
+                    return
+                data = body.encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', f'{content_type}; charset=utf-8')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self._server.server_address[1]
+
+    def stop_serving(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+
+metrics = Metrics()
+metrics.enabled = os.environ.get(METRICS_ENV, '') == '1'
+
+
+def timed(name: str):
+    """方法装饰器：开启记录时把每次调用的次数和耗时计入 name"""
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not metrics.enabled:
+                return fn(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                metrics.observe(name, time.perf_counter() - start)
+        return wrapper
+    return decorate
+
+
+class Profiler:
+    """
+    按需开启的 cProfile 和 tracemalloc 采集。
+    stop() 把 cProfile 的统计写入 <prefix>.prof（可用 snakeviz 或 pstats 查看），
+    把按分配位置统计的前 top 项内存写入 <prefix>.alloc.txt，返回写入的文件列表。
+    cProfile 只统计调用 start() 的线程。
+    """
+    def __init__(self):
+        self._profile = None
+        self._tracing = False
+
+    @property
+    def running(self) -> bool:
+        return self._profile is not None or self._tracing
+
+    def start(self, cpu: bool = True, memory: bool = True):
+        if self.running:
+            return
+        if cpu:
+            import cProfile
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+        if memory:
+            import tracemalloc
+            tracemalloc.start(16)
+            self._tracing = True
+
+    def stop(self, prefix: str, top: int = 50) -> list[str]:
+        written = []
+        if self._profile is not None:
+            self._profile.disable()
+            self._profile.dump_stats(prefix + '.prof')
+            written.append(prefix + '.prof')
+            self._profile = None
+        if self._tracing:
+            import tracemalloc
+            snapshot = tracemalloc.take_snapshot()
+            current, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            self._tracing = False
+            with open(prefix + '.alloc.txt', 'w', encoding='utf-8') as f:
+                f.write(f'current {current / 1024:.1f} KiB, peak {peak / 1024:.1f} KiB\n')
+                for stat in snapshot.statistics('lineno')[:top]:
+                    f.write(f'{stat}\n')
+            written.append(prefix + '.alloc.txt')
+        return written
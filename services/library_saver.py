@@ -0,0 +1,136 @@
+import threading
+from PySide6.QtCore import QObject, QTimer, Signal, Slot
+
+
+class LibrarySaver(QObject):
+    """
+    在后台线程中保存媒体库，GUI 线程只负责创建快照（见 LibraryController.snapshot）。
+
+    写入期间收到的保存请求合并为一次：当前写入完成后，用最新的数据再保存一次。
+    schedule_autosave() 在最后一次修改之后 autosave_delay 秒保存（防抖）。
+    仓库不支持后台保存（BACKGROUND_SAVE 为 False）时在 GUI 线程中同步保存。
+    控制层正在分块加载时推迟保存，加载完成后再写入，否则只会写入已加载的部分。
+    """
+    # 推迟的保存检查加载是否完成的间隔
+    LOAD_POLL_MS = 50
+
+    saved = Signal(str)
+    failed = Signal(str, str)
+    task_started = Signal()
+    task_finished = Signal()
+    # 工作线程 -> GUI 线程：(路径, 错误信息)，错误信息为空表示成功
+    _done = Signal(str, str)
+
+    def __init__(self, controller, autosave_delay: float = 0, parent=None):
+        super().__init__(parent)
+        self.controller = controller
+        self._thread = None
+        self._pending = None
+        self._waiting_generation = None
+        self._autosave_path = ''
+        self._autosave = QTimer(self)
+        self._autosave.setSingleShot(True)
+        self._autosave.timeout.connect(self._on_autosave)
+        self._load_wait = QTimer(self)
+        self._load_wait.setSingleShot(True)
+        self._load_wait.setInterval(self.LOAD_POLL_MS)
+        self._load_wait.timeout.connect(self._on_load_wait)
+        self.set_autosave_delay(autosave_delay)
+        self._done.connect(self._on_done)
+
+    def set_autosave_delay(self, seconds: float):
+        """seconds <= 0 时关闭自动保存"""
+        self.autosave_delay = seconds
+        self._autosave.setInterval(int(max(seconds, 0) * 1000))
+        if seconds <= 0:
+            self._autosave.stop()
+
+    def is_saving(self) -> bool:
+        """正在写入，或有等待加载完成的保存"""
+        return self._thread is not None or self._load_wait.isActive()
+
+    def save(self, path: str):
+        self._autosave.stop()
+        if self.is_saving():
+            self._pending = path
+            return
+        if getattr(self.controller, 'loading', False):
+            # 等待期间也算一个任务，应用不会在写入之前退出
+            self._pending = path
+            self._waiting_generation = self.controller.load_generation
+            self.task_started.emit()
+            self._load_wait.start()
+            return
+        repository = self.controller.repository
+        if not getattr(repository, 'BACKGROUND_SAVE', False):
+            try:
+                self.controller.save_library(path)
+            except Exception as e:
+                self.failed.emit(path, str(e) or type(e).__name__)
+            else:
+                self.saved.emit(path)
+            return
+        snapshot = self.controller.snapshot()
+        self.task_started.emit()
+        self._thread = threading.Thread(
+            target=self._run, args=(repository, snapshot, path), daemon=True)
+        self._thread.start()
+
+    def schedule_autosave(self, path: str):
+        """在 autosave_delay 秒内没有新的修改时保存到 path"""
+        if self.autosave_delay > 0 and path:
+            self._autosave_path = path
+            self._autosave.start()
+
+    def flush(self):
+        """立即执行等待中的自动保存，例如在关闭窗口时"""
+        if self._autosave.isActive():
+            self._autosave.stop()
+            self._on_autosave()
+
+    def wait(self, timeout: float = None) -> bool:
+        """等待当前的写入结束（不处理随后合并的请求），返回是否已结束"""
+        thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+            return not thread.is_alive()
+        return True
+
+    def cancel_autosave(self):
+        self._autosave.stop()
+
+    def _on_autosave(self):
+        self.save(self._autosave_path)
+
+    def _on_load_wait(self):
+        if getattr(self.controller, 'loading', False):
+            self._load_wait.start()
+            return
+        path, self._pending = self._pending, None
+        # 等待期间又加载了其他媒体库：保存请求属于之前的数据，放弃
+        if self.controller.load_generation == self._waiting_generation:
+            self.save(path)
+        self.task_finished.emit()
+
+    def _run(self, repository, snapshot, path: str):
+        error = ''
+        try:
+            repository.save(snapshot, path)
+        except Exception as e:
+            error = str(e) or type(e).__name__
+        finally:
+            snapshot.close()
+        self._done.emit(path, error)
+
+    @Slot(str, str)
+    def _on_done(self, path: str, error: str):
+        self._thread = None
+        if error:
+            self.failed.emit(path, error)
+        else:
+            self.saved.emit(path)
+        # 先开始合并的保存，再报告结束，避免应用在两次写入之间退出
+        if self._pending is not None:
+            path, self._pending = self._pending, None
+            self.save(path)
+        self.task_finished.emit()
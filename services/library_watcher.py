@@ -0,0 +1,143 @@
+import os
+import threading
+from typing import Callable
+from PySide6.QtCore import QFileSystemWatcher, QObject, QTimer, Signal, Slot
+from controllers.library_diff import diff_items
+
+
+def _signature(path: str):
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size, stat.st_ino
+
+
+class LibraryWatcher(QObject):
+    """
+    监视当前媒体库文件，其他程序改写它之后只把变化的行应用到控制层。
+
+    文件和所在目录都加入 QFileSystemWatcher（原子替换后文件本身会从监视列表中消失），
+    事件在 DEBOUNCE_MS 内合并；文件的 mtime、大小和 inode 与最后一次同步时相同则忽略，
+    本程序自己的保存通过 mark_synced 记录，不会被当作外部修改。
+    新内容在后台线程中读取，并与控制层的写时复制快照比较（见 controllers.library_diff）；
+    比较期间媒体库发生了变化时重新比较。差异太大时发出 reload_needed，由调用方重新加载。
+    """
+    DEBOUNCE_MS = 500
+
+    applied = Signal(str, dict)
+    reload_needed = Signal(str)
+    failed = Signal(str, str)
+    task_started = Signal()
+    task_finished = Signal()
+    # 工作线程 -> GUI 线程
+    _ready = Signal(object)
+
+    def __init__(self, controller, busy: Callable[[], bool] = None, parent=None):
+        """:param busy: 返回 True 时推迟检查，例如正在后台保存"""
+        super().__init__(parent)
+        self.controller = controller
+        self._busy = busy or (lambda: False)
+        self._path = ''
+        self._load = None
+        self._known = None
+        self._thread = None
+        self._watcher = QFileSystemWatcher(self)
+        self._watcher.fileChanged.connect(self._on_event)
+        self._watcher.directoryChanged.connect(self._on_event)
+        self._debounce = QTimer(self)
+        self._debounce.setSingleShot(True)
+        self._debounce.setInterval(self.DEBOUNCE_MS)
+        self._debounce.timeout.connect(self._check)
+        self._ready.connect(self._on_ready)
+
+    @property
+    def path(self) -> str:
+        return self._path
+
+    def watch(self, path: str, load: Callable[[str], list]):
+        """
+        开始监视 path，当前内容视为已同步。
+        :param load: 在工作线程中调用，load(path) 返回文件中的全部条目。
+        """
+        self.unwatch()
+        self._path = os.path.abspath(path)
+        self._load = load
+        self._known = _signature(self._path)
+        paths = [os.path.dirname(self._path)]
+        if os.path.exists(self._path):
+            paths.append(self._path)
+        self._watcher.addPaths(paths)
+
+    def unwatch(self):
+        self._debounce.stop()
+        watched = self._watcher.files() + self._watcher.directories()
+        if watched:
+            self._watcher.removePaths(watched)
+        self._path = ''
+        self._load = None
+
+    def mark_synced(self, path: str):
+        """path 刚由本程序写入"""
+        if self._path and os.path.abspath(path) == self._path:
+            self._known = _signature(self._path)
+
+    def recheck(self):
+        """不论文件签名是否变化，重新读取并比较，例如显示的数据来自可能过期的缓存"""
+        if self._path:
+            self._known = None
+            self._debounce.start()
+
+    def _on_event(self, changed: str):
+        if self._path:
+            self._debounce.start()
+
+    def _state(self):
+        return self._path, self.controller.undo_stack.index(), self.controller.row_count()
+
+    def _check(self):
+        if not self._path:
+            return
+        if os.path.exists(self._path) and self._path not in self._watcher.files():
+            self._watcher.addPath(self._path)
+        signature = _signature(self._path)
+        if signature is None or signature == self._known:
+            return
+        if self._thread is not None or self._busy() or self.controller.loading:
+            self._debounce.start()
+            return
+        self._known = signature
+        snapshot = self.controller.snapshot()
+        self.task_started.emit()
+        self._thread = threading.Thread(
+            target=self._run, args=(self._path, self._load, snapshot, self._state()), daemon=True)
+        self._thread.start()
+
+    def _run(self, path, load, snapshot, state):
+        try:
+            items = list(load(path))
+            self._ready.emit((state, items, diff_items(snapshot, items), ''))
+        except Exception as e:
+            self._ready.emit((state, None, None, str(e) or type(e).__name__))
+        finally:
+            snapshot.close()
+
+    @Slot(object)
+    def _on_ready(self, result):
+        self._thread = None
+        state, items, opcodes, error = result
+        path = state[0]
+        if path != self._path:
+            pass
+        elif error:
+            # 写入一半的文件：写完时的事件会再次触发检查
+            self.failed.emit(path, error)
+        elif state != self._state():
+            # 比较期间媒体库被修改了，用新的快照重新比较
+            self._known = None
+            self._debounce.start()
+        elif opcodes is None:
+            self.reload_needed.emit(path)
+        elif opcodes:
+            self.applied.emit(path, self.controller.apply_diff(opcodes, items))
+        self.task_finished.emit()
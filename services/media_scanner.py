@@ -0,0 +1,376 @@
+"""
+扫描目录树中的视频文件，从文件名解析标题和年份，为新文件生成媒体项记录。不依赖 Qt。
+
+    目录遍历  线程池中并行 os.scandir；目录的 mtime 与扫描索引中记录的相同时
+              不重新列出其中的文件，只继续检查记录的子目录。
+    指纹      文件大小加开头和结尾各 FINGERPRINT_BYTES 字节的 blake2b 摘要；
+              待计算的文件很多时分块交给进程池。
+    去重      扫描索引按媒体库记录导入过的指纹（record_imports，通常在媒体库保存后调用）；
+              根目录下指纹已导入当前媒体库的文件（包括被移动或重命名的）不会再生成记录。
+              同一次扫描中内容相同的文件只生成一条。
+
+目录和文件的缓存与媒体库无关：换一个媒体库扫描同一目录时不需要重新计算指纹，
+但其中的文件对新的媒体库都是新文件；扫描后被撤销或未保存的添加也不会被记为已导入。
+目录的 mtime 只在其中的条目增删或改名时变化，原地修改的文件要等所在目录变化后才会被重新检查。
+读取失败的文件不写入索引，下次扫描时重试。
+扫描索引保存在一个 SQLite 文件中，只应在打开它的线程中使用。
+"""
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from multiprocessing import get_context
+from typing import Callable, Iterable
+
+VIDEO_EXTENSIONS = frozenset({
+    '.mkv', '.mp4', '.m4v', '.avi', '.mov', '.wmv', '.mpg', '.mpeg', '.ts', '.m2ts',
+    '.webm', '.flv', '.rmvb', '.iso'})
+FINGERPRINT_BYTES = 64 * 1024
+# 少于此数的文件在当前进程内计算指纹，避免启动进程池的开销
+PARALLEL_MIN_FILES = 256
+FINGERPRINT_CHUNK = 64
+
+_YEAR = re.compile(r'[(\[（【]?\b((?:19|20)\d{2})\b[)\]）】]?')
+# 年份之后通常是发布信息；没有年份时在第一个这样的标记处截断
+_RELEASE_TAGS = re.compile(
+    r'\b(?:2160p|1080p|1080i|720p|576p|480p|4k|uhd|hdr|bluray|blu-ray|bdrip|brrip|remux|'
+    r'web-?dl|webrip|hdtv|dvdrip|dvd|hdrip|x264|x265|h\.?264|h\.?265|hevc|avc|aac|dts|ac3|'
+    r'proper|repack|extended|unrated)\b', re.IGNORECASE)
+_LEADING_TAGS = re.compile(r'^(?:\s*[\[【][^\]】]*[\]】])+')
+_SAMPLE = re.compile(r'(?:^|[\s._-])sample(?:$|[\s._-])', re.IGNORECASE)
+
+
+def parse_filename(name: str) -> tuple[str, int]:
+    """
+    "The.Matrix.1999.1080p.BluRay.mkv" -> ("The Matrix", 1999)；
+    "[字幕组]霸王别姬 (1993).mkv" -> ("霸王别姬", 1993)；没有年份时年份为 0。
+    开头的年份视为标题的一部分（"1917 (2019)"、"2001 A Space Odyssey"）。
+    """
+    stem = os.path.splitext(name)[0]
+    stem = _LEADING_TAGS.sub('', stem).strip() or stem
+    if ' ' not in stem:
+        stem = stem.replace('.', ' ').replace('_', ' ')
+    year = 0
+    end = len(stem)
+    for match in _YEAR.finditer(stem):
+        if match.start() > 0:
+            year, end = int(match.group(1)), match.start()
+    tag = _RELEASE_TAGS.search(stem, 0, end)
+    if tag is not None and tag.start() > 0:
+        end = tag.start()
+    title = ' '.join(stem[:end].split()).strip(' -([{（【')
+    return title or stem.strip(), year
+
+
+def is_video(name: str) -> bool:
+    return os.path.splitext(name)[1].lower() in VIDEO_EXTENSIONS and not _SAMPLE.search(name)
+
+
+def fingerprint(path: str, size: int) -> str:
+    """大小加开头和结尾各 FINGERPRINT_BYTES 字节的摘要；读取失败时返回空字符串"""
+    digest = hashlib.blake2b(digest_size=16)
+    try:
+        with open(path, 'rb') as f:
+            digest.update(f.read(FINGERPRINT_BYTES))
+            if size > 2 * FINGERPRINT_BYTES:
+                f.seek(size - FINGERPRINT_BYTES)
+                digest.update(f.read(FINGERPRINT_BYTES))
+            elif size > FINGERPRINT_BYTES:
+                digest.update(f.read())
+    except OSError:
+        return ''
+    return f'{size:x}-{digest.hexdigest()}'
+
+
+def fingerprint_files(files: list[tuple[str, int]]) -> list[str]:
+    """[(路径, 大小), ...] 的指纹，模块级函数，供进程池调用"""
+    return [fingerprint(path, size) for path, size in files]
+
+
+def _list_dir(path: str, known_mtime: int | None):
+    """
+    线程池中执行：返回 (mtime_ns, 子目录, 视频文件 [(名称, 大小, mtime_ns)])；
+    mtime 与 known_mtime 相同时不列出目录，子目录和文件为 None。
+    """
+    try:
+        mtime = os.stat(path).st_mtime_ns
+    except OSError:
+        return None, [], []
+    if mtime == known_mtime:
+        return mtime, None, None
+    subdirs, files = [], []
+    try:
+        with os.scandir(path) as entries:
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        if not entry.name.startswith('.'):
+                            subdirs.append(entry.name)
+                    elif entry.is_file() and is_video(entry.name):
+                        stat = entry.stat()
+                        files.append((entry.name, stat.st_size, stat.st_mtime_ns))
+                except OSError:
+                    continue
+    except OSError:
+        return None, [], []
+    return mtime, subdirs, files
+
+
+@dataclass
+class ScanResult:
+    """
+    records 为新文件的媒体项字典，可直接交给 LibraryController.add_items；
+    fingerprints 为对应文件的指纹，媒体库保存后交给 MediaScanner.record_imports。
+    """
+    records: list[dict] = field(default_factory=list)
+    fingerprints: list[str] = field(default_factory=list)
+    dirs_listed: int = 0
+    dirs_skipped: int = 0
+    files_found: int = 0
+    files_hashed: int = 0
+    cancelled: bool = False
+
+
+class ScanIndex:
+    """
+    扫描索引：每个目录的 mtime 和子目录，每个文件的大小、mtime 和指纹，
+    以及每个媒体库（绝对路径）导入过的指纹。
+    """
+    def __init__(self, path: str):
+        self._conn = sqlite3.connect(path)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS scan_dirs (
+                path TEXT PRIMARY KEY,
+                mtime_ns INTEGER NOT NULL,
+                subdirs TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS scan_files (
+                path TEXT PRIMARY KEY,
+                dir TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                fingerprint TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS scan_files_dir ON scan_files(dir);
+            CREATE TABLE IF NOT EXISTS scan_imports (
+                library TEXT NOT NULL,
+                fingerprint TEXT NOT NULL,
+                PRIMARY KEY (library, fingerprint)
+            );
+        """)
+
+    def close(self):
+        self._conn.close()
+
+    def dirs_under(self, root: str) -> dict[str, tuple[int, list[str]]]:
+        """{目录: (mtime_ns, [子目录名, ...])}，包括 root 本身"""
+        prefix = root.rstrip(os.sep) + os.sep
+        rows = self._conn.execute(
+            'SELECT path, mtime_ns, subdirs FROM scan_dirs WHERE path = ? '
+            'OR substr(path, 1, ?) = ?', (root, len(prefix), prefix))
+        return {path: (mtime, json.loads(subdirs)) for path, mtime, subdirs in rows}
+
+    def files_in(self, directory: str) -> dict[str, tuple[int, int, str]]:
+        """{文件路径: (大小, mtime_ns, 指纹)}"""
+        rows = self._conn.execute(
+            'SELECT path, size, mtime_ns, fingerprint FROM scan_files WHERE dir = ?', (directory,))
+        return {path: (size, mtime, fp) for path, size, mtime, fp in rows}
+
+    def files_under(self, root: str) -> dict[str, str]:
+        """{文件路径: 指纹}，包括 root 的所有子目录中的文件"""
+        prefix = root.rstrip(os.sep) + os.sep
+        rows = self._conn.execute(
+            'SELECT path, fingerprint FROM scan_files WHERE dir = ? '
+            'OR substr(dir, 1, ?) = ?', (root, len(prefix), prefix))
+        return dict(rows.fetchall())
+
+    def imports(self, library: str) -> set[str]:
+        """已导入 library 的指纹"""
+        return {row[0] for row in self._conn.execute(
+            'SELECT fingerprint FROM scan_imports WHERE library = ?', (library,))}
+
+    def put_imports(self, library: str, fingerprints: Iterable[str]):
+        self._conn.executemany('INSERT OR IGNORE INTO scan_imports VALUES (?, ?)',
+                               ((library, fp) for fp in fingerprints if fp))
+
+    def rename_import(self, old: str, new: str):
+        """原地修改的文件指纹变了，它在各媒体库中仍算已导入"""
+        self._conn.execute('UPDATE OR IGNORE scan_imports SET fingerprint = ? WHERE fingerprint = ?',
+                           (new, old))
+
+    def put_dir(self, path: str, mtime: int, subdirs: list[str]):
+        self._conn.execute('INSERT OR REPLACE INTO scan_dirs VALUES (?, ?, ?)',
+                           (path, mtime, json.dumps(subdirs, ensure_ascii=False)))
+
+    def put_files(self, rows: Iterable[tuple[str, str, int, int, str]]):
+        """[(路径, 目录, 大小, mtime_ns, 指纹), ...]"""
+        self._conn.executemany('INSERT OR REPLACE INTO scan_files VALUES (?, ?, ?, ?, ?)', rows)
+
+    def remove_files(self, paths: Iterable[str]):
+        self._conn.executemany('DELETE FROM scan_files WHERE path = ?', ((p,) for p in paths))
+
+    def invalidate_dir(self, path: str):
+        self._conn.execute('UPDATE scan_dirs SET mtime_ns = -1 WHERE path = ?', (path,))
+
+    def remove_dirs(self, paths: Iterable[str]):
+        paths = [(p,) for p in paths]
+        self._conn.executemany('DELETE FROM scan_files WHERE dir = ?', paths)
+        self._conn.executemany('DELETE FROM scan_dirs WHERE path = ?', paths)
+
+    def commit(self):
+        self._conn.commit()
+
+
+class MediaScanner:
+    """
+    :param index_path: 扫描索引文件路径。
+    :param threads: 遍历目录的线程数。
+    :param workers: 计算指纹的进程数；默认为 CPU 数，文件少于 PARALLEL_MIN_FILES 时不使用进程池。
+    """
+    def __init__(self, index_path: str, threads: int = 8, workers: int = None):
+        self.index_path = index_path
+        self.threads = max(1, threads)
+        self.workers = workers or os.cpu_count() or 1
+
+    def scan(self, roots: Iterable[str],
+             progress: Callable[[str, int, int], None] = None,
+             cancel: threading.Event = None, library: str = '',
+             imported: Iterable[str] = ()) -> ScanResult:
+        """
+        扫描各根目录并更新索引，返回尚未导入 library 的文件的记录。
+        :param progress: progress(阶段, 已完成数, 总数)，阶段为 'dirs'（总数未知时为 0）或 'hash'。
+        :param cancel: 设置后尽快停止，已扫描的部分不写入索引。
+        :param library: 媒体库文件路径，尚未保存的媒体库为空字符串。
+        :param imported: 另外视为已导入的指纹，例如本次会话中添加、尚未保存的。
+        """
+        progress = progress or (lambda phase, done, total: None)
+        cancel = cancel or threading.Event()
+        result = ScanResult()
+        roots = list(dict.fromkeys(os.path.abspath(root) for root in roots))
+        index = ScanIndex(self.index_path)
+        try:
+            # 需要计算指纹的文件：[(路径, 目录, 大小, mtime_ns, 之前的指纹)]
+            pending = []
+            for root in roots:
+                pending += self._walk(root, index, result, progress, cancel)
+                if cancel.is_set():
+                    result.cancelled = True
+                    return result
+            fingerprints = self._fingerprint(pending, progress, cancel)
+            if cancel.is_set():
+                result.cancelled = True
+                return result
+            result.files_hashed = len(pending)
+            rows = []
+            for (path, directory, size, mtime, previous), fp in zip(pending, fingerprints):
+                if not fp:
+                    # 读取失败：不记录文件，并让下次扫描重新列出它所在的目录
+                    index.remove_files([path])
+                    index.invalidate_dir(directory)
+                    continue
+                rows.append((path, directory, size, mtime, fp))
+                if previous and previous != fp:
+                    index.rename_import(previous, fp)
+            index.put_files(rows)
+            known = index.imports(os.path.abspath(library) if library else '')
+            known.update(imported)
+            # 未变化的目录中的文件也要检查：它们可能还没有导入这个媒体库
+            files = {}
+            for root in roots:
+                files.update(index.files_under(root))
+            for path in sorted(files):
+                fp = files[path]
+                # 已导入的指纹包括被移动或改名的文件
+                if fp not in known:
+                    known.add(fp)
+                    title, year = parse_filename(os.path.basename(path))
+                    result.records.append({'title': title, 'year': year})
+                    result.fingerprints.append(fp)
+            index.commit()
+        finally:
+            index.close()
+        return result
+
+    def record_imports(self, library: str, fingerprints: Iterable[str]):
+        """fingerprints 对应的文件已保存到 library 中，以后扫描时不再为它们生成记录"""
+        index = ScanIndex(self.index_path)
+        try:
+            index.put_imports(os.path.abspath(library), fingerprints)
+            index.commit()
+        finally:
+            index.close()
+
+    def _walk(self, root, index, result, progress, cancel) -> list:
+        cached = index.dirs_under(root)
+        visited = set()
+        pending = []
+        with ThreadPoolExecutor(max_workers=self.threads) as pool:
+            futures = {pool.submit(_list_dir, root, cached.get(root, (None,))[0]): root}
+            while futures and not cancel.is_set():
+                done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                for future in done:
+                    directory = futures.pop(future)
+                    mtime, subdirs, files = future.result()
+                    if mtime is None:
+                        continue
+                    visited.add(directory)
+                    if subdirs is None:
+                        result.dirs_skipped += 1
+                        subdirs = cached[directory][1]
+                    else:
+                        result.dirs_listed += 1
+                        index.put_dir(directory, mtime, subdirs)
+                        pending += self._changed_files(directory, files, index, result)
+                    for name in subdirs:
+                        path = os.path.join(directory, name)
+                        futures[pool.submit(_list_dir, path, cached.get(path, (None,))[0])] = path
+                progress('dirs', result.dirs_listed + result.dirs_skipped, 0)
+            if cancel.is_set():
+                for future in futures:
+                    future.cancel()
+                return []
+        # 已删除的目录
+        index.remove_dirs(path for path in cached if path not in visited)
+        return pending
+
+    @staticmethod
+    def _changed_files(directory, files, index, result) -> list:
+        stored = index.files_in(directory)
+        pending = []
+        for name, size, mtime in files:
+            path = os.path.join(directory, name)
+            result.files_found += 1
+            previous = stored.pop(path, None)
+            if previous is None or previous[:2] != (size, mtime):
+                pending.append((path, directory, size, mtime, previous and previous[2]))
+        # 剩下的是已删除的文件
+        index.remove_files(stored)
+        return pending
+
+    def _fingerprint(self, pending, progress, cancel) -> list[str]:
+        files = [(path, size) for path, _, size, _, _ in pending]
+        chunks = [files[start:start + FINGERPRINT_CHUNK]
+                  for start in range(0, len(files), FINGERPRINT_CHUNK)]
+        result = []
+        if self.workers > 1 and len(files) >= PARALLEL_MIN_FILES:
+            # spawn：调用方通常在有其他线程的 GUI 进程中，fork 可能死锁
+            with ProcessPoolExecutor(max_workers=self.workers,
+                                     mp_context=get_context('spawn')) as pool:
+                for chunk in pool.map(fingerprint_files, chunks):
+                    result += chunk
+                    progress('hash', len(result), len(files))
+                    if cancel.is_set():
+                        pool.shutdown(cancel_futures=True)
+                        break
+        else:
+            for chunk in chunks:
+                result += fingerprint_files(chunk)
+                progress('hash', len(result), len(files))
+                if cancel.is_set():
+                    break
+        return result
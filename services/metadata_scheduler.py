@@ -0,0 +1,126 @@
+import threading
+import time
+from typing import Callable
+import requests
+from requests.adapters import HTTPAdapter
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, Signal, Slot
+from services.instrumentation import metrics
+from services.omdb_worker import OMDB_URL, fetch_omdb, get_api_key, request_key
+
+
+class RateLimiter:
+    """线程安全的最小间隔限速器，rate 为每秒请求数，<= 0 表示不限速"""
+    def __init__(self, rate: float):
+        self._interval = 1.0 / rate if rate > 0 else 0.0
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        if not self._interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next)
+            self._next = slot + self._interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+class _FetchTask(QRunnable):
+    def __init__(self, scheduler: 'MetadataScheduler', key: str, title: str):
+        super().__init__()
+        self._scheduler = scheduler
+        self._key = key
+        self._title = title
+
+    def run(self):
+        scheduler = self._scheduler
+        info, answered = None, False
+        try:
+            scheduler._limiter.acquire()
+            info = scheduler._fetch(self._title)
+            answered = True
+        except Exception:
+            pass
+        # 在工作线程中发射，经队列连接回到调度器所在的 GUI 线程处理
+        scheduler._task_done.emit(self._key, info, answered)
+
+
+class MetadataScheduler(QObject):
+    """
+    元数据获取调度器。
+    使用固定大小的线程池和共享的 requests.Session（长连接复用），
+    同一标题同时只有一个请求在途，重复的请求合并到该请求上，并按配置限速。
+    """
+    fetched = Signal(str, dict)
+    task_started = Signal()
+    task_finished = Signal()
+    _task_done = Signal(str, object, bool)
+
+    def __init__(self, max_workers: int = 4, rate_limit: float = 5.0,
+                 api_key: str = None, plot: str = 'short', cache=None,
+                 url: str = OMDB_URL, parent=None):
+        """
+        :param cache: 可选的 OMDbCache，命中时不再发起网络请求。
+        """
+        super().__init__(parent)
+        self.api_key = get_api_key() if api_key is None else api_key
+        self.plot = plot
+        self.url = url
+        self.cache = cache
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(max_workers)
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_workers)
+        self._session.mount('http://', adapter)
+        self._session.mount('https://', adapter)
+        self._limiter = RateLimiter(rate_limit)
+        # key -> 等待该请求结果的回调列表
+        self._in_flight: dict[str, list[Callable[[dict], None]]] = {}
+        self._task_done.connect(self._on_task_done)
+
+    @property
+    def pending(self) -> int:
+        return len(self._in_flight)
+
+    def submit(self, title: str, callback: Callable[[dict], None] = None):
+        """请求获取 title 的元数据；成功时在 GUI 线程中调用 callback(info)"""
+        if not self.api_key:
+            return
+        key = request_key(title, self.plot)
+        if self.cache is not None:
+            hit, info = self.cache.get(key)
+            metrics.count('omdb.cache', result='hit' if hit else 'miss')
+            if hit:
+                if info is not None:
+                    if callback is not None:
+                        callback(info)
+                    self.fetched.emit(key, info)
+                return
+        callbacks = self._in_flight.get(key)
+        if callbacks is not None:
+            if callback is not None:
+                callbacks.append(callback)
+            return
+        self._in_flight[key] = [callback] if callback is not None else []
+        self.task_started.emit()
+        self._pool.start(_FetchTask(self, key, title))
+
+    def _fetch(self, title: str) -> dict | None:
+        return fetch_omdb(title, self.api_key, session=self._session,
+                          plot=self.plot, url=self.url)
+
+    @Slot(str, object, bool)
+    def _on_task_done(self, key: str, info, answered: bool):
+        callbacks = self._in_flight.pop(key, [])
+        # 只缓存服务器明确的答复，网络错误下次仍会重试
+        if answered and self.cache is not None:
+            self.cache.put(key, info)
+        if info is not None:
+            for callback in callbacks:
+                callback(info)
+            self.fetched.emit(key, info)
+        self.task_finished.emit()
+
+    def wait_for_done(self, msecs: int = -1) -> bool:
+        return self._pool.waitForDone(msecs)
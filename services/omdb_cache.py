@@ -0,0 +1,77 @@
+import json
+import sqlite3
+import time
+
+
+class OMDbCache:
+    """
+    OMDb 响应的持久化缓存，保存在一个 SQLite 文件中。
+    键为 omdb_worker.request_key 生成的请求键；条目有过期时间，
+    条目数超过上限时按最近访问时间淘汰（LRU），查无此片的结果也会缓存（负缓存）。
+    只应在创建它的线程（GUI 线程）中使用。
+    """
+    TTL = 30 * 24 * 3600
+    NEGATIVE_TTL = 24 * 3600
+    MAX_ENTRIES = 50_000
+
+    def __init__(self, path: str, ttl: float = None, negative_ttl: float = None,
+                 max_entries: int = None):
+        self.ttl = self.TTL if ttl is None else ttl
+        self.negative_ttl = self.NEGATIVE_TTL if negative_ttl is None else negative_ttl
+        self.max_entries = self.MAX_ENTRIES if max_entries is None else max_entries
+        self.hits = 0
+        self.misses = 0
+        self._conn = sqlite3.connect(path, isolation_level=None)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS omdb_cache (
+                key TEXT PRIMARY KEY,
+                value TEXT,
+                expires_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS omdb_cache_accessed ON omdb_cache(accessed_at);
+        """)
+        self._count = self._conn.execute('SELECT COUNT(*) FROM omdb_cache').fetchone()[0]
+
+    def get(self, key: str) -> tuple[bool, dict | None]:
+        """
+        返回 (是否命中, 元数据)。负缓存命中时元数据为 None。
+        """
+        now = time.time()
+        row = self._conn.execute(
+            'SELECT value, expires_at FROM omdb_cache WHERE key=?', (key,)).fetchone()
+        if row is None or row[1] < now:
+            self.misses += 1
+            return False, None
+        self._conn.execute('UPDATE omdb_cache SET accessed_at=? WHERE key=?', (now, key))
+        self.hits += 1
+        return True, (json.loads(row[0]) if row[0] is not None else None)
+
+    def put(self, key: str, info: dict | None):
+        """写入结果；info 为 None 表示查无此片"""
+        now = time.time()
+        ttl = self.ttl if info is not None else self.negative_ttl
+        value = json.dumps(info, ensure_ascii=False) if info is not None else None
+        existed = self._conn.execute(
+            'SELECT 1 FROM omdb_cache WHERE key=?', (key,)).fetchone() is not None
+        self._conn.execute(
+            'INSERT OR REPLACE INTO omdb_cache (key, value, expires_at, accessed_at) '
+            'VALUES (?, ?, ?, ?)', (key, value, now + ttl, now))
+        if not existed:
+            self._count += 1
+        if self._count > self.max_entries:
+            self._evict(self._count - self.max_entries)
+
+    def _evict(self, count: int):
+        self._conn.execute(
+            'DELETE FROM omdb_cache WHERE key IN '
+            '(SELECT key FROM omdb_cache ORDER BY accessed_at LIMIT ?)', (count,))
+        self._count -= count
+
+    def stats(self) -> dict:
+        return {'hits': self.hits, 'misses': self.misses, 'entries': self._count}
+
+    def close(self):
+        self._conn.close()
@@ -1,32 +1,73 @@
 import os
 import requests
 from PySide6.QtCore import QThread, Signal
-from dotenv import load_dotenv
+from models.media_model import normalize_title
+from services.instrumentation import metrics
+
+OMDB_URL = 'http://www.omdbapi.com/'
+
+_dotenv_loaded = False
+
+
+def get_api_key() -> str:
+    """读取 OMDB_API_KEY 环境变量；第一次调用时才加载 .env 文件"""
+    global _dotenv_loaded
+    if not _dotenv_loaded:
+        from dotenv import load_dotenv
+        load_dotenv()
+        _dotenv_loaded = True
+    return os.getenv('OMDB_API_KEY', '')
+
+
+def request_key(title: str, plot: str = 'short') -> str:
+    """同一请求的唯一键：plot 模式加规范化后的标题"""
+    return f'{plot}:{normalize_title(title)}'
+
+
+def fetch_omdb(title: str, api_key: str, session=None, plot: str = 'short',
+               timeout: float = 10, url: str = OMDB_URL) -> dict | None:
+    """
+    查询单个标题的元数据，成功时返回 {'poster_url', 'plot'}；
+    OMDb 明确答复查无此片时返回 None，HTTP 错误则抛出 requests.HTTPError。
+    :param session: 可选的 requests.Session，用于复用连接。
+    """
+    http = session or requests
+    params = {'t': title, 'apikey': api_key, 'plot': plot}
+    try:
+        with metrics.timer('omdb.fetch'):
+            response = http.get(url, params=params, timeout=timeout)
+    except requests.RequestException as e:
+        metrics.count('omdb.errors', error=type(e).__name__)
+        raise
+    metrics.count('omdb.responses', status=response.status_code)
+    response.raise_for_status()
+    return parse_omdb(response.json())
+
+
+def parse_omdb(data: dict) -> dict | None:
+    """把 OMDb 的 JSON 响应转换为 MediaItem 的字段，查无此片时返回 None"""
+    if data.get('Response') == 'False':
+        return None
+    return {
+        'poster_url': data.get('Poster', ''),
+        'plot': data.get('Plot', '')
+    }
+
 
-load_dotenv()
 class OMDbWorker(QThread):
     fetched = Signal(dict)
 
     def __init__(self, title: str, parent=None):
         super().__init__(parent=parent)
         self.title = title
-        self.api_key = os.getenv('OMDB_API_KEY', '')
-        print("OMDb API Key:", self.api_key)
+        self.api_key = get_api_key()
 
     def run(self):
         if not self.api_key:
             return
-        url = 'http://www.omdbapi.com/'
-        params = {'t': self.title, 'apikey': self.api_key, 'plot': 'short'}
         try:
-            response = requests.get(url, params=params, timeout=10)
-            print(response)
-            if response.status_code == 200:
-                data = response.json()
-                info = {
-                    'poster_url': data.get('Poster', ''),
-                    'plot': data.get('Plot', '')
-                }
+            info = fetch_omdb(self.title, self.api_key)
+            if info is not None:
                 self.fetched.emit(info)
         except Exception:
-            pass
\ No newline at end of file
+            pass
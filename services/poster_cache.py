@@ -0,0 +1,147 @@
+import hashlib
+import os
+from collections import OrderedDict
+import requests
+from requests.adapters import HTTPAdapter
+from PySide6.QtCore import QObject, QRunnable, QSize, Qt, QThreadPool, Signal, Slot
+from PySide6.QtGui import QImage, QPixmap
+
+
+class PixmapLRU:
+    """按字节数限定容量的 QPixmap 缓存，超出时淘汰最久未使用的条目"""
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.used_bytes = 0
+        self._entries: OrderedDict[str, tuple[QPixmap, int]] = OrderedDict()
+
+    @staticmethod
+    def _cost(pixmap: QPixmap) -> int:
+        return pixmap.width() * pixmap.height() * max(pixmap.depth(), 8) // 8
+
+    def get(self, key: str) -> QPixmap | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        self._entries.move_to_end(key)
+        return entry[0]
+
+    def put(self, key: str, pixmap: QPixmap):
+        if key in self._entries:
+            self.used_bytes -= self._entries.pop(key)[1]
+        cost = self._cost(pixmap)
+        self._entries[key] = (pixmap, cost)
+        self.used_bytes += cost
+        while self.used_bytes > self.max_bytes and len(self._entries) > 1:
+            _, (_, evicted) = self._entries.popitem(last=False)
+            self.used_bytes -= evicted
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class _DownloadTask(QRunnable):
+    def __init__(self, cache: 'PosterCache', url: str):
+        super().__init__()
+        self._cache = cache
+        self._url = url
+
+    def run(self):
+        cache = self._cache
+        path = cache.disk_path(self._url)
+        if os.path.exists(path):
+            # 磁盘上已有缩略图，直接交给解码线程池读取
+            cache._decode_pool.start(_DecodeTask(cache, self._url, None, path))
+            return
+        try:
+            response = cache._session.get(self._url, timeout=cache.timeout)
+            response.raise_for_status()
+        except Exception:
+            cache._loaded.emit(self._url, None)
+            return
+        cache._decode_pool.start(_DecodeTask(cache, self._url, response.content, path))
+
+
+class _DecodeTask(QRunnable):
+    def __init__(self, cache: 'PosterCache', url: str, data: bytes | None, path: str):
+        super().__init__()
+        self._cache = cache
+        self._url = url
+        self._data = data
+        self._path = path
+
+    def run(self):
+        cache = self._cache
+        if self._data is None:
+            image = QImage(self._path)
+        else:
+            image = QImage.fromData(self._data)
+            if not image.isNull():
+                image = image.scaled(cache.thumb_size, Qt.KeepAspectRatio,
+                                     Qt.SmoothTransformation)
+                tmp_path = self._path + '.tmp'
+                if image.save(tmp_path, 'PNG'):
+                    os.replace(tmp_path, self._path)
+        cache._loaded.emit(self._url, None if image.isNull() else image)
+
+
+class PosterCache(QObject):
+    """
+    海报缩略图缓存。
+    下载在 I/O 线程池中通过共享 requests.Session 完成，解码和缩放在另一个线程池中进行；
+    缩略图以 URL 的 SHA-1 命名保存到磁盘，内存中再按字节数做 LRU 缓存。
+    QPixmap 只在 GUI 线程中由 QImage 转换得到。
+    """
+    thumbnail_ready = Signal(str)
+    _loaded = Signal(str, object)
+
+    def __init__(self, cache_dir: str, thumb_size: QSize = QSize(32, 48),
+                 memory_bytes: int = 32 * 1024 * 1024, download_workers: int = 8,
+                 timeout: float = 10, parent=None):
+        super().__init__(parent)
+        self.cache_dir = cache_dir
+        self.thumb_size = thumb_size
+        self.timeout = timeout
+        os.makedirs(cache_dir, exist_ok=True)
+        self._memory = PixmapLRU(memory_bytes)
+        self._download_pool = QThreadPool(self)
+        self._download_pool.setMaxThreadCount(download_workers)
+        self._decode_pool = QThreadPool(self)
+        self._decode_pool.setMaxThreadCount(max(1, os.cpu_count() or 1))
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_maxsize=download_workers)
+        self._session.mount('http://', adapter)
+        self._session.mount('https://', adapter)
+        self._requested: set[str] = set()
+        self._failed: set[str] = set()
+        self._loaded.connect(self._on_loaded)
+
+    def disk_path(self, url: str) -> str:
+        return os.path.join(self.cache_dir, hashlib.sha1(url.encode('utf-8')).hexdigest() + '.png')
+
+    def get(self, url: str) -> QPixmap | None:
+        """
+        返回已就绪的缩略图；尚未就绪时返回 None 并在后台开始加载，
+        加载完成后发出 thumbnail_ready(url)。
+        """
+        pixmap = self._memory.get(url)
+        if pixmap is not None:
+            return pixmap
+        if url not in self._requested and url not in self._failed:
+            self._requested.add(url)
+            self._download_pool.start(_DownloadTask(self, url))
+        return None
+
+    def has_failed(self, url: str) -> bool:
+        return url in self._failed
+
+    @Slot(str, object)
+    def _on_loaded(self, url: str, image):
+        self._requested.discard(url)
+        if image is None:
+            self._failed.add(url)
+            return
+        self._memory.put(url, QPixmap.fromImage(image))
+        self.thumbnail_ready.emit(url)
+
+    def wait_for_done(self, msecs: int = -1) -> bool:
+        return self._download_pool.waitForDone(msecs) and self._decode_pool.waitForDone(msecs)
@@ -0,0 +1,73 @@
+import threading
+import time
+from PySide6.QtCore import QObject, Signal
+from services.media_scanner import MediaScanner
+
+
+class ScanRunner(QObject):
+    """
+    在后台线程中运行 MediaScanner.scan，通过排队的 Qt 信号把进度和结果交回 GUI 线程。
+    进度信号最多每 PROGRESS_INTERVAL 秒发出一次。
+    """
+    PROGRESS_INTERVAL = 0.1
+
+    progress = Signal(str, int, int)
+    finished = Signal(object)
+    failed = Signal(str)
+    task_started = Signal()
+    task_finished = Signal()
+
+    def __init__(self, scanner: MediaScanner, parent=None):
+        super().__init__(parent)
+        self.scanner = scanner
+        self._thread = None
+        self._cancel = threading.Event()
+        self._last_progress = 0.0
+
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, roots: list[str], library: str = '', imported=()):
+        """library 和 imported 见 MediaScanner.scan"""
+        if self.is_running():
+            return
+        self._cancel.clear()
+        self.task_started.emit()
+        self._thread = threading.Thread(
+            target=self._run, args=(list(roots), library, list(imported)), daemon=True)
+        self._thread.start()
+
+    def record_imports(self, library: str, fingerprints: list[str]):
+        """
+        在后台线程中调用 MediaScanner.record_imports；扫描进行中时
+        SQLite 的写锁可能要等扫描结束才能拿到，不在 GUI 线程中等待。
+        """
+        if not fingerprints:
+            return
+        self.task_started.emit()
+        threading.Thread(target=self._record, args=(library, list(fingerprints)),
+                         daemon=True).start()
+
+    def cancel(self):
+        self._cancel.set()
+
+    def _on_progress(self, phase: str, done: int, total: int):
+        now = time.monotonic()
+        if now - self._last_progress >= self.PROGRESS_INTERVAL or done == total:
+            self._last_progress = now
+            self.progress.emit(phase, done, total)
+
+    def _run(self, roots, library, imported):
+        try:
+            self.finished.emit(self.scanner.scan(
+                roots, self._on_progress, self._cancel, library, imported))
+        except Exception as e:
+            self.failed.emit(str(e))
+        self.task_finished.emit()
+
+    def _record(self, library, fingerprints):
+        try:
+            self.scanner.record_imports(library, fingerprints)
+        except Exception as e:
+            self.failed.emit(str(e))
+        self.task_finished.emit()
@@ -0,0 +1,201 @@
+"""
+会话缓存：关闭窗口时把当前媒体库写成二进制快照（格式与 .mlib 媒体库相同），
+连同源文件的指纹和视图状态（排序、列宽、滚动位置）保存在 config.ini 旁边。
+下次启动时直接映射快照并显示，条目按需解码；随后在后台线程中重新计算源文件的指纹，
+与缓存时不一致则发出 stale，由调用方把文件中的变化应用到已显示的数据上。
+
+    <名称>.mlib  条目
+    <名称>.order 排序后的显示顺序（小端 int32 行号），没有排序时不存在
+    <名称>.json  {'version', 'source', 'rows', 'files': [[路径, 大小, mtime_ns, 摘要], ...], 'view'}
+元数据最后写入并原子替换；两个文件都存在、版本和行数一致时缓存才被使用。
+指纹同时覆盖源文件的追加日志（<源文件>.journal），不存在的文件记为 None。
+"""
+import hashlib
+import json
+import os
+import tempfile
+import sys
+import threading
+from array import array
+from dataclasses import dataclass, field
+from PySide6.QtCore import QObject, Signal, Slot
+from repository.binary_repository import BinaryRepository
+from repository.journaled_repository import JournaledJSONRepository
+
+CACHE_VERSION = 1
+_CHUNK = 1 << 20
+
+
+def file_digest(path: str) -> str:
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        while chunk := f.read(_CHUNK):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def fingerprint(source: str, digests: bool = True) -> list:
+    """[[路径, 大小, mtime_ns, 摘要], ...]，覆盖源文件及其追加日志；digests 为 False 时摘要为 None"""
+    result = []
+    for path in (source, JournaledJSONRepository.journal_path(source)):
+        try:
+            stat = os.stat(path)
+            result.append([path, stat.st_size, stat.st_mtime_ns,
+                           file_digest(path) if digests else None])
+        except OSError:
+            result.append([path, None, None, None])
+    return result
+
+
+@dataclass
+class SessionEntry:
+    """恢复的缓存：items 为按需解码的快照条目，order 为保存时的显示顺序"""
+    source: str
+    items: list
+    files: list
+    view: dict = field(default_factory=dict)
+    order: array | None = None
+
+
+class SessionCache(QObject):
+    """
+    会话缓存的读取（GUI 线程，只映射文件）、校验和写入（后台线程）。
+    校验先比较大小和 mtime，一致时再比较完整内容的摘要，
+    因此 mtime 被保留的覆盖（例如从备份恢复）也能发现。
+    """
+    verified = Signal(str)
+    stale = Signal(str)
+    stored = Signal(str)
+    failed = Signal(str, str)
+    task_started = Signal()
+    task_finished = Signal()
+    # 工作线程 -> GUI 线程：(操作, 源文件, 错误信息)
+    _done = Signal(str, str, str)
+
+    def __init__(self, path: str, parent=None):
+        """:param path: 快照文件路径，元数据写在同名的 .json 文件中"""
+        super().__init__(parent)
+        self.snapshot_path = path
+        self.meta_path = os.path.splitext(path)[0] + '.json'
+        self.order_path = os.path.splitext(path)[0] + '.order'
+        self._thread = None
+        self._done.connect(self._on_done)
+
+    def restore(self, source: str) -> SessionEntry | None:
+        """source 的缓存；没有缓存、缓存属于其他文件或已损坏时返回 None"""
+        source = os.path.abspath(source)
+        try:
+            with open(self.meta_path, encoding='utf-8') as f:
+                meta = json.load(f)
+            if meta.get('version') != CACHE_VERSION or meta.get('source') != source \
+                    or not os.path.exists(source):
+                return None
+            items = BinaryRepository().load(self.snapshot_path)
+        except (OSError, ValueError):
+            return None
+        if len(items) != meta.get('rows'):
+            return None
+        return SessionEntry(source, items, meta.get('files', []), meta.get('view', {}),
+                            self._read_order(len(items)) if meta.get('ordered') else None)
+
+    def _read_order(self, rows: int) -> array | None:
+        # 显示顺序让排序的视图不必在启动时解码全部条目来建立排序列
+        order = array('i')
+        try:
+            with open(self.order_path, 'rb') as f:
+                order.frombytes(f.read())
+        except (OSError, ValueError):
+            return None
+        if sys.byteorder == 'big':
+            order.byteswap()
+        return order if len(order) == rows else None
+
+    def verify(self, entry: SessionEntry):
+        """在后台比较源文件与缓存时的指纹，结果通过 verified / stale 发出"""
+        self._start(self._verify, entry)
+
+    def store(self, snapshot, source: str, view: dict = None, order=None):
+        """
+        在后台把快照写入缓存，调用方保证它与 source 的内容一致（例如刚保存或加载完）。
+        :param snapshot: LibraryController.snapshot() 的结果，写完后关闭。
+        :param order: 排序后的显示顺序（源行号序列），没有排序时为 None。
+        """
+        self._start(self._store, snapshot, os.path.abspath(source), view or {}, order)
+
+    def clear(self):
+        """删除缓存；元数据先删除，快照即使删除失败（仍被映射）也不会再被使用"""
+        for path in (self.meta_path, self.snapshot_path, self.order_path):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def is_busy(self) -> bool:
+        return self._thread is not None
+
+    def wait(self, timeout: float = None) -> bool:
+        thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+            return not thread.is_alive()
+        return True
+
+    def _start(self, target, *args):
+        # 写入和校验都很少发生，前一个还在进行时等待它结束
+        self.wait()
+        self.task_started.emit()
+        self._thread = threading.Thread(target=target, args=args, daemon=True)
+        self._thread.start()
+
+    def _verify(self, entry: SessionEntry):
+        kind = 'stale'
+        try:
+            quick = fingerprint(entry.source, digests=False)
+            if [f[:3] for f in quick] == [f[:3] for f in entry.files] \
+                    and fingerprint(entry.source) == entry.files:
+                kind = 'verified'
+        except Exception:
+            pass
+        self._done.emit(kind, entry.source, '')
+
+    def _store(self, snapshot, source: str, view: dict, order):
+        error = ''
+        try:
+            files = fingerprint(source)
+            # 先删除旧的元数据，中途失败时不会把新快照与旧指纹配在一起；
+            # 快照原子替换，映射中的旧快照在替换后仍然有效
+            if os.path.exists(self.meta_path):
+                os.remove(self.meta_path)
+            BinaryRepository().save(snapshot, self.snapshot_path)
+            if order is not None:
+                order = array('i', order)
+                if sys.byteorder == 'big':
+                    order.byteswap()
+                with open(self.order_path, 'wb') as f:
+                    order.tofile(f)
+            meta = {'version': CACHE_VERSION, 'source': source, 'rows': len(snapshot),
+                    'files': files, 'view': view, 'ordered': order is not None}
+            fd, tmp_path = tempfile.mkstemp(prefix='.session-', suffix='.tmp',
+                                            dir=os.path.dirname(self.meta_path))
+            try:
+                with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                    json.dump(meta, f, ensure_ascii=False)
+                os.replace(tmp_path, self.meta_path)
+            except BaseException:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+        except Exception as e:
+            error = str(e) or type(e).__name__
+        finally:
+            snapshot.close()
+        self._done.emit('stored', source, error)
+
+    @Slot(str, str, str)
+    def _on_done(self, kind: str, source: str, error: str):
+        self._thread = None
+        if error:
+            self.failed.emit(source, error)
+        else:
+            getattr(self, kind).emit(source)
+        self.task_finished.emit()
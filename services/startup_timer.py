@@ -0,0 +1,37 @@
+import os
+import sys
+import time
+
+# 设置为 1 时在标准错误输出启动各阶段耗时；设置为 exit 时输出后立即退出（供计时脚本使用）
+TIMING_ENV = 'MEDIA_LIBRARY_STARTUP_TIMING'
+
+
+class StartupTimer:
+    """记录启动过程中各阶段的结束时间，阶段耗时为与上一个标记之间的间隔"""
+    def __init__(self):
+        self._start = time.perf_counter()
+        self._marks: list[tuple[str, float]] = []
+
+    def mark(self, phase: str):
+        self._marks.append((phase, time.perf_counter()))
+
+    def phases(self) -> list[tuple[str, float]]:
+        """[(阶段名, 毫秒), ...]"""
+        result, previous = [], self._start
+        for phase, at in self._marks:
+            result.append((phase, (at - previous) * 1000))
+            previous = at
+        return result
+
+    def total(self) -> float:
+        return (self._marks[-1][1] - self._start) * 1000 if self._marks else 0.0
+
+    def report(self, out=None):
+        out = out or sys.stderr
+        for phase, ms in self.phases():
+            print(f'startup: {phase:24} {ms:8.1f}ms', file=out)
+        print(f'startup: {"total":24} {self.total():8.1f}ms', file=out)
+
+    @staticmethod
+    def mode() -> str:
+        return os.environ.get(TIMING_ENV, '')
@@ -7,6 +7,10 @@ class SettingsManager:
         self._file = os.path.join(base_dir, 'config.ini')
         self._settings = QSettings(self._file, QSettings.IniFormat)
 
+    def data_path(self, filename: str) -> str:
+        """与 config.ini 位于同一目录的数据文件路径"""
+        return os.path.join(os.path.dirname(self._file), filename)
+
     def value(self, key: str, default=None):
         return self._settings.value(key, default)
 
@@ -18,3 +22,71 @@ class SettingsManager:
 
     def set_last_path(self, path: str):
         self.set_value('file/last_path', path)
+
+    def get_theme(self) -> str:
+        return self.value('ui/theme', 'dark_teal.xml')
+
+    def set_theme(self, theme: str):
+        self.set_value('ui/theme', theme)
+
+    def get_load_last_library(self) -> bool:
+        value = self.value('startup/load_last_library', 'true')
+        return str(value).lower() in ('1', 'true', 'yes')
+
+    def get_session_cache_enabled(self) -> bool:
+        """启动时先显示上次会话缓存的媒体库，再在后台核对源文件"""
+        value = self.value('startup/session_cache', 'true')
+        return str(value).lower() in ('1', 'true', 'yes')
+
+    def is_journal_enabled(self) -> bool:
+        value = self.value('storage/journal', 'false')
+        return str(value).lower() in ('1', 'true', 'yes')
+
+    def get_autosave_delay(self) -> float:
+        """最后一次修改后自动保存的延迟秒数，0 表示不自动保存"""
+        return float(self.value('storage/autosave_delay', 0))
+
+    def get_watch_library(self) -> bool:
+        """监视当前媒体库文件，其他程序修改后增量应用变化"""
+        value = self.value('storage/watch', 'true')
+        return str(value).lower() in ('1', 'true', 'yes')
+
+    def get_omdb_max_workers(self) -> int:
+        return int(self.value('omdb/max_workers', 4))
+
+    def get_omdb_rate_limit(self) -> float:
+        return float(self.value('omdb/rate_limit', 5.0))
+
+    def get_omdb_concurrency(self) -> int:
+        return int(self.value('omdb/concurrency', 16))
+
+    def get_omdb_batch_rate_limit(self) -> float:
+        return float(self.value('omdb/batch_rate_limit', 0))
+
+    def get_metrics_enabled(self) -> bool:
+        value = self.value('metrics/enabled', 'false')
+        return str(value).lower() in ('1', 'true', 'yes')
+
+    def set_metrics_enabled(self, enabled: bool):
+        self.set_value('metrics/enabled', 'true' if enabled else 'false')
+
+    def get_metrics_port(self) -> int:
+        """本机 Prometheus 端点的端口，0 表示不提供"""
+        return int(self.value('metrics/port', 0))
+
+    def get_scan_dir(self) -> str:
+        return self.value('scanner/last_dir', '')
+
+    def set_scan_dir(self, path: str):
+        self.set_value('scanner/last_dir', path)
+
+    def get_scan_threads(self) -> int:
+        return int(self.value('scanner/threads', 8))
+
+    def get_scan_workers(self) -> int:
+        """计算文件指纹的进程数，0 表示 CPU 数"""
+        return int(self.value('scanner/workers', 0))
+
+    def get_duplicate_workers(self) -> int:
+        """查找重复项使用的进程数，0 表示 CPU 数"""
+        return int(self.value('duplicates/workers', 0))
@@ -0,0 +1,44 @@
+import os
+import time
+import pytest
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+from PySide6.QtGui import QGuiApplication
+from benchmarks.mock_omdb import MockOMDbServer
+from models.media_model import MediaItem
+
+@pytest.fixture(scope="session", autouse=True)
+def qt_app():
+    """整个测试会话共用一个 QGuiApplication"""
+    return QGuiApplication.instance() or QGuiApplication([])
+
+@pytest.fixture
+def omdb_server():
+    """本地替身 OMDb 服务器"""
+    with MockOMDbServer() as server:
+        yield server
+
+@pytest.fixture
+def media_items():
+    """
+    生成测试条目的函数：media_items(n) 返回 n 个条目，第 i 个为 ('T{i}', 'C', 2000 + i, float(i))；
+    关键字参数替换对应字段，值为常量或以 i 为参数的函数。
+    """
+    def make(n=5, **fields):
+        fields = {'title': lambda i: f'T{i}', 'creator': 'C', 'year': lambda i: 2000 + i,
+                  'rating': float, **fields}
+        return [MediaItem(**{name: value(i) if callable(value) else value
+                             for name, value in fields.items()}) for i in range(n)]
+    return make
+
+@pytest.fixture
+def wait_until(qt_app):
+    """处理事件直到 condition() 为真，超过 timeout 秒则失败"""
+    def wait(condition, timeout=5.0):
+        deadline = time.monotonic() + timeout
+        while not condition():
+            assert time.monotonic() < deadline, 'timed out'
+            qt_app.processEvents()
+            time.sleep(0.005)
+    return wait
@@ -0,0 +1,62 @@
+import json
+import unicodedata
+from benchmarks import suite
+from benchmarks.synthetic import synthetic_items
+
+
+def _result(seconds, rss=10.0):
+    return {'seconds': seconds, 'ops': 1, 'ops_per_s': 1 / seconds, 'peak_rss_mib': rss}
+
+
+def test_synthetic_items_are_deterministic():
+    assert synthetic_items(200, seed=3) == synthetic_items(200, seed=3)
+    assert synthetic_items(200, seed=3) != synthetic_items(200, seed=4)
+    assert len(synthetic_items(1234)) == 1234
+
+
+def test_synthetic_items_look_like_a_real_library():
+    items = synthetic_items(2000)
+    scripts = {'cjk': 0, 'kana': 0}
+    for item in items:
+        names = {unicodedata.name(c, '') for c in item.title}
+        scripts['cjk'] += any(name.startswith('CJK UNIFIED') for name in names)
+        scripts['kana'] += any(name.startswith(('HIRAGANA', 'KATAKANA')) for name in names)
+    assert scripts['cjk'] > len(items) * 0.4
+    assert scripts['kana'] > len(items) * 0.05
+    plots = sorted(len(item.plot) for item in items)
+    assert 0.1 < plots.count(0) / len(items) < 0.3
+    assert 50 < plots[len(plots) // 2] < 300 and plots[-1] <= 1000
+    assert all(1920 <= item.year <= 2025 and 0 <= item.rating <= 10 for item in items)
+
+
+def test_parse_and_format_sizes():
+    assert [suite.parse_size(s) for s in ('1k', '100K', '1m', '2500')] == [1000, 100_000, 1_000_000, 2500]
+    assert suite.result_key('json.load', 1_000_000) == 'json.load@1m'
+    assert suite.result_key('icons.render', None) == 'icons.render'
+
+
+def test_compare_flags_slowdowns_beyond_threshold():
+    baseline = {'results': {'a@1k': _result(0.100), 'b@1k': _result(0.001),
+                            'c@1k': _result(0.100, rss=100.0), 'gone@1k': _result(0.1)}}
+    current = {'results': {'a@1k': _result(0.150), 'b@1k': _result(0.002),
+                           'c@1k': _result(0.110, rss=200.0), 'new@1k': _result(0.1)}}
+    rows = suite.compare(baseline, current, threshold=0.2, min_ms=5, min_mib=8)
+    regressed = {(row['key'], row['metric']) for row in rows if row['regressed']}
+    # b 翻倍但只慢 1 ms，低于 min_ms；c 只慢 10%，但内存翻倍
+    assert regressed == {('a@1k', 'seconds'), ('c@1k', 'peak_rss_mib')}
+    assert {row['key'] for row in rows} == {'a@1k', 'b@1k', 'c@1k'}
+
+
+def test_compare_command_exit_status(tmp_path, capsys):
+    baseline, current = tmp_path / 'base.json', tmp_path / 'current.json'
+    baseline.write_text(json.dumps({'meta': {}, 'results': {'a@1k': _result(0.1)}}))
+    current.write_text(json.dumps({'meta': {}, 'results': {'a@1k': _result(0.1)}}))
+    assert suite.main(['compare', str(baseline), str(current)]) == 0
+    current.write_text(json.dumps({'meta': {}, 'results': {'a@1k': _result(0.5)}}))
+    assert suite.main(['compare', str(baseline), str(current)]) == 1
+    assert '变慢' in capsys.readouterr().out
+
+
+def test_run_case_in_process():
+    result = suite.run_case('controller.delete', 50, repeat=2)
+    assert result['ops'] == 50 and result['seconds'] > 0 and result['peak_rss_mib'] >= 0
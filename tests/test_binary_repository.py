@@ -0,0 +1,85 @@
+import time
+import pytest
+from PySide6.QtCore import QCoreApplication
+from controllers.library_controller import LibraryController
+from models.media_model import MediaItem
+from models.media_table_model import MediaTableModel
+from repository.binary_repository import BinaryRepository, SnapshotItems, convert
+from repository.json_repository import JSONRepository
+
+def make_items():
+    return [
+        MediaItem('千与千寻', '宫崎骏', 2001, 9.4, 'http://p/1.jpg', '少女误入神灵世界'),
+        MediaItem('The Matrix', 'Wachowski', 1999, 8.7),
+        MediaItem('龙猫', '宫崎骏', 1988, 9.2),
+        MediaItem('', '', -300, 0.1 + 0.2),
+    ]
+
+def test_round_trip_with_json(tmp_path):
+    items = make_items()
+    JSONRepository().save(items, str(tmp_path / 'a.json'))
+    convert(str(tmp_path / 'a.json'), str(tmp_path / 'b.mlib'))
+    convert(str(tmp_path / 'b.mlib'), str(tmp_path / 'c.json'))
+    assert (tmp_path / 'a.json').read_bytes() == (tmp_path / 'c.json').read_bytes()
+    assert list(BinaryRepository().iter_load(str(tmp_path / 'b.mlib'))) == items
+
+def test_lazy_items_behave_like_a_list(tmp_path):
+    path = str(tmp_path / 'lib.mlib')
+    repo = BinaryRepository(path)
+    repo.save(make_items())
+    loaded = repo.load()
+    assert isinstance(loaded, SnapshotItems)
+    assert loaded[2] is loaded[2]
+    assert loaded[-2].title == '龙猫'
+
+    extra = MediaItem('Akira', 'Otomo', 1988, 8.0)
+    loaded[1:1] = [extra]
+    del loaded[0]
+    assert loaded[0] is extra
+    assert [item.title for item in loaded] == ['Akira', 'The Matrix', '龙猫', '']
+
+    # 覆盖正在映射的文件
+    repo.save(loaded)
+    assert repo.load() == loaded
+
+def test_rejects_other_files(tmp_path):
+    path = tmp_path / 'lib.mlib'
+    path.write_bytes(b'[]' * 40)
+    with pytest.raises(ValueError):
+        BinaryRepository().load(str(path))
+    repo = BinaryRepository(str(path))
+    repo.save(make_items())
+    path.write_bytes(path.read_bytes()[:-5])
+    with pytest.raises(ValueError):
+        repo.load()
+
+def test_controller_binds_snapshot_directly(tmp_path):
+    path = str(tmp_path / 'lib.mlib')
+    BinaryRepository().save(make_items(), path)
+    model = MediaTableModel()
+    controller = LibraryController(model, BinaryRepository(path))
+    progress = []
+    controller.load_library(path, chunk_size=2, progress=lambda done, total: progress.append(done))
+    assert model.rowCount() == 4
+    assert progress and progress[-1] > 0
+    assert model.index(0, 0).data() == '千与千寻'
+    controller.add_item({'title': 'Heat', 'creator': 'Mann', 'year': 1995, 'rating': 8.3})
+    controller.save_library(path)
+    assert [item.title for item in BinaryRepository().load(path)][-1] == 'Heat'
+
+def test_search_index_reads_fields_without_decoding(tmp_path):
+    path = str(tmp_path / 'lib.mlib')
+    BinaryRepository().save(make_items() * 500, path)
+    items = BinaryRepository().load(path)
+    controller = LibraryController(MediaTableModel(), BinaryRepository(path))
+    controller.restore(items)
+    # 空闲时的索引预建和查询都直接读快照中的列
+    deadline = time.monotonic() + 0.3
+    while time.monotonic() < deadline:
+        QCoreApplication.processEvents()
+    assert controller.search('宫崎', min_rating=9.3) == list(range(0, 2000, 4))
+    assert controller.search('matrix', max_year=1999)[:2] == [1, 5]
+    assert items.pending == 2000
+    controller.edit_item(1, {'title': 'Reloaded'})
+    assert controller.search('matrix')[:2] == [5, 9]
+    assert items.pending == 1999
@@ -0,0 +1,63 @@
+import json
+import subprocess
+import sys
+import cli
+from models.media_model import MediaItem
+from repository.json_repository import JSONRepository
+
+def write_csv(path, text):
+    path.write_text(text, encoding='utf-8-sig')
+
+def test_import_export_round_trip(tmp_path, capsys):
+    write_csv(tmp_path / 'in.csv',
+              'title,creator,year,rating,plot\n'
+              '千与千寻,宫崎骏,2001,9.4,"少女,神灵"\n'
+              'Heat,Mann,,8.3,\n'
+              'Broken,X,abc,1,\n')
+    assert cli.main(['import', str(tmp_path / 'in.csv'), '-o', str(tmp_path / 'lib.json')]) == 0
+    assert 'record 3: skipped' in capsys.readouterr().err
+    items = JSONRepository().load(str(tmp_path / 'lib.json'))
+    assert items == [MediaItem('千与千寻', '宫崎骏', 2001, 9.4, '', '少女,神灵'),
+                     MediaItem('Heat', 'Mann', 0, 8.3)]
+
+    assert cli.main(['export', str(tmp_path / 'lib.json'), '-o', str(tmp_path / 'out.csv')]) == 0
+    assert cli.main(['import', str(tmp_path / 'out.csv'), '-o', str(tmp_path / 'lib.mlib')]) == 0
+    assert cli.main(['export', str(tmp_path / 'lib.mlib'), '-o', str(tmp_path / 'again.json')]) == 0
+    assert JSONRepository().load(str(tmp_path / 'again.json')) == items
+
+def test_merge_drops_duplicates(tmp_path, capsys):
+    JSONRepository().save([MediaItem('The Matrix', 'W', 1999, 8.7),
+                           MediaItem('Heat', 'Mann', 1995, 8.3)], str(tmp_path / 'a.json'))
+    JSONRepository().save([MediaItem('the  matrix', 'W', 1999, 8.0),
+                           MediaItem('Heat', 'Mann', 1986, 6.0)], str(tmp_path / 'b.json'))
+    out = str(tmp_path / 'm.json')
+    assert cli.main(['merge', str(tmp_path / 'a.json'), str(tmp_path / 'b.json'), '-o', out]) == 0
+    assert [(i.title, i.year) for i in JSONRepository().load(out)] == [
+        ('The Matrix', 1999), ('Heat', 1995), ('Heat', 1986)]
+    assert '1 duplicates dropped' in capsys.readouterr().err
+    cli.main(['merge', str(tmp_path / 'a.json'), str(tmp_path / 'b.json'), '-o', out, '--key', 'title'])
+    assert len(JSONRepository().load(out)) == 2
+
+def test_validate_reports_problems(tmp_path, capsys):
+    records = [{'title': 'A', 'year': 2000, 'rating': 5},
+               {'title': '', 'year': 'x', 'rating': 11, 'extra': 1},
+               {'title': 'a', 'year': 2000, 'rating': 5},
+               [1, 2]]
+    (tmp_path / 'v.json').write_text(json.dumps(records), encoding='utf-8')
+    assert cli.main(['validate', str(tmp_path / 'v.json')]) == 1
+    out = capsys.readouterr().out
+    assert 'record 2: error: missing title' in out
+    assert "record 2: error: invalid year 'x'" in out
+    assert 'record 2: warning: rating 11.0 outside 0..10' in out
+    assert 'record 3: warning: duplicate of record 1' in out
+    assert 'record 4: error: record is not an object' in out
+
+    (tmp_path / 'bad.json').write_text('[{"title": "A"}, {"title', encoding='utf-8')
+    assert cli.main(['validate', str(tmp_path / 'bad.json')]) == 1
+    assert cli.main(['validate', str(tmp_path / 'v.json').replace('v.json', 'missing.json')]) == 1
+
+def test_does_not_import_qt():
+    code = 'import sys, cli; print(any(m.startswith("PySide6") for m in sys.modules))'
+    result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True,
+                            cwd=cli.os.path.dirname(cli.__file__), check=True)
+    assert result.stdout.strip() == 'False'
@@ -0,0 +1,109 @@
+import pytest
+from PySide6.QtCore import Qt
+from controllers.commands import merge_rows
+from controllers.library_controller import LibraryController
+from models.media_table_model import MediaTableModel
+from models.search_proxy_model import SearchProxyModel
+from repository.sqlite_repository import SQLiteRepository
+
+def _creator(i):
+    return f'C{i % 3}'
+
+@pytest.fixture
+def library(tmp_path, media_items):
+    file = str(tmp_path / 'library.db')
+    SQLiteRepository().save(media_items(10, creator=_creator), file)
+    model = MediaTableModel()
+    controller = LibraryController(model, SQLiteRepository(file))
+    controller.load_library(file)
+    return controller, model, file
+
+def test_merge_rows():
+    assert merge_rows([9, 1, 2, 3, 7, 2]) == [(1, 3), (7, 1), (9, 1)]
+    assert merge_rows([]) == []
+
+def test_delete_rows_merges_ranges_and_undoes(library, media_items):
+    controller, model, file = library
+    removed = []
+    model.rowsRemoved.connect(lambda parent, first, last: removed.append((first, last)))
+
+    controller.delete_rows([7, 1, 3, 2, 9])
+    assert removed == [(9, 9), (7, 7), (1, 3)]
+    assert [item.title for item in controller.items()] == ['T0', 'T4', 'T5', 'T6', 'T8']
+    assert controller.undo_stack.undoText() == '删除 5 项'
+
+    controller.undo_stack.undo()
+    assert controller.items() == media_items(10, creator=_creator)
+    # 仓库中的行与模型保持一致
+    controller.save_library()
+    assert SQLiteRepository().load(file) == media_items(10, creator=_creator)
+
+    controller.undo_stack.redo()
+    assert model.rowCount() == 5
+    assert controller.search('T2') == []
+
+def test_edit_records_only_changed_fields(library):
+    controller, model, _ = library
+    controller.edit_item(2, {'title': 'Alien', 'creator': 'C2', 'year': 2002})
+    command = controller.undo_stack.command(0)
+    assert command._changes == {'title': ('T2', 'Alien')}
+    assert controller.search('alien') == [2]
+
+    # 没有变化的编辑不进入命令栈
+    controller.edit_item(2, {'title': 'Alien'})
+    assert controller.undo_stack.count() == 1
+
+    controller.undo_stack.undo()
+    assert controller.get_item(2).title == 'T2'
+    assert model.index(2, 0).data() == 'T2'
+    assert controller.search('alien') == []
+
+def test_batch_is_one_undo_step(library, media_items):
+    controller, model, _ = library
+    with controller.batch('导入'):
+        controller.add_items([{'title': 'A'}, {'title': 'B'}])
+        controller.delete_item(0)
+        controller.edit_item(0, {'rating': 9.5})
+    assert controller.undo_stack.count() == 1
+    assert model.rowCount() == 11
+    controller.undo_stack.undo()
+    assert controller.items() == media_items(10, creator=_creator)
+
+def test_loading_clears_history(library):
+    controller, _, file = library
+    controller.delete_item(0)
+    controller.load_library(file)
+    assert controller.undo_stack.count() == 0
+
+def test_many_ranges_rebuild_in_one_reset(library, media_items):
+    controller, model, file = library
+    controller.RESET_RANGES = 1
+    resets, removed = [], []
+    model.modelReset.connect(lambda: resets.append(model.rowCount()))
+    model.rowsRemoved.connect(lambda *args: removed.append(args))
+
+    controller.delete_rows([0, 2, 4, 6, 7])
+    assert resets == [5] and removed == []
+    assert [item.title for item in controller.items()] == ['T1', 'T3', 'T5', 'T8', 'T9']
+    assert controller.search('T5') == [2]
+
+    controller.undo_stack.undo()
+    assert controller.items() == media_items(10, creator=_creator)
+    controller.save_library()
+    assert SQLiteRepository().load(file) == media_items(10, creator=_creator)
+
+def test_scattered_delete_updates_a_sorted_view_once(library):
+    controller, model, file = library
+    proxy = SearchProxyModel(controller.search, controller.sort_order)
+    proxy.setSourceModel(model)
+    proxy.sort(3, Qt.DescendingOrder)
+    events = []
+    proxy.modelReset.connect(lambda: events.append('reset'))
+    proxy.layoutChanged.connect(lambda: events.append('layout'))
+
+    controller.delete_rows([0, 2, 4, 6, 7])
+    assert events == ['layout']
+    assert [proxy.index(r, 0).data() for r in range(proxy.rowCount())] == ['T9', 'T8', 'T5', 'T3', 'T1']
+    controller.undo_stack.undo()
+    assert events == ['layout', 'layout']
+    assert [proxy.index(r, 0).data() for r in range(proxy.rowCount())] == [f'T{i}' for i in range(9, -1, -1)]
@@ -0,0 +1,57 @@
+from controllers.library_controller import LibraryController
+from models.media_model import MediaItem
+from models.media_table_model import MediaTableModel
+from repository.json_repository import JSONRepository
+from services import duplicates
+from services.duplicates import edit_distance, find_duplicates, match_text, preferred_index
+
+def _library():
+    return [
+        MediaItem('The Matrix', 'Wachowski', 1999, 8.7),
+        MediaItem('Inception', 'Christopher Nolan', 2010, 8.8),
+        MediaItem('Matrix, The', 'wachowski', 1999, 0.0, poster_url='http://p/matrix.jpg'),
+        MediaItem('Incepton', 'Nolan', 2010, 8.0, plot='Dreams.'),
+        MediaItem('Rocky 2', 'Stallone', 1979, 7.0),
+        MediaItem('Rocky 3', 'Stallone', 1979, 6.8),
+        MediaItem('Inception', 'Christopher Nolan', 2011, 8.8),
+        MediaItem('ＴＨＥ　ＭＡＴＲＩＸ', 'Wachowski', 1999, 8.7),
+    ]
+
+def test_match_text_and_edit_distance():
+    assert match_text('Matrix, The', drop_article=True) == 'matrix'
+    assert match_text('ＴＨＥ　ＭＡＴＲＩＸ!', drop_article=True) == 'matrix'
+    assert match_text('The') == 'the'
+    assert edit_distance('inception', 'incepton', 2) == 1
+    assert edit_distance('kitten', 'sitting', 1) == 2
+
+def test_exact_and_fuzzy_groups():
+    groups = find_duplicates(_library())
+    assert [(group.rows, group.exact) for group in groups] == [([0, 2, 7], True), ([1, 3], False)]
+    # 只有精确阶段
+    assert [group.rows for group in find_duplicates(_library(), fuzzy=False)] == [[0, 2, 7]]
+
+def test_process_pool_gives_same_groups(monkeypatch):
+    monkeypatch.setattr(duplicates, 'PARALLEL_MIN_ITEMS', 1)
+    groups = find_duplicates(_library(), workers=2)
+    assert [(group.rows, group.exact) for group in groups] == [([0, 2, 7], True), ([1, 3], False)]
+
+def test_preferred_index():
+    items = _library()
+    assert preferred_index([items[0], items[2]]) == 1
+    assert preferred_index([items[1], items[6]]) == 0
+
+def test_merge_duplicates_fills_metadata_and_undoes():
+    items = _library()
+    controller = LibraryController(MediaTableModel(), JSONRepository())
+    controller._set_items(list(items))
+    keeper = controller.get_item(1)
+    controller.merge_duplicates([(keeper, [controller.get_item(3)]),
+                                 (controller.get_item(0), [controller.get_item(2), controller.get_item(7)])])
+    assert [item.title for item in controller.items()] == [
+        'The Matrix', 'Inception', 'Rocky 2', 'Rocky 3', 'Inception']
+    assert controller.get_item(0).poster_url == 'http://p/matrix.jpg'
+    assert keeper.plot == 'Dreams.'
+    assert controller.undo_stack.count() == 1
+
+    controller.undo_stack.undo()
+    assert controller.items() == items
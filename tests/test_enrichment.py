@@ -0,0 +1,56 @@
+import asyncio
+import pytest
+from controllers.library_controller import LibraryController
+from models.media_table_model import MediaTableModel
+from repository.json_repository import JSONRepository
+from services import enrichment
+from services.enrichment import EnrichmentEngine
+from services.enrichment_runner import EnrichmentRunner
+
+# 'alien' 与 'Alien' 只差大小写，应合并为同一次请求
+TITLES = ['Alien', 'alien', 'Heat', 'Missing', 'Up']
+
+@pytest.mark.parametrize('use_aiohttp', [True, False])
+def test_engine_batches_and_dedupes(omdb_server, tmp_path, monkeypatch, use_aiohttp,
+                                    media_items):
+    if not use_aiohttp:
+        monkeypatch.setattr(enrichment, 'aiohttp', None)
+    elif enrichment.aiohttp is None:
+        pytest.skip('aiohttp is not installed')
+    items = media_items(len(TITLES), title=TITLES.__getitem__)
+    batches = []
+    engine = EnrichmentEngine(api_key='k', concurrency=3, batch_size=2, url=omdb_server.url,
+                              cache_path=str(tmp_path / 'cache.sqlite3'))
+    stats = asyncio.run(engine.run(items, batches.append))
+
+    assert sorted(omdb_server.requests) == ['Alien', 'Heat', 'Missing', 'Up']
+    assert len(batches) == 2 and sum(map(len, batches)) == 4
+    assert {item.title: info['plot'] for b in batches for item, info in b} == {
+        'Alien': 'Alien plot', 'alien': 'Alien plot', 'Heat': 'Heat plot', 'Up': 'Up plot'}
+    assert stats['enriched'] == 4 and stats['failed'] == 0
+
+    # 第二次运行全部命中缓存
+    stats = asyncio.run(engine.run(items, batches.append))
+    assert len(omdb_server.requests) == 4
+    assert stats['cache_hits'] == 4 and stats['requests'] == 0
+
+def test_runner_applies_batches_through_controller(qt_app, omdb_server, media_items):
+    model = MediaTableModel()
+    controller = LibraryController(model, JSONRepository())
+    for item in media_items(len(TITLES), title=TITLES.__getitem__):
+        controller.add_item(item.to_dict())
+    changes = []
+    model.dataChanged.connect(lambda first, last: changes.append((first.row(), last.row())))
+
+    runner = EnrichmentRunner(EnrichmentEngine(api_key='k', batch_size=100, url=omdb_server.url))
+    runner.batch_ready.connect(controller.update_items)
+    done = []
+    runner.finished.connect(done.append)
+    runner.start(controller.items())
+    while not done:
+        qt_app.processEvents()
+    qt_app.processEvents()
+
+    assert controller.get_item(2).plot == 'Heat plot'
+    assert controller.get_item(3).plot == ''
+    assert changes == [(0, 4)]
@@ -0,0 +1,63 @@
+import pytest
+from PySide6.QtGui import QColor
+from iconmanager import icon_atlas, icon_manager
+from iconmanager.icon_atlas import DEVICE_PIXEL_RATIOS, IconAtlas, icon_colors, svg_digest
+from iconmanager.icon_manager import IconManager
+
+SVG = (b'<svg xmlns="http://www.w3.org/2000/svg" width="24" height="24">'
+       b'<rect x="4" y="4" width="16" height="16" fill="black"/></svg>')
+
+@pytest.fixture
+def icons(tmp_path):
+    directory = tmp_path / 'icons'
+    directory.mkdir()
+    (directory / 'add.svg').write_bytes(SVG)
+    (directory / 'broken.svg').write_bytes(b'not an svg')
+    return directory
+
+def test_build_and_load_round_trip(icons, tmp_path):
+    path = str(tmp_path / 'atlas.bin')
+    IconAtlas(path).build(str(icons), names=('add.svg', 'broken.svg', 'missing.svg'))
+
+    atlas = IconAtlas(path)
+    assert atlas.load()
+    digest = atlas.digest_of(str(icons / 'add.svg'))
+    assert digest == svg_digest(SVG)
+    assert atlas.digest_of(str(icons / 'missing.svg')) is None
+    for color in icon_colors():
+        for ratio in DEVICE_PIXEL_RATIOS:
+            image = atlas.image(digest, QColor(color), ratio)
+            assert image.width() == round(24 * ratio)
+            # 图形内部被着色为主题颜色，外部保持透明
+            assert image.pixelColor(image.width() // 2, image.height() // 2).name() == color
+            assert image.pixelColor(0, 0).alpha() == 0
+
+def test_load_rejects_corrupt_file(tmp_path):
+    path = tmp_path / 'atlas.bin'
+    assert not IconAtlas(str(path)).load()
+    path.write_bytes(b'MLIC\x01\x00')
+    assert not IconAtlas(str(path)).load()
+
+def test_manager_uses_atlas_without_rendering(icons, tmp_path, monkeypatch):
+    path = str(tmp_path / 'atlas.bin')
+    IconManager('dark_teal', base_path=str(icons), atlas_path=path).get_add_icon()
+
+    def fail(*args):
+        raise AssertionError('icon rendered at runtime')
+    monkeypatch.setattr(icon_atlas, 'render_icon', fail)
+    monkeypatch.setattr(icon_manager, 'render_icon', fail)
+    manager = IconManager('dark_teal', base_path=str(icons), atlas_path=path)
+    icon = manager.get_add_icon()
+    assert icon.availableSizes()
+    # 切换到另一种颜色的主题同样取自图集
+    manager.set_theme('light_blue.xml')
+    assert manager.get_add_icon() is not icon
+    assert manager.get_add_icon().availableSizes()
+
+def test_manager_rebuilds_when_svg_changes(icons, tmp_path):
+    path = str(tmp_path / 'atlas.bin')
+    IconManager('dark_teal', base_path=str(icons), atlas_path=path).get_add_icon()
+    (icons / 'add.svg').write_bytes(SVG.replace(b'width="24" height="24"', b'width="32"  height="32"'))
+    icon = IconManager('dark_teal', base_path=str(icons), atlas_path=path).get_add_icon()
+    assert icon.pixmap(32, 32).width() == 32
+    assert IconAtlas(path).load()
@@ -0,0 +1,100 @@
+import json
+import urllib.request
+import pytest
+import requests
+from repository.json_repository import JSONRepository
+from models.media_model import MediaItem
+from services import omdb_worker
+from services.instrumentation import Metrics, Profiler, metrics
+
+@pytest.fixture
+def enabled():
+    metrics.reset()
+    metrics.enabled = True
+    yield metrics
+    metrics.enabled = False
+    metrics.reset()
+
+def test_disabled_records_nothing(tmp_path):
+    metrics.reset()
+    assert not metrics.enabled
+    JSONRepository().save([MediaItem('A', 'B', 2000, 1.0)], str(tmp_path / 'a.json'))
+    with metrics.timer('x'):
+        pass
+    metrics.count('y')
+    assert metrics.snapshot() == {'counters': [], 'timings': {}}
+
+def test_repository_timings_and_json_dump(enabled, tmp_path):
+    path = str(tmp_path / 'library.json')
+    repository = JSONRepository()
+    repository.save([MediaItem('A', 'B', 2000, 1.0)], path)
+    repository.load(path)
+    repository.load(path)
+    timings = enabled.snapshot()['timings']
+    assert timings['repository.save']['count'] == 1
+    assert timings['repository.load']['count'] == 2
+    assert timings['repository.load']['max_ms'] >= timings['repository.load']['mean_ms']
+    enabled.dump_json(str(tmp_path / 'metrics.json'))
+    with open(tmp_path / 'metrics.json', encoding='utf-8') as f:
+        assert json.load(f)['timings'].keys() == timings.keys()
+
+class _Response:
+    def __init__(self, status_code, data):
+        self.status_code = status_code
+        self._data = data
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(str(self.status_code))
+
+    def json(self):
+        return self._data
+
+class _Session:
+    def __init__(self, responses):
+        self._responses = list(responses)
+
+    def get(self, url, params=None, timeout=None):
+        response = self._responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+def test_omdb_status_codes_and_errors(enabled):
+    session = _Session([_Response(200, {'Response': 'False'}), _Response(503, {}),
+                        requests.ConnectionError()])
+    assert omdb_worker.fetch_omdb('A', 'key', session=session) is None
+    for _ in range(2):
+        with pytest.raises(requests.RequestException):
+            omdb_worker.fetch_omdb('A', 'key', session=session)
+    counters = {(c['name'], tuple(c['labels'].items())): c['value']
+                for c in enabled.snapshot()['counters']}
+    assert counters == {('omdb.responses', (('status', 200),)): 1,
+                        ('omdb.responses', (('status', 503),)): 1,
+                        ('omdb.errors', (('error', 'ConnectionError'),)): 1}
+    assert enabled.snapshot()['timings']['omdb.fetch']['count'] == 3
+
+def test_prometheus_endpoint():
+    local = Metrics()
+    local.enabled = True
+    local.count('icon.cache', result='hit')
+    local.count('icon.cache', result='hit')
+    local.observe('repository.save', 0.25)
+    port = local.serve(0)
+    try:
+        with urllib.request.urlopen(f'http://127.0.0.1:{port}/metrics', timeout=5) as response:
+            text = response.read().decode('utf-8')
+    finally:
+        local.stop_serving()
+    assert 'media_library_icon_cache_total{result="hit"} 2' in text
+    assert 'media_library_duration_seconds_count{op="repository.save"} 1' in text
+    assert 'media_library_duration_seconds_sum{op="repository.save"} 0.250000' in text
+
+def test_profiler_writes_files(tmp_path):
+    profiler = Profiler()
+    profiler.start()
+    assert profiler.running
+    sorted(str(i) for i in range(1000))
+    written = profiler.stop(str(tmp_path / 'run'))
+    assert not profiler.running
+    assert [p.rsplit('/', 1)[-1] for p in written] == ['run.prof', 'run.alloc.txt']
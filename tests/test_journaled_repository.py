@@ -0,0 +1,95 @@
+import json
+import os
+import pytest
+from models.media_model import MediaItem
+from repository.json_repository import JSONRepository
+from repository.journaled_repository import JournaledJSONRepository
+
+def _seed(file, n=5):
+    JSONRepository().save([MediaItem(f'T{i}', 'C', 2000 + i, 5.0) for i in range(n)], str(file))
+
+def test_save_appends_journal_and_reload_replays(tmp_path):
+    file = tmp_path / "library.json"
+    _seed(file)
+    snapshot = file.read_bytes()
+
+    repo = JournaledJSONRepository(str(file))
+    items = repo.load()
+    items[1].title = 'Edited'
+    repo.update(1, items[1])
+    del items[0]
+    repo.delete(0)
+    items.append(MediaItem('New', 'D', 2020, 9.0))
+    repo.insert(len(items) - 1, items[-1])
+    repo.save(items)
+
+    assert file.read_bytes() == snapshot
+    assert os.path.exists(JournaledJSONRepository.journal_path(str(file)))
+    assert JournaledJSONRepository().load(str(file)) == items
+
+def test_failed_append_is_followed_by_compaction(tmp_path, monkeypatch):
+    file = tmp_path / "library.json"
+    _seed(file)
+    repo = JournaledJSONRepository(str(file))
+    items = repo.load()
+    items[0].title = 'Edited'
+    repo.update(0, items[0])
+    items.append(MediaItem('New', 'D', 2020, 9.0))
+    repo.insert(len(items) - 1, items[-1])
+
+    def fail(fd):
+        raise OSError('disk full')
+    # 记录已经写入日志文件，落盘时失败
+    monkeypatch.setattr(os, 'fsync', fail)
+    with pytest.raises(OSError):
+        repo.save(items)
+    monkeypatch.undo()
+
+    repo.save(items)
+    assert not os.path.exists(JournaledJSONRepository.journal_path(str(file)))
+    assert JournaledJSONRepository().load(str(file)) == items
+
+def test_compaction_rewrites_snapshot(tmp_path, monkeypatch):
+    file = tmp_path / "library.json"
+    _seed(file)
+    monkeypatch.setattr(JournaledJSONRepository, 'COMPACT_RECORDS', 2)
+
+    repo = JournaledJSONRepository(str(file))
+    items = repo.load()
+    for row in range(3):
+        items[row].rating = 1.0
+        repo.update(row, items[row])
+    repo.save(items)
+
+    assert not os.path.exists(JournaledJSONRepository.journal_path(str(file)))
+    assert JSONRepository().load(str(file)) == items
+
+def test_stale_and_truncated_journals(tmp_path):
+    file = tmp_path / "library.json"
+    _seed(file)
+    repo = JournaledJSONRepository(str(file))
+    items = repo.load()
+    items[0].title = 'A'
+    repo.update(0, items[0])
+    items[1].title = 'B'
+    repo.update(1, items[1])
+    repo.save(items)
+
+    # 崩溃留下半条记录：只重放完整的记录，且下一次保存重写快照
+    journal = JournaledJSONRepository.journal_path(str(file))
+    with open(journal, 'rb+') as f:
+        f.truncate(os.path.getsize(journal) - 5)
+    repo2 = JournaledJSONRepository(str(file))
+    loaded = repo2.load()
+    assert [i.title for i in loaded[:2]] == ['A', 'T1']
+    repo2.save(loaded)
+    assert not os.path.exists(journal)
+
+    # 其他程序重写了快照：旧日志不再重放
+    repo3 = JournaledJSONRepository(str(file))
+    items = repo3.load()
+    items[2].title = 'C'
+    repo3.update(2, items[2])
+    repo3.save(items)
+    _seed(file, n=3)
+    assert [i.title for i in JournaledJSONRepository().load(str(file))] == ['T0', 'T1', 'T2']
@@ -1,4 +1,5 @@
 import json
+import pytest
 from repository.json_repository import JSONRepository
 from models.media_model import MediaItem
 
@@ -10,3 +11,24 @@ def test_json_repository(tmp_path):
     loaded = repo.load(str(file))
     assert len(loaded) == 2
     assert loaded[0].title == 'X'
+
+
+def test_iter_load_streams_across_chunks(tmp_path, monkeypatch):
+    file = tmp_path / "repo.json"
+    items = [MediaItem(f'标题{i}', '导演', 2000 + i, 7.5, plot='剧情' * 50) for i in range(50)]
+    repo = JSONRepository(str(file))
+    repo.save(items)
+
+    # 读取块远小于单个元素，强制元素跨块解析
+    monkeypatch.setattr(JSONRepository, 'READ_CHUNK_SIZE', 64)
+    progress = []
+    loaded = list(repo.iter_load(progress=lambda done, total: progress.append((done, total))))
+    assert loaded == items
+    assert progress[-1][0] == progress[-1][1] == file.stat().st_size
+
+
+def test_iter_load_rejects_truncated_file(tmp_path):
+    file = tmp_path / "repo.json"
+    file.write_text('[{"title": "X"}, {"title": ', encoding='utf-8')
+    with pytest.raises(ValueError):
+        list(JSONRepository().iter_load(str(file)))
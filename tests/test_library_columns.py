@@ -0,0 +1,167 @@
+import pytest
+from PySide6.QtCore import QItemSelectionModel, Qt
+from controllers.library_controller import LibraryController
+from models.library_columns import LibraryColumns
+from models.media_model import MediaItem
+from models.media_table_model import MediaTableModel
+from models.search_index import SearchIndex
+from models.search_proxy_model import SearchProxyModel
+from repository.json_repository import JSONRepository
+
+def make_items():
+    return [
+        MediaItem('千与千寻', '宫崎骏', 2001, 9.4),
+        MediaItem('The Matrix', 'Wachowski', 1999, 8.7),
+        MediaItem('龙猫', '宫崎骏', 1988, 9.2),
+        MediaItem('akira', 'Otomo', 1988, 8.0),
+    ]
+
+def test_multi_key_sort():
+    columns = LibraryColumns()
+    columns.reset(make_items())
+    assert columns.sort_order([('rating', False)]).tolist() == [0, 2, 1, 3]
+    assert columns.sort_order([('year', True), ('rating', True)]).tolist() == [3, 2, 1, 0]
+    assert columns.sort_order([('title', True)]).tolist() == [3, 1, 0, 2]
+    assert columns.sort_order([('creator', True), ('year', False)]).tolist() == [3, 1, 0, 2]
+    assert columns.sort_order([('year', True)], rows=[0, 1, 2]).tolist() == [2, 1, 0]
+    assert columns.sort_order([]).tolist() == [0, 1, 2, 3]
+
+def test_incremental_maintenance_and_stats():
+    items = make_items()
+    columns = LibraryColumns()
+    columns.reset(items)
+    columns.ensure_built()
+    for i in range(1500):
+        items.append(MediaItem(f'x{i}', 'Otomo', 2000, 5.0))
+        columns.insert_rows(len(items) - 1)
+    items.insert(1, MediaItem('Heat', 'Mann', 1995, 8.3))
+    columns.insert_rows(1)
+    del items[5:]
+    columns.remove_rows(5, 1500)
+    items[0].rating = 1.5
+    columns.update_row(0)
+    assert columns.year.tolist() == [item.year for item in items]
+    assert columns.rating.tolist() == [item.rating for item in items]
+
+    stats = columns.stats()
+    assert stats['count'] == 5
+    assert stats['year_counts'] == {1988: 2, 1995: 1, 1999: 1, 2001: 1}
+    assert stats['rating_histogram'][8] == 3 and stats['rating_histogram'][1] == 1
+    assert stats['creators']['宫崎骏'] == (2, pytest.approx(5.35))
+    assert 'x0' not in stats['creators']
+    assert columns.stats(rows=[1, 3])['count'] == 2
+
+def test_title_ranks_follow_title_edits_only():
+    items = make_items()
+    columns = LibraryColumns()
+    columns.reset(items)
+    ranks = columns.sort_key('title')
+    items[1].rating = 1.0
+    columns.update_row(1)
+    assert columns.sort_key('title') is ranks
+    items[1].title = 'AKIRA'
+    columns.update_row(1)
+    assert columns.sort_key('title').tolist() == [1, 0, 2, 0]
+    items.append(MediaItem('Zardoz', 'Boorman', 1974, 5.9))
+    columns.insert_rows(4)
+    assert columns.sort_order([('title', True), ('rating', False)]).tolist() == [3, 1, 4, 0, 2]
+
+def test_proxy_sorts_through_controller():
+    model = MediaTableModel()
+    controller = LibraryController(model, JSONRepository())
+    proxy = SearchProxyModel(controller.search, controller.sort_order)
+    proxy.setSourceModel(model)
+    for item in make_items():
+        controller.add_item(item.to_dict())
+
+    proxy.sort(3, Qt.DescendingOrder)
+    assert [proxy.index(r, 0).data() for r in range(4)] == ['千与千寻', '龙猫', 'The Matrix', 'akira']
+    proxy.sort(2, Qt.AscendingOrder)
+    assert proxy.sort_keys == [('year', True), ('rating', False)]
+    assert [proxy.index(r, 0).data() for r in range(4)] == ['龙猫', 'akira', 'The Matrix', '千与千寻']
+    assert proxy.mapFromSource(model.index(3, 0)).row() == 1
+    assert proxy.headerData(0, Qt.Vertical) == '3'
+
+    proxy.set_criteria(**SearchIndex.parse_query('宫崎骏'))
+    assert [proxy.mapToSource(proxy.index(r, 0)).row() for r in range(2)] == [2, 0]
+    controller.edit_item(0, {'year': 1980})
+    assert [proxy.mapToSource(proxy.index(r, 0)).row() for r in range(2)] == [0, 2]
+
+    proxy.sort(-1)
+    proxy.set_criteria()
+    assert not proxy.is_sorted and proxy.rowCount() == 4
+
+def _sorted_view(n=40):
+    model = MediaTableModel()
+    controller = LibraryController(model, JSONRepository())
+    controller._set_items([MediaItem(f'T{i}', f'C{i % 3}', 2000 + i * 7 % n, float(i % 10))
+                           for i in range(n)])
+    proxy = SearchProxyModel(controller.search, controller.sort_order)
+    proxy.setSourceModel(model)
+    proxy.sort(2, Qt.DescendingOrder)
+    events = []
+    proxy.modelReset.connect(lambda: events.append('reset'))
+    proxy.layoutChanged.connect(lambda: events.append('layout'))
+    return controller, proxy, events
+
+def _displayed(proxy):
+    return [proxy.mapToSource(proxy.index(r, 0)).row() for r in range(proxy.rowCount())]
+
+def _expected(controller, proxy):
+    rows = controller.search(**proxy._criteria) if proxy._criteria else None
+    return controller.sort_order(proxy.sort_keys, rows).tolist()
+
+def _select(proxy, row):
+    selection = QItemSelectionModel(proxy)
+    selection.setCurrentIndex(proxy.index(row, 0),
+                              QItemSelectionModel.ClearAndSelect | QItemSelectionModel.Rows)
+    return selection
+
+def _selected_titles(controller, proxy, selection):
+    return [controller.get_item(proxy.mapToSource(index).row()).title
+            for index in selection.selectedRows()]
+
+def test_sorted_proxy_follows_row_changes_without_reset():
+    controller, proxy, events = _sorted_view()
+    selection = _select(proxy, 5)
+    title = _selected_titles(controller, proxy, selection)
+    keep = proxy.mapToSource(proxy.index(5, 0)).row()
+
+    controller.delete_rows([row for row in (1, 9, 17, 30) if row != keep])
+    assert _displayed(proxy) == _expected(controller, proxy)
+    controller.add_items([{'title': 'New', 'creator': 'C', 'year': 2020, 'rating': 1.0}])
+    assert _displayed(proxy) == _expected(controller, proxy)
+    # 编辑后行移动到新的位置，选择跟随它
+    row = controller.items().index(next(i for i in controller.items() if i.title == title[0]))
+    controller.edit_item(row, {'year': 1900})
+    assert _displayed(proxy) == _expected(controller, proxy)
+    assert proxy.mapFromSource(controller._model.index(row, 0)).row() == proxy.rowCount() - 1
+    while controller.undo_stack.canUndo():
+        controller.undo_stack.undo()
+    assert _displayed(proxy) == _expected(controller, proxy)
+    assert 'reset' not in events and 'layout' in events
+    assert _selected_titles(controller, proxy, selection) == title
+    assert selection.currentIndex().row() == 5
+
+def test_filtered_proxy_follows_row_changes_without_reset():
+    controller, proxy, events = _sorted_view()
+    proxy.set_criteria(**SearchIndex.parse_query('c1'))
+    events.clear()
+    selection = _select(proxy, 2)
+    title = _selected_titles(controller, proxy, selection)
+    matches = proxy.rowCount()
+
+    controller.delete_rows([proxy.mapToSource(proxy.index(0, 0)).row(), 0, 2])
+    assert _displayed(proxy) == _expected(controller, proxy)
+    controller.add_items([{'title': 'New', 'creator': 'C1', 'year': 1990, 'rating': 1.0},
+                          {'title': 'Other', 'creator': 'C2', 'year': 1990, 'rating': 1.0}])
+    assert _displayed(proxy) == _expected(controller, proxy)
+    assert proxy.rowCount() == matches
+    assert 'reset' not in events
+    assert _selected_titles(controller, proxy, selection) == title
+    # 只过滤不排序时同样如此；编辑后不再匹配的行从结果中消失
+    proxy.sort(-1)
+    events.clear()
+    controller.edit_item(proxy.mapToSource(proxy.index(0, 0)).row(), {'creator': 'Nobody'})
+    assert _displayed(proxy) == controller.search(**proxy._criteria)
+    assert proxy.rowCount() == matches - 1 and events == ['layout']
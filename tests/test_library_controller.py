@@ -1,18 +1,13 @@
 import os
 import json
-import pytest
-from PySide6.QtCore import QCoreApplication
-from PySide6.QtGui import QStandardItemModel
 from controllers.library_controller import LibraryController
+from models.media_table_model import MediaTableModel
 from repository.json_repository import JSONRepository
-
-@pytest.fixture(scope="module", autouse=True)
-def app():
-    return QCoreApplication([])
+from models.media_model import MediaItem
 
 def test_add_edit_delete(tmp_path):
     repo = JSONRepository()
-    model = QStandardItemModel()
+    model = MediaTableModel()
     controller = LibraryController(model, repo)
 
     data = {'title':'Test','creator':'John','year':2021,'rating':8.5}
@@ -23,7 +18,7 @@ def test_add_edit_delete(tmp_path):
     new_data = {'title':'Test2','creator':'Jane','year':2022,'rating':9.0}
     controller.edit_item(0, new_data)
     assert controller.get_item(0).title == 'Test2'
-    assert model.item(0,0).text() == 'Test2'
+    assert model.index(0,0).data() == 'Test2'
 
     controller.delete_item(0)
     assert model.rowCount() == 0
@@ -32,7 +27,7 @@ def test_add_edit_delete(tmp_path):
 def test_save_load(tmp_path):
     file = tmp_path / "library.json"
     repo = JSONRepository()
-    model = QStandardItemModel()
+    model = MediaTableModel()
     controller = LibraryController(model, repo)
 
     controller.add_item({'title':'A','creator':'X','year':2000,'rating':7})
@@ -43,8 +38,42 @@ def test_save_load(tmp_path):
         data = json.load(f)
     assert len(data) == 2
 
-    model2 = QStandardItemModel()
+    model2 = MediaTableModel()
     controller2 = LibraryController(model2, repo)
     controller2.load_library(str(file))
     assert model2.rowCount() == 2
-    assert controller2.get_item(1).title == 'B'
\ No newline at end of file
+    assert controller2.get_item(1).title == 'B'
+
+def test_chunked_load(tmp_path, qt_app):
+    file = tmp_path / "library.json"
+    repo = JSONRepository()
+    repo.save([MediaItem(f'T{i}', 'C', 2000, 5.0) for i in range(10)], str(file))
+
+    model = MediaTableModel()
+    controller = LibraryController(model, repo)
+    resets = []
+    model.modelReset.connect(lambda: resets.append(model.rowCount()))
+    controller.load_library(str(file), chunk_size=4)
+    assert resets == [4]
+    assert model.rowCount() == 4
+
+    while model.rowCount() < 10:
+        qt_app.processEvents()
+    assert controller.get_item(9).title == 'T9'
+
+def test_load_supersedes_chunked_load(tmp_path, qt_app):
+    file = tmp_path / "library.json"
+    repo = JSONRepository()
+    repo.save([MediaItem(f'T{i}', 'C', 2000, 5.0) for i in range(30)], str(file))
+
+    model = MediaTableModel()
+    controller = LibraryController(model, repo)
+    controller.load_library(str(file), chunk_size=10)
+    controller.load_library(str(file), chunk_size=10)
+    # 第一次加载剩余的块被丢弃并关闭，不会追加到第二次加载的结果中
+    while controller.loading:
+        qt_app.processEvents()
+    for _ in range(5):
+        qt_app.processEvents()
+    assert model.rowCount() == 30
+    assert [item.title for item in controller.items()] == [f'T{i}' for i in range(30)]
@@ -0,0 +1,127 @@
+import threading
+from PySide6.QtCore import QCoreApplication
+from controllers.library_controller import LibraryController
+from models.media_table_model import MediaTableModel
+from repository.json_repository import JSONRepository
+from repository.sqlite_repository import SQLiteRepository
+from services.library_saver import LibrarySaver
+
+def _controller(items, repository=None):
+    controller = LibraryController(MediaTableModel(), repository or JSONRepository())
+    controller._set_items(items)
+    return controller
+
+class _GatedRepository(JSONRepository):
+    """每次保存前等待 gate，记录保存时的标题"""
+    def __init__(self):
+        super().__init__()
+        self.gate = threading.Event()
+        self.saves = []
+
+    def save(self, items, path=None):
+        self.gate.wait(5)
+        titles = [item.title for item in items]
+        self.saves.append(titles)
+        super().save(items, path)
+
+def test_snapshot_keeps_values_from_when_it_was_taken(media_items):
+    controller = _controller(media_items())
+    snapshot = controller.snapshot()
+    controller.edit_item(1, {'title': 'Edited'})
+    controller.update_item(controller.get_item(2), {'plot': 'new plot'})
+    controller.delete_item(0)
+    assert [item.title for item in snapshot] == ['T0', 'T1', 'T2', 'T3', 'T4']
+    assert [item.plot for item in snapshot][2] == ''
+    snapshot.close()
+    # 关闭后的修改不再复制
+    assert controller.get_item(0).title == 'Edited'
+
+def test_saves_in_background_and_coalesces(tmp_path, media_items, wait_until):
+    repository = _GatedRepository()
+    controller = _controller(media_items(), repository)
+    saver = LibrarySaver(controller)
+    saved = []
+    saver.saved.connect(saved.append)
+    path = str(tmp_path / 'library.json')
+
+    saver.save(path)
+    assert saver.is_saving()
+    # 写入期间的修改和保存请求：快照不受影响，三次请求合并为一次
+    controller.edit_item(0, {'title': 'A'})
+    saver.save(path)
+    controller.edit_item(0, {'title': 'B'})
+    saver.save(path)
+    saver.save(path)
+    repository.gate.set()
+    wait_until(lambda: len(saved) == 2 and not saver.is_saving())
+
+    assert [titles[0] for titles in repository.saves] == ['T0', 'B']
+    assert JSONRepository().load(path)[0].title == 'B'
+
+def test_autosave_is_debounced(tmp_path, media_items, wait_until):
+    repository = _GatedRepository()
+    repository.gate.set()
+    controller = _controller(media_items(), repository)
+    saver = LibrarySaver(controller, autosave_delay=0.05)
+    saved = []
+    saver.saved.connect(saved.append)
+    path = str(tmp_path / 'library.json')
+    for title in ('A', 'B', 'C'):
+        controller.edit_item(0, {'title': title})
+        saver.schedule_autosave(path)
+    wait_until(lambda: saved)
+    wait_until(lambda: not saver.is_saving())
+    assert repository.saves == [['C', 'T1', 'T2', 'T3', 'T4']]
+
+    # 关闭自动保存后不再保存
+    saver.set_autosave_delay(0)
+    saver.schedule_autosave(path)
+    QCoreApplication.processEvents()
+    assert len(repository.saves) == 1
+
+def test_failure_is_reported(tmp_path, media_items, wait_until):
+    saver = LibrarySaver(_controller(media_items()))
+    failed = []
+    saver.failed.connect(lambda path, error: failed.append(path))
+    path = str(tmp_path / 'missing' / 'library.json')
+    saver.save(path)
+    wait_until(lambda: failed)
+    assert failed == [path] and not saver.is_saving()
+
+def test_repositories_bound_to_gui_thread_save_synchronously(tmp_path, media_items):
+    path = str(tmp_path / 'library.db')
+    saver = LibrarySaver(_controller(media_items(), SQLiteRepository()))
+    saved = []
+    saver.saved.connect(saved.append)
+    saver.save(path)
+    assert saved == [path] and not saver.is_saving()
+    assert SQLiteRepository().load(path) == media_items()
+
+def test_save_waits_for_a_chunked_load(tmp_path, media_items, wait_until):
+    path = str(tmp_path / 'library.json')
+    JSONRepository().save(media_items(25), path)
+    controller = LibraryController(MediaTableModel(), JSONRepository(path))
+    saver = LibrarySaver(controller)
+    saved = []
+    saver.saved.connect(saved.append)
+    controller.load_library(path, chunk_size=5)
+    assert controller.loading
+    saver.save(path)
+    assert saver.is_saving() and not saved
+    wait_until(lambda: saved)
+    assert not controller.loading
+    assert JSONRepository().load(path) == media_items(25)
+
+def test_save_requested_during_a_superseded_load_is_dropped(tmp_path, media_items, wait_until):
+    path, other = str(tmp_path / 'library.json'), str(tmp_path / 'other.json')
+    JSONRepository().save(media_items(25), path)
+    JSONRepository().save(media_items(3), other)
+    controller = LibraryController(MediaTableModel(), JSONRepository(path))
+    saver = LibrarySaver(controller)
+    finished = []
+    saver.task_finished.connect(lambda: finished.append(True))
+    controller.load_library(path, chunk_size=5)
+    saver.save(path)
+    controller.load_library(other)
+    wait_until(lambda: finished)
+    assert JSONRepository().load(path) == media_items(25)
@@ -0,0 +1,100 @@
+import os
+from PySide6.QtCore import QItemSelectionModel, Qt
+from controllers.library_controller import LibraryController
+from controllers.library_diff import diff_items
+from models.media_model import MediaItem
+from models.media_table_model import MediaTableModel
+from models.search_proxy_model import SearchProxyModel
+from repository.json_repository import JSONRepository
+from services.library_watcher import LibraryWatcher
+
+def test_diff_items(media_items):
+    old = media_items(10)
+    new = media_items(10)
+    new[3] = MediaItem('T3', 'C', 2003, 9.9)
+    del new[6:8]
+    new.insert(1, MediaItem('New', 'C', 1999, 1.0))
+    assert diff_items(old, new) == [
+        ('insert', 1, 1, 1, 2), ('replace', 3, 4, 4, 5), ('delete', 6, 8, 7, 7)]
+    assert diff_items(old, media_items(10)) == []
+    assert diff_items(old, old[:5]) == [('delete', 5, 10, 5, 5)]
+    # 变化太多时由调用方重新加载
+    assert diff_items(old, list(reversed(old)), max_changes=5) is None
+
+def test_apply_diff_touches_only_changed_rows(media_items):
+    model = MediaTableModel()
+    controller = LibraryController(model, JSONRepository())
+    controller._set_items(media_items(10))
+    new = media_items(10)
+    new[3] = MediaItem('T3', 'C', 2003, 9.9)
+    del new[6:8]
+    new.insert(1, MediaItem('New', 'C', 1999, 1.0))
+    events = []
+    model.modelReset.connect(lambda: events.append('reset'))
+    model.rowsInserted.connect(lambda parent, first, last: events.append(('insert', first, last)))
+    model.rowsRemoved.connect(lambda parent, first, last: events.append(('remove', first, last)))
+    model.dataChanged.connect(lambda top, bottom, roles=(): events.append(('changed', top.row())))
+
+    summary = controller.apply_diff(diff_items(controller.items(), new), new)
+    assert summary == {'inserted': 1, 'removed': 2, 'changed': 1}
+    assert controller.items() == new
+    assert events == [('remove', 6, 7), ('changed', 3), ('insert', 1, 1)]
+    assert controller.search('new') == [1]
+    controller.undo_stack.undo()
+    assert controller.items() == media_items(10)
+
+def test_apply_diff_updates_a_sorted_view_once(media_items):
+    model = MediaTableModel()
+    controller = LibraryController(model, JSONRepository())
+    controller._set_items(media_items(200))
+    proxy = SearchProxyModel(controller.search, controller.sort_order)
+    proxy.setSourceModel(model)
+    proxy.sort(2, Qt.DescendingOrder)
+    selection = QItemSelectionModel(proxy)
+    selection.select(proxy.index(150, 0), QItemSelectionModel.Select | QItemSelectionModel.Rows)
+    events = []
+    proxy.modelReset.connect(lambda: events.append('reset'))
+    proxy.layoutChanged.connect(lambda: events.append('layout'))
+
+    new = media_items(200)
+    for row in range(0, 200, 10):
+        new[row] = MediaItem(f'T{row}', 'C', 1900 + row, 1.0)
+    del new[101:103]
+    new.insert(5, MediaItem('New', 'C', 3000, 1.0))
+    summary = controller.apply_diff(diff_items(controller.items(), new), new)
+    assert summary == {'inserted': 1, 'removed': 2, 'changed': 20}
+    # 整个差异只更新一次代理，选择的行仍然是同一项
+    assert events == ['layout']
+    assert proxy.index(0, 0).data() == 'New'
+    assert [proxy.mapToSource(index).row() for index in selection.selectedRows()] == [50]
+    controller.undo_stack.undo()
+    controller.undo_stack.redo()
+    assert events == ['layout'] * 3
+    assert controller.items() == new
+    assert [proxy.mapToSource(index).row() for index in selection.selectedRows()] == [50]
+
+def test_external_rewrite_is_applied(tmp_path, media_items, wait_until):
+    path = str(tmp_path / 'library.json')
+    JSONRepository().save(media_items(10), path)
+    controller = LibraryController(MediaTableModel(), JSONRepository(path))
+    controller.load_library(path)
+    watcher = LibraryWatcher(controller)
+    watcher.DEBOUNCE_MS = 50
+    watcher._debounce.setInterval(50)
+    applied = []
+    watcher.applied.connect(lambda p, summary: applied.append(summary))
+    watcher.watch(path, lambda p: JSONRepository().load(p))
+
+    # 本程序自己的保存不算外部修改
+    controller.save_library(path)
+    watcher.mark_synced(path)
+    watcher._check()
+    assert watcher._thread is None
+
+    new = media_items(10)
+    new[0] = MediaItem('Changed', 'C', 2000, 0.0)
+    JSONRepository().save(new, path)
+    wait_until(lambda: applied)
+    assert applied == [{'inserted': 0, 'removed': 0, 'changed': 1}]
+    assert controller.get_item(0).title == 'Changed' and controller.row_count() == 10
+    watcher.unwatch()
@@ -0,0 +1,113 @@
+import os
+import shutil
+import pytest
+from services import media_scanner
+from services.media_scanner import MediaScanner, fingerprint, parse_filename
+
+@pytest.mark.parametrize('name, expected', [
+    ('The.Matrix.1999.1080p.BluRay.x264.mkv', ('The Matrix', 1999)),
+    ('[字幕组]霸王别姬 (1993).mkv', ('霸王别姬', 1993)),
+    ('千与千寻.2001.WEB-DL.mp4', ('千与千寻', 2001)),
+    ('1917 (2019).mp4', ('1917', 2019)),
+    ('2001.A.Space.Odyssey.mkv', ('2001 A Space Odyssey', 0)),
+    ('Movie.Name.720p.mkv', ('Movie Name', 0)),
+])
+def test_parse_filename(name, expected):
+    assert parse_filename(name) == expected
+
+def _write(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(data)
+
+@pytest.fixture
+def tree(tmp_path):
+    root = tmp_path / 'media'
+    _write(str(root / 'Alien (1979).mkv'), b'alien' * 100)
+    _write(str(root / 'a' / 'Heat.1995.mp4'), b'heat' * 100_000)
+    _write(str(root / 'a' / 'b' / 'Up.2009.avi'), b'up')
+    _write(str(root / 'a' / 'b' / 'notes.txt'), b'x')
+    _write(str(root / 'a' / 'b' / 'Up.2009.sample.avi'), b'sample')
+    return str(root), str(tmp_path / 'index.sqlite3')
+
+def _titles(result):
+    return sorted((record['title'], record['year']) for record in result.records)
+
+def _scan(scanner, root, library):
+    """扫描并把结果记为已导入 library，相当于添加后保存了媒体库"""
+    result = scanner.scan([root], library=library)
+    scanner.record_imports(library, result.fingerprints)
+    return result
+
+def test_rescan_is_incremental(tree):
+    root, index = tree
+    scanner = MediaScanner(index, threads=4, workers=1)
+    result = _scan(scanner, root, 'library.json')
+    assert _titles(result) == [('Alien', 1979), ('Heat', 1995), ('Up', 2009)]
+    assert (result.dirs_listed, result.dirs_skipped, result.files_found) == (3, 0, 3)
+
+    result = _scan(scanner, root, 'library.json')
+    assert result.records == []
+    assert (result.dirs_listed, result.dirs_skipped, result.files_hashed) == (0, 3, 0)
+
+    # 只重新列出发生变化的目录；移动的文件指纹不变，不算新文件
+    _write(os.path.join(root, 'a', 'b', 'Brazil 1985.mkv'), b'brazil')
+    os.rename(os.path.join(root, 'a', 'Heat.1995.mp4'), os.path.join(root, 'Heat.1995.mp4'))
+    result = _scan(scanner, root, 'library.json')
+    assert _titles(result) == [('Brazil', 1985)]
+    assert (result.dirs_listed, result.dirs_skipped) == (3, 0)
+
+    # 删除的目录从索引中移除
+    shutil.rmtree(os.path.join(root, 'a', 'b'))
+    result = _scan(scanner, root, 'library.json')
+    assert result.records == [] and (result.dirs_listed, result.dirs_skipped) == (1, 1)
+    result = _scan(scanner, root, 'library.json')
+    assert (result.dirs_listed, result.dirs_skipped) == (0, 2)
+
+def test_imports_belong_to_one_library(tree):
+    root, index = tree
+    scanner = MediaScanner(index, workers=1)
+    first = _scan(scanner, root, 'a.json')
+    # 另一个媒体库：目录未变化，不重新计算指纹，但文件仍然是新的
+    result = scanner.scan([root], library='b.json')
+    assert _titles(result) == _titles(first) and result.files_hashed == 0
+    # 添加后没有保存（例如被撤销或放弃）：没有记为已导入，下次扫描时仍然生成记录
+    assert _titles(scanner.scan([root], library='b.json')) == _titles(first)
+    # 本次会话中已添加、尚未保存的指纹由调用方传入
+    assert scanner.scan([root], library='b.json', imported=result.fingerprints).records == []
+    assert scanner.scan([root], library='a.json').records == []
+
+def test_unreadable_files_are_retried(tree, monkeypatch):
+    root, index = tree
+    scanner = MediaScanner(index, workers=1)
+    real = media_scanner.fingerprint
+    monkeypatch.setattr(media_scanner, 'fingerprint',
+                        lambda path, size: '' if 'Alien' in path else real(path, size))
+    assert _titles(_scan(scanner, root, 'library.json')) == [('Heat', 1995), ('Up', 2009)]
+    monkeypatch.setattr(media_scanner, 'fingerprint', real)
+    result = _scan(scanner, root, 'library.json')
+    assert _titles(result) == [('Alien', 1979)] and result.files_hashed == 1
+
+def test_identical_files_are_added_once(tree):
+    root, index = tree
+    _write(os.path.join(root, 'copy', 'Alien.Copy.mkv'), b'alien' * 100)
+    result = MediaScanner(index, workers=1).scan([root])
+    assert len(result.records) == 3
+
+def test_fingerprints_in_process_pool(tree, monkeypatch):
+    root, index = tree
+    monkeypatch.setattr(media_scanner, 'PARALLEL_MIN_FILES', 1)
+    result = MediaScanner(index, workers=2).scan([root])
+    assert _titles(result) == [('Alien', 1979), ('Heat', 1995), ('Up', 2009)]
+
+def test_fingerprint_reads_head_and_tail(tmp_path):
+    size = 3 * media_scanner.FINGERPRINT_BYTES
+    a, b = str(tmp_path / 'a'), str(tmp_path / 'b')
+    _write(a, b'\0' * size)
+    # 只有中间不同：部分内容摘要相同
+    _write(b, b'\0' * media_scanner.FINGERPRINT_BYTES + b'\1' * media_scanner.FINGERPRINT_BYTES
+           + b'\0' * media_scanner.FINGERPRINT_BYTES)
+    assert fingerprint(a, size) == fingerprint(b, size)
+    _write(b, b'\0' * (size - 1) + b'\1')
+    assert fingerprint(a, size) != fingerprint(b, size)
+    assert fingerprint(str(tmp_path / 'missing'), 1) == ''
@@ -0,0 +1,66 @@
+import pytest
+from models.media_model import MediaItem
+from models.media_store import MediaStore
+from models.media_table_model import MediaTableModel
+
+def make_items():
+    return [
+        MediaItem('千与千寻', '宫崎骏', 2001, 9.4, 'http://p/1.jpg', '少女误入神灵世界'),
+        MediaItem('The Matrix', 'Wachowski', 1999, 8.7),
+        MediaItem('龙猫', '宫崎骏', 1988, 9.2),
+    ]
+
+def test_round_trip_matches_dataclass():
+    items = make_items()
+    store = MediaStore(items)
+    assert len(store) == 3
+    assert store.to_items() == items
+    assert store.to_dicts() == [item.to_dict() for item in items]
+    assert MediaStore.from_dicts(store.to_dicts()).to_items() == items
+    assert store[0].plot == '少女误入神灵世界'
+    assert store[-1].to_dict() == items[-1].to_dict()
+    with pytest.raises(IndexError):
+        store[3]
+
+def test_views_write_through_and_rows_shift():
+    store = MediaStore(make_items())
+    view = store[1]
+    view.title = 'Matrix Reloaded'
+    view.rating = 7.2
+    view.apply_metadata({'plot': 'Neo returns'})
+    assert store.to_item(1) == MediaItem('Matrix Reloaded', 'Wachowski', 1999, 7.2, '', 'Neo returns')
+
+    store.insert(0, [MediaItem('Akira', 'Otomo', 1988, 8.0)])
+    del store[2:4]
+    assert [item.title for item in store] == ['Akira', '千与千寻']
+    store.compact()
+    assert store.to_items()[1] == make_items()[0]
+
+def test_year_overflow_leaves_store_unchanged():
+    store = MediaStore(make_items())
+    with pytest.raises(OverflowError):
+        store.extend([MediaItem('Far future', '', 70000, 1.0)])
+    assert len(store) == 3
+    assert store.to_items() == make_items()
+
+def test_backs_the_table_model():
+    model = MediaTableModel()
+    store = MediaStore(make_items())
+    model.set_items(store)
+    assert model.rowCount() == 3
+    assert model.index(1, 0).data() == 'The Matrix' and model.index(2, 2).data() == '1988'
+
+    model.insert_items(1, [MediaItem('Akira', 'Otomo', 1988, 8.0), MediaItem('Heat', 'Mann', 1995, 8.3)])
+    assert [model.index(r, 0).data() for r in range(model.rowCount())] == [
+        '千与千寻', 'Akira', 'Heat', 'The Matrix', '龙猫']
+    assert model.index(2, 3).data() == '8.3'
+    model.remove_items(0, 2)
+    assert [item.title for item in store] == ['Heat', 'The Matrix', '龙猫']
+    assert store.to_items()[1:] == make_items()[1:]
+
+    # 切片赋值可以使用本集合的视图，值在删除之前读出
+    store[0:1] = [store[2]]
+    store[1] = MediaItem('Up', 'Docter', 2009, 8.3)
+    assert [item.title for item in store] == ['龙猫', 'Up', '龙猫']
+    with pytest.raises(ValueError):
+        store[::2] = []
@@ -0,0 +1,30 @@
+from PySide6.QtCore import Qt
+from models.media_model import MediaItem
+from models.media_table_model import MediaTableModel
+
+def test_data_is_read_from_items():
+    items = [MediaItem('X','A',1999,5.5)]
+    model = MediaTableModel()
+    model.set_items(items)
+    assert model.rowCount() == 1
+    assert model.index(0,2).data() == '1999'
+    assert model.headerData(0, Qt.Horizontal) == '标题'
+
+    items[0].title = 'Y'
+    assert model.index(0,0).data() == 'Y'
+
+def test_insert_remove_signals():
+    items = []
+    model = MediaTableModel()
+    model.set_items(items)
+    inserted, removed = [], []
+    model.rowsInserted.connect(lambda parent, first, last: inserted.append((first, last)))
+    model.rowsRemoved.connect(lambda parent, first, last: removed.append((first, last)))
+
+    model.insert_items(0, [MediaItem('A','',2000,1.0), MediaItem('B','',2001,2.0)])
+    assert inserted == [(0, 1)]
+    assert len(items) == 2
+
+    model.remove_items(0, 2)
+    assert removed == [(0, 1)]
+    assert items == []
@@ -0,0 +1,53 @@
+import threading
+import time
+from services.metadata_scheduler import MetadataScheduler, RateLimiter
+
+class _CountingScheduler(MetadataScheduler):
+    def __init__(self, **kwargs):
+        super().__init__(api_key='test', **kwargs)
+        self.calls = []
+        self.active = 0
+        self.max_active = 0
+        self._lock = threading.Lock()
+
+    def _fetch(self, title):
+        with self._lock:
+            self.calls.append(title)
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        time.sleep(0.02)
+        with self._lock:
+            self.active -= 1
+        return {'poster_url': '', 'plot': title}
+
+def _drain(qt_app, scheduler):
+    while scheduler.pending:
+        qt_app.processEvents()
+
+def test_duplicate_titles_are_coalesced(qt_app):
+    scheduler = _CountingScheduler(max_workers=2, rate_limit=0)
+    results = []
+    finished = []
+    scheduler.task_finished.connect(lambda: finished.append(1))
+    for title in ['Alien', ' alien ', 'ALIEN', 'Heat']:
+        scheduler.submit(title, lambda info: results.append(info['plot']))
+    _drain(qt_app, scheduler)
+
+    assert sorted(scheduler.calls) == ['Alien', 'Heat']
+    assert sorted(results) == ['Alien', 'Alien', 'Alien', 'Heat']
+    assert len(finished) == 2
+
+def test_pool_size_is_bounded(qt_app):
+    scheduler = _CountingScheduler(max_workers=3, rate_limit=0)
+    for i in range(12):
+        scheduler.submit(f'T{i}')
+    _drain(qt_app, scheduler)
+    assert len(scheduler.calls) == 12
+    assert scheduler.max_active <= 3
+
+def test_rate_limiter_spaces_requests():
+    limiter = RateLimiter(100)
+    start = time.monotonic()
+    for _ in range(6):
+        limiter.acquire()
+    assert time.monotonic() - start >= 0.05
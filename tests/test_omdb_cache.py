@@ -0,0 +1,40 @@
+from services.metadata_scheduler import MetadataScheduler
+from services.omdb_cache import OMDbCache
+
+def _run(qt_app, url, cache, titles):
+    scheduler = MetadataScheduler(api_key='k', rate_limit=0, cache=cache, url=url)
+    results = {}
+    for title in titles:
+        scheduler.submit(title, lambda info, title=title: results.__setitem__(title, info))
+    while scheduler.pending:
+        qt_app.processEvents()
+    return results
+
+def test_second_session_makes_no_network_calls(qt_app, omdb_server, tmp_path):
+    url, seen = omdb_server.url, omdb_server.requests
+    path = str(tmp_path / 'cache.sqlite3')
+    titles = ['Alien', 'Heat', 'Missing']
+
+    first = _run(qt_app, url, OMDbCache(path), titles)
+    assert sorted(seen) == sorted(titles)
+    assert first['Alien']['plot'] == 'Alien plot'
+    assert 'Missing' not in first
+
+    cache = OMDbCache(path)
+    second = _run(qt_app, url, cache, titles)
+    assert len(seen) == 3
+    assert second == first
+    assert cache.stats() == {'hits': 3, 'misses': 0, 'entries': 3}
+
+def test_ttl_and_lru_eviction(tmp_path):
+    cache = OMDbCache(str(tmp_path / 'cache.sqlite3'), max_entries=2, negative_ttl=-1)
+    cache.put('a', {'plot': 'A'})
+    cache.put('b', {'plot': 'B'})
+    assert cache.get('a') == (True, {'plot': 'A'})
+    cache.put('c', {'plot': 'C'})
+    # b 最久未被访问，被淘汰
+    assert cache.get('b') == (False, None)
+    assert cache.get('a')[0] and cache.get('c')[0]
+
+    cache.put('missing', None)
+    assert cache.get('missing') == (False, None)
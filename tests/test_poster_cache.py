@@ -0,0 +1,49 @@
+from PySide6.QtCore import QSize, Qt
+from PySide6.QtGui import QPixmap
+from models.media_model import MediaItem
+from models.media_table_model import MediaTableModel
+from services.poster_cache import PixmapLRU, PosterCache
+
+def test_thumbnail_is_downscaled_and_cached_on_disk(omdb_server, tmp_path, wait_until):
+    url = f'{omdb_server.url}poster/Alien.png'
+    cache = PosterCache(str(tmp_path), thumb_size=QSize(32, 48))
+    ready = []
+    cache.thumbnail_ready.connect(ready.append)
+
+    assert cache.get(url) is None
+    wait_until(lambda: ready)
+    pixmap = cache.get(url)
+    assert pixmap.size() == QSize(32, 48)
+
+    # 新的缓存实例直接从磁盘读取，不再下载
+    cache2 = PosterCache(str(tmp_path), thumb_size=QSize(32, 48))
+    cache2.get(url)
+    wait_until(lambda: cache2.get(url) is not None)
+    assert len(omdb_server.poster_requests) == 1
+
+def test_model_swaps_placeholder_for_thumbnail(omdb_server, tmp_path, wait_until):
+    items = [MediaItem('Alien', 'C', 1979, 8.5, poster_url=f'{omdb_server.url}poster/Alien.png'),
+             MediaItem('Heat', 'C', 1995, 8.3)]
+    cache = PosterCache(str(tmp_path))
+    model = MediaTableModel()
+    model.set_poster_cache(cache)
+    model.set_items(items)
+    changed = []
+    model.dataChanged.connect(lambda first, last, roles: changed.append(first.row()))
+
+    placeholder = model.index(0, 0).data(Qt.DecorationRole)
+    assert isinstance(placeholder, QPixmap)
+    assert model.index(1, 0).data(Qt.DecorationRole) is None
+
+    wait_until(lambda: changed)
+    assert changed == [0]
+    assert model.index(0, 0).data(Qt.DecorationRole) is not placeholder
+
+def test_lru_is_bounded_by_bytes():
+    pixmap = QPixmap(10, 10)
+    cost = PixmapLRU._cost(pixmap)
+    lru = PixmapLRU(cost * 2)
+    for key in 'abc':
+        lru.put(key, pixmap)
+    assert len(lru) == 2 and lru.get('a') is None
+    assert lru.used_bytes == cost * 2
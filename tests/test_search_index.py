@@ -0,0 +1,109 @@
+from PySide6.QtCore import Qt
+from controllers.library_controller import LibraryController
+from models.media_model import MediaItem
+from models.media_table_model import MediaTableModel
+from models.search_index import SearchIndex
+from models.search_proxy_model import SearchProxyModel
+from repository.json_repository import JSONRepository
+
+def make_items():
+    return [
+        MediaItem('千与千寻', '宫崎骏', 2001, 9.4),
+        MediaItem('The Matrix', 'Wachowski', 1999, 8.7),
+        MediaItem('龙猫', '宫崎骏', 1988, 9.2),
+        MediaItem('Matrix Reloaded', 'Wachowski', 2003, 7.2),
+    ]
+
+def test_cjk_prefix_and_ranges():
+    index = SearchIndex()
+    index.reset(make_items())
+    assert index.search() is None
+    assert index.search('千寻') == [0]
+    assert index.search('宫崎') == [0, 2]
+    assert index.search('千猫') == []
+    assert index.search('mat') == [1, 3]
+    assert index.search('MATRIX reload') == [3]
+    assert index.search('atrix') == []
+    assert index.search(min_year=1999, max_year=2001) == [0, 1]
+    assert index.search('宫崎骏', min_rating=9.3) == [0]
+
+def test_incremental_build_and_maintenance():
+    items = make_items()
+    index = SearchIndex()
+    index.reset(items)
+    assert not index.build_step(2)
+    assert not index.built
+
+    items.insert(1, MediaItem('Matrix Resurrections', 'Wachowski', 2021, 5.7))
+    index.insert_rows(1)
+    items.append(MediaItem('Akira', 'Otomo', 1988, 8.0))
+    index.insert_rows(len(items) - 1)
+    assert index.search('matrix') == [1, 2, 4]
+
+    items[0].title = 'Spirited Away'
+    index.update_row(0)
+    assert index.search('千寻') == []
+    assert index.search('spirit') == [0]
+
+    del items[0:2]
+    index.remove_rows(0, 2)
+    assert index.search('matrix') == [0, 2]
+    assert index.search(max_year=1988) == [1, 3]
+
+def _entries(index):
+    buckets = [*index._postings.values(), *index._years.values(), *index._ratings.values()]
+    return sum(len(bucket) for bucket in buckets)
+
+def test_stale_entries_are_counted_exactly():
+    items = make_items()
+    index = SearchIndex()
+    index.reset(items)
+    index.ensure_built()
+    assert index._live_entries == _entries(index) and index._garbage == 0
+    items[1].title = 'Heat'
+    index.update_row(1)
+    del items[2:]
+    index.remove_rows(2, 2)
+    assert index._live_entries + index._garbage == _entries(index)
+    # 过期记录刚好来自旧的第 1 行和被删除的两行
+    fresh = SearchIndex()
+    fresh.reset(items)
+    fresh.ensure_built()
+    assert index._live_entries == _entries(fresh)
+    del items[:]
+    index.remove_rows(0, 2)
+    assert index._live_entries == 0
+    assert index.search('heat') == [] and index._garbage == 0
+
+def test_parse_query():
+    assert SearchIndex.parse_query('matrix year:1990-1999 rating:8-') == {
+        'text': 'matrix', 'min_year': 1990, 'max_year': 1999,
+        'min_rating': 8.0, 'max_rating': None}
+    assert SearchIndex.parse_query('year:2001') == {
+        'text': '', 'min_year': 2001, 'max_year': 2001}
+    assert SearchIndex.parse_query('year:abc') == {'text': 'year:abc'}
+
+def test_controller_search_with_proxy():
+    model = MediaTableModel()
+    controller = LibraryController(model, JSONRepository())
+    proxy = SearchProxyModel(controller.search)
+    proxy.setSourceModel(model)
+    for item in make_items():
+        controller.add_item(item.to_dict())
+    assert proxy.rowCount() == 4
+
+    proxy.set_criteria(**SearchIndex.parse_query('matrix'))
+    assert proxy.rowCount() == 2
+    assert proxy.mapToSource(proxy.index(1, 0)).row() == 3
+    assert proxy.headerData(1, Qt.Vertical) == '4'
+
+    controller.add_item({'title': 'Matrix 4', 'creator': '', 'year': 2021, 'rating': 5.7})
+    assert proxy.rowCount() == 3
+    controller.edit_item(1, {'title': 'Ghost in the Shell'})
+    assert [proxy.index(r, 0).data() for r in range(proxy.rowCount())] == [
+        'Matrix Reloaded', 'Matrix 4']
+    controller.delete_item(0)
+    assert proxy.mapToSource(proxy.index(0, 0)).row() == 2
+
+    proxy.set_criteria()
+    assert proxy.rowCount() == 4
@@ -0,0 +1,130 @@
+import json
+import os
+import pytest
+from PySide6.QtCore import QItemSelectionModel
+from controllers.library_controller import LibraryController
+from models.media_model import MediaItem
+from models.media_table_model import MediaTableModel
+from repository.json_repository import JSONRepository
+from models.search_proxy_model import SearchProxyModel
+from services.library_watcher import LibraryWatcher
+from services.session_cache import SessionCache
+
+# 中文标题和简介，覆盖快照字符串表中的非 ASCII 字符串
+_FIELDS = {'title': lambda i: f'标题{i}', 'creator': '导演', 'plot': lambda i: '简介' * i}
+
+@pytest.fixture
+def library(tmp_path, media_items, wait_until):
+    """已保存到 library.json 的控制层，以及写入了它的会话缓存"""
+    path = str(tmp_path / 'library.json')
+    controller = LibraryController(MediaTableModel(), JSONRepository())
+    controller._set_items(media_items(**_FIELDS))
+    controller.save_library(path)
+    os.makedirs(tmp_path / 'cache')
+    cache = SessionCache(str(tmp_path / 'cache' / 'session.mlib'))
+    stored = []
+    cache.stored.connect(stored.append)
+    view = {'sort': [['year', False]], 'widths': [200, 120, 60, 60], 'row': 3}
+    cache.store(controller.snapshot(), path, view, order=[4, 3, 2, 1, 0])
+    wait_until(lambda: stored)
+    return path, cache, view
+
+def _verify(cache, entry, wait_until):
+    results = []
+    cache.verified.connect(lambda path: results.append('verified'))
+    cache.stale.connect(lambda path: results.append('stale'))
+    cache.verify(entry)
+    wait_until(lambda: results)
+    return results[0]
+
+def test_restore_maps_the_snapshot_and_view_state(library, media_items, wait_until):
+    path, cache, view = library
+    entry = cache.restore(path)
+    assert entry is not None and entry.source == os.path.abspath(path)
+    assert list(entry.items) == media_items(**_FIELDS)
+    assert entry.view == view
+    assert list(entry.order) == [4, 3, 2, 1, 0]
+    controller = LibraryController(MediaTableModel(), JSONRepository(path))
+    controller.restore(entry.items)
+    proxy = SearchProxyModel(controller.search, controller.sort_order)
+    proxy.setSourceModel(controller._model)
+    proxy.restore_sort([('year', False)], entry.order)
+    # 显示顺序取自缓存，排序列尚未建立
+    assert controller._columns is None
+    assert proxy.mapToSource(proxy.index(0, 0)).row() == 4
+    assert proxy.mapFromSource(controller._model.index(4, 0)).row() == 0
+    assert controller.get_item(4).plot == '简介' * 4
+    assert controller.search('标题3') == [3]
+    assert _verify(cache, entry, wait_until) == 'verified'
+
+def test_cache_belongs_to_one_source(library, tmp_path):
+    path, cache, _ = library
+    other = tmp_path / 'other.json'
+    other.write_text('[]', encoding='utf-8')
+    assert cache.restore(str(other)) is None
+    os.remove(path)
+    assert cache.restore(path) is None
+
+def test_changes_with_preserved_mtime_are_stale(library, wait_until):
+    path, cache, _ = library
+    entry = cache.restore(path)
+    stat = os.stat(path)
+    with open(path, 'r+', encoding='utf-8') as f:
+        data = f.read()
+        f.seek(0)
+        f.write(data.replace('标题1', '标题9'))
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    assert os.stat(path).st_size == stat.st_size
+    assert _verify(cache, entry, wait_until) == 'stale'
+
+def test_journal_is_part_of_the_fingerprint(library, wait_until):
+    path, cache, _ = library
+    entry = cache.restore(path)
+    with open(path + '.journal', 'w', encoding='utf-8') as f:
+        f.write('{}\n')
+    assert _verify(cache, entry, wait_until) == 'stale'
+
+def test_damaged_or_cleared_cache_is_ignored(library):
+    path, cache, _ = library
+    with open(cache.meta_path, encoding='utf-8') as f:
+        meta = json.load(f)
+    meta['rows'] += 1
+    with open(cache.meta_path, 'w', encoding='utf-8') as f:
+        json.dump(meta, f)
+    assert cache.restore(path) is None
+    cache.clear()
+    assert not os.path.exists(cache.meta_path) and cache.restore(path) is None
+
+def test_stale_reconcile_keeps_the_selection_of_a_sorted_view(library, media_items, wait_until):
+    path, cache, _ = library
+    entry = cache.restore(path)
+    controller = LibraryController(MediaTableModel(), JSONRepository(path))
+    controller.restore(entry.items)
+    proxy = SearchProxyModel(controller.search, controller.sort_order)
+    proxy.setSourceModel(controller._model)
+    proxy.restore_sort([('year', False)], entry.order)
+    selection = QItemSelectionModel(proxy)
+    selection.setCurrentIndex(proxy.index(1, 0),
+                              QItemSelectionModel.ClearAndSelect | QItemSelectionModel.Rows)
+    resets = []
+    proxy.modelReset.connect(lambda: resets.append(True))
+
+    # 缓存之后文件被改写：删除第一项、修改一项并追加一项
+    items = media_items(**_FIELDS)
+    items[1].year = 2010
+    del items[0]
+    items.append(MediaItem('标题5', '导演', 1990, 1.0))
+    JSONRepository().save(items, path)
+    watcher = LibraryWatcher(controller)
+    applied = []
+    watcher.applied.connect(lambda p, summary: applied.append(summary))
+    watcher.watch(path, lambda p: JSONRepository().load(p))
+    watcher.recheck()
+    wait_until(lambda: applied)
+
+    assert controller.items() == items and not resets
+    assert [proxy.index(r, 0).data() for r in range(proxy.rowCount())] == [
+        '标题1', '标题4', '标题3', '标题2', '标题5']
+    # 选择和当前行仍是之前选中的“标题3”
+    assert [index.data() for index in selection.selectedRows()] == ['标题3']
+    assert selection.currentIndex().data() == '标题3'
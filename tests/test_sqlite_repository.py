@@ -0,0 +1,108 @@
+import time
+from PySide6.QtCore import QCoreApplication
+from controllers.library_controller import LibraryController
+from models.media_model import MediaItem
+from models.media_table_model import MediaTableModel
+from models.search_index import SearchIndex
+from repository.json_repository import JSONRepository
+from repository.sqlite_repository import SQLiteRepository, convert_json_to_sqlite
+
+def _creator(i):
+    return f'C{i % 2}'
+
+def test_save_load_roundtrip(tmp_path, media_items):
+    file = tmp_path / "library.db"
+    repo = SQLiteRepository()
+    repo.save(media_items(creator=_creator), str(file))
+    assert SQLiteRepository().load(str(file)) == media_items(creator=_creator)
+
+def test_row_level_changes_are_committed_on_save(tmp_path, media_items):
+    file = tmp_path / "library.db"
+    SQLiteRepository().save(media_items(creator=_creator), str(file))
+
+    repo = SQLiteRepository(str(file))
+    items = repo.load()
+    items[1].title = 'Edited'
+    repo.update(1, items[1])
+    del items[0]
+    repo.delete(0)
+    for row in (0, 2, len(items)):
+        items.insert(row, MediaItem(f'New{row}', 'D', 2020, 9.0))
+        repo.insert(row, items[row])
+
+    # 未保存的修改不会被其他连接看到
+    assert SQLiteRepository().load(str(file)) == media_items(creator=_creator)
+    repo.save(items)
+    assert SQLiteRepository().load(str(file)) == items
+
+def test_indexed_search_and_paging(tmp_path, media_items):
+    file = tmp_path / "library.db"
+    repo = SQLiteRepository()
+    repo.save(media_items(10, creator=_creator), str(file))
+    assert [i.title for i in repo.search(creator='C1', min_year=2003, max_rating=7)] == ['T3', 'T5', 'T7']
+    assert [i.title for i in repo.search(title='T', limit=2)] == ['T0', 'T1']
+    assert [i.title for i in repo.fetch_rows(8, 5)] == ['T8', 'T9']
+
+def test_convert_from_json(tmp_path, media_items):
+    src, dst = tmp_path / "library.json", tmp_path / "library.db"
+    JSONRepository().save(media_items(creator=_creator), str(src))
+    convert_json_to_sqlite(str(src), str(dst))
+    assert SQLiteRepository().load(str(dst)) == media_items(creator=_creator)
+
+def test_write_new_streams_without_touching_the_connection(tmp_path, media_items):
+    file, other = str(tmp_path / "library.db"), str(tmp_path / "other.db")
+    repo = SQLiteRepository()
+    repo.save(media_items(creator=_creator), file)
+    repo.write_new((item for item in media_items(3, creator=_creator)), other)
+    assert SQLiteRepository().load(other) == media_items(3, creator=_creator)
+    assert repo.count() == 5 and repo.fetch_rows(4, 1) == media_items(creator=_creator)[4:]
+
+def test_controller_pages_rows_on_demand(tmp_path, media_items):
+    file = str(tmp_path / "library.db")
+    SQLiteRepository().save(media_items(1200, creator=_creator), file)
+    model = MediaTableModel()
+    repo = SQLiteRepository(file)
+    controller = LibraryController(model, repo)
+    controller.load_library(file)
+    # 空闲时也不预建内存索引，否则会把整张表读进来
+    deadline = time.monotonic() + 0.3
+    while time.monotonic() < deadline:
+        QCoreApplication.processEvents()
+    assert model.rowCount() == 1200 and repo.pages_read == 0
+    # 读取一行只查询它所在的一页，同一页的其他行不再查询
+    assert model.index(1100, 0).data() == 'T1100'
+    assert model.index(1101, 0).data() == 'T1101'
+    assert repo.pages_read == 1
+    # 搜索直接查询数据库
+    assert controller.search('t115') == [115] + list(range(1150, 1160))
+    assert controller.search('', min_year=3195) == [1195, 1196, 1197, 1198, 1199]
+    assert repo.pages_read == 1
+
+    controller.edit_item(1100, {'title': 'Edited'})
+    controller.delete_rows([0, 5, 1150])
+    controller.add_item({'title': 'New', 'creator': 'D', 'year': 2020, 'rating': 9.0})
+    expected = [item.copy() for item in controller.items()]
+    controller.save_library()
+    assert SQLiteRepository().load(file) == expected
+    assert expected[1098].title == 'Edited' and expected[-1].title == 'New'
+
+def test_search_rows_matches_search_index(tmp_path):
+    file = str(tmp_path / "library.db")
+    items = [MediaItem('The Matrix', 'Wachowski', 1999, 8.7),
+             MediaItem('千与千寻', '宫崎骏', 2001, 9.4),
+             MediaItem('Élan_vital', 'Nobody', 2010, 5.0),
+             MediaItem('Mad Max', 'George Miller', 1979, 6.8)]
+    repo = SQLiteRepository()
+    repo.save(items, file)
+    index = SearchIndex()
+    index.reset(items)
+    for query in ('mat', 'matrix wach', 'atrix', '千寻', '宫崎', 'élan', 'élan_v', 'max',
+                  'george max', 'zzz'):
+        assert repo.search_rows(query) == index.search(query), query
+    assert repo.search_rows('m', min_year=1990) == index.search('m', min_year=1990) == [0]
+    assert repo.search_rows('', max_rating=7) == [2, 3]
+    assert repo.search_rows('') is None
+    # 单条修改未提交时也能查到
+    repo.delete(0)
+    repo.insert(1, MediaItem('Matrix Reloaded', 'Wachowski', 2003, 7.2))
+    assert repo.search_rows('matrix') == [1]
@@ -0,0 +1,23 @@
+import os
+import subprocess
+import sys
+from services.startup_timer import StartupTimer
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def test_timer_phases_are_intervals():
+    timer = StartupTimer()
+    timer.mark('a')
+    timer.mark('b')
+    phases = timer.phases()
+    assert [name for name, _ in phases] == ['a', 'b']
+    assert abs(sum(ms for _, ms in phases) - timer.total()) < 1e-6
+
+def test_main_defers_heavy_imports():
+    code = ('import sys, main; print(sorted(m for m in '
+            '("requests", "aiohttp", "numpy", "qt_material", "dotenv", "PySide6.QtSvg") '
+            'if m in sys.modules))')
+    env = dict(os.environ, QT_QPA_PLATFORM='offscreen')
+    result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True,
+                            cwd=ROOT, env=env, check=True)
+    assert result.stdout.strip() == '[]'
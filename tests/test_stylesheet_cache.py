@@ -0,0 +1,23 @@
+import qt_material
+from ui import stylesheet_cache
+
+def test_stylesheet_is_generated_once_per_theme(tmp_path, monkeypatch):
+    calls = []
+
+    def build_stylesheet(theme, invert_secondary, parent):
+        calls.append(theme)
+        (tmp_path / 'resources' / parent / 'primary').mkdir(parents=True)
+        return f'/* {theme} */'
+    monkeypatch.setattr(qt_material, 'build_stylesheet', build_stylesheet)
+    monkeypatch.setattr(stylesheet_cache, 'RESOURCES_PATH', str(tmp_path / 'resources'))
+    monkeypatch.setattr(stylesheet_cache, '_loaded', {})
+    cache_dir = str(tmp_path / 'stylesheets')
+
+    assert stylesheet_cache.load_stylesheet('dark_teal.xml', cache_dir) == '/* dark_teal.xml */'
+    assert stylesheet_cache.load_stylesheet('light_blue.xml', cache_dir, True) == '/* light_blue.xml */'
+    # 新的进程：内存中的缓存为空，从文件读取
+    monkeypatch.setattr(stylesheet_cache, '_loaded', {})
+    assert stylesheet_cache.load_stylesheet('dark_teal.xml', cache_dir) == '/* dark_teal.xml */'
+    assert calls == ['dark_teal.xml', 'light_blue.xml']
+    assert sorted(p.name.split('-')[0] for p in (tmp_path / 'stylesheets').iterdir()) == [
+        'theme_dark_teal', 'theme_light_blue_inverted']
@@ -1,5 +1,6 @@
 from PySide6.QtWidgets import (
-    QDialog, QFormLayout, QLineEdit, QDialogButtonBox, QHBoxLayout, QLabel, QPushButton
+    QDialog, QFormLayout, QLineEdit, QDialogButtonBox, QHBoxLayout, QLabel, QPushButton,
+    QTreeWidget, QTreeWidgetItem, QVBoxLayout
 )
 from PySide6.QtCore import Qt, QSize
 from PySide6.QtGui import QPixmap, QIcon, QAction
@@ -58,4 +59,81 @@ class AddWarningDialog(QDialog):
         layout.addWidget(self.message_label)
         buttons = QDialogButtonBox(QDialogButtonBox.Ok, parent=self)
         buttons.accepted.connect(self.accept)
-        layout.addWidget(buttons)
\ No newline at end of file
+        layout.addWidget(buttons)
+
+
+class DuplicatesDialog(QDialog):
+    """
+    审阅重复项：每组一个可勾选的顶层节点，子节点为组内条目。
+    粗体的条目被保留，双击其他条目可改为保留它；只合并勾选的组。
+    """
+    KEEP_COLUMN = 4
+
+    def __init__(self, groups, parent=None):
+        """:param groups: services.duplicates.DuplicateGroup 列表"""
+        super().__init__(parent)
+        self.setWindowTitle('重复项')
+        self.resize(720, 480)
+        layout = QVBoxLayout(self)
+        exact = sum(group.exact for group in groups)
+        layout.addWidget(QLabel(
+            f'找到 {len(groups)} 组重复项（完全相同 {exact} 组，相似 {len(groups) - exact} 组）。'
+            '默认只勾选完全相同的组；双击条目可改为保留该条目。', self))
+
+        self.tree = QTreeWidget(self)
+        self.tree.setHeaderLabels(['标题', '导演/作者', '年份', '评分', ''])
+        self.tree.itemDoubleClicked.connect(self._on_double_clicked)
+        from services.duplicates import preferred_index
+        for group in groups:
+            top = QTreeWidgetItem(self.tree, [
+                f'{"完全相同" if group.exact else "相似"}：{group.items[0].title}（{len(group.items)} 项）'])
+            top.setFlags(top.flags() | Qt.ItemIsUserCheckable)
+            top.setCheckState(0, Qt.Checked if group.exact else Qt.Unchecked)
+            top.setFirstColumnSpanned(True)
+            for item in group.items:
+                child = QTreeWidgetItem(top, [item.title, item.creator, str(item.year),
+                                              str(item.rating), ''])
+                child.setData(0, Qt.UserRole, item)
+            self._set_keeper(top.child(preferred_index(group.items)))
+        self.tree.expandAll()
+        self.tree.resizeColumnToContents(0)
+        layout.addWidget(self.tree)
+
+        buttons = QDialogButtonBox(QDialogButtonBox.Ok | QDialogButtonBox.Cancel, parent=self)
+        buttons.button(QDialogButtonBox.Ok).setText('合并勾选的组')
+        buttons.accepted.connect(self.accept)
+        buttons.rejected.connect(self.reject)
+        layout.addWidget(buttons)
+
+    def _set_keeper(self, child: QTreeWidgetItem):
+        top = child.parent()
+        for index in range(top.childCount()):
+            other = top.child(index)
+            keep = other is child
+            other.setText(self.KEEP_COLUMN, '保留' if keep else '')
+            font = other.font(0)
+            font.setBold(keep)
+            for column in range(self.tree.columnCount()):
+                other.setFont(column, font)
+
+    def _on_double_clicked(self, item: QTreeWidgetItem, column: int):
+        if item.parent() is not None:
+            self._set_keeper(item)
+
+    def merges(self) -> list:
+        """勾选的组：[(保留的条目, [其余条目, ...]), ...]，交给 LibraryController.merge_duplicates"""
+        result = []
+        for index in range(self.tree.topLevelItemCount()):
+            top = self.tree.topLevelItem(index)
+            if top.checkState(0) != Qt.Checked:
+                continue
+            keeper, others = None, []
+            for child_index in range(top.childCount()):
+                child = top.child(child_index)
+                item = child.data(0, Qt.UserRole)
+                if child.text(self.KEEP_COLUMN):
+                    keeper = item
+                else:
+                    others.append(item)
+            result.append((keeper, others))
+        return result
@@ -0,0 +1,121 @@
+"""
+qt_material 样式表的磁盘缓存。
+
+qt_material.apply_stylesheet 每次启动都要导入 jinja2、删除并重新生成图标资源、
+再渲染模板。这里把渲染结果按主题和 qt_material 版本保存为 .qss 文件，
+图标资源按主题放在各自的目录中；命中缓存时只需读取文件并设置搜索路径。
+各主题的资源目录互不覆盖，因此也可以在运行时切换主题。
+"""
+import hashlib
+import os
+from importlib import util
+from pathlib import Path
+from PySide6.QtCore import QDir
+from PySide6.QtGui import QColor, QFontDatabase, QGuiApplication, QPalette
+from iconmanager.theme import THEMES
+
+# 与 qt_material.resources.generate.RESOURCES_PATH 相同
+RESOURCES_PATH = os.path.join(Path.home(), '.qt_material')
+
+
+def _package_dir() -> str:
+    # 只定位包所在的目录，不执行 qt_material 的导入
+    return util.find_spec('qt_material').submodule_search_locations[0]
+
+
+def _version() -> str:
+    # 升级或重装 qt_material 后模板文件会变化，用它的修改时间和大小代替版本号；
+    # importlib.metadata 的导入本身就要几十毫秒
+    stat = os.stat(os.path.join(_package_dir(), 'material.qss.template'))
+    return f'{stat.st_mtime_ns}:{stat.st_size}'
+
+
+_fonts_added = False
+_style_set = False
+# 本次运行中已读取的样式表，切换回用过的主题时不再读文件
+_loaded: dict[str, str] = {}
+
+
+def _add_fonts():
+    global _fonts_added
+    if _fonts_added:
+        return
+    _fonts_added = True
+    fonts = os.path.join(_package_dir(), 'fonts', 'roboto')
+    for name in sorted(os.listdir(fonts)):
+        if name.endswith('.ttf'):
+            QFontDatabase.addApplicationFont(os.path.join(fonts, name))
+
+
+def _apply_palette(primary: str):
+    # 与 qt_material.build_stylesheet 对调色板的修改相同；颜色不变时不触发调色板变更事件
+    palette = QGuiApplication.palette()
+    color = QColor(primary)
+    color.setAlpha(92)
+    if palette.color(QPalette.ColorRole.Text) == color:
+        return
+    palette.setColor(QPalette.ColorRole.Text, color)
+    QGuiApplication.setPalette(palette)
+
+
+def theme_name(theme: str) -> str:
+    """'dark_teal.xml' -> 'dark_teal'，即 THEMES 的键"""
+    return theme[:-4] if theme.endswith('.xml') else theme
+
+
+def load_stylesheet(theme: str, cache_dir: str, invert_secondary: bool = False) -> str:
+    """
+    返回主题的样式表文本，并保证对应的图标资源目录存在。
+    缓存未命中时用 qt_material 生成并写入 cache_dir。
+    """
+    name = theme_name(theme)
+    parent = f'theme_{name}' + ('_inverted' if invert_secondary else '')
+    key = hashlib.sha1(f'{_version()}|{theme}|{invert_secondary}'.encode()).hexdigest()[:12]
+    path = os.path.join(cache_dir, f'{parent}-{key}.qss')
+    if path in _loaded:
+        return _loaded[path]
+    if os.path.exists(path) and os.path.isdir(os.path.join(RESOURCES_PATH, parent, 'primary')):
+        with open(path, encoding='utf-8') as f:
+            stylesheet = f.read()
+    else:
+        from qt_material import build_stylesheet
+        stylesheet = build_stylesheet(theme, invert_secondary, parent=parent)
+        if stylesheet is None:
+            raise ValueError(f'unknown theme {theme}')
+        os.makedirs(cache_dir, exist_ok=True)
+        for stale in os.listdir(cache_dir):
+            if stale.startswith(parent + '-'):
+                os.remove(os.path.join(cache_dir, stale))
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(stylesheet)
+        os.replace(tmp_path, path)
+    _loaded[path] = stylesheet
+    return stylesheet
+
+
+def apply_cached_stylesheet(app, theme: str, cache_dir: str,
+                            invert_secondary: bool = False) -> bool:
+    """
+    应用 qt_material 主题，优先使用缓存；返回样式表是否发生了变化。
+    可以在运行时反复调用来切换主题：字体和 Fusion 风格只设置一次，
+    样式表与当前相同时不重新应用，避免所有控件重新抛光。
+    :param theme: qt_material 主题文件名，例如 'dark_teal.xml'。
+    """
+    stylesheet = load_stylesheet(theme, cache_dir, invert_secondary)
+    name = theme_name(theme)
+    parent = f'theme_{name}' + ('_inverted' if invert_secondary else '')
+    global _style_set
+    if not _style_set:
+        # 应用样式表后 app.style() 是包装过的样式，不能据此判断；setStyle 会让所有控件重新抛光
+        _style_set = True
+        app.setStyle('Fusion')
+    _add_fonts()
+    if name in THEMES:
+        _apply_palette(THEMES[name]['colors']['primaryColor'])
+    # 替换而不是追加搜索路径，否则切换主题后仍会先找到旧主题的图标
+    QDir.setSearchPaths('icon', [os.path.join(RESOURCES_PATH, parent)])
+    if app.styleSheet() == stylesheet:
+        return False
+    app.setStyleSheet(stylesheet)
+    return True